@@ -23,6 +23,12 @@ Scenario format: cs sx sy gx gy  (base-grid coordinates).
 import argparse
 import os
 import random
+import sys
+
+# Occupancy-bitmap placement shared with the hetpibt scenario generator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'third_party', 'hetpibt', 'tools'))
+from gen_scenario import AnchorPool, Occupancy
 
 
 FLEET_SIZES = [1, 3, 5, 7]
@@ -57,15 +63,6 @@ def fleet_cells_free(grid, map_size, cs):
     return free, fw, fh
 
 
-def base_footprint(fx, fy, cs):
-    """Base-grid cells covered by fleet cell (fx, fy)."""
-    cells = set()
-    for dy in range(cs):
-        for dx in range(cs):
-            cells.add((fx * cs + dx, fy * cs + dy))
-    return cells
-
-
 def generate(map_size, door_heights, agents_per_fleet, num_scenarios,
              output_dir_maps, output_dir_scens, seed_start=0):
     max_cs = max(FLEET_SIZES)  # 7
@@ -140,8 +137,8 @@ def generate(map_size, door_heights, agents_per_fleet, num_scenarios,
         random.seed(seed)
 
         agents = []
-        occupied_starts = set()  # base cells
-        occupied_goals = set()   # base cells
+        occupied_starts = Occupancy(map_size, map_size)
+        occupied_goals = Occupancy(map_size, map_size)
 
         for cs in sorted(agents_per_fleet.keys(), reverse=True):
             count = agents_per_fleet[cs]
@@ -156,31 +153,30 @@ def generate(map_size, door_heights, agents_per_fleet, num_scenarios,
                     print(f"  Fleet cs={cs}: no left/right cells, skipping")
                 continue
 
-            placed = 0
-            attempts = 0
-            while placed < count and attempts < 3000:
-                attempts += 1
-
-                start = random.choice(left_cells)
-                goal = random.choice(right_cells)
-
-                s_base = base_footprint(start[0], start[1], cs)
-                g_base = base_footprint(goal[0], goal[1], cs)
+            start_pool = AnchorPool(
+                left_cells, occupied_starts.anchor_mask(left_cells, cs))
+            goal_pool = AnchorPool(
+                right_cells, occupied_goals.anchor_mask(right_cells, cs))
 
-                if s_base & occupied_starts or g_base & occupied_goals:
-                    continue
+            placed = 0
+            while placed < count:
+                start = start_pool.sample(random)
+                goal = goal_pool.sample(random)
+                if start is None or goal is None:
+                    break
 
                 sx = start[0] * cs
                 sy = start[1] * cs
                 gx = goal[0] * cs
                 gy = goal[1] * cs
                 agents.append((cs, sx, sy, gx, gy))
-                occupied_starts |= s_base
-                occupied_goals |= g_base
+                occupied_starts.reserve(start[0], start[1], cs)
+                occupied_goals.reserve(goal[0], goal[1], cs)
                 placed += 1
 
-            if placed < count and seed_offset == 0:
-                print(f"  Fleet cs={cs}: placed {placed}/{count}")
+            if placed < count:
+                print(f"  WARNING: scenario {seed_offset:02d} fleet cs={cs}: "
+                      f"placed {placed}/{count} (room full)")
 
         # Write .scen file
         scen_name = f"bottleneck_doors_{map_size}_{seed_offset:02d}.scen"
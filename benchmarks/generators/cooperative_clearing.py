@@ -17,6 +17,12 @@ Scenario format: cs sx sy gx gy  (base-grid coordinates).
 import argparse
 import os
 import random
+import sys
+
+# Occupancy-bitmap placement shared with the hetpibt scenario generator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'third_party', 'hetpibt', 'tools'))
+from gen_scenario import AnchorPool, Occupancy
 
 
 FLEET_SIZES = [1, 3, 5, 7]
@@ -51,15 +57,6 @@ def fleet_cells_free(grid, map_size, cs):
     return free, fw, fh
 
 
-def base_footprint(fx, fy, cs):
-    """Base-grid cells covered by fleet cell (fx, fy)."""
-    cells = set()
-    for dy in range(cs):
-        for dx in range(cs):
-            cells.add((fx * cs + dx, fy * cs + dy))
-    return cells
-
-
 def generate(map_size, agents_per_fleet, lr_ratio, num_scenarios,
              output_dir_maps, output_dir_scens, seed_start=0):
     max_cs = max(FLEET_SIZES)  # 7
@@ -130,8 +127,8 @@ def generate(map_size, agents_per_fleet, lr_ratio, num_scenarios,
         random.seed(seed)
 
         agents = []
-        occupied_starts = set()  # base cells
-        occupied_goals = set()   # base cells
+        occupied_starts = Occupancy(map_size, map_size)
+        occupied_goals = Occupancy(map_size, map_size)
 
         for cs in sorted(agents_per_fleet.keys(), reverse=True):
             count = agents_per_fleet[cs]
@@ -146,24 +143,30 @@ def generate(map_size, agents_per_fleet, lr_ratio, num_scenarios,
                     print(f"  Fleet cs={cs}: no left/right cells, skipping")
                 continue
 
-            placed = 0
-            attempts = 0
-            while placed < count and attempts < 3000:
-                attempts += 1
+            start_mask = occupied_starts.anchor_mask(left_cells + right_cells, cs)
+            goal_mask = occupied_goals.anchor_mask(left_cells + right_cells, cs)
+            # (start pool, goal pool) per direction; None once exhausted
+            left_to_right = (AnchorPool(left_cells, start_mask),
+                             AnchorPool(right_cells, goal_mask))
+            right_to_left = (AnchorPool(right_cells, start_mask),
+                             AnchorPool(left_cells, goal_mask))
 
+            placed = 0
+            while placed < count and (left_to_right or right_to_left):
                 # Bidirectional: lr_ratio go left->right, rest right->left
-                if random.random() < lr_ratio:
-                    start_pool, goal_pool = left_cells, right_cells
+                if left_to_right and right_to_left:
+                    to_right = random.random() < lr_ratio
                 else:
-                    start_pool, goal_pool = right_cells, left_cells
-
-                start = random.choice(start_pool)
-                goal = random.choice(goal_pool)
-
-                s_base = base_footprint(start[0], start[1], cs)
-                g_base = base_footprint(goal[0], goal[1], cs)
-
-                if s_base & occupied_starts or g_base & occupied_goals:
+                    to_right = left_to_right is not None
+                start_pool, goal_pool = left_to_right if to_right else right_to_left
+
+                start = start_pool.sample(random)
+                goal = goal_pool.sample(random)
+                if start is None or goal is None:
+                    if to_right:
+                        left_to_right = None
+                    else:
+                        right_to_left = None
                     continue
 
                 sx = start[0] * cs
@@ -171,12 +174,13 @@ def generate(map_size, agents_per_fleet, lr_ratio, num_scenarios,
                 gx = goal[0] * cs
                 gy = goal[1] * cs
                 agents.append((cs, sx, sy, gx, gy))
-                occupied_starts |= s_base
-                occupied_goals |= g_base
+                occupied_starts.reserve(start[0], start[1], cs)
+                occupied_goals.reserve(goal[0], goal[1], cs)
                 placed += 1
 
-            if placed < count and seed_offset == 0:
-                print(f"  Fleet cs={cs}: placed {placed}/{count}")
+            if placed < count:
+                print(f"  WARNING: scenario {seed_offset:02d} fleet cs={cs}: "
+                      f"placed {placed}/{count} (rooms full)")
 
         # Write .scen file
         scen_name = f"cooperative_clearing_{map_size}_{seed_offset:02d}.scen"
@@ -11,6 +11,12 @@ Fleet config: cs={1,3,5,7}.
 import argparse
 import os
 import random
+import sys
+
+# Occupancy-bitmap placement shared with the hetpibt scenario generator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'third_party', 'hetpibt', 'tools'))
+from gen_scenario import AnchorPool, Occupancy
 
 FLEET_SIZES = [1, 3, 5, 7]
 
@@ -120,26 +126,14 @@ def generate(map_size, agents_per_fleet, num_scenarios,
                 right.append((fx, fy))
         return left, right
 
-    # ---- Validate: check wall overlaps ----
-    def validate_placement(cs, fx, fy):
-        for dy in range(cs):
-            for dx in range(cs):
-                bx = fx * cs + dx
-                by = fy * cs + dy
-                if bx >= map_size or by >= map_size:
-                    return False
-                if grid[by][bx] != '.':
-                    return False
-        return True
-
     # ---- Generate scenarios ----
     for seed_offset in range(num_scenarios):
         seed = seed_start + seed_offset
         random.seed(seed)
 
         agents = []
-        occupied_starts = set()  # base cells
-        occupied_goals = set()
+        occupied_starts = Occupancy(map_size, map_size)
+        occupied_goals = Occupancy(map_size, map_size)
 
         for cs in sorted(agents_per_fleet.keys(), reverse=True):
             count = agents_per_fleet[cs]
@@ -151,35 +145,30 @@ def generate(map_size, agents_per_fleet, num_scenarios,
                     print(f"  Fleet cs={cs}: no left/right cells")
                 continue
 
-            placed = 0
-            attempts = 0
-            max_attempts = 3000
-
-            while placed < count and attempts < max_attempts:
-                attempts += 1
+            start_mask = occupied_starts.anchor_mask(left + right, cs)
+            goal_mask = occupied_goals.anchor_mask(left + right, cs)
+            # (start pool, goal pool) per direction; None once exhausted
+            left_to_right = (AnchorPool(left, start_mask),
+                             AnchorPool(right, goal_mask))
+            right_to_left = (AnchorPool(right, start_mask),
+                             AnchorPool(left, goal_mask))
 
+            placed = 0
+            while placed < count and (left_to_right or right_to_left):
                 # Half go left->right, half right->left
-                if random.random() < 0.5:
-                    start_cell = random.choice(left)
-                    goal_cell = random.choice(right)
+                if left_to_right and right_to_left:
+                    to_right = random.random() < 0.5
                 else:
-                    start_cell = random.choice(right)
-                    goal_cell = random.choice(left)
-
-                if not validate_placement(cs, start_cell[0], start_cell[1]):
-                    continue
-                if not validate_placement(cs, goal_cell[0], goal_cell[1]):
-                    continue
-
-                # Build base footprints
-                s_base = set()
-                g_base = set()
-                for dy in range(cs):
-                    for dx in range(cs):
-                        s_base.add((start_cell[0] * cs + dx, start_cell[1] * cs + dy))
-                        g_base.add((goal_cell[0] * cs + dx, goal_cell[1] * cs + dy))
-
-                if s_base & occupied_starts or g_base & occupied_goals:
+                    to_right = left_to_right is not None
+                start_pool, goal_pool = left_to_right if to_right else right_to_left
+
+                start_cell = start_pool.sample(random)
+                goal_cell = goal_pool.sample(random)
+                if start_cell is None or goal_cell is None:
+                    if to_right:
+                        left_to_right = None
+                    else:
+                        right_to_left = None
                     continue
 
                 sx = start_cell[0] * cs
@@ -187,12 +176,13 @@ def generate(map_size, agents_per_fleet, num_scenarios,
                 gx = goal_cell[0] * cs
                 gy = goal_cell[1] * cs
                 agents.append((cs, sx, sy, gx, gy))
-                occupied_starts |= s_base
-                occupied_goals |= g_base
+                occupied_starts.reserve(start_cell[0], start_cell[1], cs)
+                occupied_goals.reserve(goal_cell[0], goal_cell[1], cs)
                 placed += 1
 
-            if placed < count and seed_offset == 0:
-                print(f"  Fleet cs={cs}: placed {placed}/{count}")
+            if placed < count:
+                print(f"  WARNING: scenario {seed_offset:02d} fleet cs={cs}: "
+                      f"placed {placed}/{count} (open areas full)")
 
         scen_name = f"corridor_speed_{map_size}_{seed_offset:02d}.scen"
         scen_path = os.path.join(output_dir_scens, scen_name)
@@ -11,6 +11,12 @@ Fleet config: cs={1,3,5,7}.
 import argparse
 import os
 import random
+import sys
+
+# Occupancy-bitmap placement shared with the hetpibt scenario generator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', '..', 'third_party', 'hetpibt', 'tools'))
+from gen_scenario import AnchorPool, Occupancy
 
 FLEET_SIZES = [1, 3, 5, 7]
 
@@ -169,26 +175,14 @@ def generate(map_size, center_size, corridor_widths, agents_per_fleet,
                 endpoints[d] = cells
         return endpoints
 
-    # ---- Validate placement ----
-    def validate_placement(cs, fx, fy):
-        for dy in range(cs):
-            for dx in range(cs):
-                bx = fx * cs + dx
-                by = fy * cs + dy
-                if bx >= map_size or by >= map_size:
-                    return False
-                if grid[by][bx] != '.':
-                    return False
-        return True
-
     # ---- Generate scenarios ----
     for seed_offset in range(num_scenarios):
         seed = seed_start + seed_offset
         random.seed(seed)
 
         agents = []
-        occupied_starts = set()
-        occupied_goals = set()
+        occupied_starts = Occupancy(map_size, map_size)
+        occupied_goals = Occupancy(map_size, map_size)
 
         for cs in sorted(agents_per_fleet.keys(), reverse=True):
             count = agents_per_fleet[cs]
@@ -201,32 +195,32 @@ def generate(map_size, center_size, corridor_widths, agents_per_fleet,
                     print(f"  Fleet cs={cs}: only {len(usable_dirs)} usable dirs")
                 continue
 
-            placed = 0
-            attempts = 0
-            max_attempts = 3000
-
-            while placed < count and attempts < max_attempts:
-                attempts += 1
-
-                start_dir = random.choice(usable_dirs)
-                goal_dir = random.choice([d for d in usable_dirs if d != start_dir])
-
-                start = random.choice(endpoints[start_dir])
-                goal = random.choice(endpoints[goal_dir])
+            # center cells can be endpoints of two directions
+            all_cells = sorted({c for cells in endpoints.values() for c in cells})
+            start_mask = occupied_starts.anchor_mask(all_cells, cs)
+            goal_mask = occupied_goals.anchor_mask(all_cells, cs)
+            # pools are dropped once exhausted
+            start_pools = {d: AnchorPool(endpoints[d], start_mask)
+                           for d in usable_dirs}
+            goal_pools = {d: AnchorPool(endpoints[d], goal_mask)
+                          for d in usable_dirs}
 
-                if not validate_placement(cs, start[0], start[1]):
-                    continue
-                if not validate_placement(cs, goal[0], goal[1]):
+            placed = 0
+            while placed < count:
+                start_dirs = [d for d in start_pools
+                              if any(g != d for g in goal_pools)]
+                if not start_dirs:
+                    break
+                start_dir = random.choice(start_dirs)
+                goal_dir = random.choice([d for d in goal_pools if d != start_dir])
+
+                start = start_pools[start_dir].sample(random)
+                if start is None:
+                    del start_pools[start_dir]
                     continue
-
-                s_base = set()
-                g_base = set()
-                for dy in range(cs):
-                    for dx in range(cs):
-                        s_base.add((start[0] * cs + dx, start[1] * cs + dy))
-                        g_base.add((goal[0] * cs + dx, goal[1] * cs + dy))
-
-                if s_base & occupied_starts or g_base & occupied_goals:
+                goal = goal_pools[goal_dir].sample(random)
+                if goal is None:
+                    del goal_pools[goal_dir]
                     continue
 
                 sx = start[0] * cs
@@ -234,12 +228,13 @@ def generate(map_size, center_size, corridor_widths, agents_per_fleet,
                 gx = goal[0] * cs
                 gy = goal[1] * cs
                 agents.append((cs, sx, sy, gx, gy))
-                occupied_starts |= s_base
-                occupied_goals |= g_base
+                occupied_starts.reserve(start[0], start[1], cs)
+                occupied_goals.reserve(goal[0], goal[1], cs)
                 placed += 1
 
-            if placed < count and seed_offset == 0:
-                print(f"  Fleet cs={cs}: placed {placed}/{count}")
+            if placed < count:
+                print(f"  WARNING: scenario {seed_offset:02d} fleet cs={cs}: "
+                      f"placed {placed}/{count} (corridor endpoints full)")
 
         scen_name = f"intersection_{map_size}_{seed_offset:02d}.scen"
         scen_path = os.path.join(output_dir_scens, scen_name)
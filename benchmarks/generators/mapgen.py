@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Procedural benchmark maps as NumPy arrays, for scaling studies.
+
+MapBuilder keeps the map as an (H, W) bool array (True = free) and
+composes it with slice assignments: rooms, walls, doors of a given
+height, corridors of a given width and blocks of shelving. Width and
+height are rounded up to a multiple of the LCM of the fleet cell sizes
+(105 for 1, 3, 5, 7, as in the 105-series maps), so every fleet grid
+tiles the whole map. Openings (doors, corridors, aisles) are placed at
+the nearest offset where every fleet that fits the opening gets a full
+fleet cell through it.
+
+components() labels a fleet grid without a Python loop over cells: free
+runs of each row get ids, runs that touch between adjacent rows are
+joined by vectorized min-label propagation with pointer jumping. check()
+reports, per cell size, how many fleet cells the largest component holds.
+
+write() streams the rows in chunks, so a 2000x2000 map (4 MB) is written
+in well under a second.
+
+Layouts:
+  rooms      grid of rooms; every wall between two rooms gets one door of
+             each height in --doors (bottleneck_doors.py at scale)
+  warehouse  shelving blocks with aisles wide enough for every fleet and
+             cross aisles every --cross shelves
+  corridors  parallel corridors cycling through --widths, joined by two
+             halls at the ends (corridor_speed.py at scale)
+
+Usage:
+    python mapgen.py rooms --size 1050 --room 105 --doors 1,3,5,7 -o ../maps/rooms_1050.map
+    python mapgen.py warehouse --size 2100 -o ../maps/warehouse_2100.map
+    python mapgen.py corridors --size 1050 --widths 1,3,5,7,9 -o ../maps/corridors_1050.map
+"""
+import argparse
+import math
+import random
+import time
+from functools import reduce
+
+import numpy as np
+
+
+FLEET_SIZES = [1, 3, 5, 7]
+
+
+def parse_ints(s):
+    """Parse '1,3,5,7' into [1, 3, 5, 7]."""
+    return [int(x) for x in s.split(',') if x]
+
+
+def lcm(values):
+    return reduce(lambda a, b: a * b // math.gcd(a, b), values, 1)
+
+
+class MapBuilder:
+    """An (H, W) free-cell array built up with slice assignments."""
+
+    def __init__(self, width, height, sizes=FLEET_SIZES, free=False):
+        self.sizes = sorted(sizes)
+        self.unit = lcm(self.sizes)
+        self.width = -(-width // self.unit) * self.unit
+        self.height = -(-height // self.unit) * self.unit
+        self.free = np.full((self.height, self.width), free, dtype=bool)
+
+    # ---- primitives (base-cell coordinates, x right, y down) ----
+
+    def fill(self, x, y, w, h, free=True):
+        self.free[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = free
+
+    def border(self, thickness=1):
+        t = thickness
+        self.free[:t, :] = self.free[-t:, :] = False
+        self.free[:, :t] = self.free[:, -t:] = False
+
+    def room(self, x, y, w, h, wall=1):
+        """Free interior, walls of `wall` cells around it."""
+        self.fill(x, y, w, h, False)
+        self.fill(x + wall, y + wall, w - 2 * wall, h - 2 * wall, True)
+
+    def fits(self, lo, length):
+        """Cell sizes that get a full fleet cell in [lo, lo + length)."""
+        return [cs for cs in self.sizes
+                if cs <= length and -(-lo // cs) * cs + cs <= lo + length]
+
+    def align(self, lo, length, limit):
+        """Smallest offset >= lo (and <= limit - length) where an opening of
+        `length` fits every cell size <= length; lo if there is none."""
+        want = [cs for cs in self.sizes if cs <= length]
+        for start in range(lo, limit - length + 1):
+            if len(self.fits(start, length)) == len(want):
+                return start
+        return lo
+
+    def door(self, x, y, length, vertical=True):
+        """Open `length` cells of a wall starting at (x, y); a vertical door
+        runs down a wall column, a horizontal one along a wall row."""
+        if vertical:
+            self.fill(x, y, 1, length)
+        else:
+            self.fill(x, y, length, 1)
+
+    def corridor(self, x0, y0, x1, y1, width):
+        """Axis-aligned L-shaped corridor of `width` cells, horizontal leg
+        first, between the top-left corners (x0, y0) and (x1, y1)."""
+        self.fill(min(x0, x1), y0, abs(x1 - x0) + width, width)
+        self.fill(x1, min(y0, y1), width, abs(y1 - y0) + width)
+
+    def shelves(self, x, y, w, h, depth, length, aisle, cross=0, cross_aisle=None):
+        """Block [x, x + w) x [y, y + h) with shelving: `depth` x `length`
+        blocked blocks in rows, `aisle` free cells between blocks both ways,
+        and every `cross`-th aisle row widened to `cross_aisle`."""
+        cross_aisle = cross_aisle or aisle
+        rows = []
+        r = y + aisle
+        k = 0
+        while r + depth + aisle <= y + h:
+            rows.append(r)
+            k += 1
+            r += depth + (cross_aisle if cross and k % cross == 0 else aisle)
+        cols = np.arange(x + aisle, x + w - length - aisle + 1, length + aisle)
+        if not rows or not len(cols):
+            return 0
+        # one mask row for a whole shelf row, assigned to every shelf row
+        band = np.zeros(self.width, dtype=bool)
+        span = (cols[:, None] + np.arange(length)[None, :]).ravel()
+        band[span] = True
+        for r in rows:
+            self.free[r:r + depth, band] = False
+        return len(rows) * len(cols)
+
+    # ---- fleet grids ----
+
+    def fleet_free(self, cs):
+        """(H / cs, W / cs) bool: fleet cells whose cs x cs block is free."""
+        fh, fw = self.height // cs, self.width // cs
+        return self.free[:fh * cs, :fw * cs].reshape(fh, cs, fw, cs).all(axis=(1, 3))
+
+    def components(self, cs):
+        """(fh, fw) component labels of the fleet grid (-1 = blocked) and the
+        component sizes, labels numbered by size, largest first."""
+        free = self.fleet_free(cs)
+        fh, fw = free.shape
+        # run ids: a new run starts at every free cell whose left neighbour
+        # is blocked
+        starts = free.copy()
+        starts[:, 1:] &= ~free[:, :-1]
+        run = np.cumsum(starts.ravel()).reshape(fh, fw) - 1
+        run[~free] = -1
+        n_runs = int(starts.sum())
+        label = np.arange(n_runs)
+        # runs touching vertically; two runs overlap in one interval, so
+        # its first column gives each pair once
+        both = free[:-1] & free[1:]
+        first = both.copy()
+        first[:, 1:] &= ~(both[:, :-1] & ~starts[:-1, 1:] & ~starts[1:, 1:])
+        a, b = run[:-1][first], run[1:][first]
+        while True:
+            m = np.minimum(label[a], label[b])
+            old = label.copy()
+            np.minimum.at(label, a, m)
+            np.minimum.at(label, b, m)
+            label = label[label]  # pointer jumping
+            if np.array_equal(label, old):
+                break
+        roots, comp = np.unique(label, return_inverse=True)
+        sizes = np.bincount(comp[run[free]], minlength=len(roots))
+        order = np.argsort(-sizes, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        out = np.full((fh, fw), -1, dtype=np.int64)
+        out[free] = rank[comp[run[free]]]
+        return out, sizes[order]
+
+    def check(self, min_share=0.99):
+        """[(cs, free fleet cells, components, largest share, ok)]; ok when
+        the largest component holds at least `min_share` of the cells."""
+        report = []
+        for cs in self.sizes:
+            _, sizes = self.components(cs)
+            total = int(sizes.sum())
+            share = sizes[0] / total if total else 0.0
+            report.append((cs, total, len(sizes), share, share >= min_share))
+        return report
+
+    # ---- output ----
+
+    def write(self, path, chunk_rows=1024):
+        """Write a .map file, `chunk_rows` rows per write."""
+        chars = np.array([ord('@'), ord('.')], dtype=np.uint8)
+        with open(path, 'wb') as f:
+            f.write(f"type octile\nheight {self.height}\nwidth {self.width}\nmap\n"
+                    .encode())
+            line = np.full((chunk_rows, self.width + 1), ord('\n'), dtype=np.uint8)
+            for y in range(0, self.height, chunk_rows):
+                rows = self.free[y:y + chunk_rows]
+                line[:len(rows), :-1] = chars[rows.view(np.uint8)]
+                f.write(line[:len(rows)].tobytes())
+
+
+# ---------------------------------------------------------------------------
+# layouts
+# ---------------------------------------------------------------------------
+
+def rooms_layout(size, room, doors, sizes=FLEET_SIZES, seed=0):
+    """Grid of `room` x `room` rooms (walls shared) with one door of each
+    height in `doors` per wall between neighbouring rooms."""
+    rng = random.Random(seed)
+    b = MapBuilder(size, size, sizes, free=True)
+    H, W = b.free.shape
+    b.free[:, ::room] = False
+    b.free[::room, :] = False
+    b.border()
+    gap = max(b.sizes)
+    for horizontal in (False, True):
+        length = W if horizontal else H
+        across = H if horizontal else W
+        for wall in range(room, across - 1, room):
+            for seg in range(0, length - room + 1, room):
+                # doors spread along the segment, in random order
+                heights = rng.sample(list(doors), len(doors))
+                lo = seg + 1
+                for h in heights:
+                    start = b.align(lo, h, seg + room)
+                    if start + h > seg + room:
+                        break
+                    if horizontal:
+                        b.door(start, wall, h, vertical=False)
+                    else:
+                        b.door(wall, start, h, vertical=True)
+                    lo = start + h + gap
+    return b
+
+
+def warehouse_layout(size, depth, length, aisle, cross, sizes=FLEET_SIZES):
+    """Open hall with shelving; aisles default to 2 * max(cs) - 1 so every
+    fleet fits through any aisle, whatever its offset."""
+    b = MapBuilder(size, size, sizes, free=True)
+    aisle = aisle or 2 * max(b.sizes) - 1
+    b.border()
+    b.shelves(1, 1, b.width - 2, b.height - 2, depth, length, aisle,
+              cross=cross, cross_aisle=2 * aisle)
+    return b
+
+
+def corridors_layout(size, widths, wall, sizes=FLEET_SIZES):
+    """Parallel horizontal corridors of cycling widths separated by `wall`
+    rows, joined by vertical halls at both ends."""
+    b = MapBuilder(size, size, sizes, free=False)
+    hall = 2 * max(b.sizes) - 1
+    x0, x1 = 1, b.width - 1 - hall
+    b.fill(x0, 1, hall, b.height - 2)
+    b.fill(x1, 1, hall, b.height - 2)
+    y = 1 + wall
+    k = 0
+    while True:
+        w = widths[k % len(widths)]
+        y = b.align(y, w, b.height - 1)
+        if y + w > b.height - 1 - wall:
+            break
+        b.fill(x0, y, x1 + hall - x0, w)
+        y += w + wall
+        k += 1
+    return b
+
+
+# ---------------------------------------------------------------------------
+# main
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate large procedural maps")
+    sub = parser.add_subparsers(dest='layout', required=True)
+    p = sub.add_parser('rooms', help="grid of rooms with doors of given heights")
+    p.add_argument('--room', type=int, default=105, help="room period in base cells")
+    p.add_argument('--doors', default='1,3,5,7', help="door heights per wall")
+    p.add_argument('--seed', type=int, default=0)
+    p = sub.add_parser('warehouse', help="shelving blocks and aisles")
+    p.add_argument('--depth', type=int, default=4, help="shelf rows per block")
+    p.add_argument('--length', type=int, default=20, help="shelf columns per block")
+    p.add_argument('--aisle', type=int, default=0,
+                   help="aisle width (default 2 * max cell size - 1)")
+    p.add_argument('--cross', type=int, default=5,
+                   help="double-width cross aisle every N shelf rows (0: none)")
+    p = sub.add_parser('corridors', help="parallel corridors of given widths")
+    p.add_argument('--widths', default='1,3,5,7', help="corridor widths, cycled")
+    p.add_argument('--wall', type=int, default=3, help="rows between corridors")
+    for p in sub.choices.values():
+        p.add_argument('--size', type=int, default=1050,
+                       help="side in base cells, rounded up to the LCM of --sizes")
+        p.add_argument('--sizes', default='1,3,5,7', help="fleet cell sizes")
+        p.add_argument('--min-share', type=float, default=0.99,
+                       help="largest component share required per fleet")
+        p.add_argument('-o', '--output', required=True)
+    args = parser.parse_args()
+
+    sizes = parse_ints(args.sizes)
+    t0 = time.time()
+    if args.layout == 'rooms':
+        b = rooms_layout(args.size, args.room, parse_ints(args.doors), sizes, args.seed)
+    elif args.layout == 'warehouse':
+        b = warehouse_layout(args.size, args.depth, args.length, args.aisle,
+                             args.cross, sizes)
+    else:
+        b = corridors_layout(args.size, parse_ints(args.widths), args.wall, sizes)
+    t1 = time.time()
+    report = b.check(args.min_share)
+    t2 = time.time()
+    b.write(args.output)
+    t3 = time.time()
+
+    if b.width != args.size:
+        print(f"Size rounded up to {b.width} (multiple of LCM {b.unit})")
+    print(f"Map: {b.width}x{b.height}, {int(b.free.sum())} free  ->  {args.output}")
+    for cs, total, n_comp, share, ok in report:
+        print(f"  Fleet cs={cs}: {total} free fleet cells, {n_comp} components, "
+              f"largest {share:.1%}{'' if ok else '  <-- below --min-share'}")
+    print(f"build {t1 - t0:.2f}s, check {t2 - t1:.2f}s, write {t3 - t2:.2f}s")
+    if not all(ok for *_, ok in report):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
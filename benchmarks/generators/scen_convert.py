@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""Scenario and result format conversions, single files or whole batches.
+
+Conversions (job kinds):
+  hetbench   5-column `cs sx sy gx gy` -> het_bench 10-column
+             (convert_to_hetbench.py); positions snap to the fleet grid and
+             blocked fleet cells are reported. Needs the map.
+  simple     het_bench 10-column -> 5-column
+  movingai   het_bench -> MovingAI .scen (tools/het2baseline.py modes
+             homogeneous / size-only / speed-only, plus cs1 =
+             tools/het2movingai.py: cs=1 agents only, rows/cols swapped)
+  replay     het_lacam result + het_bench scenario -> hetpibt result for
+             the visualizers (convert_lacam_to_hetpibt.py)
+
+Everything runs in-process. Maps and their fleet-cell freeness are loaded
+once per process, batches run on a process pool with jobs grouped by map,
+and a job whose output is newer than all of its inputs is skipped.
+
+Usage:
+    python scen_convert.py hetbench --map ../maps/intersection_105.map \\
+        ../scenarios/intersection_105_??.scen -j 4
+    python scen_convert.py movingai --mode cs1 --swap-xy \\
+        --map ../maps/room120.map ../scenarios/het_bench --pattern "scen.*"
+    python scen_convert.py replay --scen scen.0 result_*.txt
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+from collections import namedtuple
+from multiprocessing import Pool
+
+
+# Fleet definitions: cs -> (fleet_id, velocity)
+FLEET_DEFS = {
+    1:  (0, 1),
+    3:  (1, 1),
+    5:  (2, 2),
+    7:  (3, 3),
+}
+
+MOVINGAI_MODES = ["homogeneous", "size-only", "speed-only", "cs1"]
+
+# kind, input file, output file, map (hetbench, movingai) or het_bench
+# scenario (replay), options dict
+Job = namedtuple("Job", ["kind", "src", "out", "ref", "opts"],
+                 defaults=[None, None])
+
+
+# ---------------------------------------------------------------------------
+# readers (cached per process)
+# ---------------------------------------------------------------------------
+
+_maps = {}
+_free = {}
+
+
+def load_map(map_path):
+    """(grid rows, width, height, scale) of a .map file, loaded once per
+    process. A "scale N" header line makes each map cell N x N base cells;
+    width and height are in base cells, the rows stay at map resolution."""
+    if map_path not in _maps:
+        grid = []
+        reading = False
+        width = height = 0
+        scale = 1
+        with open(map_path) as f:
+            for line in f:
+                line = line.rstrip('\n\r')
+                if line == "map":
+                    reading = True
+                    continue
+                if reading and line:
+                    grid.append(line)
+                elif 'width' in line:
+                    width = int(line.split()[1])
+                elif 'height' in line:
+                    height = int(line.split()[1])
+                elif line.startswith('scale'):
+                    scale = max(1, int(line.split()[1]))
+        _maps[map_path] = (grid, width * scale, height * scale, scale)
+    return _maps[map_path]
+
+
+def is_fleet_cell_free(map_path, fx, fy, cs):
+    """Fleet cell (fx, fy) of size cs is all '.', memoized per map."""
+    key = (map_path, fx, fy, cs)
+    if key not in _free:
+        grid, width, height, s = load_map(map_path)
+        bx, by = fx * cs, fy * cs
+        _free[key] = (bx >= 0 and by >= 0 and bx + cs <= width
+                      and by + cs <= height
+                      and all(grid[my][mx] == '.'
+                              for my in range(by // s, (by + cs - 1) // s + 1)
+                              for mx in range(bx // s, (bx + cs - 1) // s + 1)))
+    return _free[key]
+
+
+def read_simple(scen_path):
+    """[(cs, sx, sy, gx, gy)] from a 5-column scenario."""
+    agents = []
+    with open(scen_path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            if len(parts) >= 10:
+                raise ValueError(f"{scen_path} is het_bench, not 5-column")
+            agents.append(tuple(int(v) for v in parts[:5]))
+    return agents
+
+
+def read_hetbench(scen_path):
+    """het_bench scenario as a list of agent dicts."""
+    agents = []
+    with open(scen_path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith('#') or len(parts) < 10:
+                continue
+            agents.append({
+                'agent_id': int(parts[0]),
+                'fleet_id': int(parts[1]),
+                'cell_size': int(float(parts[2])),
+                'velocity': float(parts[3]),
+                'sx': int(float(parts[4])),
+                'sy': int(float(parts[5])),
+                'gx': int(float(parts[6])),
+                'gy': int(float(parts[7])),
+                'grid_w': int(parts[8]),
+                'grid_h': int(parts[9]),
+            })
+    return agents
+
+
+# ---------------------------------------------------------------------------
+# conversions: each writes `out` and returns (n_agents, warnings)
+# ---------------------------------------------------------------------------
+
+def to_hetbench(scen_path, map_path, out):
+    _, width, height, _ = load_map(map_path)
+    agents = read_simple(scen_path)
+    warnings = []
+    lines = []
+    for i, (cs, sx, sy, gx, gy) in enumerate(agents):
+        fleet_id, velocity = FLEET_DEFS.get(cs, (0, 1.0))
+        fx_s, fy_s, fx_g, fy_g = sx // cs, sy // cs, gx // cs, gy // cs
+        if not is_fleet_cell_free(map_path, fx_s, fy_s, cs):
+            warnings.append(f"agent {i} cs={cs} start ({fx_s},{fy_s}) -> base "
+                            f"({fx_s * cs},{fy_s * cs}) is blocked")
+        if not is_fleet_cell_free(map_path, fx_g, fy_g, cs):
+            warnings.append(f"agent {i} cs={cs} goal ({fx_g},{fy_g}) -> base "
+                            f"({fx_g * cs},{fy_g * cs}) is blocked")
+        lines.append(f"{i} {fleet_id} {cs} {velocity} {fx_s * cs} {fy_s * cs} "
+                     f"{fx_g * cs} {fy_g * cs} {width // cs} {height // cs}\n")
+    with open(out, 'w') as f:
+        f.writelines(lines)
+    return len(agents), warnings
+
+
+def to_simple(scen_path, out):
+    agents = read_hetbench(scen_path)
+    with open(out, 'w') as f:
+        for a in agents:
+            f.write(f"{a['cell_size']} {a['sx']} {a['sy']} {a['gx']} {a['gy']}\n")
+    return len(agents), []
+
+
+def write_movingai(agents, out, map_name, map_w, map_h, mode, swap_xy=False):
+    """MovingAI .scen with a comment header keeping what the mode strips."""
+    if mode == 'cs1':
+        agents = [a for a in agents if a['cell_size'] == 1]
+    with open(out, 'w') as f:
+        f.write("version 1\n")
+        if mode == 'size-only':
+            f.write(f"# Converted from het_bench ({mode}): cell_size preserved\n")
+            f.write("# agent_index cell_size\n")
+            for i, a in enumerate(agents):
+                f.write(f"# {i} {a['cell_size']}\n")
+        elif mode == 'speed-only':
+            f.write(f"# Converted from het_bench ({mode}): velocity preserved\n")
+            f.write("# agent_index velocity\n")
+            for i, a in enumerate(agents):
+                f.write(f"# {i} {a['velocity']}\n")
+        for a in agents:
+            sx, sy, gx, gy = a['sx'], a['sy'], a['gx'], a['gy']
+            if swap_xy:  # het_bench x is the row under --swap-xy
+                sx, sy, gx, gy = sy, sx, gy, gx
+            f.write(f"0\t{map_name}\t{map_w}\t{map_h}\t"
+                    f"{sx}\t{sy}\t{gx}\t{gy}\t{0.0:.8f}\n")
+    return len(agents)
+
+
+def to_movingai(scen_path, map_path, out, mode='homogeneous', swap_xy=False):
+    _, width, height, _ = load_map(map_path)
+    n = write_movingai(read_hetbench(scen_path), out,
+                       os.path.basename(map_path), width, height, mode, swap_xy)
+    return n, []
+
+
+def lacam_to_hetpibt(result_path, scen_path, out):
+    agents = read_hetbench(scen_path)
+    N = len(agents)
+    fleets = {}
+    for a in agents:
+        fleets.setdefault(a['fleet_id'], a)
+
+    meta = {}
+    solution_lines = []
+    in_solution = False
+    with open(result_path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if in_solution:
+                solution_lines.append(line)
+            elif line.startswith("solution="):
+                in_solution = True
+                if line[len("solution="):]:
+                    solution_lines.append(line[len("solution="):])
+            elif "=" in line:
+                key, val = line.split("=", 1)
+                meta[key] = val
+
+    # t:(x0,y0),(x1,y1),... in fleet-grid coords -> per-agent trajectories
+    trajectories = {i: [] for i in range(N)}
+    for line in solution_lines:
+        m = re.match(r"^(\d+):(.*)", line)
+        if not m:
+            continue
+        t = int(m.group(1))
+        coords = re.findall(r"\((-?\d+),(-?\d+)\)", m.group(2))
+        for i, (x, y) in enumerate(coords[:N]):
+            trajectories[i].append((t, int(x), int(y)))
+
+    fleet_line = ";".join(
+        f"{fid}:{a['cell_size']}:{a['velocity']}:{a['grid_w']}:{a['grid_h']}"
+        for fid, a in sorted(fleets.items()))
+    with open(out, 'w') as f:
+        f.write(f"agents={N}\n")
+        f.write(f"map_name={meta.get('map_file', 'unknown')}\n")
+        f.write(f"seed={meta.get('seed', '0')}\n")
+        f.write("solver=het_lacam\n")
+        f.write(f"comp_time(ms)={meta.get('comp_time', '0')}\n")
+        f.write(f"makespan={meta.get('makespan', '0')}\n")
+        f.write(f"sum_of_costs={meta.get('soc', '0')}\n")
+        f.write(f"fleets={fleet_line}\n")
+        f.write("agent_fleet=" + ",".join(str(a['fleet_id']) for a in agents) + "\n")
+        f.write("starts=" + ",".join(
+            f"({a['sx'] // a['cell_size']},{a['sy'] // a['cell_size']})"
+            for a in agents) + "\n")
+        f.write("goals=" + ",".join(
+            f"({a['gx'] // a['cell_size']},{a['gy'] // a['cell_size']})"
+            for a in agents) + "\n")
+        f.write("solution\n")
+        for aid, a in enumerate(agents):
+            entries = ",".join(f"({fx},{fy})@{t}" for t, fx, fy in trajectories[aid])
+            f.write(f"{aid}:{a['fleet_id']}:{entries}\n")
+    return N, []
+
+
+# ---------------------------------------------------------------------------
+# jobs and batches
+# ---------------------------------------------------------------------------
+
+def up_to_date(job):
+    """Output exists and is newer than every input."""
+    if not os.path.exists(job.out):
+        return False
+    inputs = [job.src] + ([job.ref] if job.ref else [])
+    return os.path.getmtime(job.out) >= max(os.path.getmtime(p) for p in inputs)
+
+
+def convert_one(job):
+    """Run one job. Returns (job, n_agents, warnings, error)."""
+    opts = job.opts or {}
+    try:
+        out_dir = os.path.dirname(job.out)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        if job.kind == "hetbench":
+            n, warnings = to_hetbench(job.src, job.ref, job.out)
+        elif job.kind == "simple":
+            n, warnings = to_simple(job.src, job.out)
+        elif job.kind == "movingai":
+            n, warnings = to_movingai(job.src, job.ref, job.out, **opts)
+        elif job.kind == "replay":
+            n, warnings = lacam_to_hetpibt(job.src, job.ref, job.out)
+        else:
+            raise ValueError(f"unknown conversion {job.kind!r}")
+    except (OSError, ValueError, IndexError, KeyError) as e:
+        return job, 0, [], f"{type(e).__name__}: {e}"
+    return job, n, warnings, None
+
+
+def ensure(job):
+    """convert_one(job) unless its output is up to date; True when the
+    output is usable. Warnings are printed."""
+    if up_to_date(job):
+        return True
+    _, _, warnings, error = convert_one(job)
+    for w in warnings:
+        print(f"WARNING: {w}")
+    if error:
+        print(f"  CONVERT ERROR: {job.src}: {error}")
+    return error is None
+
+
+def convert_batch(jobs, workers=1, force=False):
+    """Run all jobs that are not up to date (all with `force`).
+
+    Returns (results, n_skipped) with results as from convert_one. Jobs
+    are grouped by map so each pool worker loads few maps.
+    """
+    todo = [j for j in jobs if force or not up_to_date(j)]
+    todo.sort(key=lambda j: (j.ref or "", j.src))
+    if workers > 1 and len(todo) > 1:
+        chunk = max(1, len(todo) // (4 * workers))
+        with Pool(workers) as pool:
+            results = pool.map(convert_one, todo, chunksize=chunk)
+    else:
+        results = [convert_one(j) for j in todo]
+    return results, len(jobs) - len(todo)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def expand_inputs(paths, pattern):
+    """Files from file names, globs and directories (matching `pattern`)."""
+    files = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(f for f in sorted(glob.glob(os.path.join(p, pattern)))
+                         if os.path.isfile(f))
+        else:
+            files.extend(sorted(glob.glob(p)) or [p])
+    return files
+
+
+def output_path(src, kind, out_dir, mode):
+    name = os.path.basename(src)
+    stem = name[:-len(".scen")] if name.endswith(".scen") else name
+    if kind == "hetbench":
+        name = f"{stem}_hb.scen"
+    elif kind == "simple":
+        name = f"{re.sub(r'_(hb|hetbench)$', '', stem)}_5col.scen"
+    elif kind == "movingai":
+        name = f"{stem}_{mode}.scen"
+    else:
+        name = f"{os.path.splitext(name)[0]}_hetpibt.txt"
+    return os.path.join(out_dir or os.path.dirname(src), name)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert scenarios / results between formats")
+    parser.add_argument("kind", choices=["hetbench", "simple", "movingai", "replay"])
+    parser.add_argument("inputs", nargs="+",
+                        help="files, globs or directories")
+    parser.add_argument("--map", help="map (hetbench, movingai)")
+    parser.add_argument("--scen", help="het_bench scenario (replay)")
+    parser.add_argument("--mode", default="homogeneous", choices=MOVINGAI_MODES,
+                        help="movingai mode")
+    parser.add_argument("--swap-xy", action="store_true",
+                        help="movingai: het_bench x is the row")
+    parser.add_argument("--out-dir", default=None,
+                        help="output directory (default: next to the input)")
+    parser.add_argument("--pattern", default="*",
+                        help="file pattern for directory inputs")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--force", action="store_true",
+                        help="convert even if the output is up to date")
+    args = parser.parse_args()
+
+    ref = args.scen if args.kind == "replay" else args.map
+    if args.kind in ("hetbench", "movingai", "replay") and not ref:
+        parser.error(f"{args.kind} needs --{'scen' if args.kind == 'replay' else 'map'}")
+    opts = ({"mode": args.mode, "swap_xy": args.swap_xy}
+            if args.kind == "movingai" else None)
+    jobs = [Job(args.kind, src,
+                output_path(src, args.kind, args.out_dir, args.mode),
+                ref if args.kind != "simple" else None, opts)
+            for src in expand_inputs(args.inputs, args.pattern)]
+
+    results, skipped = convert_batch(jobs, args.jobs, args.force)
+    errors = 0
+    for job, n, warnings, error in results:
+        if error:
+            errors += 1
+            print(f"ERROR {job.src}: {error}")
+            continue
+        print(f"{job.src} -> {job.out}: {n} agents")
+        for w in warnings:
+            print(f"  WARNING: {w}")
+    print(f"{len(results) - errors} converted, {skipped} up to date, "
+          f"{errors} failed")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
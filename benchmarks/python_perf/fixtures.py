@@ -0,0 +1,168 @@
+"""Reference inputs for the Python tooling benchmarks.
+
+Maps: bottleneck_doors_105 (105x105), corridor_speed_154 (154x154) and
+room-64-64-8 upscaled 10x (640x640, built on first use). Scenarios are
+placed with gen_scenario.place_agents, and result files are synthetic
+random walks in both result formats (het_rt_lacam `t:(x,y),...` and
+hetpibt `agent:fleet:(x,y)@t,...`). Parsers and collision checks do not
+care whether a plan is good, only how big it is. Everything is seeded,
+so every run times the same inputs.
+"""
+import os
+import random
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+MAPS_DIR = os.path.join(ROOT, "benchmarks", "maps")
+
+sys.path.insert(0, os.path.join(ROOT, "third_party", "hetpibt", "tools"))
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+from gen_scenario import (load_map, build_fleet_grid, flood_fill,  # noqa: E402
+                          Occupancy, place_agents)
+from upscale_map import upscale_map  # noqa: E402
+
+MAPS = {
+    "105": os.path.join(MAPS_DIR, "bottleneck_doors_105.map"),
+    "154": os.path.join(MAPS_DIR, "corridor_speed_154.map"),
+    "640": None,  # room-64-64-8 x10, see map_path()
+}
+
+# (cell_size, velocity) per fleet id and the default 12:5:4:4 mix
+FLEETS = [(1, 1), (3, 1), (5, 2), (7, 3)]
+MIX = (12, 5, 4, 4)
+
+# (map key, agents): small / medium / large reference scenarios
+SCENARIOS = [("105", 25), ("154", 100), ("640", 200)]
+
+RESULT_STEPS = 200  # timesteps in the synthetic result files
+SEED = 0
+
+
+class Fixtures:
+    """Lazily built, cached reference inputs under `work_dir`."""
+
+    def __init__(self, work_dir):
+        self.work_dir = work_dir
+        os.makedirs(work_dir, exist_ok=True)
+        self._maps = {}
+        self._fleet_grids = {}
+        self._scens = {}
+
+    def map_path(self, key):
+        if key == "640":
+            path = os.path.join(self.work_dir, "room-640-640-80.map")
+            if not os.path.exists(path):
+                upscale_map(os.path.join(MAPS_DIR, "room-64-64-8.map"), path, 10)
+            return path
+        return MAPS[key]
+
+    def map(self, key):
+        """(width, height, base_grid) as returned by gen_scenario.load_map."""
+        if key not in self._maps:
+            self._maps[key] = load_map(self.map_path(key))
+        return self._maps[key]
+
+    def fleet_grid(self, key, cell_size):
+        """(fw, fh, free_cells, largest component)."""
+        if (key, cell_size) not in self._fleet_grids:
+            width, height, grid = self.map(key)
+            fw, fh, free = build_fleet_grid(grid, width, height, cell_size)
+            comps = flood_fill(free) if free else []
+            largest = max(comps, key=len) if comps else []
+            self._fleet_grids[key, cell_size] = (fw, fh, free, largest)
+        return self._fleet_grids[key, cell_size]
+
+    def fleet_counts(self, n_agents):
+        """Split n_agents over FLEETS following MIX."""
+        total = sum(MIX)
+        counts = [n_agents * w // total for w in MIX]
+        counts[0] += n_agents - sum(counts)
+        return counts
+
+    def place(self, key, n_agents, seed=SEED):
+        """Place agents largest cell size first. Returns [(fid, (start, goal))]."""
+        width, height, _ = self.map(key)
+        rng = random.Random(seed)
+        occupancy = Occupancy(width, height)
+        agents = []
+        counts = self.fleet_counts(n_agents)
+        for fid in sorted(range(len(FLEETS)), key=lambda f: -FLEETS[f][0]):
+            cs = FLEETS[fid][0]
+            _, _, free, largest = self.fleet_grid(key, cs)
+            if not largest or counts[fid] == 0:
+                continue
+            placed = place_agents([largest], free, cs, counts[fid],
+                                  occupancy, rng)
+            agents.extend((fid, p) for p in placed)
+        return agents
+
+    def scenario(self, key, n_agents):
+        """Paths of (simple .scen, het_rt_lacam result, hetpibt result,
+        single-timestep het_rt_lacam result for frame rendering)."""
+        if (key, n_agents) in self._scens:
+            return self._scens[key, n_agents]
+        stem = os.path.join(self.work_dir, f"map{key}_n{n_agents}")
+        agents = self.place(key, n_agents)
+        with open(stem + ".scen", "w") as f:
+            for fid, ((sx, sy), (gx, gy)) in agents:
+                cs = FLEETS[fid][0]
+                f.write(f"{cs} {sx * cs} {sy * cs} {gx * cs} {gy * cs}\n")
+        paths = self._random_walks(key, agents)
+        self._write_lacam_result(stem + "_lacam.txt", key, agents, paths)
+        self._write_lacam_result(stem + "_frame.txt", key, agents,
+                                 [p[:1] for p in paths])
+        self._write_pibt_result(stem + "_pibt.txt", key, agents, paths)
+        self._scens[key, n_agents] = (stem + ".scen", stem + "_lacam.txt",
+                                      stem + "_pibt.txt", stem + "_frame.txt")
+        return self._scens[key, n_agents]
+
+    def _random_walks(self, key, agents):
+        rng = random.Random(SEED)
+        paths = []
+        for fid, (start, _) in agents:
+            free = self.fleet_grid(key, FLEETS[fid][0])[2]
+            pos = start
+            path = [pos]
+            for _ in range(RESULT_STEPS):
+                x, y = pos
+                moves = [(x, y)] + [p for p in ((x + 1, y), (x - 1, y),
+                                                (x, y + 1), (x, y - 1))
+                                    if p in free]
+                pos = rng.choice(moves)
+                path.append(pos)
+            paths.append(path)
+        return paths
+
+    def _fleets_line(self, key):
+        width, height, _ = self.map(key)
+        return ";".join(f"{fid}:{cs}:{vel}:{width // cs}:{height // cs}"
+                        for fid, (cs, vel) in enumerate(FLEETS))
+
+    def _write_lacam_result(self, path, key, agents, paths):
+        with open(path, "w") as f:
+            f.write(f"agents={len(agents)}\n")
+            f.write(f"map_file={os.path.basename(self.map_path(key))}\n")
+            f.write("solver=het_rt_lacam\nsolved=1\n")
+            f.write(f"fleets={self._fleets_line(key)}\n")
+            f.write("agent_fleet=" + ",".join(str(fid) for fid, _ in agents)
+                    + "\n")
+            f.write("starts=" + "".join(f"({s[0]},{s[1]})," for _, (s, _) in agents)
+                    + "\n")
+            f.write("goals=" + "".join(f"({g[0]},{g[1]})," for _, (_, g) in agents)
+                    + "\n")
+            f.write("solution=\n")
+            for t in range(len(paths[0]) if paths else 0):
+                f.write(f"{t}:" + "".join(f"({p[t][0]},{p[t][1]}),"
+                                          for p in paths) + "\n")
+
+    def _write_pibt_result(self, path, key, agents, paths):
+        with open(path, "w") as f:
+            f.write(f"agents={len(agents)}\n")
+            f.write(f"fleets={self._fleets_line(key)}\n")
+            f.write("agent_fleet=" + ",".join(str(fid) for fid, _ in agents)
+                    + "\n")
+            f.write("solution\n")
+            for i, ((fid, _), p) in enumerate(zip(agents, paths)):
+                f.write(f"{i}:{fid}:" + ",".join(f"({x},{y})@{t}"
+                                                 for t, (x, y) in enumerate(p))
+                        + "\n")
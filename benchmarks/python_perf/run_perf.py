@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Time the Python tooling hot paths on fixed reference inputs.
+
+Cases (see fixtures.py for the inputs):
+  load_map          gen_scenario.load_map            105 / 154 / 640 maps
+  build_fleet_grid  gen_scenario.build_fleet_grid    cs=1 and cs=7
+  flood_fill        gen_scenario.flood_fill          cs=1 fleet grid
+  place_agents      gen_scenario.place_agents        25 / 100 / 200 agents
+  validate          generators/validate.validate     scenario checks + BFS
+  check_collisions  hetpibt tests/assets/check_collisions.py
+  parse_result      het_rt_lacam visualize.load_result
+  render_frame      het_rt_lacam visualize.py, one frame saved to a file
+
+Each case gets --warmup untimed calls and then --repeat samples. Every
+sample runs the call often enough to take at least --min-time. Per-call
+median/min/mean/IQR are written as JSON. Cases marked slow (validate on
+the 640 map) only run with --full, once.
+
+With a stored baseline, every case is compared against it. A case is
+flagged when its median moved by more than --threshold and the new
+minimum is past the old median, so a single noisy sample cannot flag it.
+
+Usage:
+    python benchmarks/python_perf/run_perf.py                  # run + compare
+    python benchmarks/python_perf/run_perf.py -k parse --repeat 10
+    python benchmarks/python_perf/run_perf.py --save-baseline  # store baseline
+"""
+import argparse
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, "..", "..")
+RESULTS_DIR = os.path.join(HERE, "results")
+BASELINE = os.path.join(HERE, "baseline.json")
+
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks", "generators"))
+sys.path.insert(0, os.path.join(ROOT, "third_party", "hetpibt", "tests", "assets"))
+sys.path.insert(0, os.path.join(ROOT, "het_rt_lacam"))
+import matplotlib  # noqa: E402
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+import check_collisions  # noqa: E402
+import validate  # noqa: E402
+import visualize  # noqa: E402
+from fixtures import (Fixtures, SCENARIOS, FLEETS, load_map,  # noqa: E402
+                      build_fleet_grid, flood_fill, Occupancy, place_agents)
+
+
+# ---------------------------------------------------------------------------
+# cases
+# ---------------------------------------------------------------------------
+
+def quiet(fn, *args):
+    """Call fn with stdout swallowed (validators print per-agent lines)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def with_argv(fn, argv):
+    """Call a script-style main() with sys.argv set, stdout swallowed."""
+    saved = sys.argv
+    sys.argv = argv
+    try:
+        return quiet(fn)
+    finally:
+        sys.argv = saved
+
+
+def make_cases(fx):
+    """[(name, slow, setup)] -- setup() builds inputs and returns the call."""
+    cases = []
+
+    for key in ["105", "154", "640"]:
+        def setup(key=key):
+            path = fx.map_path(key)
+            return lambda: load_map(path)
+        cases.append((f"load_map/{key}", False, setup))
+        for cs in [1, 7]:
+            def setup(key=key, cs=cs):
+                width, height, grid = fx.map(key)
+                return lambda: build_fleet_grid(grid, width, height, cs)
+            cases.append((f"build_fleet_grid/{key}/cs{cs}", False, setup))
+
+        def setup(key=key):
+            free = fx.fleet_grid(key, 1)[2]
+            return lambda: flood_fill(free)
+        cases.append((f"flood_fill/{key}/cs1", False, setup))
+
+    for key, n in SCENARIOS:
+        tag = f"{key}/n{n}"
+
+        def setup(key=key, n=n):
+            width, height, _ = fx.map(key)
+            counts = fx.fleet_counts(n)
+            grids = [fx.fleet_grid(key, cs) for cs, _ in FLEETS]
+
+            def call():
+                rng = random.Random(0)
+                occupancy = Occupancy(width, height)
+                for fid in sorted(range(len(FLEETS)), key=lambda f: -FLEETS[f][0]):
+                    _, _, free, largest = grids[fid]
+                    quiet(place_agents, [largest], free, FLEETS[fid][0],
+                          counts[fid], occupancy, rng)
+            return call
+        cases.append((f"place_agents/{tag}", False, setup))
+
+        def setup(key=key, n=n):
+            scen = fx.scenario(key, n)[0]
+            return lambda: quiet(validate.validate, fx.map_path(key), scen)
+        cases.append((f"validate/{tag}", key == "640", setup))
+
+        def setup(key=key, n=n):
+            pibt_result = fx.scenario(key, n)[2]
+            return lambda: with_argv(check_collisions.main,
+                                     ["check_collisions.py", pibt_result])
+        cases.append((f"check_collisions/{tag}", False, setup))
+
+        def setup(key=key, n=n):
+            lacam_result = fx.scenario(key, n)[1]
+            return lambda: visualize.load_result(lacam_result)
+        cases.append((f"parse_result/{tag}", False, setup))
+
+        def setup(key=key, n=n):
+            frame_result = fx.scenario(key, n)[3]
+            out = os.path.join(fx.work_dir, f"frame_{key}_{n}.gif")
+
+            def call():
+                with_argv(visualize.main,
+                          ["visualize.py", "-r", frame_result, "-m",
+                           fx.map_path(key), "--save", out])
+                plt.close("all")
+            return call
+        cases.append((f"render_frame/{tag}", False, setup))
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# timing
+# ---------------------------------------------------------------------------
+
+def time_case(call, warmup, repeat, min_time):
+    """Per-call seconds for each of `repeat` samples, plus calls per sample."""
+    for _ in range(warmup):
+        call()
+    # calibrate: calls per sample so that a sample takes >= min_time
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed * 1.2))
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            call()
+        samples.append((time.perf_counter() - t0) / number)
+    return samples, number
+
+
+def summarize(samples, number):
+    ms = sorted(s * 1e3 for s in samples)
+    q1, q3 = (statistics.quantiles(ms, n=4)[::2] if len(ms) >= 2
+              else (ms[0], ms[0]))
+    return {
+        "median_ms": statistics.median(ms),
+        "min_ms": ms[0],
+        "mean_ms": statistics.fmean(ms),
+        "iqr_ms": q3 - q1,
+        "samples": len(ms),
+        "calls_per_sample": number,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, cwd=ROOT,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ---------------------------------------------------------------------------
+# baseline comparison
+# ---------------------------------------------------------------------------
+
+def compare(results, baseline, threshold):
+    """Print the comparison table. Returns the number of regressions."""
+    base_cases = baseline["cases"]
+    n_slow = n_fast = 0
+    print(f"\nvs baseline {baseline['meta'].get('commit') or '?'} "
+          f"({baseline['meta'].get('time', '?')}, "
+          f"{baseline['meta'].get('host', '?')}):")
+    print(f"{'case':<36} {'baseline':>11} {'now':>11} {'change':>8}")
+    for name, cur in results["cases"].items():
+        base = base_cases.get(name)
+        if base is None:
+            print(f"{name:<36} {'-':>11} {cur['median_ms']:>9.2f}ms")
+            continue
+        ratio = cur["median_ms"] / base["median_ms"] if base["median_ms"] else 1
+        flag = ""
+        if ratio > 1 + threshold and cur["min_ms"] > base["median_ms"]:
+            flag = "  SLOWER"
+            n_slow += 1
+        elif ratio < 1 - threshold and cur["median_ms"] < base["min_ms"]:
+            flag = "  faster"
+            n_fast += 1
+        print(f"{name:<36} {base['median_ms']:>9.2f}ms {cur['median_ms']:>9.2f}ms "
+              f"{100 * (ratio - 1):>+7.1f}%{flag}")
+    print(f"\n{n_slow} slower, {n_fast} faster (threshold {100 * threshold:.0f}%)")
+    return n_slow
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the Python tooling hot paths")
+    parser.add_argument("-k", "--filter", default="*",
+                        help="glob on case names, e.g. 'parse*' or '*/640*'")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds per sample (fast cases loop)")
+    parser.add_argument("--full", action="store_true",
+                        help="include slow cases (run once, no warmup)")
+    parser.add_argument("--work-dir", default=None,
+                        help="fixture directory (default: a temp dir)")
+    parser.add_argument("-o", "--output",
+                        default=os.path.join(RESULTS_DIR, "latest.json"))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="also store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative median change that counts")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit 1 if any case got slower")
+    args = parser.parse_args()
+
+    pattern = args.filter if any(c in args.filter for c in "*?[") \
+        else f"*{args.filter}*"
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="python_perf_")
+    fx = Fixtures(work_dir)
+    cases = [c for c in make_cases(fx) if fnmatch.fnmatch(c[0], pattern)]
+
+    results = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": git_commit(),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "warmup": args.warmup,
+        },
+        "cases": {},
+    }
+    print(f"{'case':<36} {'median':>11} {'min':>11} {'iqr':>9}  calls")
+    for name, slow, setup in cases:
+        if slow and not args.full:
+            continue
+        call = quiet(setup)  # fixture builders print progress
+        if slow:
+            samples, number = time_case(call, 0, 1, 0)
+        else:
+            samples, number = time_case(call, args.warmup, args.repeat,
+                                        args.min_time)
+        stats = summarize(samples, number)
+        results["cases"][name] = stats
+        print(f"{name:<36} {stats['median_ms']:>9.2f}ms {stats['min_ms']:>9.2f}ms "
+              f"{stats['iqr_ms']:>7.2f}ms  {number}x{stats['samples']}", flush=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"\nResults written to {args.output}")
+
+    n_slow = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            n_slow = compare(results, json.load(f), args.threshold)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=1)
+        print(f"Baseline stored at {args.baseline}")
+    if args.fail_on_regression and n_slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
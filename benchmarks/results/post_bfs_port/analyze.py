@@ -1,49 +1,24 @@
 #!/usr/bin/env python3
-"""Combine post-BFS CSVs and produce full analysis."""
-import csv
+"""Load post-BFS results from the results DB and produce full analysis."""
 import os
+import sys
 from collections import defaultdict
 from pathlib import Path
 import statistics
 
 DIR = Path("E:/gb/benchmarks/results/post_bfs_port")
 
-# 1. Concatenate 5 CSVs into het_rt_lacam_full.csv
-INPUT_FILES = [
-    "lacam_bottleneck_doors.csv",
-    "lacam_corridor_speed.csv",
-    "lacam_intersection.csv",
-    "lacam_cooperative_clearing.csv",
-    "lacam_het_bench.csv",
-]
-
-all_rows = []
-header = None
-for fname in INPUT_FILES:
-    with open(DIR / fname) as f:
-        reader = csv.DictReader(f)
-        if header is None:
-            header = reader.fieldnames
-        for row in reader:
-            all_rows.append(row)
-
-with open(DIR / "het_rt_lacam_full.csv", "w", newline="") as f:
-    w = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
-    w.writeheader()
-    w.writerows(all_rows)
-print(f"Combined CSV: {len(all_rows)} rows written to het_rt_lacam_full.csv")
-
-# 2. Load all datasets
-def load_csv(path):
-    with open(path) as f:
-        return list(csv.DictReader(f))
-
-post_bfs = all_rows
-pre_bfs = load_csv(DIR / "het_rt_lacam_pre_bfs.csv")
-hetpibt = load_csv(DIR / "hetpibt_full.csv")
+sys.path.insert(0, "E:/gb/tools")
+import results_db  # noqa: E402
+
+# 1. Load all datasets (newest result per scenario key)
+db = results_db.open_db()
+post_bfs = results_db.load_rows(db, campaign="post_bfs_port", solver="het_rt_lacam")
+pre_bfs = results_db.load_rows(db, campaign="pre_bfs_port", solver="het_rt_lacam")
+hetpibt = results_db.load_rows(db, campaign="post_bfs_port", solver="hetpibt")
 
 def is_solved(row):
-    return row["solved"] == "True"
+    return row["solved"] in (True, "True")
 
 def key(row):
     return (row["category"], row["agent_label"], row["scen_id"])
@@ -57,6 +32,21 @@ pibt_by_key = {key(r): r for r in hetpibt}
 CATEGORIES = ["bottleneck_doors", "corridor_speed", "intersection", "cooperative_clearing", "het_bench"]
 AGENT_LABELS_105 = ["n5", "n10", "n15", "n20", "n25"]
 
+# combined CSV, still read by regression_analyze.py; rows in the order the
+# per-category CSVs were concatenated in
+FULL_FIELDS = ["solver", "category", "agent_label", "scen_id", "agents",
+               "solved", "goals_reached", "goals_total", "soc", "soc_lb",
+               "makespan", "makespan_lb", "runtime_ms"]
+
+def full_order(row):
+    labels = AGENT_LABELS_105 + ["var"]
+    return (CATEGORIES.index(row["category"]), labels.index(row["agent_label"]),
+            int(row["scen_id"]))
+
+results_db.export_csv(db, DIR / "het_rt_lacam_full.csv", fields=FULL_FIELDS,
+                      key=full_order, campaign="post_bfs_port",
+                      solver="het_rt_lacam")
+
 # ============ ANALYSIS ============
 lines = []
 def w(s=""):
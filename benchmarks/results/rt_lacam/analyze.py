@@ -1,23 +1,19 @@
 #!/usr/bin/env python3
 """Analyze RT-LaCAM results vs standard mode and hetpibt baselines."""
-import csv
+import sys
 from collections import defaultdict
 from pathlib import Path
 
 ROOT = Path("E:/gb/benchmarks/results")
-RT_CSV = ROOT / "rt_lacam" / "het_rt_lacam_rt_full.csv"
-STD_CSV = ROOT / "post_bfs_port" / "het_rt_lacam_full.csv"
-PIBT_CSV = ROOT / "post_bfs_port" / "hetpibt_full.csv"
 OUT_MD = ROOT / "rt_lacam" / "analysis.md"
 
+sys.path.insert(0, "E:/gb/tools")
+import results_db  # noqa: E402
 
-def load_csv(path):
-    rows = {}
-    with open(path) as f:
-        for r in csv.DictReader(f):
-            key = (r["category"], r["agent_label"], r["scen_id"])
-            rows[key] = r
-    return rows
+# results DB selections (campaign, solver)
+RT = {"campaign": "rt_lacam", "solver": "het_rt_lacam_rt"}
+STD = {"campaign": "post_bfs_port", "solver": "het_rt_lacam"}
+PIBT = {"campaign": "post_bfs_port", "solver": "hetpibt"}
 
 
 def is_solved(row):
@@ -42,9 +38,10 @@ def get_float(row, field, default=0.0):
 
 
 def main():
-    rt = load_csv(RT_CSV)
-    std = load_csv(STD_CSV)
-    pibt = load_csv(PIBT_CSV)
+    db = results_db.open_db()
+    rt = results_db.load_index(db, **RT)
+    std = results_db.load_index(db, **STD)
+    pibt = results_db.load_index(db, **PIBT)
 
     all_keys = sorted(set(rt.keys()) | set(std.keys()))
 
@@ -3,6 +3,7 @@
 import csv
 import re
 import subprocess
+import sys
 import time
 from pathlib import Path
 
@@ -10,6 +11,9 @@ ROOT = Path("E:/gb")
 EXE = ROOT / "het_rt_lacam" / "build" / "Release" / "main.exe"
 OUT = ROOT / "benchmarks" / "results" / "rt_lacam" / "budget_sweep.csv"
 
+sys.path.insert(0, str(ROOT / "tools"))
+import results_db  # noqa: E402
+
 SCENARIOS = [
     # (category, agent_label, scen_id, map, scen_path, type)
     ("bottleneck_doors", "n10", "01", "bottleneck_doors_105.map",
@@ -78,6 +82,12 @@ def main():
     header = ["category", "agent_label", "scen_id", "type", "budget",
               "solved", "steps", "soc", "makespan", "time_ms"]
 
+    db = results_db.open_db()
+    # one run per budget, so budgets compare as runs of the same binary
+    run_ids = {b: results_db.start_run(db, "rt_budget_sweep", "het_rt_lacam_rt",
+                                       EXE, flags=f"--rt-budget {b}")
+               for b in BUDGETS}
+
     for cat, al, sid, mapf, scenf, stype in SCENARIOS:
         for budget in BUDGETS:
             label = f"{cat}/{al}/scen{sid}"
@@ -98,12 +108,15 @@ def main():
                 "type": stype, "budget": budget, "solved": solved,
                 "steps": steps, "soc": soc, "makespan": ms, "time_ms": t_ms,
             })
+            results_db.add_result(db, run_ids[budget], rows[-1])
+            db.commit()
 
     with open(OUT, "w", newline="") as f:
         w = csv.DictWriter(f, fieldnames=header)
         w.writeheader()
         w.writerows(rows)
-    print(f"\nSaved {OUT} ({len(rows)} rows)")
+    print(f"\nSaved {OUT} ({len(rows)} rows, + {results_db.DB_PATH})")
+    db.close()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
-"""Run het_rt_lacam in RT mode on all benchmark scenarios, one category at a time."""
+"""Run het_rt_lacam in RT mode on all benchmark scenarios, one category at a time.
+
+With -j N the whole sweep runs on N workers instead. Jobs start longest
+predicted runtime first (tools/runtime_model.py: results history, else
+scenario features), so the timeouts do not straggle at the end, and the
+predicted makespan is reported against the achieved one.
+
+runtime_ms is the solver's own comp_time (read from a per-job -o file), so
+history written by a parallel sweep is not inflated by the workers
+competing for the machine; the wall time goes to results.db as wall_ms,
+and a -j N sweep is recorded with "-j N" in its run flags.
+"""
 import argparse
 import csv
+import os
 import re
+import shutil
 import subprocess
 import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 ROOT = Path("E:/gb")
@@ -14,6 +29,10 @@ SCEN_DIR = ROOT / "benchmarks" / "scenarios"
 MAPS_DIR = ROOT / "benchmarks" / "maps"
 OUT_DIR = ROOT / "benchmarks" / "results" / "rt_lacam"
 
+sys.path.insert(0, str(ROOT / "tools"))
+import results_db  # noqa: E402
+import runtime_model  # noqa: E402
+
 CATEGORIES_105 = {
     "intersection": "intersection_105.map",
     "bottleneck_doors": "bottleneck_doors_105.map",
@@ -78,8 +97,9 @@ def discover_het_bench():
     return scenarios
 
 
-def run_one(scen, timeout_s, rt_budget):
-    """Run het_rt_lacam in RT mode. Returns result dict."""
+def run_one(scen, timeout_s, rt_budget, out_path):
+    """Run het_rt_lacam in RT mode, result file at `out_path` (one per
+    concurrent job). Returns result dict."""
     cmd = [
         str(EXE),
         "-m", scen["map_path"],
@@ -88,9 +108,12 @@ def run_one(scen, timeout_s, rt_budget):
         "--rt", "--rt-budget", str(rt_budget),
         "-t", str(timeout_s),
         "-v", "1",
+        "-o", out_path,
     ]
     if scen["swap_xy"]:
         cmd.append("--swap-xy")
+    if os.path.exists(out_path):
+        os.remove(out_path)
 
     t0 = time.time()
     try:
@@ -103,6 +126,14 @@ def run_one(scen, timeout_s, rt_budget):
         output = ""
     elapsed_ms = int((time.time() - t0) * 1000)
 
+    # solver-side time; a killed run counts as the full timeout
+    comp_time = timeout_s * 1000
+    if os.path.exists(out_path):
+        with open(out_path) as f:
+            m = re.search(r"^comp_time=(\d+)", f.read(), re.MULTILINE)
+        if m:
+            comp_time = int(m.group(1))
+
     # Parse output
     solved = "goal reached" in output
     rt_steps = 0
@@ -141,39 +172,126 @@ def run_one(scen, timeout_s, rt_budget):
         "soc_lb": soc_lb,
         "makespan": makespan,
         "makespan_lb": makespan_lb,
-        "runtime_ms": elapsed_ms,
+        "runtime_ms": comp_time,
         "rt_steps": rt_steps,
+        "wall_ms": elapsed_ms,
     }
 
 
-def run_category(cat, timeout_s, rt_budget):
-    """Run all scenarios for one category, save CSV, return results."""
+def discover(cat):
+    """(scenarios, csv name) for one category."""
     if cat == "het_bench":
-        scenarios = discover_het_bench()
-        csv_name = "lacam_het_bench.csv"
-    else:
-        scenarios = discover_105(cat)
-        csv_name = f"lacam_{cat}.csv"
+        return discover_het_bench(), "lacam_het_bench.csv"
+    return discover_105(cat), f"lacam_{cat}.csv"
+
+
+def start_run(db, timeout_s, rt_budget, jobs=1):
+    flags = f"--goal-lock --rt --rt-budget {rt_budget} -t {timeout_s}"
+    if jobs > 1:
+        flags += f" -j {jobs}"
+    return results_db.start_run(db, OUT_DIR.name, "het_rt_lacam_rt", EXE,
+                                flags=flags)
 
+
+def format_result(r):
+    status = "SOLVED" if r["solved"] else "TIMEOUT"
+    detail = f"steps={r['rt_steps']} soc={r['soc']} ms={r['makespan']} t={r['runtime_ms']}ms" if r["solved"] else f"steps={r['rt_steps']} t={r['runtime_ms']}ms"
+    return f"{status} {detail}"
+
+
+def save_csv(path, results):
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_HEADER, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(results)
+
+
+def run_category(cat, timeout_s, rt_budget):
+    """Run all scenarios for one category, save CSV + results DB, return results."""
+    scenarios, csv_name = discover(cat)
+    db = results_db.open_db()
+    run_id = start_run(db, timeout_s, rt_budget)
+
+    tmp_dir = tempfile.mkdtemp(prefix="run_rt_")
+    out_path = os.path.join(tmp_dir, "result.txt")
     results = []
     for i, scen in enumerate(scenarios):
         label = f"{scen['category']}/{scen['agent_label']}/scen{scen['scen_id']}"
         print(f"  [{i+1}/{len(scenarios)}] {label} ...", end="", flush=True)
-        r = run_one(scen, timeout_s, rt_budget)
-        status = "SOLVED" if r["solved"] else "TIMEOUT"
-        detail = f"steps={r['rt_steps']} soc={r['soc']} ms={r['makespan']} t={r['runtime_ms']}ms" if r["solved"] else f"steps={r['rt_steps']} t={r['runtime_ms']}ms"
-        print(f" {status} {detail}")
+        r = run_one(scen, timeout_s, rt_budget, out_path)
+        results_db.add_result(db, run_id, r)
+        db.commit()
+        print(f" {format_result(r)}")
         results.append(r)
 
+    shutil.rmtree(tmp_dir, ignore_errors=True)
     csv_path = OUT_DIR / csv_name
-    with open(csv_path, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=CSV_HEADER)
-        w.writeheader()
-        w.writerows(results)
-    print(f"  -> Saved {csv_path} ({len(results)} rows)")
+    save_csv(csv_path, results)
+    print(f"  -> Saved {csv_path} ({len(results)} rows, run {run_id} in {results_db.DB_PATH})")
+    db.close()
     return results
 
 
+def run_parallel(cats, timeout_s, rt_budget, jobs):
+    """Run all categories as one sweep on `jobs` workers, longest predicted
+    job first. Saves the per-category CSVs, returns {cat: results}."""
+    scenarios, csv_names = [], {}
+    for cat in cats:
+        found, csv_names[cat] = discover(cat)
+        scenarios.extend(found)
+
+    db = results_db.open_db()
+    run_id = start_run(db, timeout_s, rt_budget, jobs)
+    model = runtime_model.RuntimeModel.from_db(
+        db, "het_rt_lacam_rt", timeout_s * 1000)
+    preds = model.predict_all(scenarios)
+    costs = [c for c, _ in preds]
+    order, predicted, _ = runtime_model.lpt_schedule(costs, jobs)
+    sources = [src for _, src in preds]
+    print(f"{len(scenarios)} jobs on {jobs} workers, longest first "
+          f"({sources.count('history')} predicted from history, "
+          f"{len(sources) - sources.count('history')} from features)")
+    if model.calibrated:
+        print(f"Predicted makespan: {predicted / 1000:.0f}s "
+              f"(total work {sum(costs) / 1000:.0f}s)")
+
+    results = [None] * len(scenarios)
+    tmp_dir = tempfile.mkdtemp(prefix="run_rt_")
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_one, scenarios[i], timeout_s, rt_budget,
+                               os.path.join(tmp_dir, f"result_{i}.txt")): i
+                   for i in order}
+        for n, fut in enumerate(as_completed(futures), 1):
+            i = futures[fut]
+            r = results[i] = fut.result()
+            results_db.add_result(db, run_id, r)
+            db.commit()
+            label = f"{r['category']}/{r['agent_label']}/scen{r['scen_id']}"
+            pred = f"pred {costs[i]:.0f}ms" if model.calibrated else "pred n/a"
+            print(f"  [{n}/{len(scenarios)}] {label} {format_result(r)} ({pred})")
+    achieved = (time.time() - t0) * 1000
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    db.close()
+
+    print(f"\nMakespan: achieved {achieved / 1000:.0f}s", end="")
+    if model.calibrated:
+        actual = [r["runtime_ms"] for r in results]
+        errors = sorted(abs(p - a) / max(a, 1) for p, a in zip(costs, actual))
+        print(f", predicted {predicted / 1000:.0f}s "
+              f"({100 * (achieved - predicted) / max(predicted, 1):+.0f}%); "
+              f"median job error {100 * errors[len(errors) // 2]:.0f}%")
+    else:
+        print()
+
+    by_cat = {cat: [r for r in results if r["category"] == cat] for cat in cats}
+    for cat in cats:
+        csv_path = OUT_DIR / csv_names[cat]
+        save_csv(csv_path, by_cat[cat])
+        print(f"  -> Saved {csv_path} ({len(by_cat[cat])} rows, run {run_id})")
+    return by_cat
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--category", default="all",
@@ -181,6 +299,8 @@ def main():
                             "intersection", "cooperative_clearing", "het_bench"])
     p.add_argument("--timeout", type=int, default=60)
     p.add_argument("--rt-budget", type=int, default=100)
+    p.add_argument("-j", "--jobs", type=int, default=1,
+                   help="parallel workers (longest predicted job first)")
     args = p.parse_args()
 
     cats = (
@@ -190,19 +310,23 @@ def main():
     )
 
     all_results = []
-    for cat in cats:
-        print(f"\n=== {cat} ===")
-        results = run_category(cat, args.timeout, args.rt_budget)
-        all_results.extend(results)
-        solved = sum(1 for r in results if r["solved"])
-        print(f"  Summary: {solved}/{len(results)} solved")
+    if args.jobs > 1:
+        by_cat = run_parallel(cats, args.timeout, args.rt_budget, args.jobs)
+        for cat in cats:
+            solved = sum(1 for r in by_cat[cat] if r["solved"])
+            print(f"  {cat}: {solved}/{len(by_cat[cat])} solved")
+            all_results.extend(by_cat[cat])
+    else:
+        for cat in cats:
+            print(f"\n=== {cat} ===")
+            results = run_category(cat, args.timeout, args.rt_budget)
+            all_results.extend(results)
+            solved = sum(1 for r in results if r["solved"])
+            print(f"  Summary: {solved}/{len(results)} solved")
 
     # Combined CSV
     combined = OUT_DIR / "het_rt_lacam_rt_full.csv"
-    with open(combined, "w", newline="") as f:
-        w = csv.DictWriter(f, fieldnames=CSV_HEADER)
-        w.writeheader()
-        w.writerows(all_results)
+    save_csv(combined, all_results)
     total_solved = sum(1 for r in all_results if r["solved"])
     print(f"\n=== TOTAL: {total_solved}/{len(all_results)} solved ===")
     print(f"Combined CSV: {combined}")
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Per-step latency of RT-LaCAM: tail distribution per (category, agents, budget).
+
+Every scenario is run in --rt mode once per --rt-budget with
+--telemetry and --phase-times. That records the wall-clock time of every
+solve_one_step() call and how it split over the search phases:
+  lowlevel   constraint (LNode) enumeration
+  pibt       set_new_config: PIBT + footprint collision checks
+  explored   EXPLORED lookup + rewrite on revisits
+  heuristic  DistTable lookups for h of new nodes
+  create     HNode construction + EXPLORED insert
+  extract    extract_next_step + advance
+
+Outputs (next to this script):
+  step_latency_steps.csv  one row per executed step
+  step_latency.csv        per group: p50/p90/p99/p99.9/max, steps over
+                          --deadline-ms, phase shares overall and in spikes
+  step_latency.md         the same as tables, plus the largest budget per
+                          (category, agents) whose every step met the deadline
+
+Spikes are the steps over the deadline, or the slowest 1% of a group if
+none went over. A budget is only a guarantee for the steps sampled here.
+`budget_at_deadline` extrapolates from the worst per-iteration cost seen
+(deadline / max ms per search iteration).
+
+Usage:
+    python step_latency.py --category bottleneck_doors --agents n10,n25 \
+        --budgets 10,100,1000 --deadline-ms 50
+    python step_latency.py --from-csv step_latency_steps.csv --deadline-ms 20
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path("E:/gb")
+EXE = ROOT / "het_rt_lacam" / "build" / "Release" / "main.exe"
+OUT_DIR = ROOT / "benchmarks" / "results" / "rt_lacam"
+
+sys.path.insert(0, str(OUT_DIR))
+from run_rt import (AGENT_COUNTS, CATEGORIES_105, discover_105,  # noqa: E402
+                    discover_het_bench)
+
+PHASES = ["lowlevel", "pibt", "explored", "heuristic", "create", "extract"]
+
+STEP_FIELDS = [
+    "category", "agent_label", "scen_id", "budget", "step", "latency_ms",
+    "iters", "created", "revisited", "explored_size",
+] + [f"{p}_ms" for p in PHASES]
+
+SUMMARY_FIELDS = [
+    "category", "agent_label", "budget", "runs", "solved", "steps",
+    "mean_ms", "p50_ms", "p90_ms", "p99_ms", "p999_ms", "max_ms",
+    "over_deadline", "over_pct", "max_iter_ms", "budget_at_deadline",
+] + [f"share_{p}" for p in PHASES] + [f"spike_share_{p}" for p in PHASES]
+
+
+def percentile(values, p):
+    """Nearest-rank percentile (as the solver's lifelong latency report)."""
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(max(math.ceil(p / 100 * len(s)), 1), len(s))
+    return s[k - 1]
+
+
+# ---------------------------------------------------------------------------
+# running
+# ---------------------------------------------------------------------------
+
+def run_one(exe, scen, budget, timeout_s, flags, tmp_dir):
+    """One RT run. Returns (step records, end record or None)."""
+    telemetry = os.path.join(tmp_dir, "telemetry.jsonl")
+    cmd = [
+        str(exe),
+        "-m", scen["map_path"],
+        "-i", scen["scen_path"],
+        "-t", str(timeout_s),
+        "-v", "0",
+        "-o", os.path.join(tmp_dir, "result.txt"),
+        "--rt", "--rt-budget", str(budget),
+        "--telemetry", telemetry, "--phase-times",
+    ]
+    if scen["swap_xy"]:
+        cmd.append("--swap-xy")
+    cmd.extend(shlex.split(flags))
+    if os.path.exists(telemetry):
+        os.remove(telemetry)
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       timeout=timeout_s + 10)
+    except subprocess.TimeoutExpired:
+        pass
+    steps, end = [], None
+    if os.path.exists(telemetry):
+        with open(telemetry) as f:
+            for line in f:
+                rec = json.loads(line)
+                if rec["type"] == "step":
+                    steps.append(rec)
+                elif rec["type"] == "end":
+                    end = rec
+    return steps, end
+
+
+def step_row(scen, budget, rec):
+    row = {
+        "category": scen["category"], "agent_label": scen["agent_label"],
+        "scen_id": scen["scen_id"], "budget": budget, "step": rec["step"],
+        "latency_ms": rec["latency_ms"], "iters": rec.get("iters", 0),
+        "created": rec.get("created", 0), "revisited": rec.get("revisited", 0),
+        "explored_size": rec["explored"],
+    }
+    phases = rec.get("phases", {})
+    for p in PHASES:
+        row[f"{p}_ms"] = phases.get(p, 0.0)
+    return row
+
+
+def load_steps(path):
+    rows = []
+    with open(path, newline="") as f:
+        for r in csv.DictReader(f):
+            for k in ["budget", "step", "iters", "created", "revisited",
+                      "explored_size"]:
+                r[k] = int(r[k])
+            for k in ["latency_ms"] + [f"{p}_ms" for p in PHASES]:
+                r[k] = float(r[k])
+            rows.append(r)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# summary
+# ---------------------------------------------------------------------------
+
+def agent_order(label):
+    return AGENT_COUNTS.index(label) if label in AGENT_COUNTS else len(AGENT_COUNTS)
+
+
+def phase_shares(rows):
+    total = sum(r["latency_ms"] for r in rows)
+    return {p: (sum(r[f"{p}_ms"] for r in rows) / total if total > 0 else 0.0)
+            for p in PHASES}
+
+
+def summarize(rows, runs, deadline_ms):
+    """Summary rows per (category, agent_label, budget)."""
+    groups = defaultdict(list)
+    for r in rows:
+        groups[(r["category"], r["agent_label"], r["budget"])].append(r)
+    out = []
+    for key in sorted(groups, key=lambda k: (k[0], agent_order(k[1]), k[2])):
+        g = groups[key]
+        lat = [r["latency_ms"] for r in g]
+        over = [r for r in g if r["latency_ms"] > deadline_ms]
+        spikes = over or sorted(g, key=lambda r: -r["latency_ms"])[
+            :max(1, len(g) // 100)]
+        iter_ms = [r["latency_ms"] / r["iters"] for r in g if r["iters"] > 0]
+        max_iter_ms = max(iter_ms) if iter_ms else 0.0
+        cat, al, budget = key
+        n_runs, n_solved = runs.get(key, (0, ""))
+        row = {
+            "category": cat, "agent_label": al, "budget": budget,
+            "runs": n_runs, "solved": n_solved, "steps": len(g),
+            "mean_ms": sum(lat) / len(lat),
+            "p50_ms": percentile(lat, 50), "p90_ms": percentile(lat, 90),
+            "p99_ms": percentile(lat, 99), "p999_ms": percentile(lat, 99.9),
+            "max_ms": max(lat), "over_deadline": len(over),
+            "over_pct": 100 * len(over) / len(g),
+            "max_iter_ms": max_iter_ms,
+            "budget_at_deadline": (int(deadline_ms / max_iter_ms)
+                                   if max_iter_ms > 0 else ""),
+        }
+        for p, v in phase_shares(g).items():
+            row[f"share_{p}"] = v
+        for p, v in phase_shares(spikes).items():
+            row[f"spike_share_{p}"] = v
+        out.append(row)
+    return out
+
+
+def write_report(summary, path, deadline_ms, meta):
+    lines = []
+
+    def w(s=""):
+        lines.append(s)
+
+    w("# RT-LaCAM Per-Step Latency")
+    w()
+    for k, v in meta.items():
+        w(f"- {k}: {v}")
+    w(f"- deadline: {deadline_ms:g} ms per step")
+    w()
+    w("## Tail latency (ms)")
+    w()
+    w("| category | agents | budget | steps | p50 | p90 | p99 | p99.9 | max "
+      "| over deadline | budget@deadline |")
+    w("|---|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|")
+    for s in summary:
+        w(f"| {s['category']} | {s['agent_label']} | {s['budget']} "
+          f"| {s['steps']} | {s['p50_ms']:.2f} | {s['p90_ms']:.2f} "
+          f"| {s['p99_ms']:.2f} | {s['p999_ms']:.2f} | {s['max_ms']:.2f} "
+          f"| {s['over_deadline']} ({s['over_pct']:.1f}%) "
+          f"| {s['budget_at_deadline']} |")
+    w()
+    w("## Where the time goes (% of step time: all steps / spikes)")
+    w()
+    w("| category | agents | budget | " + " | ".join(PHASES) + " |")
+    w("|---|---|---:|" + "---:|" * len(PHASES))
+    for s in summary:
+        cells = [f"{100 * s[f'share_{p}']:.0f} / {100 * s[f'spike_share_{p}']:.0f}"
+                 for p in PHASES]
+        w(f"| {s['category']} | {s['agent_label']} | {s['budget']} | "
+          + " | ".join(cells) + " |")
+    w()
+    w("## Largest budget meeting the deadline")
+    w()
+    w("Largest swept budget with every sampled step (max) / 99% of steps "
+      "(p99) within the deadline.")
+    w()
+    w("| category | agents | max-safe budget | p99-safe budget |")
+    w("|---|---|---:|---:|")
+    by_group = defaultdict(list)
+    for s in summary:
+        by_group[(s["category"], s["agent_label"])].append(s)
+    for (cat, al), rows in by_group.items():
+        safe_max = [s["budget"] for s in rows if s["max_ms"] <= deadline_ms]
+        safe_p99 = [s["budget"] for s in rows if s["p99_ms"] <= deadline_ms]
+        w(f"| {cat} | {al} | {max(safe_max) if safe_max else 'none'} "
+          f"| {max(safe_p99) if safe_p99 else 'none'} |")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    categories = list(CATEGORIES_105) + ["het_bench"]
+    parser = argparse.ArgumentParser(
+        description="Per-step latency benchmark for RT-LaCAM")
+    parser.add_argument("--exe", default=str(EXE))
+    parser.add_argument("--category", action="append", choices=categories,
+                        help="repeatable (default: the four 105 categories)")
+    parser.add_argument("--agents", default="n10,n25",
+                        help=f"agent labels ({','.join(AGENT_COUNTS)})")
+    parser.add_argument("--scen-ids", default="",
+                        help="only these scenario ids, e.g. 00,01")
+    parser.add_argument("--budgets", default="10,100,1000")
+    parser.add_argument("--deadline-ms", type=float, default=50,
+                        help="real-time deadline per step")
+    parser.add_argument("-t", "--timeout", type=int, default=30)
+    parser.add_argument("--flags", default="--goal-lock")
+    parser.add_argument("--from-csv", default=None,
+                        help="rebuild summary/report from a steps CSV")
+    parser.add_argument("-o", "--out-dir", default=str(OUT_DIR))
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    steps_csv = out_dir / "step_latency_steps.csv"
+    runs = {}  # (cat, label, budget) -> (runs, solved)
+    if args.from_csv:
+        rows = load_steps(args.from_csv)
+        # the steps CSV does not record solved/timeout
+        for cat, al, b, _ in {(r["category"], r["agent_label"], r["budget"],
+                               r["scen_id"]) for r in rows}:
+            runs[(cat, al, b)] = (runs.get((cat, al, b), (0, ""))[0] + 1, "")
+        meta = {"source": args.from_csv}
+    else:
+        budgets = [int(b) for b in args.budgets.split(",")]
+        labels = args.agents.split(",")
+        scenarios = []
+        for cat in args.category or list(CATEGORIES_105):
+            if cat == "het_bench":
+                scenarios.extend(discover_het_bench())
+            else:
+                scenarios.extend(s for s in discover_105(cat)
+                                 if s["agent_label"] in labels)
+        if args.scen_ids:
+            ids = set(args.scen_ids.split(","))
+            scenarios = [s for s in scenarios if s["scen_id"] in ids]
+        if not scenarios:
+            sys.exit("no scenarios selected")
+
+        tmp_dir = tempfile.mkdtemp(prefix="step_latency_")
+        rows = []
+        total = len(scenarios) * len(budgets)
+        k = 0
+        with open(steps_csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=STEP_FIELDS)
+            writer.writeheader()
+            for scen in scenarios:
+                for budget in budgets:
+                    k += 1
+                    steps, end = run_one(args.exe, scen, budget, args.timeout,
+                                         args.flags, tmp_dir)
+                    new = [step_row(scen, budget, rec) for rec in steps]
+                    writer.writerows(new)
+                    f.flush()
+                    rows.extend(new)
+                    key = (scen["category"], scen["agent_label"], budget)
+                    n, s = runs.get(key, (0, 0))
+                    solved = end is not None and end["result"] == "success"
+                    runs[key] = (n + 1, s + solved)
+                    worst = max((r["latency_ms"] for r in new), default=0)
+                    print(f"[{k}/{total}] {scen['category']}/{scen['agent_label']}"
+                          f"/{scen['scen_id']} budget={budget:>5}: "
+                          f"{len(new)} steps, max {worst:.1f}ms "
+                          f"{'SOLVED' if solved else 'TIMEOUT'}", flush=True)
+        meta = {"exe": args.exe, "flags": args.flags,
+                "timeout": f"{args.timeout}s", "budgets": args.budgets}
+    if not rows:
+        sys.exit("no steps recorded (does the solver support --telemetry?)")
+
+    summary = summarize(rows, runs, args.deadline_ms)
+    summary_csv = out_dir / "step_latency.csv"
+    with open(summary_csv, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        for s in summary:
+            writer.writerow({k: (round(v, 4) if isinstance(v, float) else v)
+                             for k, v in s.items()})
+    report = out_dir / "step_latency.md"
+    write_report(summary, report, args.deadline_ms, meta)
+    print(f"\nSaved {summary_csv}, {report}"
+          + ("" if args.from_csv else f", {steps_csv}"))
+
+
+if __name__ == "__main__":
+    main()
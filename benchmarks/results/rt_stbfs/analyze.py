@@ -1,59 +1,37 @@
 #!/usr/bin/env python3
 """Analyze RT+ST-BFS benchmark results vs RT+spatial-BFS and hetpibt."""
-import csv
+import sys
 from pathlib import Path
 from collections import defaultdict
 
 ROOT = Path("E:/gb/benchmarks/results")
 STBFS_DIR = ROOT / "rt_stbfs"
-OLD_RT_CSV = ROOT / "rt_lacam" / "het_rt_lacam_rt_full.csv"
-HETPIBT_CSV = ROOT / "post_bfs_port" / "hetpibt_full.csv"
+
+sys.path.insert(0, "E:/gb/tools")
+import results_db  # noqa: E402
+
+# results DB selections (campaign, solver)
+STBFS = {"campaign": "rt_stbfs", "solver": "het_rt_lacam_rt_stbfs"}
+OLD_RT = {"campaign": "rt_lacam", "solver": "het_rt_lacam_rt"}
+HETPIBT = {"campaign": "post_bfs_port", "solver": "hetpibt"}
 
 CATEGORIES = ["bottleneck_doors", "corridor_speed", "intersection",
               "cooperative_clearing", "het_bench"]
 AGENT_LABELS = ["n5", "n10", "n15", "n20", "n25", "var"]
 
 
-def load_csv(path):
-    rows = []
-    with open(path) as f:
-        for r in csv.DictReader(f):
-            r["solved"] = r["solved"] == "True"
-            for k in ["agents", "soc", "soc_lb", "makespan", "makespan_lb", "runtime_ms"]:
-                if k in r:
-                    r[k] = int(r[k]) if r[k] else 0
-            if "rt_steps" in r:
-                r["rt_steps"] = int(r["rt_steps"]) if r["rt_steps"] else 0
-            rows.append(r)
-    return rows
-
-
 def key(r):
     return (r["category"], r["agent_label"], r["scen_id"])
 
 
-def build_index(rows):
-    return {key(r): r for r in rows}
-
-
 def main():
-    # Load new RT+ST-BFS
-    stbfs_rows = []
-    for cat in CATEGORIES:
-        fname = f"lacam_{cat}.csv"
-        p = STBFS_DIR / fname
-        if p.exists():
-            stbfs_rows.extend(load_csv(p))
-
-    # Load old RT+spatial-BFS
-    old_rt_rows = load_csv(OLD_RT_CSV) if OLD_RT_CSV.exists() else []
-
-    # Load hetpibt
-    hetpibt_rows = load_csv(HETPIBT_CSV) if HETPIBT_CSV.exists() else []
-
-    stbfs = build_index(stbfs_rows)
-    old_rt = build_index(old_rt_rows)
-    hetpibt = build_index(hetpibt_rows)
+    db = results_db.open_db()
+    stbfs = results_db.load_index(db, **STBFS)
+    old_rt = results_db.load_index(db, **OLD_RT)
+    hetpibt = results_db.load_index(db, **HETPIBT)
+    # indexed joins on the scenario key: [(stbfs_row, other_row)]
+    stbfs_old_pairs = results_db.paired(db, STBFS, OLD_RT)
+    stbfs_pibt_pairs = results_db.paired(db, STBFS, HETPIBT)
 
     lines = []
     def w(s=""):
@@ -140,12 +118,8 @@ def main():
     # ---------------------------------------------------------------
     w("## C. New Solves (RT+ST-BFS solved, RT+spatial did not)")
     w()
-    new_solves = []
-    for k, r in stbfs.items():
-        if r["solved"]:
-            old = old_rt.get(k)
-            if old and not old["solved"]:
-                new_solves.append(r)
+    new_solves = [r for r, old in stbfs_old_pairs
+                  if r["solved"] and not old["solved"]]
 
     if new_solves:
         w(f"**{len(new_solves)} new solves:**")
@@ -163,12 +137,8 @@ def main():
     # ---------------------------------------------------------------
     w("## D. Regressions (RT+spatial solved, RT+ST-BFS did not)")
     w()
-    regressions = []
-    for k, r in old_rt.items():
-        if r["solved"]:
-            new = stbfs.get(k)
-            if new and not new["solved"]:
-                regressions.append((r, new))
+    regressions = [(old, new) for new, old in stbfs_old_pairs
+                   if old["solved"] and not new["solved"]]
 
     if regressions:
         w(f"**{len(regressions)} regressions:**")
@@ -189,12 +159,12 @@ def main():
 
     # ST-BFS vs old RT
     stbfs_vs_oldrt_socs = []
-    for k in stbfs:
-        if k in old_rt and stbfs[k]["solved"] and old_rt[k]["solved"]:
-            s_new = stbfs[k]["soc"]
-            s_old = old_rt[k]["soc"]
+    for new, old in stbfs_old_pairs:
+        if new["solved"] and old["solved"]:
+            s_new = new["soc"]
+            s_old = old["soc"]
             if s_old > 0 and s_new > 0:
-                stbfs_vs_oldrt_socs.append((s_new / s_old, k, s_new, s_old))
+                stbfs_vs_oldrt_socs.append((s_new / s_old, key(new), s_new, s_old))
 
     if stbfs_vs_oldrt_socs:
         ratios = [x[0] for x in stbfs_vs_oldrt_socs]
@@ -233,12 +203,12 @@ def main():
 
     # ST-BFS vs hetpibt
     stbfs_vs_pibt_socs = []
-    for k in stbfs:
-        if k in hetpibt and stbfs[k]["solved"] and hetpibt[k]["solved"]:
-            s_new = stbfs[k]["soc"]
-            s_pibt = hetpibt[k]["soc"]
+    for new, pibt in stbfs_pibt_pairs:
+        if new["solved"] and pibt["solved"]:
+            s_new = new["soc"]
+            s_pibt = pibt["soc"]
             if s_pibt > 0 and s_new > 0:
-                stbfs_vs_pibt_socs.append((s_new / s_pibt, k, s_new, s_pibt))
+                stbfs_vs_pibt_socs.append((s_new / s_pibt, key(new), s_new, s_pibt))
 
     if stbfs_vs_pibt_socs:
         ratios = [x[0] for x in stbfs_vs_pibt_socs]
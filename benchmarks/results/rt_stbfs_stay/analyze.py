@@ -1,33 +1,32 @@
 #!/usr/bin/env python3
 """Analyze RT+ST-BFS+stay benchmark results vs RT+ST-BFS and hetpibt."""
-import csv
+import sys
 from pathlib import Path
 from collections import defaultdict
 
 ROOT = Path("E:/gb/benchmarks/results")
 STAY_DIR = ROOT / "rt_stbfs_stay"
-OLD_STBFS_DIR = ROOT / "rt_stbfs"
-HETPIBT_CSV = ROOT / "post_bfs_port" / "hetpibt_full.csv"
+
+sys.path.insert(0, "E:/gb/tools")
+import results_db  # noqa: E402
+
+# results DB selections (campaign, solver)
+STAY = {"campaign": "rt_stbfs_stay", "solver": "het_rt_lacam_rt_stbfs_stay"}
+OLD_STBFS = {"campaign": "rt_stbfs", "solver": "het_rt_lacam_rt_stbfs"}
+HETPIBT = {"campaign": "post_bfs_port", "solver": "hetpibt"}
 
 CATEGORIES = ["bottleneck_doors", "corridor_speed", "intersection",
               "cooperative_clearing", "het_bench"]
 AGENT_LABELS = ["n5", "n10", "n15", "n20", "n25", "var"]
 
 
-def load_csv(path):
-    rows = []
-    with open(path) as f:
-        for r in csv.DictReader(f):
-            r["solved"] = r["solved"] == "True"
-            for k in ["agents", "soc", "soc_lb", "makespan", "makespan_lb", "runtime_ms"]:
-                if k in r:
-                    r[k] = int(r[k]) if r[k] else 0
-            if "rt_steps" in r:
-                r["rt_steps"] = int(r["rt_steps"]) if r["rt_steps"] else 0
-            for k in ["move_steps", "stay_steps", "explored"]:
-                if k in r:
-                    r[k] = int(r[k]) if r[k] else 0
-            rows.append(r)
+def load_index(db, sel):
+    """DB index with the solver-specific step counters as ints."""
+    rows = results_db.load_index(db, **sel)
+    for r in rows.values():
+        for k in ["move_steps", "stay_steps", "explored"]:
+            if k in r:
+                r[k] = int(r[k]) if r[k] not in ("", None) else 0
     return rows
 
 
@@ -35,33 +34,11 @@ def key(r):
     return (r["category"], r["agent_label"], r["scen_id"])
 
 
-def build_index(rows):
-    return {key(r): r for r in rows}
-
-
 def main():
-    # Load RT+ST-BFS+stay
-    stay_rows = []
-    for cat in CATEGORIES:
-        fname = f"lacam_{cat}.csv"
-        p = STAY_DIR / fname
-        if p.exists():
-            stay_rows.extend(load_csv(p))
-
-    # Load old RT+ST-BFS
-    old_rows = []
-    for cat in CATEGORIES:
-        fname = f"lacam_{cat}.csv"
-        p = OLD_STBFS_DIR / fname
-        if p.exists():
-            old_rows.extend(load_csv(p))
-
-    # Load hetpibt
-    hetpibt_rows = load_csv(HETPIBT_CSV) if HETPIBT_CSV.exists() else []
-
-    stay = build_index(stay_rows)
-    old = build_index(old_rows)
-    hetpibt = build_index(hetpibt_rows)
+    db = results_db.open_db()
+    stay = load_index(db, STAY)
+    old = load_index(db, OLD_STBFS)
+    hetpibt = load_index(db, HETPIBT)
 
     lines = []
     def w(s=""):
@@ -4,6 +4,7 @@ import argparse
 import csv
 import re
 import subprocess
+import sys
 import time
 from pathlib import Path
 
@@ -13,6 +14,9 @@ SCEN_DIR = ROOT / "benchmarks" / "scenarios"
 MAPS_DIR = ROOT / "benchmarks" / "maps"
 OUT_DIR = ROOT / "benchmarks" / "results" / "rt_stbfs_stay"
 
+sys.path.insert(0, str(ROOT / "tools"))
+import results_db  # noqa: E402
+
 CATEGORIES_105 = {
     "intersection": "intersection_105.map",
     "bottleneck_doors": "bottleneck_doors_105.map",
@@ -165,11 +169,18 @@ def main():
         scenarios = discover_105(cat)
         csv_name = f"lacam_{cat}.csv"
 
+    db = results_db.open_db()
+    run_id = results_db.start_run(
+        db, OUT_DIR.name, "het_rt_lacam_rt_stbfs_stay", EXE,
+        flags=f"--goal-lock --rt --rt-budget {args.rt_budget} -t {args.timeout}")
+
     results = []
     for i, scen in enumerate(scenarios):
         label = f"{scen['category']}/{scen['agent_label']}/scen{scen['scen_id']}"
         print(f"  [{i+1}/{len(scenarios)}] {label} ...", end="", flush=True)
         r = run_one(scen, args.timeout, args.rt_budget)
+        results_db.add_result(db, run_id, r)
+        db.commit()
         status = "SOLVED" if r["solved"] else "TIMEOUT"
         if r["solved"]:
             detail = f"steps={r['rt_steps']} soc={r['soc']} mk={r['makespan']} move={r['move_steps']} stay={r['stay_steps']} t={r['runtime_ms']}ms"
@@ -186,7 +197,8 @@ def main():
 
     solved = sum(1 for r in results if r["solved"])
     print(f"\n=== {cat}: {solved}/{len(results)} solved ===")
-    print(f"Saved: {csv_path}")
+    print(f"Saved: {csv_path} (+ {results_db.DB_PATH}, run {run_id})")
+    db.close()
 
 
 if __name__ == "__main__":
@@ -8,10 +8,15 @@ Usage:
                                                     [--category all|intersection|bottleneck_doors|corridor_speed|cooperative_clearing|het_bench]
                                                     [--agents all|n5|n10|n15|n20|n25]
                                                     [--timeout-lacam 30] [--timeout-pibt 30]
+                                                    [--prune-after K] [--budget-factor F]
+
+    --prune-after / --budget-factor skip or shorten hopeless runs (see
+    tools/sweep_pruning.py); those rows are marked in the `pruned` column.
 
 Output:
     E:/gb/benchmarks/results/het_rt_lacam.csv
     E:/gb/benchmarks/results/hetpibt.csv
+    E:/gb/benchmarks/results/results.db   (campaign --campaign, see tools/results_db.py)
 """
 import argparse
 import csv
@@ -30,6 +35,10 @@ RESULTS_DIR = ROOT / "benchmarks" / "results"
 HET_RT_LACAM_EXE = ROOT / "het_rt_lacam" / "build" / "Release" / "main.exe"
 HETPIBT_EXE = ROOT / "third_party" / "hetpibt" / "build" / "Release" / "main.exe"
 
+sys.path.insert(0, str(ROOT / "tools"))
+import results_db  # noqa: E402
+import sweep_pruning  # noqa: E402
+
 # 105-series categories and their maps
 CATEGORIES_105 = {
     "intersection": "intersection_105.map",
@@ -262,10 +271,29 @@ def parse_hetpibt_output(output, elapsed_ms):
     return r
 
 
+def run_pruned(pruner, solver, run, scen, key, timeout_s):
+    """run(scen, timeout) unless the pruner skips it; a pruned row has
+    `solved` empty and the reason in `pruned`."""
+    reason = pruner.skip(solver, key, timeout_s)
+    if reason is None:
+        timeout_s, cap = pruner.budget(solver, key, timeout_s)
+        r = run(scen, timeout_s)
+        reason = pruner.outcome(solver, key, r["solved"], cap)
+        if reason is None:
+            r["pruned"] = ""
+            return r
+    else:
+        r = {"solver": solver, "category": scen["category"],
+             "agents": scen["agents"], "agent_label": scen["agent_label"],
+             "scen_id": scen["scen_id"], "runtime_ms": 0}
+    r.update({"solved": "", "pruned": reason})
+    return r
+
+
 CSV_FIELDS = [
     "solver", "category", "agent_label", "scen_id", "agents",
     "solved", "goals_reached", "goals_total",
-    "soc", "soc_lb", "makespan", "makespan_lb", "runtime_ms",
+    "soc", "soc_lb", "makespan", "makespan_lb", "runtime_ms", "pruned",
 ]
 
 
@@ -291,6 +319,9 @@ def main():
                         help="Timeout in seconds for het_rt_lacam")
     parser.add_argument("--timeout-pibt", type=int, default=30,
                         help="Timeout in seconds for hetpibt")
+    parser.add_argument("--campaign", default="all_experiments",
+                        help="campaign name in the results DB")
+    sweep_pruning.add_arguments(parser)
     args = parser.parse_args()
 
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -301,25 +332,48 @@ def main():
         print("No scenarios found!")
         return
 
+    db = results_db.open_db()
+    if args.solver in ("both", "het_rt_lacam"):
+        lacam_run = results_db.start_run(
+            db, args.campaign, "het_rt_lacam", HET_RT_LACAM_EXE,
+            flags=f"--goal-lock -t {args.timeout_lacam}")
+    if args.solver in ("both", "hetpibt"):
+        pibt_run = results_db.start_run(
+            db, args.campaign, "hetpibt", HETPIBT_EXE, flags="--seed 0 --goal-lock")
+
+    pruner = sweep_pruning.Pruner.from_args(args, db)
     lacam_results = []
     pibt_results = []
 
     for idx, scen in enumerate(scenarios):
         label = f"{scen['category']}/{scen['agent_label']}/scen.{scen['scen_id']}"
         progress = f"[{idx+1}/{len(scenarios)}]"
+        key = (scen["category"], scen["agent_label"], scen["scen_id"])
 
         if args.solver in ("both", "het_rt_lacam"):
             print(f"{progress} het_rt_lacam  {label} ...", end=" ", flush=True)
-            r = run_het_rt_lacam(scen, args.timeout_lacam)
-            status = f"soc={r['soc']}" if r["solved"] else "FAIL"
-            print(f"{status}  ({r['runtime_ms']}ms)")
+            r = run_pruned(pruner, "het_rt_lacam", run_het_rt_lacam, scen, key,
+                           args.timeout_lacam)
+            if r["pruned"]:
+                print(f"PRUNED  ({r['pruned']})")
+            else:
+                status = f"soc={r['soc']}" if r["solved"] else "FAIL"
+                print(f"{status}  ({r['runtime_ms']}ms)")
+                results_db.add_result(db, lacam_run, r)
+                db.commit()
             lacam_results.append(r)
 
         if args.solver in ("both", "hetpibt"):
             print(f"{progress} hetpibt       {label} ...", end=" ", flush=True)
-            r = run_hetpibt(scen, args.timeout_pibt)
-            status = f"{r['goals_reached']}/{r['goals_total']} soc={r['soc']}"
-            print(f"{status}  ({r['runtime_ms']}ms)")
+            r = run_pruned(pruner, "hetpibt", run_hetpibt, scen, key,
+                           args.timeout_pibt)
+            if r["pruned"]:
+                print(f"PRUNED  ({r['pruned']})")
+            else:
+                status = f"{r['goals_reached']}/{r['goals_total']} soc={r['soc']}"
+                print(f"{status}  ({r['runtime_ms']}ms)")
+                results_db.add_result(db, pibt_run, r)
+                db.commit()
             pibt_results.append(r)
 
     # Write results
@@ -327,6 +381,7 @@ def main():
         write_csv(lacam_results, RESULTS_DIR / "het_rt_lacam.csv")
     if pibt_results:
         write_csv(pibt_results, RESULTS_DIR / "hetpibt.csv")
+    db.close()
 
     # Print summary
     print("\n" + "=" * 70)
@@ -335,21 +390,29 @@ def main():
     for name, results in [("het_rt_lacam", lacam_results), ("hetpibt", pibt_results)]:
         if not results:
             continue
-        solved = sum(1 for r in results if r["solved"])
-        total = len(results)
-        print(f"\n{name}: {solved}/{total} solved ({100*solved/total:.0f}%)")
+        # pruned rows are neither solved nor failed: rates are over runs
+        ran = [r for r in results if not r["pruned"]]
+        solved = sum(1 for r in ran if r["solved"])
+        total = len(ran)
+        pruned = len(results) - total
+        print(f"\n{name}: {solved}/{total} solved ({100*solved/max(total, 1):.0f}%)"
+              + (f", {pruned} pruned" if pruned else ""))
 
         # Per-category breakdown
         cats = sorted(set(r["category"] for r in results))
         for cat in cats:
-            cr = [r for r in results if r["category"] == cat]
+            cr = [r for r in ran if r["category"] == cat]
             cs = sum(1 for r in cr if r["solved"])
             ct = len(cr)
+            cp = sum(1 for r in results if r["category"] == cat and r["pruned"])
             avg_soc = 0
             solved_socs = [r["soc"] for r in cr if r["solved"] and r["soc"] > 0]
             if solved_socs:
                 avg_soc = sum(solved_socs) / len(solved_socs)
-            print(f"  {cat:25s}  {cs:3d}/{ct:3d} solved  avg_soc={avg_soc:.0f}")
+            print(f"  {cat:25s}  {cs:3d}/{ct:3d} solved  avg_soc={avg_soc:.0f}"
+                  + (f"  ({cp} pruned)" if cp else ""))
+    if pruner.active:
+        print(f"\n{pruner.summary()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,363 @@
+/*
+ * Microbenchmarks for het_rt_lacam core components
+ *
+ * Small self-contained harness: each benchmark is a closure that does one
+ * unit of work; the harness calibrates the iteration count to --min-time,
+ * repeats --reps times and reports min/median time per iteration (and per
+ * item for batched benchmarks). Fixtures are a het_bench map + scenario,
+ * by default from benchmarks/maps and benchmarks/scenarios.
+ *
+ *   ./bench_components                      # all benchmarks, table
+ *   ./bench_components -f pibt --json r.json
+ *
+ * tools/bench_components.py runs this and keeps a JSON history.
+ */
+#include <argparse/argparse.hpp>
+#include <functional>
+#include <iostream>
+
+#include "collision_table.hpp"
+#include "dist_table.hpp"
+#include "instance.hpp"
+#include "pibt.hpp"
+#include "sipp.hpp"
+#include "st_reservation.hpp"
+
+struct Benchmark {
+  std::string name;
+  int items;  // work items per iteration (queries, agents, ...)
+  std::function<void()> setup;  // untimed, before each repetition
+  std::function<void()> run;    // one iteration
+};
+
+struct BenchResult {
+  std::string name;
+  long long iterations;  // per repetition
+  int items;
+  std::vector<double> ns_per_iter;  // one entry per repetition
+  double median() const;
+  double min() const;
+};
+
+double BenchResult::median() const
+{
+  auto s = ns_per_iter;
+  std::sort(s.begin(), s.end());
+  auto k = s.size() / 2;
+  return s.size() % 2 ? s[k] : 0.5 * (s[k - 1] + s[k]);
+}
+
+double BenchResult::min() const
+{
+  return *std::min_element(ns_per_iter.begin(), ns_per_iter.end());
+}
+
+static double time_ns(const Benchmark &b, long long iters)
+{
+  if (b.setup) b.setup();
+  const auto t_s = Time::now();
+  for (long long k = 0; k < iters; ++k) b.run();
+  const auto t_e = Time::now();
+  return std::chrono::duration<double, std::nano>(t_e - t_s).count();
+}
+
+static BenchResult run_benchmark(const Benchmark &b, double min_time_ms,
+                                 int reps)
+{
+  // calibrate: grow the iteration count until one repetition takes
+  // at least min_time_ms
+  long long iters = 1;
+  while (true) {
+    auto ns = time_ns(b, iters);
+    if (ns >= min_time_ms * 1e6 || iters >= (1LL << 30)) break;
+    auto scale = ns > 0 ? min_time_ms * 1e6 / ns * 1.2 : 10.0;
+    iters = std::max(iters + 1, (long long)(iters * std::min(scale, 10.0)));
+  }
+  BenchResult res{b.name, iters, b.items, {}};
+  for (int r = 0; r < reps; ++r) {
+    res.ns_per_iter.push_back(time_ns(b, iters) / iters);
+  }
+  return res;
+}
+
+static std::string json_escape(const std::string &s)
+{
+  std::string out;
+  for (char c : s) {
+    if (c == '"' || c == '\\') out += '\\';
+    out += c;
+  }
+  return out;
+}
+
+// priority order used by the planner: farthest from goal first
+static std::vector<int> make_order(const Instance &ins, const DistTable &D,
+                                   const HetConfig &Q)
+{
+  std::vector<int> order(ins.N);
+  std::iota(order.begin(), order.end(), 0);
+  std::sort(order.begin(), order.end(), [&](int a, int b) {
+    return D.get(a, Q.positions[a]) > D.get(b, Q.positions[b]);
+  });
+  return order;
+}
+
+static std::vector<Benchmark> make_benchmarks(Instance &ins, DistTable &D,
+                                              int seed)
+{
+  std::vector<Benchmark> benches;
+  const int N = (int)ins.N;
+
+  // ---- Graph::build_from_base, one per fleet cell size ----
+  for (int cs : ins.fleet_cell_sizes) {
+    benches.push_back({"graph/build_from_base/cs" + std::to_string(cs), 1,
+                       nullptr, [&ins, cs]() {
+                         Graph g;
+                         g.build_from_base(ins.base_graph, cs);
+                       }});
+  }
+
+  // ---- DistTable ----
+  benches.push_back({"dist_table/build", N, nullptr,
+                     [&ins]() { DistTable d(&ins); }});
+  auto next_agent = std::make_shared<int>(0);
+  benches.push_back({"dist_table/update", 1, nullptr, [&D, next_agent, N]() {
+                       D.update(*next_agent);
+                       *next_agent = (*next_agent + 1) % N;
+                     }});
+
+  // ---- HetPIBT::set_new_config: roll configurations from the start ----
+  const int kPIBTSteps = 32;
+  auto pibt = std::make_shared<HetPIBT>(&ins, &D, seed, true);
+  auto Q = std::make_shared<HetConfig>();
+  auto step = std::make_shared<int>(0);
+  benches.push_back(
+      {"pibt/set_new_config", 1,
+       [&ins, Q, step]() {
+         *Q = ins.make_start_config();
+         *step = 0;
+       },
+       [&ins, &D, pibt, Q, step, N]() {
+         if (++(*step) > kPIBTSteps) {
+           *Q = ins.make_start_config();
+           *step = 0;
+         }
+         HetConfig Q_to;
+         Q_to.positions.assign(N, nullptr);
+         Q_to.kappa.assign(N, 0);
+         if (pibt->set_new_config(*Q, Q_to, make_order(ins, D, *Q))) {
+           *Q = Q_to;
+         }
+       }});
+
+  // ---- STReservation: seed + reserve every agent's BFS-greedy path ----
+  const int kHorizon = 8;
+  std::vector<std::pair<int, std::vector<int>>> res_paths;  // fleet, cells
+  for (int i = 0; i < N; ++i) {
+    auto v = ins.starts[i];
+    std::vector<int> cells = {v->index};
+    for (int t = 0; t < kHorizon; ++t) {
+      for (auto u : v->neighbor) {
+        if (D.get(i, u) < D.get(i, v)) {
+          v = u;
+          break;
+        }
+      }
+      cells.push_back(v->index);
+    }
+    res_paths.push_back({ins.agents[i].fleet_id, cells});
+  }
+  const auto Q_start = ins.make_start_config();
+  benches.push_back({"st_reservation/seed_reserve", N, nullptr,
+                     [&ins, Q_start, res_paths, N]() {
+                       STReservation res(&ins, N);
+                       res.seed_transient(Q_start);
+                       for (int i = 0; i < N; ++i) {
+                         res.reserve_path(i, res_paths[i].first, 1,
+                                          res_paths[i].second);
+                       }
+                     }});
+  auto st_res = std::make_shared<STReservation>(&ins, N);
+  st_res->seed_transient(Q_start);
+  for (int i = 0; i < N; ++i) {
+    st_res->reserve_path(i, res_paths[i].first, 1, res_paths[i].second);
+  }
+  // move_collides queries: every agent, every neighbor, every time step
+  std::vector<std::array<int, 4>> queries;  // fleet, from, to, agent
+  for (int i = 0; i < N; ++i) {
+    for (auto u : ins.starts[i]->neighbor) {
+      queries.push_back(
+          {ins.agents[i].fleet_id, ins.starts[i]->index, u->index, i});
+    }
+  }
+  benches.push_back({"st_reservation/move_collides",
+                     (int)queries.size() * kHorizon, nullptr,
+                     [st_res, queries]() {
+                       int hits = 0;
+                       for (int t = 0; t < kHorizon; ++t) {
+                         for (auto &q : queries) {
+                           hits += st_res->move_collides(q[0], q[1], q[2], t,
+                                                         q[3]);
+                         }
+                       }
+                       if (hits < 0) std::cout << hits;  // keep the loop
+                     }});
+
+  // ---- SIPP + CollisionTable: unit agents on their fleet graph ----
+  int unit_fleet = -1;
+  for (int f = 0; f < ins.num_fleets; ++f) {
+    if (ins.fleet_cell_sizes[f] == 1) unit_fleet = f;
+  }
+  std::vector<int> unit_agents;
+  for (int i = 0; i < N; ++i) {
+    if (ins.agents[i].fleet_id == unit_fleet) unit_agents.push_back(i);
+  }
+  if (unit_agents.empty()) {
+    std::cerr << "no cell_size=1 agents, skipping sipp/collision_table"
+              << std::endl;
+    return benches;
+  }
+  const int graph_size = ins.fleet_graphs[unit_fleet].size();
+  // reference paths: SIPP one agent at a time against the earlier ones
+  auto paths = std::make_shared<Paths>(N);
+  {
+    CollisionTable CT(graph_size, N);
+    for (int i : unit_agents) {
+      (*paths)[i] = sipp(i, ins.starts[i], ins.goals[i], &D, &CT);
+      CT.enrollPath(i, (*paths)[i]);
+    }
+  }
+  benches.push_back({"collision_table/enroll_clear", (int)unit_agents.size(),
+                     nullptr, [paths, unit_agents, graph_size, N]() {
+                       CollisionTable CT(graph_size, N);
+                       for (int i : unit_agents) CT.enrollPath(i, (*paths)[i]);
+                       for (int i : unit_agents) CT.clearPath(i, (*paths)[i]);
+                     }});
+  auto CT_full = std::make_shared<CollisionTable>(graph_size, N);
+  int cost_queries = 0;
+  for (int i : unit_agents) {
+    CT_full->enrollPath(i, (*paths)[i]);
+    cost_queries += (*paths)[i].size();
+  }
+  benches.push_back({"collision_table/get_collision_cost", cost_queries,
+                     nullptr, [CT_full, paths, unit_agents]() {
+                       int cost = 0;
+                       for (int i : unit_agents) {
+                         auto &p = (*paths)[i];
+                         for (size_t t = 1; t < p.size(); ++t) {
+                           cost += CT_full->getCollisionCost(p[t - 1], p[t],
+                                                             t - 1);
+                         }
+                       }
+                       if (cost < 0) std::cout << cost;  // keep the loop
+                     }});
+  benches.push_back({"sipp/replan_one", 1, nullptr,
+                     [&ins, &D, CT_full, paths, unit_agents, next_agent]() {
+                       // refiner-style: lift one agent out and replan it
+                       int i = unit_agents[*next_agent % unit_agents.size()];
+                       ++(*next_agent);
+                       CT_full->clearPath(i, (*paths)[i]);
+                       sipp(i, ins.starts[i], ins.goals[i], &D, CT_full.get());
+                       CT_full->enrollPath(i, (*paths)[i]);
+                     }});
+  return benches;
+}
+
+int main(int argc, char *argv[])
+{
+  argparse::ArgumentParser program("bench_components", "0.1.0");
+  program.add_argument("-m", "--map")
+      .help("map file")
+      .default_value(
+          std::string("../../benchmarks/maps/bottleneck_doors_105.map"));
+  program.add_argument("-i", "--scen")
+      .help("het_bench scenario file")
+      .default_value(std::string(
+          "../../benchmarks/scenarios/bottleneck_doors_105_00_hb.scen"));
+  program.add_argument("--swap-xy")
+      .help("swap x/y in het_bench scenario coordinates")
+      .default_value(false)
+      .implicit_value(true);
+  program.add_argument("--map-scale")
+      .help("base cells per map cell side; overrides the map's scale line")
+      .default_value(std::string("0"));
+  program.add_argument("-f", "--filter")
+      .help("only benchmarks whose name contains this string")
+      .default_value(std::string(""));
+  program.add_argument("--min-time")
+      .help("minimum time per repetition (ms)")
+      .default_value(std::string("50"));
+  program.add_argument("--reps")
+      .help("repetitions per benchmark")
+      .default_value(std::string("5"));
+  program.add_argument("-s", "--seed")
+      .help("seed")
+      .default_value(std::string("0"));
+  program.add_argument("--json")
+      .help("write results as JSON to this file")
+      .default_value(std::string(""));
+  try {
+    program.parse_known_args(argc, argv);
+  } catch (const std::runtime_error &err) {
+    std::cerr << err.what() << std::endl;
+    std::cerr << program;
+    std::exit(1);
+  }
+
+  const auto map_name = program.get<std::string>("map");
+  const auto scen_name = program.get<std::string>("scen");
+  const auto filter = program.get<std::string>("filter");
+  const auto min_time_ms = std::stod(program.get<std::string>("min-time"));
+  const auto reps = std::stoi(program.get<std::string>("reps"));
+  const auto seed = std::stoi(program.get<std::string>("seed"));
+  const auto json_name = program.get<std::string>("json");
+
+  Instance ins(scen_name, map_name, program.get<bool>("swap-xy"), 0, -1,
+               std::stoi(program.get<std::string>("map-scale")));
+  if (!ins.is_valid(1)) {
+    std::cerr << "invalid instance: " << scen_name << std::endl;
+    return 1;
+  }
+  DistTable D(&ins);
+  auto benches = make_benchmarks(ins, D, seed);
+
+  std::cout << "map=" << map_name << " scen=" << scen_name << " N=" << ins.N
+            << " fleets=" << ins.num_fleets << std::endl;
+  std::cout << std::left << std::setw(40) << "benchmark" << std::right
+            << std::setw(14) << "median" << std::setw(14) << "min"
+            << std::setw(14) << "per item" << std::setw(12) << "iters"
+            << std::endl;
+  std::vector<BenchResult> results;
+  for (auto &b : benches) {
+    if (!filter.empty() && b.name.find(filter) == std::string::npos) continue;
+    auto r = run_benchmark(b, min_time_ms, reps);
+    std::cout << std::left << std::setw(40) << r.name << std::right
+              << std::fixed << std::setprecision(1) << std::setw(12)
+              << r.median() / 1e3 << "us" << std::setw(12) << r.min() / 1e3
+              << "us" << std::setw(12) << r.median() / r.items << "ns"
+              << std::setw(12) << r.iterations << std::endl;
+    results.push_back(r);
+  }
+
+  if (!json_name.empty()) {
+    std::ofstream out(json_name);
+    out << std::setprecision(6);
+    out << "{\n  \"map\": \"" << json_escape(map_name)
+        << "\",\n  \"scen\": \"" << json_escape(scen_name)
+        << "\",\n  \"agents\": " << ins.N << ",\n  \"reps\": " << reps
+        << ",\n  \"benchmarks\": [\n";
+    for (size_t k = 0; k < results.size(); ++k) {
+      auto &r = results[k];
+      out << "    {\"name\": \"" << r.name << "\", \"iterations\": "
+          << r.iterations << ", \"items\": " << r.items
+          << ", \"median_ns\": " << r.median() << ", \"min_ns\": " << r.min()
+          << ", \"ns_per_iter\": [";
+      for (size_t j = 0; j < r.ns_per_iter.size(); ++j) {
+        out << (j ? ", " : "") << r.ns_per_iter[j];
+      }
+      out << "]}" << (k + 1 < results.size() ? "," : "") << "\n";
+    }
+    out << "  ]\n}\n";
+  }
+  return 0;
+}
@@ -28,8 +28,7 @@ def generate(total, counts, seed=42):
               f"{len(free)} free, largest={largest}")
         fleet_grids.append((fw, fh, free, comps, cs, vel))
 
-    occupied_starts = set()
-    occupied_goals = set()
+    occupancy = gen.Occupancy(width, height)
     all_agents = []
 
     # Place largest first
@@ -40,8 +39,7 @@ def generate(total, counts, seed=42):
         fw, fh, free, comps, cs, vel = fleet_grids[fi]
         n = counts[fi]
         print(f"\nPlacing {n} agents for fleet {fi} (cs={cs})...")
-        placements = gen.place_agents(comps, free, cs, n,
-                                       occupied_starts, occupied_goals, rng)
+        placements = gen.place_agents(comps, free, cs, n, occupancy, rng)
         for start, goal in placements:
             all_agents.append((agent_id, fi, cs, vel, start[0], start[1],
                               goal[0], goal[1], fw, fh))
@@ -14,6 +14,9 @@ struct DistTable {
 
   DistTable(const Instance *ins);
 
+  // Recompute agent i's row from its current goal (lifelong goal changes)
+  void update(const int i);
+
   int get(const int i, const int v_id) const;
   int get(const int i, const Vertex *v) const;
 };
@@ -55,8 +55,10 @@ struct Graph {
   Vertices U;  // with nullptr, i.e., |U| = width * height
   int width;   // grid width
   int height;  // grid height
+  int scale;   // base cells per map cell side (map header "scale N")
   Graph();
-  Graph(const std::string &filename);  // taking map filename
+  // taking map filename; _scale > 0 overrides the map header
+  Graph(const std::string &filename, int _scale = 0);
   ~Graph();
 
   // move semantics (Graph owns Vertex memory)
@@ -68,6 +70,8 @@ struct Graph {
   // Build coarser fleet graph from base grid using non-overlapping tiling.
   // Fleet cell (fx, fy) covers base cells [fx*cs, (fx+1)*cs) x [fy*cs, (fy+1)*cs).
   // A fleet cell is passable only if ALL underlying base cells are passable.
+  // With base.scale > 1 the base grid is virtual: base cell (bx, by) is map
+  // cell (bx / scale, by / scale), so the upscaled map is never built.
   void build_from_base(const Graph &base, int cell_size);
 
   int size() const;
@@ -33,6 +33,10 @@ struct HNode {
         HNode *_parent = nullptr, int _g = 0, int _h = 0);
   ~HNode();
 
+  // Restart constraint enumeration from the empty LNode (lifelong mode:
+  // successors must be re-generated after a goal change)
+  void reset_search_tree();
+
   // Speed-gated: agents with kappa>0 get only the stay option
   // Goal-locked: agents at goal with kappa=0 get only the stay option
   LNode *get_next_lowlevel_node(std::mt19937 &MT, const Instance *ins,
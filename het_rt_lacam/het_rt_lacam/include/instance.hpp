@@ -22,22 +22,30 @@ struct Instance {
   Config goals;                        // fleet-specific goal vertices
   std::vector<AgentInfo> agents;       // per-agent metadata
   uint N;                              // number of agents
-  int base_width;
+  int base_width;                      // base_graph dims times its scale
   int base_height;
   int num_fleets;
 
-  // het_bench scenario
+  // het_bench scenario ("-" reads from stdin); keeps agents
+  // [agent_begin, agent_end) in file order, agent_end < 0 = all.
+  // map_scale > 0 overrides the "scale" line of the map header.
   Instance(const std::string &scen_filename, const std::string &map_filename,
-           bool swap_xy = false);
+           bool swap_xy = false, int agent_begin = 0, int agent_end = -1,
+           int map_scale = 0);
 
   // homogeneous (standard MAPF benchmark), all cell_size=1
   Instance(const std::string &scen_filename, const std::string &map_filename,
-           int _N);
+           int _N, int map_scale = 0);
 
   ~Instance();
 
   const Graph *fleet_graph(int agent_id) const;
   int speed_period(int agent_id) const;
+
+  // Base-grid (x, y) -> vertex on the agent's fleet graph, nullptr if the
+  // fleet cell is out of bounds or blocked. Same convention as het_bench.
+  Vertex *get_fleet_vertex(int agent_id, int x, int y,
+                           bool swap_xy = false) const;
   int skip_invalid_agents(const int verbose = 0);
   bool is_valid(const int verbose = 0) const;
 
@@ -0,0 +1,54 @@
+/*
+ * Lifelong (streaming-goal) execution on top of RT-LaCAM
+ *
+ * Goals are reassigned between solve_one_step() calls as agents finish
+ * their current task. Tasks come from a JSON-lines feed, one per line:
+ *   {"agent": 3, "goal": [x, y]}
+ *   {"agent": 3, "goal": [x, y], "step": 120}   // released at step 120
+ * Coordinates are base-grid cells (same convention as het_bench, including
+ * --swap-xy). Each agent works through its own tasks in file order; the
+ * goal given in the scenario counts as the agent's first task.
+ */
+#pragma once
+
+#include "instance.hpp"
+#include "planner.hpp"
+#include "telemetry.hpp"
+#include "utils.hpp"
+
+struct LifelongTask {
+  int agent;
+  int x;
+  int y;
+  int release_step;  // not assigned before this step (0 = immediately)
+};
+
+struct LifelongResult {
+  int steps;
+  int tasks_completed;
+  int tasks_assigned;
+  std::vector<double> step_latency_ms;  // wall-clock per solve_one_step
+  std::vector<HetConfig> executed;
+
+  double throughput() const;  // tasks completed per 1k steps
+  double latency_percentile(double p) const;
+};
+
+// Returns an empty vector when the file cannot be read.
+// Malformed lines are skipped with a warning (verbose >= 1).
+std::vector<LifelongTask> load_tasks(const std::string &filename,
+                                     const int verbose = 0);
+
+// Runs until max_steps, the deadline, or until every task is done.
+LifelongResult run_lifelong(Instance &ins, Planner &planner,
+                            const std::vector<LifelongTask> &tasks,
+                            int node_budget, int max_steps,
+                            bool swap_xy = false,
+                            const Deadline *deadline = nullptr,
+                            const int verbose = 0,
+                            Telemetry *telemetry = nullptr);
+
+void make_lifelong_log(const Instance &ins, const LifelongResult &res,
+                       const std::string &output_name,
+                       const double comp_time_ms, const std::string &map_name,
+                       const int seed, const bool log_short = false);
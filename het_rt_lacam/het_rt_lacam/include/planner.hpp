@@ -15,6 +15,7 @@
 #include "hnode.hpp"
 #include "instance.hpp"
 #include "pibt.hpp"
+#include "trace.hpp"
 #include "utils.hpp"
 
 struct Planner {
@@ -48,6 +49,20 @@ struct Planner {
   // RT search status
   enum class SearchStatus { SEARCHING, GOAL_FOUND, NO_SOLUTION };
 
+  // where one solve_one_step() spent its time (FLG_PHASE_TIMES only)
+  struct StepPhases {
+    double lowlevel_ms = 0;   // constraint (LNode) enumeration
+    double pibt_ms = 0;       // set_new_config: PIBT + collision checks
+    double explored_ms = 0;   // EXPLORED lookup + rewrite on revisits
+    double heuristic_ms = 0;  // DistTable lookups for h of new nodes
+    double create_ms = 0;     // HNode construction + EXPLORED insert
+    double extract_ms = 0;    // extract_next_step + advance
+    int iterations = 0;
+    int created = 0;
+    int revisited = 0;
+  };
+  StepPhases phases;  // reset at the start of every solve_one_step()
+
   // parameters
   static bool FLG_STAR;
   static bool FLG_GOAL_LOCK;
@@ -57,6 +72,7 @@ struct Planner {
   static float RANDOM_INSERT_PROB1;
   static float RANDOM_INSERT_PROB2;
   static bool FLG_REFINER;
+  static bool FLG_PHASE_TIMES;  // fill `phases` (costs a clock read per phase)
   static int REFINER_NUM;
 
   // logging
@@ -81,6 +97,12 @@ struct Planner {
   HetConfig solve_one_step(int node_budget);
   void reset();
 
+  // Lifelong mode: call after ins->goals[i] has been reassigned.
+  // Recomputes only the changed agents' distances and re-roots the search at
+  // the current config, keeping EXPLORED (configs + transitions) and PIBT.
+  void update_goal(int i);
+  void update_goals(const std::vector<int> &agents);
+
   bool set_new_config(HNode *S, LNode *M, HetConfig &Q_to);
   HNode *create_highlevel_node(const HetConfig &Q, HNode *parent);
   void rewrite(HNode *H_from, HNode *H_to);
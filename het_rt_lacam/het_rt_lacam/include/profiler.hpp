@@ -0,0 +1,27 @@
+/*
+ * in-process sampling profiler
+ *
+ * Built only with -DHET_PROFILE=ON (POSIX). A SIGPROF timer samples the
+ * call stack of whichever thread is on CPU; the samples are written as
+ * collapsed stacks ("root;...;leaf count" per line) when the session ends.
+ * Without HET_PROFILE the session only prints a warning.
+ */
+
+#pragma once
+
+#include <string>
+
+struct ProfileSession {
+  const std::string out_path;
+
+  ProfileSession(const std::string &_out_path, int hz = 999);
+  ~ProfileSession();
+
+  // stop sampling and write the collapsed stacks (called by the destructor)
+  void finish();
+
+  static bool available();
+
+private:
+  bool active = false;
+};
@@ -0,0 +1,43 @@
+/*
+ * per-step telemetry for RT and lifelong runs (--telemetry)
+ *
+ * One JSON object per line, flushed after every line so a monitor can
+ * tail the stream while the solver runs (tools/rt_monitor.py):
+ *   {"type":"start","mode":"rt","agents":25,"budget":100,...}
+ *   {"type":"step","step":1,"t_ms":3.2,"latency_ms":1.1,"explored":120,
+ *    "open":31,"goals":4,"moved":21,"rss_kb":10240}
+ *   {"type":"end","result":"success","steps":212,"comp_time_ms":840}
+ * With --phase-times (Planner::FLG_PHASE_TIMES), step records also carry the
+ * search iterations, nodes created/revisited and "phases" (ms per search
+ * phase, see Planner::StepPhases).
+ * The target is a file path (a named pipe works too) or fd:N to write to
+ * an inherited file descriptor.
+ */
+#pragma once
+
+#include <cstdio>
+
+#include "instance.hpp"
+#include "planner.hpp"
+#include "utils.hpp"
+
+struct Telemetry {
+  Telemetry(const std::string &target);  // empty target: disabled
+  ~Telemetry();
+
+  bool enabled() const { return fp != nullptr; }
+
+  void start(const Instance &ins, const std::string &mode, int budget,
+             int seed, const std::string &map_name);
+  // one executed step prev -> next that took latency_ms to plan
+  void step(int step, double t_ms, double latency_ms, const Planner &planner,
+            const HetConfig &prev, const HetConfig &next);
+  void end(const std::string &result, int steps, double comp_time_ms);
+
+private:
+  FILE *fp = nullptr;
+  bool owned = false;
+};
+
+// resident set size of this process in KiB, -1 when unknown
+long get_rss_kb();
@@ -0,0 +1,67 @@
+/*
+ * Chrome Trace Event Format export of solver phases (--trace out.json)
+ *
+ * TRACE_SPAN("name", "category") records a complete event ("ph":"X") from
+ * the declaration to the end of the enclosing scope. Events land in one
+ * buffer and are written when the trace is closed. Open the file in
+ * chrome://tracing or ui.perfetto.dev; tools/trace_summary.py sums phases
+ * and merges traces.
+ *
+ * Each thread draws on a lane (the trace "tid"): 0 is the planner loop,
+ * PIBT workers take lane 1 + k. When tracing is off, a span costs one
+ * branch on a global flag.
+ */
+#pragma once
+
+#include <atomic>
+#include <string>
+
+#include "utils.hpp"
+
+namespace trace {
+
+extern std::atomic<bool> enabled;
+
+// start recording; events are written to `path` by close()
+bool open(const std::string &path);
+void close();
+
+// lane (trace tid) of the calling thread, named on first use
+void set_lane(int lane, const std::string &name);
+
+// traces for its lifetime (empty path: no tracing)
+struct Session {
+  Session(const std::string &path)
+  {
+    if (!path.empty()) open(path);
+  }
+  ~Session() { close(); }
+};
+
+struct Span {
+  const char *name;
+  const char *cat;
+  const char *arg_name;
+  long long arg;
+  bool active;
+  Time::time_point t_s;
+
+  Span(const char *_name, const char *_cat, const char *_arg_name = nullptr,
+       long long _arg = 0)
+      : name(_name),
+        cat(_cat),
+        arg_name(_arg_name),
+        arg(_arg),
+        active(enabled.load(std::memory_order_relaxed))
+  {
+    if (active) t_s = Time::now();
+  }
+  ~Span();
+};
+
+}  // namespace trace
+
+#define TRACE_CONCAT_(a, b) a##b
+#define TRACE_CONCAT(a, b) TRACE_CONCAT_(a, b)
+#define TRACE_SPAN(...) \
+  trace::Span TRACE_CONCAT(trace_span_, __LINE__)(__VA_ARGS__)
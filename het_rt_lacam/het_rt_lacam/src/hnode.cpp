@@ -73,6 +73,15 @@ HNode::~HNode()
   }
 }
 
+void HNode::reset_search_tree()
+{
+  while (!search_tree.empty()) {
+    delete search_tree.front();
+    search_tree.pop();
+  }
+  search_tree.push(new LNode());
+}
+
 LNode *HNode::get_next_lowlevel_node(std::mt19937 &MT, const Instance *ins,
                                      bool goal_lock)
 {
@@ -2,19 +2,41 @@
 
 Instance::~Instance() {}
 
+// Read all lines of a scenario; "-" reads from stdin.
+static bool read_scenario_lines(const std::string &scen_filename,
+                                std::vector<std::string> &lines)
+{
+  std::ifstream file;
+  std::istream *in = &std::cin;
+  if (scen_filename != "-") {
+    file.open(scen_filename);
+    if (!file) return false;
+    in = &file;
+  }
+  std::string line;
+  while (std::getline(*in, line)) {
+    if (!line.empty() && line.back() == '\r') line.pop_back();
+    lines.push_back(line);
+  }
+  return true;
+}
+
 // ---------------------------------------------------------------------------
 // het_bench scenario loader
 // Supports two formats:
 //   Simple:    cs sx sy gx gy                (benchmark .scen)
 //   Full:      agent_id fleet_id cell_size velocity sx sy gx gy grid_w grid_h
 // Auto-detects by counting fields on the first data line.
+// Only data lines [agent_begin, agent_end) are kept (agent_end < 0: all),
+// so scaling sweeps can take prefixes of one file.
 // ---------------------------------------------------------------------------
 Instance::Instance(const std::string &scen_filename,
-                   const std::string &map_filename, bool swap_xy)
-    : base_graph(map_filename), N(0), num_fleets(0)
+                   const std::string &map_filename, bool swap_xy,
+                   int agent_begin, int agent_end, int map_scale)
+    : base_graph(map_filename, map_scale), N(0), num_fleets(0)
 {
-  base_width = base_graph.width;
-  base_height = base_graph.height;
+  base_width = base_graph.width * base_graph.scale;
+  base_height = base_graph.height * base_graph.scale;
 
   struct RawAgent {
     int cell_size;
@@ -25,18 +47,15 @@ Instance::Instance(const std::string &scen_filename,
   std::map<int, int> fleet_cs;  // cell_size -> fleet_id (auto-assigned)
   std::map<int, int> fleet_vel; // cell_size -> velocity (speed period)
 
-  std::ifstream file(scen_filename);
-  if (!file) {
+  std::vector<std::string> lines;
+  if (!read_scenario_lines(scen_filename, lines)) {
     info(0, 0, scen_filename, " is not found");
     return;
   }
 
   // Detect format by counting fields on first data line
   bool full_format = false;
-  std::string line;
-  std::streampos start_pos = file.tellg();
-  while (std::getline(file, line)) {
-    if (!line.empty() && line.back() == '\r') line.pop_back();
+  for (auto &line : lines) {
     if (line.empty() || line[0] == '#') continue;
     std::istringstream iss(line);
     int count = 0;
@@ -45,12 +64,13 @@ Instance::Instance(const std::string &scen_filename,
     full_format = (count >= 10);
     break;
   }
-  file.clear();
-  file.seekg(start_pos);
 
-  while (std::getline(file, line)) {
-    if (!line.empty() && line.back() == '\r') line.pop_back();
+  int data_index = -1;
+  for (auto &line : lines) {
     if (line.empty() || line[0] == '#') continue;
+    ++data_index;
+    if (data_index < agent_begin) continue;
+    if (agent_end >= 0 && data_index >= agent_end) break;
     std::istringstream iss(line);
     RawAgent ra;
     if (full_format) {
@@ -96,25 +116,9 @@ Instance::Instance(const std::string &scen_filename,
 
   for (size_t i = 0; i < raw.size(); ++i) {
     auto &ra = raw[i];
-    int fid = fleet_cs[ra.cell_size];
-    agents[i] = {fid, ra.cell_size};
-    auto &fg = fleet_graphs[fid];
-    int cs = ra.cell_size;
-    int fw = fg.width;
-
-    int fx_s, fy_s, fx_g, fy_g;
-    if (swap_xy) {
-      fx_s = ra.sy / cs;  fy_s = ra.sx / cs;
-      fx_g = ra.gy / cs;  fy_g = ra.gx / cs;
-    } else {
-      fx_s = ra.sx / cs;  fy_s = ra.sy / cs;
-      fx_g = ra.gx / cs;  fy_g = ra.gy / cs;
-    }
-
-    if (fx_s >= 0 && fx_s < fw && fy_s >= 0 && fy_s < fg.height)
-      starts[i] = fg.U[fw * fy_s + fx_s];
-    if (fx_g >= 0 && fx_g < fw && fy_g >= 0 && fy_g < fg.height)
-      goals[i] = fg.U[fw * fy_g + fx_g];
+    agents[i] = {fleet_cs[ra.cell_size], ra.cell_size};
+    starts[i] = get_fleet_vertex((int)i, ra.sx, ra.sy, swap_xy);
+    goals[i] = get_fleet_vertex((int)i, ra.gx, ra.gy, swap_xy);
   }
 }
 
@@ -125,11 +129,12 @@ static const std::regex r_instance =
     std::regex(R"(\d+\t.+\.map\t\d+\t\d+\t(\d+)\t(\d+)\t(\d+)\t(\d+)\t.+)");
 
 Instance::Instance(const std::string &scen_filename,
-                   const std::string &map_filename, const int _N)
-    : base_graph(map_filename), N(_N), num_fleets(1)
+                   const std::string &map_filename, const int _N,
+                   int map_scale)
+    : base_graph(map_filename, map_scale), N(_N), num_fleets(1)
 {
-  base_width = base_graph.width;
-  base_height = base_graph.height;
+  base_width = base_graph.width * base_graph.scale;
+  base_height = base_graph.height * base_graph.scale;
 
   // Single fleet with cell_size=1 (same as base graph)
   fleet_graphs.resize(1);
@@ -137,15 +142,13 @@ Instance::Instance(const std::string &scen_filename,
   fleet_speed_periods = {1};
   fleet_graphs[0].build_from_base(base_graph, 1);
 
-  std::ifstream file(scen_filename);
-  if (!file) {
+  std::vector<std::string> lines;
+  if (!read_scenario_lines(scen_filename, lines)) {
     info(0, 0, scen_filename, " is not found");
     return;
   }
-  std::string line;
   std::smatch results;
-  while (getline(file, line)) {
-    if (!line.empty() && line.back() == '\r') line.pop_back();
+  for (auto &line : lines) {
     if (std::regex_match(line, results, r_instance)) {
       auto x_s = std::stoi(results[1].str());
       auto y_s = std::stoi(results[2].str());
@@ -171,6 +174,17 @@ const Graph *Instance::fleet_graph(int agent_id) const
   return &fleet_graphs[agents[agent_id].fleet_id];
 }
 
+Vertex *Instance::get_fleet_vertex(int agent_id, int x, int y,
+                                   bool swap_xy) const
+{
+  const int cs = agents[agent_id].cell_size;
+  auto &fg = fleet_graphs[agents[agent_id].fleet_id];
+  const int fx = (swap_xy ? y : x) / cs;
+  const int fy = (swap_xy ? x : y) / cs;
+  if (fx < 0 || fx >= fg.width || fy < 0 || fy >= fg.height) return nullptr;
+  return fg.U[fg.width * fy + fx];
+}
+
 int Instance::speed_period(int agent_id) const
 {
   return fleet_speed_periods[agents[agent_id].fleet_id];
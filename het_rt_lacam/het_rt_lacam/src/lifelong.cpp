@@ -0,0 +1,183 @@
+#include "../include/lifelong.hpp"
+
+static const std::regex r_task_agent = std::regex(R"("agent"\s*:\s*(-?\d+))");
+static const std::regex r_task_goal =
+    std::regex(R"("goal"\s*:\s*\[\s*(-?\d+)\s*,\s*(-?\d+)\s*\])");
+static const std::regex r_task_step = std::regex(R"("step"\s*:\s*(\d+))");
+
+std::vector<LifelongTask> load_tasks(const std::string &filename,
+                                     const int verbose)
+{
+  std::vector<LifelongTask> tasks;
+  std::ifstream file(filename);
+  if (!file) {
+    info(0, 0, filename, " is not found");
+    return tasks;
+  }
+  std::string line;
+  std::smatch m_agent, m_goal, m_step;
+  int line_no = 0;
+  while (std::getline(file, line)) {
+    ++line_no;
+    if (!line.empty() && line.back() == '\r') line.pop_back();
+    if (line.empty() || line[0] == '#') continue;
+    if (!std::regex_search(line, m_agent, r_task_agent) ||
+        !std::regex_search(line, m_goal, r_task_goal)) {
+      info(1, verbose, "warning: skipping malformed task at line ", line_no);
+      continue;
+    }
+    LifelongTask t;
+    t.agent = std::stoi(m_agent[1].str());
+    t.x = std::stoi(m_goal[1].str());
+    t.y = std::stoi(m_goal[2].str());
+    t.release_step = std::regex_search(line, m_step, r_task_step)
+                         ? std::stoi(m_step[1].str())
+                         : 0;
+    tasks.push_back(t);
+  }
+  return tasks;
+}
+
+double LifelongResult::throughput() const
+{
+  if (steps <= 0) return 0;
+  return 1000.0 * tasks_completed / steps;
+}
+
+double LifelongResult::latency_percentile(double p) const
+{
+  if (step_latency_ms.empty()) return 0;
+  auto sorted = step_latency_ms;
+  std::sort(sorted.begin(), sorted.end());
+  // nearest-rank
+  auto k = (size_t)std::ceil(p / 100.0 * sorted.size());
+  k = std::min(std::max(k, (size_t)1), sorted.size());
+  return sorted[k - 1];
+}
+
+LifelongResult run_lifelong(Instance &ins, Planner &planner,
+                            const std::vector<LifelongTask> &tasks,
+                            int node_budget, int max_steps, bool swap_xy,
+                            const Deadline *deadline, const int verbose,
+                            Telemetry *telemetry)
+{
+  const int N = (int)ins.N;
+  LifelongResult res;
+  res.steps = 0;
+  res.tasks_completed = 0;
+  res.tasks_assigned = N;  // scenario goals are the first tasks
+
+  std::vector<std::deque<LifelongTask>> pending(N);
+  for (auto &t : tasks) {
+    if (t.agent < 0 || t.agent >= N) {
+      info(1, verbose, "warning: task for unknown agent ", t.agent);
+      continue;
+    }
+    pending[t.agent].push_back(t);
+  }
+  std::vector<bool> done(N, false);  // current task of agent i finished
+
+  auto current = ins.make_start_config();
+  res.executed.push_back(current);
+
+  while (true) {
+    // bookkeeping between steps: arrivals, then reassignment
+    std::vector<int> reassigned;
+    bool all_idle = true;
+    for (int i = 0; i < N; ++i) {
+      if (!done[i] && current.positions[i] == ins.goals[i] &&
+          current.kappa[i] == 0) {
+        done[i] = true;
+        ++res.tasks_completed;
+      }
+      while (done[i] && !pending[i].empty() &&
+             pending[i].front().release_step <= res.steps) {
+        auto t = pending[i].front();
+        pending[i].pop_front();
+        auto v = ins.get_fleet_vertex(i, t.x, t.y, swap_xy);
+        if (v == nullptr) {
+          info(1, verbose, "warning: skipping task (", t.x, ",", t.y,
+               ") for agent ", i, " (blocked or out of bounds)");
+          continue;
+        }
+        ins.goals[i] = v;
+        done[i] = false;
+        ++res.tasks_assigned;
+        reassigned.push_back(i);
+      }
+      if (!done[i] || !pending[i].empty()) all_idle = false;
+    }
+    planner.update_goals(reassigned);
+
+    if (all_idle) break;
+    if (res.steps >= max_steps || is_expired(deadline)) break;
+
+    const auto t_s = Time::now();
+    auto next = planner.solve_one_step(node_budget);
+    const auto t_e = Time::now();
+    const auto latency_ms =
+        std::chrono::duration<double, std::milli>(t_e - t_s).count();
+    res.step_latency_ms.push_back(latency_ms);
+    if (telemetry != nullptr) {
+      telemetry->step(res.steps + 1, elapsed_ms(deadline), latency_ms,
+                      planner, current, next);
+    }
+    current = next;
+    res.executed.push_back(current);
+    ++res.steps;
+  }
+  return res;
+}
+
+static const std::regex r_map_name = std::regex(R"(.+/(.+))");
+
+void make_lifelong_log(const Instance &ins, const LifelongResult &res,
+                       const std::string &output_name,
+                       const double comp_time_ms, const std::string &map_name,
+                       const int seed, const bool log_short)
+{
+  std::smatch results;
+  const auto map_recorded_name =
+      (std::regex_match(map_name, results, r_map_name)) ? results[1].str()
+                                                        : map_name;
+  const double mean =
+      res.step_latency_ms.empty()
+          ? 0
+          : std::accumulate(res.step_latency_ms.begin(),
+                            res.step_latency_ms.end(), 0.0) /
+                res.step_latency_ms.size();
+
+  std::ofstream log;
+  log.open(output_name, std::ios::out);
+  log << "agents=" << ins.N << "\n";
+  log << "map_file=" << map_recorded_name << "\n";
+  if (ins.base_graph.scale > 1) {
+    log << "map_scale=" << ins.base_graph.scale << "\n";
+  }
+  log << "solver=het_rt_lacam\n";
+  log << "mode=lifelong\n";
+  log << "steps=" << res.steps << "\n";
+  log << "tasks_assigned=" << res.tasks_assigned << "\n";
+  log << "tasks_completed=" << res.tasks_completed << "\n";
+  log << "throughput_per_1k_steps=" << res.throughput() << "\n";
+  log << "step_latency_mean_ms=" << mean << "\n";
+  log << "step_latency_p50_ms=" << res.latency_percentile(50) << "\n";
+  log << "step_latency_p95_ms=" << res.latency_percentile(95) << "\n";
+  log << "step_latency_p99_ms=" << res.latency_percentile(99) << "\n";
+  log << "step_latency_max_ms=" << res.latency_percentile(100) << "\n";
+  log << "comp_time=" << comp_time_ms << "\n";
+  log << "seed=" << seed << "\n";
+  if (log_short) return;
+
+  log << "step_latency_ms=";
+  for (auto &l : res.step_latency_ms) log << l << ",";
+  log << "\nsolution=\n";
+  for (size_t t = 0; t < res.executed.size(); ++t) {
+    log << t << ":";
+    for (auto v : res.executed[t].positions) {
+      log << "(" << v->x << "," << v->y << "),";
+    }
+    log << "\n";
+  }
+  log.close();
+}
@@ -13,6 +13,22 @@ float Planner::RANDOM_INSERT_PROB1 = 0.0;
 float Planner::RANDOM_INSERT_PROB2 = 0.0;
 bool Planner::FLG_REFINER = true;
 int Planner::REFINER_NUM = 4;
+bool Planner::FLG_PHASE_TIMES = false;
+
+// phase timing helpers: no clock reads unless FLG_PHASE_TIMES
+static Time::time_point phase_clock()
+{
+  return Planner::FLG_PHASE_TIMES ? Time::now() : Time::time_point();
+}
+
+// add the time since t to acc and restart t
+static void add_phase(double &acc, Time::time_point &t)
+{
+  if (!Planner::FLG_PHASE_TIMES) return;
+  const auto now = Time::now();
+  acc += std::chrono::duration<double, std::milli>(now - t).count();
+  t = now;
+}
 
 std::string Planner::MSG;
 int Planner::CHECKPOINTS_DURATION = 5000;
@@ -66,6 +82,7 @@ Solution Planner::solve()
 
   // search loop
   while (!OPEN.empty() && !is_expired(deadline)) {
+    TRACE_SPAN("expand", "lacam");
     search_iter += 1;
     update_checkpoints();
 
@@ -94,7 +111,11 @@ Solution Planner::solve()
     }
 
     // low-level search
-    auto L = H->get_next_lowlevel_node(MT, ins, FLG_GOAL_LOCK);
+    LNode *L;
+    {
+      TRACE_SPAN("lowlevel", "lacam");
+      L = H->get_next_lowlevel_node(MT, ins, FLG_GOAL_LOCK);
+    }
     if (L == nullptr) {
       OPEN.pop_front();
       continue;
@@ -135,6 +156,7 @@ Solution Planner::solve()
   // Iterative refinement: single-fleet mode only, runs with remaining budget
   if (FLG_REFINER && ins->num_fleets == 1 && !solution.empty()) {
     for (int r = 0; !is_expired(deadline); ++r) {
+      TRACE_SPAN("refine", "refiner", "round", r);
       auto refined = refine(ins, deadline, solution, D, seed + r, verbose);
       if (!refined.empty()) solution = refined;
     }
@@ -145,20 +167,27 @@ Solution Planner::solve()
 
 HNode *Planner::create_highlevel_node(const HetConfig &Q, HNode *parent)
 {
+  TRACE_SPAN("create_node", "lacam");
+  auto t = phase_clock();
   auto g_val =
       (parent == nullptr) ? 0 : parent->g + get_edge_cost(parent->C, Q);
   auto h_val = heuristic->get(Q);
+  add_phase(phases.heuristic_ms, t);
   auto H_new = new HNode(Q, D, ins, parent, g_val, h_val);
   EXPLORED[Q] = H_new;
+  add_phase(phases.create_ms, t);
+  ++phases.created;
   return H_new;
 }
 
 bool Planner::set_new_config(HNode *H, LNode *L, HetConfig &Q_to)
 {
+  TRACE_SPAN("set_new_config", "pibt");
   auto Q_cands = std::vector<HetConfig>(PIBT_NUM);
   auto f_vals = std::vector<int>(PIBT_NUM, INT_MAX);
 
   auto worker = [&](int k) {
+    TRACE_SPAN("pibt", "pibt", "k", k);
     Q_cands[k].positions.assign(N, nullptr);
     Q_cands[k].kappa.assign(N, 0);
 
@@ -177,7 +206,12 @@ bool Planner::set_new_config(HNode *H, LNode *L, HetConfig &Q_to)
 
   if (FLG_MULTI_THREAD && PIBT_NUM > 1) {
     auto threads = std::vector<std::thread>();
-    for (int k = 0; k < PIBT_NUM; ++k) threads.emplace_back(worker, k);
+    for (int k = 0; k < PIBT_NUM; ++k) {
+      threads.emplace_back([&, k]() {
+        trace::set_lane(1 + k, "pibt worker " + std::to_string(k));
+        worker(k);
+      });
+    }
     for (auto &th : threads) th.join();
   } else {
     for (int k = 0; k < PIBT_NUM; ++k) worker(k);
@@ -201,6 +235,7 @@ bool Planner::set_new_config(HNode *H, LNode *L, HetConfig &Q_to)
 
 void Planner::rewrite(HNode *H_from, HNode *H_to)
 {
+  TRACE_SPAN("rewrite", "lacam");
   H_from->neighbor.insert(H_to);
 
   std::queue<HNode *> Q({H_from});
@@ -315,8 +350,10 @@ Planner::SearchStatus Planner::search(int node_budget)
 
   int iterations = 0;
   while (!OPEN.empty() && !is_expired(deadline) && iterations < node_budget) {
+    TRACE_SPAN("expand", "lacam");
     search_iter += 1;
     iterations += 1;
+    ++phases.iterations;
     update_checkpoints();
 
     auto H = OPEN.front();
@@ -345,7 +382,13 @@ Planner::SearchStatus Planner::search(int node_budget)
     }
 
     // low-level search
-    auto L = H->get_next_lowlevel_node(MT, ins, FLG_GOAL_LOCK);
+    auto t = phase_clock();
+    LNode *L;
+    {
+      TRACE_SPAN("lowlevel", "lacam");
+      L = H->get_next_lowlevel_node(MT, ins, FLG_GOAL_LOCK);
+    }
+    add_phase(phases.lowlevel_ms, t);
     if (L == nullptr) {
       OPEN.pop_front();
       continue;
@@ -358,12 +401,15 @@ Planner::SearchStatus Planner::search(int node_budget)
 
     auto res = set_new_config(H, L, Q_to);
     delete L;
+    add_phase(phases.pibt_ms, t);
     if (!res) continue;
 
     // check explored list
     auto iter = EXPLORED.find(Q_to);
     if (iter != EXPLORED.end()) {
       rewrite(H, iter->second);
+      add_phase(phases.explored_ms, t);
+      ++phases.revisited;
       latest_generated_ = iter->second;
       if (RANDOM_INSERT_PROB1 > 0 &&
           get_random_float(MT) < RANDOM_INSERT_PROB1) {
@@ -372,6 +418,7 @@ Planner::SearchStatus Planner::search(int node_budget)
         OPEN.push_front(iter->second);
       }
     } else {
+      add_phase(phases.explored_ms, t);
       auto H_new = create_highlevel_node(Q_to, H);
       latest_generated_ = H_new;
       OPEN.push_front(H_new);
@@ -446,6 +493,8 @@ void Planner::advance(const HetConfig &next)
 
 HetConfig Planner::solve_one_step(int node_budget)
 {
+  TRACE_SPAN("solve_one_step", "rt", "search_iter", search_iter);
+  phases = StepPhases();
   auto *before = latest_generated_;
   auto status = search(node_budget);
 
@@ -453,10 +502,61 @@ HetConfig Planner::solve_one_step(int node_budget)
   // If no progress, stay in place and let constraints escalate.
   if (status == SearchStatus::GOAL_FOUND ||
       (latest_generated_ != nullptr && latest_generated_ != before)) {
+    TRACE_SPAN("extract", "rt");
+    auto t = phase_clock();
     auto next = extract_next_step();
     advance(next);
+    add_phase(phases.extract_ms, t);
     return next;
   }
 
   return current_root_->C;
 }
+
+void Planner::update_goal(int i) { update_goals({i}); }
+
+void Planner::update_goals(const std::vector<int> &agents)
+{
+  if (agents.empty()) return;
+  TRACE_SPAN("update_goals", "lifelong", "agents", (long long)agents.size());
+  for (int i : agents) {
+    D->update(i);
+    for (auto *pibt : pibts) pibt->recent_cells[i].clear();
+  }
+  if (!search_initialized_) return;
+
+  // Configs and transitions in EXPLORED stay valid, but g/h and the goal
+  // node were computed against the old goal. Recompute h everywhere, then
+  // g/parent by relaxation from the current config (as in rewrite()).
+  H_goal = nullptr;
+  for (auto &p : EXPLORED) {
+    auto H = p.second;
+    H->h = heuristic->get(H->C);
+    H->g = INT_MAX / 2;  // unreached from current_root_
+    H->f = H->g + H->h;
+    H->parent = nullptr;
+    H->reset_search_tree();
+  }
+  current_root_->g = 0;
+  current_root_->f = current_root_->h;
+  std::queue<HNode *> Q({current_root_});
+  while (!Q.empty()) {
+    auto n_from = Q.front();
+    Q.pop();
+    for (auto n_to : n_from->neighbor) {
+      auto g_val = n_from->g + get_edge_cost(n_from->C, n_to->C);
+      if (g_val < n_to->g) {
+        n_to->g = g_val;
+        n_to->f = n_to->g + n_to->h;
+        n_to->parent = n_from;
+        Q.push(n_to);
+      }
+    }
+  }
+
+  // restart the DFS from where the agents are now
+  OPEN.clear();
+  OPEN.push_front(current_root_);
+  H_init = current_root_;
+  latest_generated_ = current_root_;
+}
@@ -138,6 +138,9 @@ void make_log(const Instance &ins, const Solution &solution,
   log.open(output_name, std::ios::out);
   log << "agents=" << ins.N << "\n";
   log << "map_file=" << map_recorded_name << "\n";
+  if (ins.base_graph.scale > 1) {
+    log << "map_scale=" << ins.base_graph.scale << "\n";
+  }
   log << "solver=het_rt_lacam\n";
   log << "solved=" << solved << "\n";
   if (!result_status.empty()) {
@@ -0,0 +1,163 @@
+#include "../include/profiler.hpp"
+
+#include <iostream>
+
+#ifdef HET_PROFILE
+
+#include <cxxabi.h>
+#include <dlfcn.h>
+#include <execinfo.h>
+#include <signal.h>
+#include <sys/time.h>
+
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <fstream>
+#include <map>
+#include <memory>
+#include <vector>
+
+namespace {
+
+constexpr int MAX_DEPTH = 64;
+constexpr int SKIP_FRAMES = 2;        // handler + signal trampoline
+constexpr size_t POOL_SIZE = 1 << 22; // stack slots, ~32MB reserved
+
+// sample pool: [depth, frame_0 (leaf), ..., frame_{depth-1}] back to back.
+// The handler only claims a slot range with fetch_add and fills it in.
+std::unique_ptr<void *[]> pool;
+std::atomic<size_t> pool_used{0};
+std::atomic<size_t> dropped{0};
+
+void on_sigprof(int)
+{
+  void *frames[MAX_DEPTH];
+  const int n = backtrace(frames, MAX_DEPTH);
+  const int depth = n - SKIP_FRAMES;
+  if (depth <= 0) return;
+  const size_t begin = pool_used.fetch_add(depth + 1);
+  if (begin + depth + 1 > POOL_SIZE) {
+    if (begin < POOL_SIZE) pool[begin] = nullptr;  // end marker for finish()
+    dropped.fetch_add(1);
+    return;
+  }
+  pool[begin] = reinterpret_cast<void *>(static_cast<uintptr_t>(depth));
+  for (int k = 0; k < depth; ++k) pool[begin + 1 + k] = frames[SKIP_FRAMES + k];
+}
+
+std::string symbol_name(void *addr)
+{
+  Dl_info dl;
+  if (dladdr(addr, &dl) == 0) return "[unknown]";
+  if (dl.dli_sname == nullptr) {
+    // not exported (static or stripped): module + offset
+    const char *mod = dl.dli_fname ? dl.dli_fname : "?";
+    const char *slash = mod;
+    for (const char *p = mod; *p; ++p)
+      if (*p == '/') slash = p + 1;
+    char buf[64];
+    std::snprintf(buf, sizeof(buf), "+0x%lx",
+                  (unsigned long)((char *)addr - (char *)dl.dli_fbase));
+    return std::string("[") + slash + buf + "]";
+  }
+  int status = 0;
+  char *demangled = abi::__cxa_demangle(dl.dli_sname, nullptr, nullptr, &status);
+  std::string name = (status == 0 && demangled) ? demangled : dl.dli_sname;
+  std::free(demangled);
+  return name;
+}
+
+}  // namespace
+
+ProfileSession::ProfileSession(const std::string &_out_path, int hz)
+    : out_path(_out_path)
+{
+  if (out_path.empty() || hz <= 0) return;
+  pool.reset(new void *[POOL_SIZE]);
+  pool_used = 0;
+  dropped = 0;
+
+  // the first backtrace() call may allocate (loads libgcc_s); do it here
+  void *warmup[4];
+  backtrace(warmup, 4);
+
+  struct sigaction sa = {};
+  sa.sa_handler = on_sigprof;
+  sa.sa_flags = SA_RESTART;
+  sigemptyset(&sa.sa_mask);
+  sigaction(SIGPROF, &sa, nullptr);
+
+  const long usec = 1000000L / hz;
+  struct itimerval timer = {};
+  timer.it_interval.tv_sec = usec / 1000000L;
+  timer.it_interval.tv_usec = usec % 1000000L;
+  timer.it_value = timer.it_interval;
+  setitimer(ITIMER_PROF, &timer, nullptr);
+  active = true;
+}
+
+void ProfileSession::finish()
+{
+  if (!active) return;
+  active = false;
+  struct itimerval off = {};
+  setitimer(ITIMER_PROF, &off, nullptr);
+  signal(SIGPROF, SIG_IGN);
+
+  // fold: one line per distinct stack, root first
+  std::map<void *, std::string> names;
+  std::map<std::string, int> folded;
+  const size_t used = std::min(pool_used.load(), POOL_SIZE);
+  size_t i = 0, samples = 0;
+  while (i < used) {
+    const auto depth = static_cast<int>(reinterpret_cast<uintptr_t>(pool[i]));
+    if (depth <= 0 || i + 1 + depth > used) break;
+    std::string stack;
+    for (int k = depth - 1; k >= 0; --k) {
+      void *addr = pool[i + 1 + k];
+      auto it = names.find(addr);
+      if (it == names.end()) it = names.emplace(addr, symbol_name(addr)).first;
+      if (!stack.empty()) stack += ';';
+      stack += it->second;
+    }
+    ++folded[stack];
+    ++samples;
+    i += 1 + depth;
+  }
+  pool.reset();
+
+  std::ofstream log(out_path);
+  if (!log) {
+    std::cerr << "profiler: cannot write " << out_path << std::endl;
+    return;
+  }
+  for (auto &[stack, count] : folded) log << stack << " " << count << "\n";
+  if (dropped > 0) {
+    std::cerr << "profiler: pool full, dropped " << dropped.load()
+              << " of " << samples + dropped.load() << " samples" << std::endl;
+  }
+}
+
+bool ProfileSession::available() { return true; }
+
+#else
+
+ProfileSession::ProfileSession(const std::string &_out_path, int)
+    : out_path(_out_path)
+{
+  if (!out_path.empty()) {
+    std::cerr << "profiler: built without HET_PROFILE, --profile-out ignored"
+              << std::endl;
+  }
+}
+
+void ProfileSession::finish() {}
+
+bool ProfileSession::available() { return false; }
+
+#endif
+
+ProfileSession::~ProfileSession() { finish(); }
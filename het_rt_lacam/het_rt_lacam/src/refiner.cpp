@@ -1,5 +1,7 @@
 #include "../include/refiner.hpp"
 
+#include "../include/trace.hpp"
+
 Solution refine(const Instance *ins, const Deadline *deadline,
                 const Solution &solution, DistTable *D, const int seed,
                 const int verbose)
@@ -39,6 +41,7 @@ Solution refine(const Instance *ins, const Deadline *deadline,
     for (auto _i = 0; _i < num_refine_agents; ++_i) {
       const auto i = order[k * num_refine_agents + _i];
       // note: I also tested A*, but SIPP was better
+      TRACE_SPAN("sipp", "refiner", "agent", i);
       new_paths[_i] = sipp(i, ins->starts[i], ins->goals[i], D, &CT, deadline,
                            old_cost - new_cost - 1);
       if (new_paths[_i].empty()) break;  // failure
@@ -0,0 +1,127 @@
+#include "../include/telemetry.hpp"
+
+#ifdef _WIN32
+#include <io.h>
+#define NOMINMAX
+#include <windows.h>
+#include <psapi.h>
+#ifdef _MSC_VER
+#pragma comment(lib, "psapi.lib")
+#endif
+#else
+#include <unistd.h>
+#endif
+
+Telemetry::Telemetry(const std::string &target)
+{
+  if (target.empty()) return;
+  if (target.rfind("fd:", 0) == 0) {
+    int fd = -1;
+    try {
+      fd = std::stoi(target.substr(3));
+    } catch (const std::exception &) {
+    }
+#ifdef _WIN32
+    if (fd >= 0) fp = _fdopen(fd, "w");
+#else
+    if (fd >= 0) fp = fdopen(fd, "w");
+#endif
+  } else {
+    fp = std::fopen(target.c_str(), "w");
+    owned = true;
+  }
+  if (fp == nullptr) {
+    std::cerr << "telemetry: cannot open " << target << std::endl;
+    owned = false;
+  }
+}
+
+Telemetry::~Telemetry()
+{
+  if (fp == nullptr) return;
+  if (owned) {
+    std::fclose(fp);
+  } else {
+    std::fflush(fp);
+  }
+}
+
+void Telemetry::start(const Instance &ins, const std::string &mode,
+                      int budget, int seed, const std::string &map_name)
+{
+  if (fp == nullptr) return;
+  // map names are plain file names; escape the two JSON specials anyway
+  std::string map_json;
+  for (char c : map_name) {
+    if (c == '"' || c == '\\') map_json += '\\';
+    map_json += c;
+  }
+  std::fprintf(fp,
+               "{\"type\":\"start\",\"mode\":\"%s\",\"agents\":%u,"
+               "\"fleets\":%d,\"budget\":%d,\"seed\":%d,\"map\":\"%s\"}\n",
+               mode.c_str(), ins.N, ins.num_fleets, budget, seed,
+               map_json.c_str());
+  std::fflush(fp);
+}
+
+void Telemetry::step(int step, double t_ms, double latency_ms,
+                     const Planner &planner, const HetConfig &prev,
+                     const HetConfig &next)
+{
+  if (fp == nullptr) return;
+  int goals = 0, moved = 0;
+  for (size_t i = 0; i < next.size(); ++i) {
+    if (next.positions[i]->id == planner.ins->goals[i]->id &&
+        next.kappa[i] == 0)
+      ++goals;
+    if (next.positions[i]->id != prev.positions[i]->id) ++moved;
+  }
+  std::fprintf(fp,
+               "{\"type\":\"step\",\"step\":%d,\"t_ms\":%.0f,"
+               "\"latency_ms\":%.3f,\"explored\":%zu,\"open\":%zu,"
+               "\"goals\":%d,\"moved\":%d,\"rss_kb\":%ld",
+               step, t_ms, latency_ms, planner.EXPLORED.size(),
+               planner.OPEN.size(), goals, moved, get_rss_kb());
+  if (Planner::FLG_PHASE_TIMES) {
+    const auto &p = planner.phases;
+    std::fprintf(fp,
+                 ",\"iters\":%d,\"created\":%d,\"revisited\":%d,"
+                 "\"phases\":{\"lowlevel\":%.3f,\"pibt\":%.3f,"
+                 "\"explored\":%.3f,\"heuristic\":%.3f,\"create\":%.3f,"
+                 "\"extract\":%.3f}",
+                 p.iterations, p.created, p.revisited, p.lowlevel_ms,
+                 p.pibt_ms, p.explored_ms, p.heuristic_ms, p.create_ms,
+                 p.extract_ms);
+  }
+  std::fputs("}\n", fp);
+  std::fflush(fp);
+}
+
+void Telemetry::end(const std::string &result, int steps, double comp_time_ms)
+{
+  if (fp == nullptr) return;
+  std::fprintf(fp,
+               "{\"type\":\"end\",\"result\":\"%s\",\"steps\":%d,"
+               "\"comp_time_ms\":%.0f,\"rss_kb\":%ld}\n",
+               result.c_str(), steps, comp_time_ms, get_rss_kb());
+  std::fflush(fp);
+}
+
+long get_rss_kb()
+{
+#ifdef _WIN32
+  PROCESS_MEMORY_COUNTERS pmc;
+  if (GetProcessMemoryInfo(GetCurrentProcess(), &pmc, sizeof(pmc)))
+    return (long)(pmc.WorkingSetSize / 1024);
+  return -1;
+#else
+  // /proc/self/statm: size resident shared ... (in pages)
+  FILE *f = std::fopen("/proc/self/statm", "r");
+  if (f == nullptr) return -1;
+  long size = 0, resident = 0;
+  const int n = std::fscanf(f, "%ld %ld", &size, &resident);
+  std::fclose(f);
+  if (n != 2) return -1;
+  return resident * (sysconf(_SC_PAGESIZE) / 1024);
+#endif
+}
@@ -0,0 +1,112 @@
+#include "../include/trace.hpp"
+
+#include <cstdio>
+#include <mutex>
+
+namespace trace {
+
+std::atomic<bool> enabled{false};
+
+namespace {
+
+struct Event {
+  const char *name;
+  const char *cat;
+  const char *arg_name;
+  long long arg;
+  int lane;
+  double ts_us;
+  double dur_us;
+};
+
+constexpr size_t MAX_EVENTS = 4000000;  // ~200MB of JSON, then drop
+
+std::mutex mtx;
+std::vector<Event> events;
+std::map<int, std::string> lane_names;
+size_t dropped = 0;
+std::string out_path;
+Time::time_point t_origin;
+
+thread_local int lane = 0;
+
+}  // namespace
+
+bool open(const std::string &path)
+{
+  std::lock_guard<std::mutex> lock(mtx);
+  out_path = path;
+  events.clear();
+  events.reserve(1 << 16);
+  lane_names = {{0, "planner"}};
+  dropped = 0;
+  t_origin = Time::now();
+  enabled = true;
+  return true;
+}
+
+void set_lane(int _lane, const std::string &name)
+{
+  lane = _lane;
+  if (!enabled.load(std::memory_order_relaxed)) return;
+  std::lock_guard<std::mutex> lock(mtx);
+  if (lane_names.find(_lane) == lane_names.end()) lane_names[_lane] = name;
+}
+
+Span::~Span()
+{
+  if (!active) return;
+  const auto t_e = Time::now();
+  const auto us = [](Time::duration d) {
+    return std::chrono::duration<double, std::micro>(d).count();
+  };
+  std::lock_guard<std::mutex> lock(mtx);
+  if (!enabled || events.size() >= MAX_EVENTS) {
+    ++dropped;
+    return;
+  }
+  events.push_back(
+      {name, cat, arg_name, arg, lane, us(t_s - t_origin), us(t_e - t_s)});
+}
+
+void close()
+{
+  std::lock_guard<std::mutex> lock(mtx);
+  if (!enabled) return;
+  enabled = false;
+  FILE *fp = std::fopen(out_path.c_str(), "w");
+  if (fp == nullptr) {
+    std::cerr << "trace: cannot write " << out_path << std::endl;
+    return;
+  }
+  std::fprintf(fp, "{\"displayTimeUnit\":\"ms\",\"traceEvents\":[\n");
+  std::fprintf(fp,
+               "{\"ph\":\"M\",\"pid\":1,\"name\":\"process_name\","
+               "\"args\":{\"name\":\"het_rt_lacam\"}}");
+  for (auto &[l, name] : lane_names) {
+    std::fprintf(fp,
+                 ",\n{\"ph\":\"M\",\"pid\":1,\"tid\":%d,\"name\":"
+                 "\"thread_name\",\"args\":{\"name\":\"%s\"}}",
+                 l, name.c_str());
+  }
+  for (auto &e : events) {
+    std::fprintf(fp,
+                 ",\n{\"ph\":\"X\",\"pid\":1,\"tid\":%d,\"name\":\"%s\","
+                 "\"cat\":\"%s\",\"ts\":%.3f,\"dur\":%.3f",
+                 e.lane, e.name, e.cat, e.ts_us, e.dur_us);
+    if (e.arg_name != nullptr) {
+      std::fprintf(fp, ",\"args\":{\"%s\":%lld}", e.arg_name, e.arg);
+    }
+    std::fputc('}', fp);
+  }
+  std::fprintf(fp, "\n]}\n");
+  std::fclose(fp);
+  if (dropped > 0) {
+    std::cerr << "trace: event buffer full, dropped " << dropped << " spans"
+              << std::endl;
+  }
+  events.clear();
+  events.shrink_to_fit();
+}
+
+}  // namespace trace
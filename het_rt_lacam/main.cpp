@@ -2,17 +2,23 @@
 #include <iostream>
 #include <memory>
 #include <lacam.hpp>
+#include <lifelong.hpp>
+#include <profiler.hpp>
+#include <telemetry.hpp>
 
 int main(int argc, char *argv[])
 {
   argparse::ArgumentParser program("het_rt_lacam", "0.1.0");
   program.add_argument("-m", "--map").help("map file").required();
   program.add_argument("-i", "--scen")
-      .help("scenario file (het_bench or MAPF benchmark)")
+      .help("scenario file (het_bench or MAPF benchmark), - for stdin")
       .default_value(std::string(""));
   program.add_argument("-N", "--num")
       .help("number of agents (for MAPF benchmark mode)")
       .default_value(std::string("0"));
+  program.add_argument("-a", "--agents")
+      .help("het_bench mode: first N agents (\"N\") or index range \"a:b\"")
+      .default_value(std::string(""));
   program.add_argument("-s", "--seed")
       .help("seed")
       .default_value(std::string("0"));
@@ -32,6 +38,9 @@ int main(int argc, char *argv[])
       .help("swap x/y in het_bench scenario coordinates")
       .default_value(false)
       .implicit_value(true);
+  program.add_argument("--map-scale")
+      .help("base cells per map cell side; overrides the map's scale line")
+      .default_value(std::string("0"));
 
   // solver parameters
   program.add_argument("--goal-lock")
@@ -65,6 +74,13 @@ int main(int argc, char *argv[])
   program.add_argument("--rt-budget")
       .help("node expansion budget per RT step")
       .default_value(std::string("100"));
+  program.add_argument("--lifelong")
+      .help("lifelong mode: JSON-lines task feed reassigning goals (uses "
+            "--rt-budget)")
+      .default_value(std::string(""));
+  program.add_argument("--lifelong-steps")
+      .help("max executed steps in lifelong mode")
+      .default_value(std::string("1000"));
   program.add_argument("--no-st-bfs")
       .help("use spatial-only BFS instead of space-time BFS")
       .default_value(false)
@@ -73,6 +89,22 @@ int main(int argc, char *argv[])
       .help("disable iterative refinement (single-fleet only)")
       .default_value(false)
       .implicit_value(true);
+  program.add_argument("--telemetry")
+      .help("RT/lifelong: per-step JSON lines to a file or fd:N")
+      .default_value(std::string(""));
+  program.add_argument("--phase-times")
+      .help("add per-phase search times to --telemetry step records")
+      .default_value(false)
+      .implicit_value(true);
+  program.add_argument("--trace")
+      .help("write Chrome trace events (chrome://tracing, Perfetto) here")
+      .default_value(std::string(""));
+  program.add_argument("--profile-out")
+      .help("write sampled collapsed stacks here (needs -DHET_PROFILE=ON)")
+      .default_value(std::string(""));
+  program.add_argument("--profile-hz")
+      .help("sampling frequency for --profile-out")
+      .default_value(std::string("999"));
   try {
     program.parse_known_args(argc, argv);
   } catch (const std::runtime_error &err) {
@@ -91,15 +123,40 @@ int main(int argc, char *argv[])
   const auto log_short = program.get<bool>("log_short");
   const auto N = std::stoi(program.get<std::string>("num"));
   const auto swap_xy = program.get<bool>("swap-xy");
+  const auto map_scale = std::stoi(program.get<std::string>("map-scale"));
+  const auto agents_arg = program.get<std::string>("agents");
+  trace::Session trace_session(program.get<std::string>("trace"));
+
+  // --agents: "N" -> [0, N), "a:b" -> [a, b), "a:" -> [a, end)
+  int agent_begin = 0, agent_end = -1;
+  if (!agents_arg.empty()) {
+    const auto colon = agents_arg.find(':');
+    try {
+      if (colon == std::string::npos) {
+        agent_end = std::stoi(agents_arg);
+      } else {
+        if (colon > 0) agent_begin = std::stoi(agents_arg.substr(0, colon));
+        if (colon + 1 < agents_arg.size())
+          agent_end = std::stoi(agents_arg.substr(colon + 1));
+      }
+    } catch (const std::exception &) {
+      std::cerr << "invalid --agents: " << agents_arg << std::endl;
+      std::exit(1);
+    }
+  }
 
   // Create instance: het_bench mode (N=0) vs MAPF benchmark mode (N>0)
   // Can't use ternary because Instance contains non-copyable Graph members.
   // Use a unique_ptr for deferred construction.
   std::unique_ptr<Instance> ins_ptr;
-  if (N > 0) {
-    ins_ptr = std::make_unique<Instance>(scen_name, map_name, N);
-  } else {
-    ins_ptr = std::make_unique<Instance>(scen_name, map_name, swap_xy);
+  {
+    TRACE_SPAN("load_instance", "init");
+    if (N > 0) {
+      ins_ptr = std::make_unique<Instance>(scen_name, map_name, N, map_scale);
+    } else {
+      ins_ptr = std::make_unique<Instance>(scen_name, map_name, swap_xy,
+                                           agent_begin, agent_end, map_scale);
+    }
   }
   auto &ins = *ins_ptr;
   ins.skip_invalid_agents(verbose);
@@ -127,12 +184,46 @@ int main(int argc, char *argv[])
 
   Planner::FLG_ST_BFS = !program.get<bool>("no-st-bfs");
   Planner::FLG_REFINER = !program.get<bool>("no-refiner");
+  Planner::FLG_PHASE_TIMES = program.get<bool>("phase-times");
   const auto rt_mode = program.get<bool>("rt");
   const auto rt_budget = std::stoi(program.get<std::string>("rt-budget"));
+  const auto lifelong_name = program.get<std::string>("lifelong");
+  const auto lifelong_steps =
+      std::stoi(program.get<std::string>("lifelong-steps"));
+
+  // samples the solve below; stacks are written when main returns
+  ProfileSession profile(program.get<std::string>("profile-out"),
+                         std::stoi(program.get<std::string>("profile-hz")));
 
   const auto deadline = Deadline(time_limit_sec * 1000);
+  Telemetry telemetry(program.get<std::string>("telemetry"));
 
-  if (rt_mode) {
+  if (!lifelong_name.empty()) {
+    // Lifelong: RT-LaCAM with goals reassigned from the task feed as agents
+    // finish. Only the reassigned agents' DistTable rows are recomputed.
+    auto tasks = load_tasks(lifelong_name, verbose);
+    info(1, verbose, "lifelong mode, tasks=", tasks.size(),
+         ", budget=", rt_budget, " per step");
+    auto planner = Planner(&ins, verbose - 1, &deadline, seed);
+    telemetry.start(ins, "lifelong", rt_budget, seed, map_name);
+    auto res = run_lifelong(ins, planner, tasks, rt_budget, lifelong_steps,
+                            swap_xy, &deadline, verbose, &telemetry);
+    const auto comp_time_ms = deadline.elapsed_ms();
+    telemetry.end(res.steps >= lifelong_steps || is_expired(&deadline)
+                      ? "timeout"
+                      : "success",
+                  res.steps, comp_time_ms);
+
+    info(1, verbose, &deadline, "lifelong: steps=", res.steps,
+         " tasks_completed=", res.tasks_completed, "/", res.tasks_assigned,
+         " throughput=", res.throughput(), " per 1k steps");
+    info(1, verbose, &deadline, "lifelong: step latency p50=",
+         res.latency_percentile(50), "ms p95=", res.latency_percentile(95),
+         "ms p99=", res.latency_percentile(99),
+         "ms max=", res.latency_percentile(100), "ms");
+    make_lifelong_log(ins, res, output_name, comp_time_ms, map_name, seed,
+                      log_short);
+  } else if (rt_mode) {
     // RT-LaCAM: incremental execution — search for rt_budget nodes, execute
     // one step, repeat. OPEN and EXPLORED persist across steps.
     info(1, verbose, "RT-LaCAM mode, budget=", rt_budget, " per step");
@@ -144,8 +235,17 @@ int main(int argc, char *argv[])
     bool goal_reached = false;
     const int max_steps = 100000;  // guard against infinite loops
 
+    telemetry.start(ins, "rt", rt_budget, seed, map_name);
     while (!is_expired(&deadline) && (int)executed.size() <= max_steps) {
+      const auto t_s = Time::now();
       auto next = planner.solve_one_step(rt_budget);
+      if (telemetry.enabled()) {
+        const auto t_e = Time::now();
+        telemetry.step(
+            (int)executed.size(), deadline.elapsed_ms(),
+            std::chrono::duration<double, std::milli>(t_e - t_s).count(),
+            planner, executed.back(), next);
+      }
       executed.push_back(next);
       if (ins.is_goal(next)) {
         goal_reached = true;
@@ -179,6 +279,7 @@ int main(int argc, char *argv[])
       info(1, verbose, &deadline, "RT: timeout after ", steps_executed,
            " steps");
     }
+    telemetry.end(rt_result, steps_executed, comp_time_ms);
     info(1, verbose, &deadline, "RT: move=", move_steps, " stay=", stay_steps,
          " explored=", planner.EXPLORED.size());
 
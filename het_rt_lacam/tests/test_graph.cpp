@@ -67,3 +67,41 @@ TEST(GraphTest, ToBaseCells)
   ASSERT_EQ(cells2[2], 26);
   ASSERT_EQ(cells2[3], 27);
 }
+
+TEST(GraphTest, VirtualScaleMatchesUpscaledMap)
+{
+  // Write random-32-32-10 upscaled 3x, compare fleet graphs against the
+  // original map read with scale 3
+  const int s = 3;
+  std::ifstream in("../assets/random-32-32-10.map");
+  std::ofstream out("upscaled-3.map");
+  std::string line;
+  for (int i = 0; i < 4 && std::getline(in, line); ++i) {
+    if (line.rfind("height", 0) == 0) line = "height " + std::to_string(32 * s);
+    if (line.rfind("width", 0) == 0) line = "width " + std::to_string(32 * s);
+    out << line << "\n";
+  }
+  while (std::getline(in, line)) {
+    std::string row;
+    for (char c : line) row += std::string(s, c);
+    for (int k = 0; k < s; ++k) out << row << "\n";
+  }
+  out.close();
+
+  Graph upscaled("upscaled-3.map");
+  Graph base("../assets/random-32-32-10.map", s);
+  ASSERT_EQ(base.width, 32);
+  ASSERT_EQ(base.scale, s);
+  for (int cs : {1, 2, 3, 5, 7}) {
+    Graph a, b;
+    a.build_from_base(upscaled, cs);
+    b.build_from_base(base, cs);
+    ASSERT_EQ(a.width, b.width) << "cs=" << cs;
+    ASSERT_EQ(a.height, b.height) << "cs=" << cs;
+    ASSERT_EQ(a.size(), b.size()) << "cs=" << cs;
+    for (size_t i = 0; i < a.U.size(); ++i) {
+      ASSERT_EQ(a.U[i] == nullptr, b.U[i] == nullptr) << "cs=" << cs;
+    }
+  }
+  std::remove("upscaled-3.map");
+}
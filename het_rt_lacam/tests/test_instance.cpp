@@ -3,3 +3,29 @@
 #include "instance.hpp"
 
 TEST(InstanceTest, Placeholder) { ASSERT_TRUE(true); }
+
+// ---------------------------------------------------------------------------
+// het_bench agent selection: prefix and index range, in file order.
+// ---------------------------------------------------------------------------
+TEST(InstanceTest, HetBench_AgentRange)
+{
+  Instance full("../assets/test_het_3agent.scen", "../assets/empty-8-8.map");
+  ASSERT_EQ(full.N, 3u);
+  ASSERT_EQ(full.num_fleets, 2);
+
+  Instance prefix("../assets/test_het_3agent.scen", "../assets/empty-8-8.map",
+                  false, 0, 1);
+  ASSERT_EQ(prefix.N, 1u);
+  ASSERT_EQ(prefix.num_fleets, 1);  // only the cs=1 fleet is built
+  ASSERT_EQ(prefix.agents[0].cell_size, 1);
+
+  Instance range("../assets/test_het_3agent.scen", "../assets/empty-8-8.map",
+                 false, 1, 3);
+  ASSERT_EQ(range.N, 2u);
+  ASSERT_TRUE(range.is_valid());
+  for (uint i = 0; i < range.N; ++i) {
+    ASSERT_EQ(range.agents[i].cell_size, 2);
+    ASSERT_EQ(range.starts[i]->x, full.starts[i + 1]->x);
+    ASSERT_EQ(range.goals[i]->y, full.goals[i + 1]->y);
+  }
+}
@@ -1,6 +1,7 @@
 #include <gtest/gtest.h>
 
 #include "lacam.hpp"
+#include "lifelong.hpp"
 #include "planner.hpp"
 
 // ---------------------------------------------------------------------------
@@ -167,3 +168,34 @@ TEST(PlannerTest, RT_BudgetIndependence)
     ASSERT_TRUE(goal_reached) << "RT budget=" << budget << " failed to solve";
   }
 }
+
+// ---------------------------------------------------------------------------
+// Lifelong: goals reassigned between RT steps. Agent 0 returns to its start,
+// agent 1 moves on to a second goal; every task must be completed and the
+// executed trajectory must stay collision-free.
+// ---------------------------------------------------------------------------
+TEST(PlannerTest, Lifelong_ReassignGoals)
+{
+  Instance ins("../assets/test_het_3agent.scen", "../assets/empty-8-8.map");
+  ASSERT_TRUE(ins.is_valid());
+
+  auto deadline = Deadline(10000);
+  Planner::FLG_STAR = false;
+  Planner::FLG_GOAL_LOCK = false;
+
+  auto planner = Planner(&ins, 0, &deadline, 0);
+  std::vector<LifelongTask> tasks = {{0, 3, 0, 0}, {1, 6, 0, 0}};
+  auto res = run_lifelong(ins, planner, tasks, 50, 5000, false, &deadline);
+
+  ASSERT_EQ(res.tasks_assigned, 5);
+  ASSERT_EQ(res.tasks_completed, 5) << "lifelong run left tasks unfinished";
+  ASSERT_EQ(ins.goals[0], ins.get_fleet_vertex(0, 3, 0));
+  ASSERT_EQ(ins.goals[1], ins.get_fleet_vertex(1, 6, 0));
+  ASSERT_EQ((int)res.step_latency_ms.size(), res.steps);
+
+  // all tasks done: trajectory ends at the final goals
+  Solution solution;
+  for (auto &hc : res.executed) solution.push_back(hc.positions);
+  ASSERT_TRUE(is_feasible_solution(ins, solution))
+      << "lifelong trajectory has collision violations";
+}
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Run the bench_components microbenchmarks and keep a JSON history.
+
+Each run appends one entry (git commit, host, fixture, per-benchmark
+median/min ns) to benchmarks/results/microbench/history.json and prints
+the change against the previous entry for the same fixture. --plot draws
+one trend chart per component (graph, dist_table, pibt, st_reservation,
+collision_table, sipp).
+
+Usage:
+    python bench_components.py                       # run + compare
+    python bench_components.py -f pibt --label "pibt: reuse C_next"
+    python bench_components.py --no-run --plot       # charts only
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.join(HERE, '..', '..')
+BUILD_DIR = os.path.join(HERE, '..', 'build')
+HISTORY_DIR = os.path.join(REPO, 'benchmarks', 'results', 'microbench')
+DEFAULT_MAP = os.path.join(REPO, 'benchmarks', 'maps', 'bottleneck_doors_105.map')
+DEFAULT_SCEN = os.path.join(REPO, 'benchmarks', 'scenarios',
+                            'bottleneck_doors_105_00_hb.scen')
+
+
+def find_exe():
+    for rel in [('Release', 'bench_components.exe'), ('bench_components.exe',),
+                ('bench_components',)]:
+        path = os.path.join(BUILD_DIR, *rel)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def git_commit():
+    """Short HEAD hash, with a '+' suffix for a dirty tree ('' if no git)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                capture_output=True, text=True, cwd=REPO,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '-uno'],
+                               capture_output=True, text=True,
+                               cwd=REPO).stdout.strip()
+        return commit + ('+' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def run_bench(exe, args):
+    """Run the executable, return its parsed JSON output."""
+    fd, json_path = tempfile.mkstemp(suffix='.json', prefix='bench_')
+    os.close(fd)
+    cmd = [exe, '-m', args.map, '-i', args.scen, '--reps', str(args.reps),
+           '--min-time', str(args.min_time), '--json', json_path]
+    if args.filter:
+        cmd += ['-f', args.filter]
+    if args.swap_xy:
+        cmd.append('--swap-xy')
+    try:
+        subprocess.run(cmd, check=True, cwd=os.path.dirname(exe))
+        with open(json_path) as f:
+            return json.load(f)
+    finally:
+        os.remove(json_path)
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def fixture(entry):
+    return (os.path.basename(entry['map']), os.path.basename(entry['scen']))
+
+
+def compare(prev, cur, threshold):
+    """Print per-benchmark median change of `cur` against `prev`."""
+    prev_b = prev['benchmarks']
+    print(f"\nvs {prev['commit'] or '?'} ({prev['time']}"
+          f"{', ' + prev['label'] if prev.get('label') else ''}):")
+    print(f"{'benchmark':<40} {'before':>12} {'after':>12} {'change':>9}")
+    for name, b in cur['benchmarks'].items():
+        if name not in prev_b:
+            continue
+        before, after = prev_b[name]['median_ns'], b['median_ns']
+        change = (after - before) / before if before > 0 else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  slower'
+        elif change < -threshold:
+            flag = '  faster'
+        print(f"{name:<40} {before / 1e3:>10.1f}us {after / 1e3:>10.1f}us "
+              f"{100 * change:>+8.1f}%{flag}")
+
+
+def plot_history(history, out_dir):
+    """One PNG per component: median time per benchmark over history."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    by_fixture = defaultdict(list)
+    for entry in history:
+        by_fixture[fixture(entry)].append(entry)
+    written = []
+    for (map_name, scen_name), entries in by_fixture.items():
+        components = defaultdict(set)
+        for e in entries:
+            for name in e['benchmarks']:
+                components[name.split('/')[0]].add(name)
+        labels = [e['commit'] or e['time'][:10] for e in entries]
+        for comp, names in sorted(components.items()):
+            fig, ax = plt.subplots(figsize=(8, 4))
+            for name in sorted(names):
+                xs = [k for k, e in enumerate(entries) if name in e['benchmarks']]
+                ys = [entries[k]['benchmarks'][name]['median_ns'] / 1e3
+                      for k in xs]
+                ax.plot(xs, ys, marker='o', label=name.split('/', 1)[-1])
+            ax.set_xticks(range(len(entries)))
+            ax.set_xticklabels(labels, rotation=45, ha='right', fontsize=8)
+            ax.set_ylabel('median time per iteration (us)')
+            ax.set_ylim(bottom=0)
+            ax.set_title(f'{comp} -- {os.path.splitext(scen_name)[0]}')
+            ax.legend(fontsize=8)
+            fig.tight_layout()
+            stem = os.path.splitext(scen_name)[0]
+            path = os.path.join(out_dir, f'{comp}_{stem}.png')
+            fig.savefig(path, dpi=100)
+            plt.close(fig)
+            written.append(path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run het_rt_lacam microbenchmarks and track history")
+    parser.add_argument('--exe', default=None,
+                        help="bench_components executable (default: ../build)")
+    parser.add_argument('-m', '--map', default=DEFAULT_MAP)
+    parser.add_argument('-i', '--scen', default=DEFAULT_SCEN)
+    parser.add_argument('--swap-xy', action='store_true')
+    parser.add_argument('-f', '--filter', default='',
+                        help="only benchmarks whose name contains this")
+    parser.add_argument('--reps', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=50,
+                        help="ms per repetition")
+    parser.add_argument('--label', default='', help="note stored with the entry")
+    parser.add_argument('--history', default=os.path.join(HISTORY_DIR,
+                                                          'history.json'))
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help="relative change flagged as slower/faster")
+    parser.add_argument('--no-run', action='store_true',
+                        help="do not run, only --plot / compare last two")
+    parser.add_argument('--plot', action='store_true',
+                        help="write trend charts next to the history")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    if not args.no_run:
+        exe = args.exe or find_exe()
+        if exe is None or not os.path.exists(exe):
+            sys.exit(f"bench_components not found in {BUILD_DIR}; build it "
+                     "first (cmake --build build --target bench_components)")
+        args.map = os.path.abspath(args.map)
+        args.scen = os.path.abspath(args.scen)
+        out = run_bench(exe, args)
+        entry = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': git_commit(),
+            'label': args.label,
+            'host': platform.node(),
+            'map': os.path.basename(out['map']),
+            'scen': os.path.basename(out['scen']),
+            'agents': out['agents'],
+            'benchmarks': {b['name']: {'median_ns': b['median_ns'],
+                                       'min_ns': b['min_ns'],
+                                       'items': b['items']}
+                           for b in out['benchmarks']},
+        }
+        prev = [e for e in history if fixture(e) == fixture(entry)]
+        history.append(entry)
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)),
+                    exist_ok=True)
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=1)
+        print(f"\nAppended entry {len(history)} to {args.history}")
+        if prev:
+            compare(prev[-1], entry, args.threshold)
+    elif len(history) >= 2:
+        last = history[-1]
+        prev = [e for e in history[:-1] if fixture(e) == fixture(last)]
+        if prev:
+            compare(prev[-1], last, args.threshold)
+
+    if args.plot:
+        if not history:
+            sys.exit(f"no history at {args.history}")
+        out_dir = os.path.dirname(os.path.abspath(args.history))
+        for path in plot_history(history, out_dir):
+            print(f"  wrote {path}")
+
+
+if __name__ == '__main__':
+    main()
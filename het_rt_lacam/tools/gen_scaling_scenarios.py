@@ -11,7 +11,7 @@ import os
 
 # Reuse gen_scenario.py functions
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'third_party', 'hetpibt', 'tools'))
-from gen_scenario import (load_map, build_fleet_grid, flood_fill,
+from gen_scenario import (load_map, build_fleet_grid, flood_fill, Occupancy,
                           place_agents, verify_placements)
 
 # het_bench fleet definitions
@@ -54,8 +54,7 @@ def main():
         print(f"Fleet {i} (cs={cs}): {fw}x{fh}, {len(free)} free, largest_comp={largest}")
         fleet_grids.append((fw, fh, free, comps, cs, vel))
 
-    occupied_starts = set()
-    occupied_goals = set()
+    occupancy = Occupancy(width, height)
     all_agents = []
     agent_id = 0
 
@@ -64,8 +63,7 @@ def main():
         fw, fh, free, comps, cs, vel = fleet_grids[fi]
         n = agent_counts[fi]
         print(f"\nPlacing {n} agents for fleet {fi} (cs={cs})...")
-        placements = place_agents(comps, free, cs, n,
-                                  occupied_starts, occupied_goals, rng)
+        placements = place_agents(comps, free, cs, n, occupancy, rng)
         for start, goal in placements:
             all_agents.append((agent_id, fi, cs, vel, start[0], start[1],
                                goal[0], goal[1], fw, fh))
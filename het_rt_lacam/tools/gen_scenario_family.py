@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Generate nested het_bench scenario families in parallel.
+
+For every (seed x fleet mix) one scenario with the largest agent count is
+placed, and each smaller count is written as a prefix of it, so
+n5 <= n10 <= ... <= n25 hold the same agents with the same ids and the
+whole `_nXX_hb.scen` family comes out of one pass. Agents are ordered so
+that every prefix follows the fleet mix as closely as possible.
+
+Placement is gen_scenario.place_agents (uniform over the largest component
+of each fleet grid, largest cell_size first); the structured families in
+benchmarks/generators keep their own start/goal regions. --avoid-passages
+also keeps goals off the narrow passages of every fleet (passages.py).
+
+Fleet grids and component labels are built once per map in the parent and
+handed to each worker process once, through the pool initializer; every
+worker then builds its own placement sets from them.
+
+Usage:
+    python gen_scenario_family.py --map ../../benchmarks/maps/room120.map \\
+        --counts 5,10,15,20,25 --seeds 25 --out-dir ../assets/room120_family
+    python gen_scenario_family.py --map ../../benchmarks/maps/room120.map \\
+        --fleets 1:1.0,6:0.17,11:0.09 --mix 11:6:3 --mix 1:1:1 --counts 20,40,60
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+# Reuse gen_scenario.py functions
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'third_party', 'hetpibt', 'tools'))
+from gen_scenario import load_map, flood_fill, Occupancy, place_agents
+from passages import map_passages
+
+# fleet_id -> (cell_size, velocity); same fleets as convert_to_hetbench.py
+FLEET_DEFS = [
+    (1, 1),
+    (3, 1),
+    (5, 2),
+    (7, 3),
+]
+DEFAULT_MIX = (12, 5, 4, 4)  # 1:12,3:5,5:4,7:4 as in benchmarks/generators
+
+_FLEETS = None  # per worker: list of (fw, fh, free_cells, largest_comp, avoid)
+
+
+def parse_fleets(s):
+    """Parse '1:1.0,6:0.17' into [(1, 1.0), (6, 0.17)]."""
+    fleets = []
+    for pair in s.split(","):
+        cs, vel = pair.split(":")
+        fleets.append((int(cs), float(vel)))
+    return fleets
+
+
+def parse_mix(s):
+    """Parse '12:5:4:4' into (12.0, 5.0, 4.0, 4.0)."""
+    return tuple(float(x) for x in s.split(":"))
+
+
+def fleet_sequence(mix, total):
+    """Fleet id of every agent slot, such that each prefix follows the mix.
+
+    Slot k goes to the fleet furthest below its quota (weight * k), so the
+    per-fleet counts of any prefix are within one agent of proportional.
+    """
+    weights = np.array(mix, dtype=float)
+    weights /= weights.sum()
+    assigned = np.zeros(len(weights))
+    seq = []
+    for k in range(1, total + 1):
+        f = int(np.argmax(weights * k - assigned))
+        assigned[f] += 1
+        seq.append(f)
+    return seq
+
+
+def build_labels(base_grid, width, height, cell_size):
+    """Component label per fleet cell (-1 = blocked), shape (fh, fw)."""
+    fw = width // cell_size
+    fh = height // cell_size
+    base = np.array(base_grid, dtype=bool)[:fh * cell_size, :fw * cell_size]
+    free = base.reshape(fh, cell_size, fw, cell_size).all(axis=(1, 3))
+    labels = np.full((fh, fw), -1, dtype=np.int32)
+    ys, xs = np.nonzero(free)
+    comps = flood_fill(set(zip(xs.tolist(), ys.tolist())))
+    for k, comp in enumerate(comps):
+        cxs, cys = zip(*comp)
+        labels[list(cys), list(cxs)] = k
+    return labels
+
+
+def _init_worker(fleet_labels, avoid):
+    """Build the placement inputs of every fleet once per worker.
+
+    fleet_labels holds the (fh, fw) component labels and avoid one
+    goal-avoid mask (or None) per fleet.
+    """
+    global _FLEETS
+    _FLEETS = []
+    for labels, fleet_avoid in zip(fleet_labels, avoid):
+        fh, fw = labels.shape
+        ys, xs = np.nonzero(labels >= 0)
+        free_cells = set(zip(xs.tolist(), ys.tolist()))
+        comp = []
+        if free_cells:
+            largest = int(np.argmax(np.bincount(labels[labels >= 0])))
+            ys, xs = np.nonzero(labels == largest)
+            comp = list(zip(xs.tolist(), ys.tolist()))
+        _FLEETS.append((fw, fh, free_cells, comp, fleet_avoid))
+
+
+def generate_family(task):
+    """Place one max-count scenario and write its nested prefixes.
+
+    Returns (seed, mix_idx, n_placed, written_paths).
+    """
+    seed, mix_idx, mix, counts, fleet_defs, width, height, prefix, out_dir = task
+    rng = random.Random(seed)
+    seq = fleet_sequence(mix, max(counts))
+    needed = [seq.count(f) for f in range(len(fleet_defs))]
+
+    # place largest cell_size first
+    occupancy = Occupancy(width, height)
+    placed = [[] for _ in fleet_defs]
+    order = sorted(range(len(fleet_defs)), key=lambda f: -fleet_defs[f][0])
+    for f in order:
+        fw, fh, free, comp, avoid = _FLEETS[f]
+        if needed[f] == 0 or not comp:
+            continue
+        placed[f] = place_agents([comp], free, fleet_defs[f][0], needed[f],
+                                 occupancy, rng, avoid)
+
+    # interleave in slot order; slots of an under-placed fleet are dropped
+    agents = []
+    nxt = [0] * len(fleet_defs)
+    for f in seq:
+        if nxt[f] < len(placed[f]):
+            agents.append((f, placed[f][nxt[f]]))
+            nxt[f] += 1
+
+    written = []
+    for n in sorted(counts):
+        if n > len(agents):
+            print(f"  Warning: seed {seed} mix {mix_idx}: only {len(agents)} "
+                  f"agents placed, skipping n={n}")
+            break
+        path = os.path.join(out_dir, f"{prefix}_{seed:02d}_n{n}_hb.scen")
+        with open(path, "w") as f:
+            for aid, (fid, (start, goal)) in enumerate(agents[:n]):
+                cs, vel = fleet_defs[fid]
+                fw, fh = _FLEETS[fid][0], _FLEETS[fid][1]
+                f.write(f"{aid} {fid} {cs} {vel:g} {start[0]*cs} {start[1]*cs} "
+                        f"{goal[0]*cs} {goal[1]*cs} {fw} {fh}\n")
+        written.append(path)
+    return seed, mix_idx, len(agents), written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate nested _nXX_hb.scen families in parallel")
+    parser.add_argument("--map", required=True)
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--prefix", default=None,
+                        help="scenario file prefix (default: map name)")
+    parser.add_argument("--counts", default="5,10,15,20,25",
+                        help="nested agent counts")
+    parser.add_argument("--seeds", type=int, default=25,
+                        help="seeds 0..N-1 (after --seed-start)")
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--fleets", default=None,
+                        help="cs:velocity per fleet id (default 1:1,3:1,5:2,7:3)")
+    parser.add_argument("--mix", action="append", default=None,
+                        help="fleet weights, e.g. 12:5:4:4 (repeatable; "
+                             "several mixes get an _mK prefix suffix)")
+    parser.add_argument("--avoid-passages", action="store_true",
+                        help="keep goals off narrow passages of any fleet "
+                             "unless no other cell is left")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    fleet_defs = parse_fleets(args.fleets) if args.fleets else FLEET_DEFS
+    mixes = [parse_mix(m) for m in args.mix] if args.mix else [DEFAULT_MIX]
+    for mix in mixes:
+        assert len(mix) == len(fleet_defs), "mix must have one weight per fleet"
+    counts = [int(x) for x in args.counts.split(",")]
+    prefix = args.prefix or os.path.splitext(os.path.basename(args.map))[0]
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    t0 = time.time()
+    width, height, base_grid = load_map(args.map)
+    fleet_labels = []
+    for i, (cs, vel) in enumerate(fleet_defs):
+        labels = build_labels(base_grid, width, height, cs)
+        n_comps = int(labels.max()) + 1
+        print(f"Fleet {i} (cs={cs}, v={vel}): {labels.shape[1]}x{labels.shape[0]} "
+              f"grid, {int((labels >= 0).sum())} free, {n_comps} components")
+        fleet_labels.append(labels)
+    avoid = [None] * len(fleet_defs)
+    if args.avoid_passages:
+        sizes = [cs for cs, _ in fleet_defs]
+        mp = map_passages(args.map)
+        avoid = [mp.goal_mask(cs, sizes) for cs in sizes]
+        print(f"Passage cells kept free of goals: "
+              + ", ".join(f"cs={cs}: {int(m.sum())}" for cs, m in zip(sizes, avoid)))
+    print(f"Fleet grids built in {time.time() - t0:.2f}s")
+
+    tasks = []
+    for mix_idx, mix in enumerate(mixes):
+        mix_prefix = prefix if len(mixes) == 1 else f"{prefix}_m{mix_idx}"
+        for seed in range(args.seed_start, args.seed_start + args.seeds):
+            tasks.append((seed, mix_idx, mix, counts, fleet_defs, width,
+                          height, mix_prefix, args.out_dir))
+
+    n_files = 0
+    with Pool(args.jobs, initializer=_init_worker,
+              initargs=(fleet_labels, avoid)) as pool:
+        for seed, mix_idx, n_placed, written in pool.imap_unordered(
+                generate_family, tasks):
+            n_files += len(written)
+            print(f"  seed {seed:02d} mix {mix_idx}: {n_placed} agents, "
+                  f"{len(written)} files")
+
+    if len(mixes) > 1:
+        for mix_idx, mix in enumerate(mixes):
+            print(f"  _m{mix_idx}: mix {':'.join(f'{w:g}' for w in mix)}")
+    print(f"\nWrote {n_files} scenarios to {args.out_dir} "
+          f"({time.time() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Live terminal dashboard for het_rt_lacam --telemetry streams.
+
+The solver writes one JSON line per executed RT/lifelong step (see
+include/telemetry.hpp). This tool tails such a file and redraws a
+dashboard: planning latency percentiles (all steps and a recent window),
+steps over the control-loop budget, EXPLORED/OPEN size, goals reached,
+move/stay ratio and resident memory. The .jsonl file is the saved record;
+--replay summarizes it offline and --plot draws it over time.
+
+Usage:
+    python rt_monitor.py --run -- -m map.map -i scen.scen --rt -t 60
+    python rt_monitor.py telemetry.jsonl            # follow a running solver
+    python rt_monitor.py telemetry.jsonl --replay --plot steps.png
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.join(HERE, '..', '..')
+BUILD_DIR = os.path.join(HERE, '..', 'build')
+TELEMETRY_DIR = os.path.join(REPO, 'benchmarks', 'results', 'telemetry')
+
+SPARK = ' ▁▂▃▄▅▆▇█'
+
+
+def find_exe():
+    for rel in [('Release', 'main.exe'), ('main.exe',), ('main',)]:
+        path = os.path.join(BUILD_DIR, *rel)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def percentile(values, p):
+    """Nearest-rank percentile, as LifelongResult::latency_percentile."""
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(max(math.ceil(p / 100 * len(s)), 1), len(s))
+    return s[k - 1]
+
+
+class Stats:
+    """Running view of one telemetry stream."""
+
+    def __init__(self, window, budget_ms):
+        self.start = None
+        self.end = None
+        self.steps = []  # step records
+        self.latencies = []
+        self.recent = deque(maxlen=window)
+        self.budget_ms = budget_ms
+        self.over_budget = 0
+        self.stay = 0
+        self.rss_peak = -1
+
+    def add(self, rec):
+        kind = rec.get('type')
+        if kind == 'start':
+            self.start = rec
+        elif kind == 'end':
+            self.end = rec
+        elif kind == 'step':
+            self.steps.append(rec)
+            lat = rec['latency_ms']
+            self.latencies.append(lat)
+            self.recent.append(lat)
+            if self.budget_ms and lat > self.budget_ms:
+                self.over_budget += 1
+            if rec['moved'] == 0:
+                self.stay += 1
+            self.rss_peak = max(self.rss_peak, rec.get('rss_kb', -1))
+
+    def render(self, source):
+        out = []
+        s = self.start or {}
+        out.append(f"het_rt_lacam telemetry -- {source}")
+        if s:
+            out.append(f"  mode={s.get('mode')} agents={s.get('agents')} "
+                       f"fleets={s.get('fleets')} budget={s.get('budget')} "
+                       f"seed={s.get('seed')} map={os.path.basename(s.get('map', ''))}")
+        if not self.steps:
+            out.append('  waiting for steps...')
+            return '\n'.join(out)
+        last = self.steps[-1]
+        n = len(self.steps)
+        out.append('')
+        out.append(f"  step {last['step']:>7}   elapsed {last['t_ms'] / 1e3:>8.1f}s"
+                   f"   goals {last['goals']}/{s.get('agents', '?')}"
+                   f"   move/stay {n - self.stay}/{self.stay}"
+                   f" ({100 * self.stay / n:.0f}% stay)")
+        out.append(f"  explored {last['explored']:>9}   open {last['open']:>9}"
+                   f"   rss {fmt_kb(last.get('rss_kb', -1))}"
+                   f" (peak {fmt_kb(self.rss_peak)})")
+        out.append('')
+        out.append(f"  latency ms    {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for label, vals in [('all steps', self.latencies),
+                            (f'last {len(self.recent)}', list(self.recent))]:
+            out.append(f"  {label:<12} " + ' '.join(
+                f"{percentile(vals, p):>8.2f}" for p in (50, 95, 99, 100)))
+        if self.budget_ms:
+            out.append(f"  over {self.budget_ms:g} ms budget: {self.over_budget}"
+                       f" steps ({100 * self.over_budget / n:.1f}%)")
+        out.append('')
+        out.append('  ' + sparkline(list(self.recent)[-60:]))
+        if self.end:
+            out.append('')
+            out.append(f"  finished: {self.end['result']} after "
+                       f"{self.end['steps']} steps, "
+                       f"{self.end['comp_time_ms'] / 1e3:.1f}s")
+        return '\n'.join(out)
+
+
+def fmt_kb(kb):
+    if kb is None or kb < 0:
+        return '?'
+    return f"{kb / 1024:.1f}MB"
+
+
+def sparkline(values):
+    if not values:
+        return ''
+    hi = max(values) or 1
+    return ''.join(SPARK[min(int(v / hi * (len(SPARK) - 1) + 0.5),
+                             len(SPARK) - 1)] for v in values) + \
+        f"  (last {len(values)} steps, max {hi:.1f}ms)"
+
+
+def read_lines(f, partial):
+    """Complete lines appended to f since the last call."""
+    chunk = f.read()
+    if not chunk:
+        return [], partial
+    data = partial + chunk
+    lines = data.split('\n')
+    return lines[:-1], lines[-1]
+
+
+def follow(path, stats, refresh, proc=None):
+    """Tail `path`, redraw every `refresh` s, stop at the end record."""
+    while not os.path.exists(path):
+        if proc is not None and proc.poll() is not None:
+            sys.exit(f"solver exited ({proc.returncode}) before writing {path}")
+        time.sleep(0.1)
+    if os.name == 'nt':
+        os.system('')  # enable ANSI escapes in the Windows console
+    partial = ''
+    with open(path) as f:
+        while True:
+            lines, partial = read_lines(f, partial)
+            for line in lines:
+                if line.strip():
+                    stats.add(json.loads(line))
+            sys.stdout.write('\033[H\033[J' + stats.render(path) + '\n')
+            sys.stdout.flush()
+            if stats.end is not None:
+                return
+            if proc is not None and proc.poll() is not None and not lines:
+                return  # solver died without an end record
+            time.sleep(refresh)
+
+
+def load(path, stats):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                stats.add(json.loads(line))
+
+
+def plot(stats, out):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    steps = [r['step'] for r in stats.steps]
+    fig, axes = plt.subplots(3, 1, figsize=(9, 8), sharex=True)
+    axes[0].plot(steps, stats.latencies, lw=0.8)
+    if stats.budget_ms:
+        axes[0].axhline(stats.budget_ms, color='r', ls='--', lw=0.8,
+                        label=f'budget {stats.budget_ms:g} ms')
+        axes[0].legend(fontsize=8)
+    axes[0].set_ylabel('latency (ms)')
+    axes[1].plot(steps, [r['explored'] for r in stats.steps], label='explored')
+    axes[1].plot(steps, [r['open'] for r in stats.steps], label='open')
+    axes[1].set_ylabel('nodes')
+    axes[1].legend(fontsize=8)
+    axes[2].plot(steps, [r['goals'] for r in stats.steps], label='goals')
+    axes[2].set_ylabel('agents at goal')
+    ax_rss = axes[2].twinx()
+    ax_rss.plot(steps, [r.get('rss_kb', -1) / 1024 for r in stats.steps],
+                color='gray', lw=0.8)
+    ax_rss.set_ylabel('rss (MB)')
+    axes[2].set_xlabel('step')
+    s = stats.start or {}
+    axes[0].set_title(f"{os.path.basename(s.get('map', ''))} "
+                      f"{s.get('mode', '')} budget={s.get('budget', '')}")
+    fig.tight_layout()
+    fig.savefig(out, dpi=100)
+    plt.close(fig)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Monitor het_rt_lacam per-step telemetry")
+    parser.add_argument('telemetry', nargs='?', default=None,
+                        help="telemetry .jsonl (default with --run: a new "
+                             "file under benchmarks/results/telemetry)")
+    parser.add_argument('--run', action='store_true',
+                        help="start the solver with the arguments after --")
+    parser.add_argument('--exe', default=None,
+                        help="solver executable for --run (default: ../build)")
+    parser.add_argument('--replay', action='store_true',
+                        help="summarize a saved file instead of following it")
+    parser.add_argument('--budget-ms', type=float, default=0,
+                        help="control-loop deadline; count steps over it")
+    parser.add_argument('--window', type=int, default=100,
+                        help="steps in the recent-latency window")
+    parser.add_argument('--refresh', type=float, default=0.5,
+                        help="redraw interval (s)")
+    parser.add_argument('--plot', default=None,
+                        help="write latency/explored/goals/rss over steps")
+    argv = sys.argv[1:]
+    split = argv.index('--') if '--' in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    solver_args = argv[split + 1:]
+
+    stats = Stats(args.window, args.budget_ms)
+    if args.run:
+        exe = args.exe or find_exe()
+        if exe is None:
+            sys.exit(f"solver not found in {BUILD_DIR}; pass --exe")
+        path = args.telemetry or os.path.join(
+            TELEMETRY_DIR, time.strftime('%Y%m%d_%H%M%S') + '.jsonl')
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(path)
+        cmd = [exe] + solver_args + ['--telemetry', path]
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL)
+        try:
+            follow(path, stats, args.refresh, proc)
+        finally:
+            proc.wait()
+        print(f"\nSaved {path}")
+    elif args.telemetry is None:
+        parser.error("give a telemetry file or --run")
+    elif args.replay:
+        path = args.telemetry
+        load(path, stats)
+        print(stats.render(path))
+    else:
+        path = args.telemetry
+        follow(path, stats, args.refresh)
+
+    if args.plot:
+        plot(stats, args.plot)
+        print(f"Wrote {args.plot}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Summarize and merge het_rt_lacam --trace files (Chrome Trace Event Format).
+
+For each span name the summary gives count, total, self time (total minus
+nested spans on the same lane), mean/p95/max duration and self time as a
+share of wall time (above 100% when workers run in parallel). It also
+shows how busy each lane was (planner loop, PIBT workers). With several
+traces the phases are summed over all of them; --per-file adds one table
+per trace. --csv writes per-file rows for
+spreadsheets, --merge writes one trace with each input as its own process
+so scenarios sit side by side in Perfetto.
+
+Usage:
+    python trace_summary.py trace.json
+    python trace_summary.py traces/*.json --merge merged.json --csv phases.csv
+"""
+import argparse
+import csv
+import glob
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+
+
+def load_events(path):
+    with open(path) as f:
+        data = json.load(f)
+    return data['traceEvents'] if isinstance(data, dict) else data
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    s = sorted(values)
+    k = min(max(math.ceil(p / 100 * len(s)), 1), len(s))
+    return s[k - 1]
+
+
+def lane_names(events):
+    return {(e.get('pid', 0), e.get('tid', 0)): e['args']['name']
+            for e in events
+            if e.get('ph') == 'M' and e.get('name') == 'thread_name'}
+
+
+def self_times(events):
+    """[(event, self_us)] for the complete events, per-lane nesting."""
+    by_lane = defaultdict(list)
+    for e in events:
+        if e.get('ph') == 'X':
+            by_lane[(e.get('pid', 0), e.get('tid', 0))].append(e)
+    out = []
+    for lane_events in by_lane.values():
+        # parents first: earlier start, then longer duration
+        lane_events.sort(key=lambda e: (e['ts'], -e['dur']))
+        stack = []  # [event, child_us]
+        for e in lane_events:
+            while stack and e['ts'] >= stack[-1][0]['ts'] + stack[-1][0]['dur']:
+                parent, child_us = stack.pop()
+                out.append((parent, parent['dur'] - child_us))
+            if stack:
+                stack[-1][1] += e['dur']
+            stack.append([e, 0.0])
+        while stack:
+            parent, child_us = stack.pop()
+            out.append((parent, parent['dur'] - child_us))
+    return out
+
+
+def wall_us(events):
+    spans = [e for e in events if e.get('ph') == 'X']
+    if not spans:
+        return 0.0
+    return (max(e['ts'] + e['dur'] for e in spans)
+            - min(e['ts'] for e in spans))
+
+
+def phase_table(timed):
+    """{(cat, name): {count, total_us, self_us, durs}}"""
+    table = defaultdict(lambda: {'count': 0, 'total_us': 0.0, 'self_us': 0.0,
+                                 'durs': []})
+    for e, self_us in timed:
+        row = table[(e.get('cat', ''), e['name'])]
+        row['count'] += 1
+        row['total_us'] += e['dur']
+        row['self_us'] += self_us
+        row['durs'].append(e['dur'])
+    return table
+
+
+def lane_busy(events):
+    """{lane: busy us} counting only top-level spans per lane."""
+    busy = defaultdict(float)
+    by_lane = defaultdict(list)
+    for e in events:
+        if e.get('ph') == 'X':
+            by_lane[(e.get('pid', 0), e.get('tid', 0))].append(e)
+    for lane, evs in by_lane.items():
+        evs.sort(key=lambda e: e['ts'])
+        end = -1.0
+        for e in evs:
+            if e['ts'] >= end:
+                busy[lane] += e['dur']
+                end = e['ts'] + e['dur']
+            elif e['ts'] + e['dur'] > end:
+                busy[lane] += e['ts'] + e['dur'] - end
+                end = e['ts'] + e['dur']
+    return busy
+
+
+def print_table(title, table, wall):
+    print(f"\n{title} (wall {wall / 1e3:.1f} ms)")
+    print(f"  {'phase':<24} {'count':>9} {'total ms':>10} {'self ms':>10} "
+          f"{'% wall':>7} {'mean us':>9} {'p95 us':>9} {'max us':>9}")
+    rows = sorted(table.items(), key=lambda kv: -kv[1]['self_us'])
+    for (cat, name), r in rows:
+        label = f"{cat}/{name}" if cat else name
+        print(f"  {label:<24} {r['count']:>9} {r['total_us'] / 1e3:>10.1f} "
+              f"{r['self_us'] / 1e3:>10.1f} "
+              f"{100 * r['self_us'] / wall if wall else 0:>6.1f}% "
+              f"{r['total_us'] / r['count']:>9.1f} "
+              f"{percentile(r['durs'], 95):>9.1f} {max(r['durs']):>9.1f}")
+
+
+def merge(traces, out):
+    """One trace file, input k as process k+1 named after its file."""
+    merged = []
+    for pid, (path, events) in enumerate(traces, 1):
+        name = os.path.splitext(os.path.basename(path))[0]
+        merged.append({'ph': 'M', 'pid': pid, 'name': 'process_name',
+                       'args': {'name': name}})
+        for e in events:
+            if e.get('ph') == 'M' and e.get('name') == 'process_name':
+                continue
+            e = dict(e)
+            e['pid'] = pid
+            merged.append(e)
+    with open(out, 'w') as f:
+        json.dump({'displayTimeUnit': 'ms', 'traceEvents': merged}, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Summarize / merge het_rt_lacam trace files")
+    parser.add_argument('traces', nargs='+', help="trace .json files (globs ok)")
+    parser.add_argument('--per-file', action='store_true',
+                        help="also print one table per trace")
+    parser.add_argument('--csv', default=None,
+                        help="per-file phase rows (file, cat, name, ...)")
+    parser.add_argument('--merge', default=None,
+                        help="write all traces into one file")
+    args = parser.parse_args()
+
+    paths = []
+    for p in args.traces:
+        paths.extend(sorted(glob.glob(p)) or [p])
+    traces = []
+    for p in paths:
+        if not os.path.exists(p):
+            sys.exit(f"no such trace: {p}")
+        traces.append((p, load_events(p)))
+
+    total = defaultdict(lambda: {'count': 0, 'total_us': 0.0, 'self_us': 0.0,
+                                 'durs': []})
+    total_wall = 0.0
+    csv_rows = []
+    for path, events in traces:
+        table = phase_table(self_times(events))
+        wall = wall_us(events)
+        total_wall += wall
+        for key, r in table.items():
+            t = total[key]
+            t['count'] += r['count']
+            t['total_us'] += r['total_us']
+            t['self_us'] += r['self_us']
+            t['durs'].extend(r['durs'])
+            csv_rows.append({
+                'file': os.path.basename(path), 'cat': key[0], 'name': key[1],
+                'count': r['count'], 'total_ms': round(r['total_us'] / 1e3, 3),
+                'self_ms': round(r['self_us'] / 1e3, 3),
+                'p95_us': round(percentile(r['durs'], 95), 1),
+                'max_us': round(max(r['durs']), 1),
+                'wall_ms': round(wall / 1e3, 3),
+            })
+        if args.per_file or len(traces) == 1:
+            print_table(os.path.basename(path), table, wall)
+            names = lane_names(events)
+            busy = lane_busy(events)
+            print("  lanes:")
+            for lane in sorted(busy):
+                print(f"    {names.get(lane, f'tid {lane[1]}'):<20} busy "
+                      f"{busy[lane] / 1e3:>9.1f} ms "
+                      f"({100 * busy[lane] / wall if wall else 0:.0f}%)")
+    if len(traces) > 1:
+        print_table(f"all {len(traces)} traces", total, total_wall)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            w = csv.DictWriter(f, fieldnames=list(csv_rows[0]) if csv_rows
+                               else ['file'])
+            w.writeheader()
+            w.writerows(csv_rows)
+        print(f"\nWrote {args.csv}")
+    if args.merge:
+        merge(traces, args.merge)
+        print(f"Wrote {args.merge}")
+
+
+if __name__ == '__main__':
+    main()
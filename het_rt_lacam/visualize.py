@@ -49,10 +49,15 @@ def fleet_color(fleet_id):
 # ---------------------------------------------------------------------------
 # Parsing
 # ---------------------------------------------------------------------------
-def load_map(map_path):
-    """Parse a .map file into a 2D grid (True = obstacle)."""
+def load_map(map_path, scale=None):
+    """Parse a .map file into a 2D base grid (True = obstacle).
+
+    Map cells are repeated scale x scale times; scale defaults to the
+    map's "scale N" header line (1 if absent).
+    """
     grid = []
     reading_map = False
+    header_scale = 1
 
     with open(map_path, "r") as f:
         for line in f:
@@ -63,8 +68,14 @@ def load_map(map_path):
             if reading_map and line:
                 row = [c in ("@", "T") for c in line]
                 grid.append(row)
+            elif line.startswith("scale"):
+                header_scale = int(line.split()[1])
 
-    return np.array(grid, dtype=bool)
+    grid = np.array(grid, dtype=bool)
+    scale = scale or header_scale
+    if scale > 1:
+        grid = grid.repeat(scale, axis=0).repeat(scale, axis=1)
+    return grid
 
 
 def load_scen(scen_path):
@@ -302,12 +313,13 @@ def main():
     # ------------------------------------------------------------------
     # Load data
     # ------------------------------------------------------------------
-    grid = load_map(args.map)
-    base_h, base_w = grid.shape
-
     meta, fleets, agent_fleets_r, starts_fg, goals_fg, solution = \
         load_result(args.result)
 
+    # map_scale is recorded when the solver ran with --map-scale
+    grid = load_map(args.map, int(meta.get("map_scale", 0)))
+    base_h, base_w = grid.shape
+
     # Optionally enrich from .scen file
     if args.scen:
         scen_fleets, scen_agents = load_scen(args.scen)
@@ -21,6 +21,7 @@ struct Graph {
   Vertices U;  // with nullptr, i.e., |U| = width * height
   int width;   // grid width (in this graph's cells)
   int height;  // grid height (in this graph's cells)
+  int scale;   // base cells per map cell side (map header "scale N")
 
   Graph();
   ~Graph();
@@ -34,10 +35,13 @@ struct Graph {
   Graph& operator=(const Graph&) = delete;
 
   // load from .map file at native (cell_size=1) resolution
-  Graph(const std::string& filename);
+  // _scale > 0 overrides the scale line of the map header
+  Graph(const std::string& filename, int _scale = 0);
 
   // build a coarser fleet graph from a base grid and cell_size
   // a fleet cell is passable only if ALL underlying base cells are passable
+  // with base.scale > 1, base cell (bx, by) is map cell (bx/scale, by/scale)
+  // so an upscaled map never has to be written out
   void build_from_base(const Graph& base, int cell_size);
 
   int size() const;  // the number of vertices, |V|
@@ -25,7 +25,7 @@ struct HetInstance {
   // swap_xy: swap x/y coordinates to match pypibt/pibt_rs transposed convention
   HetInstance(const std::string& scen_filename,
               const std::string& map_filename,
-              bool swap_xy = false);
+              bool swap_xy = false, int map_scale = 0);
 
   // programmatic construction for testing
   HetInstance(const std::string& map_filename,
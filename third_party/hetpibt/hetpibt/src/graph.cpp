@@ -5,7 +5,7 @@ Vertex::Vertex(int _id, int _index)
 {
 }
 
-Graph::Graph() : V(Vertices()), width(0), height(0) {}
+Graph::Graph() : V(Vertices()), width(0), height(0), scale(1) {}
 
 Graph::~Graph()
 {
@@ -18,7 +18,8 @@ Graph::Graph(Graph&& other) noexcept
     : V(std::move(other.V)),
       U(std::move(other.U)),
       width(other.width),
-      height(other.height)
+      height(other.height),
+      scale(other.scale)
 {
   other.width = 0;
   other.height = 0;
@@ -34,6 +35,7 @@ Graph& Graph::operator=(Graph&& other) noexcept
     U = std::move(other.U);
     width = other.width;
     height = other.height;
+    scale = other.scale;
     other.width = 0;
     other.height = 0;
   }
@@ -43,9 +45,11 @@ Graph& Graph::operator=(Graph&& other) noexcept
 // to load graph from .map file
 static const std::regex r_height = std::regex(R"(height\s(\d+))");
 static const std::regex r_width = std::regex(R"(width\s(\d+))");
+static const std::regex r_scale = std::regex(R"(scale\s(\d+))");
 static const std::regex r_map = std::regex(R"(map)");
 
-Graph::Graph(const std::string& filename) : V(Vertices()), width(0), height(0)
+Graph::Graph(const std::string& filename, int _scale)
+    : V(Vertices()), width(0), height(0), scale(1)
 {
   std::ifstream file(filename);
   if (!file) {
@@ -66,8 +70,12 @@ Graph::Graph(const std::string& filename) : V(Vertices()), width(0), height(0)
     if (std::regex_match(line, results, r_width)) {
       width = std::stoi(results[1].str());
     }
+    if (std::regex_match(line, results, r_scale)) {
+      scale = std::max(1, std::stoi(results[1].str()));
+    }
     if (std::regex_match(line, results, r_map)) break;
   }
+  if (_scale > 0) scale = _scale;
 
   U = Vertices(width * height, nullptr);
 
@@ -128,8 +136,10 @@ void Graph::build_from_base(const Graph& base, int cell_size)
   // non-overlapping tiling: fleet cell (fx, fy) occupies base cells
   // [fx*cell_size..(fx+1)*cell_size-1] x [fy*cell_size..(fy+1)*cell_size-1]
   // agent moves cell_size base cells per step
-  width = base.width / cell_size;
-  height = base.height / cell_size;
+  scale = 1;
+  const int s = base.scale;
+  width = base.width * s / cell_size;
+  height = base.height * s / cell_size;
   if (width <= 0 || height <= 0) {
     width = 0;
     height = 0;
@@ -138,19 +148,18 @@ void Graph::build_from_base(const Graph& base, int cell_size)
   U = Vertices(width * height, nullptr);
 
   // a fleet cell (fx, fy) is passable only if ALL underlying
-  // base cells in [fx*cs .. (fx+1)*cs) x [fy*cs .. (fy+1)*cs) are passable
+  // base cells in [fx*cs .. (fx+1)*cs) x [fy*cs .. (fy+1)*cs) are passable,
+  // checked on the map cells they fall into
   for (int fy = 0; fy < height; ++fy) {
+    int my_begin = fy * cell_size / s;
+    int my_end = ((fy + 1) * cell_size - 1) / s;
     for (int fx = 0; fx < width; ++fx) {
+      int mx_begin = fx * cell_size / s;
+      int mx_end = ((fx + 1) * cell_size - 1) / s;
       bool passable = true;
-      for (int dy = 0; dy < cell_size && passable; ++dy) {
-        for (int dx = 0; dx < cell_size && passable; ++dx) {
-          int bx = fx * cell_size + dx;
-          int by = fy * cell_size + dy;
-          if (bx >= base.width || by >= base.height) {
-            passable = false;
-          } else if (base.U[base.width * by + bx] == nullptr) {
-            passable = false;
-          }
+      for (int my = my_begin; my <= my_end && passable; ++my) {
+        for (int mx = mx_begin; mx <= mx_end && passable; ++mx) {
+          if (base.U[base.width * my + mx] == nullptr) passable = false;
         }
       }
       if (passable) {
@@ -17,8 +17,8 @@ Fleet* HetInstance::get_fleet(int agent_id) const
 // agent_id fleet_id footprint velocity sx sy gx gy grid_w grid_h
 HetInstance::HetInstance(const std::string& scen_filename,
                          const std::string& map_filename,
-                         bool swap_xy)
-    : base_grid(map_filename), N(0)
+                         bool swap_xy, int map_scale)
+    : base_grid(map_filename, map_scale), N(0)
 {
   std::ifstream file(scen_filename);
   if (!file) {
@@ -68,7 +68,8 @@ HetInstance::HetInstance(const std::string& scen_filename,
   }
 
   // initialize collision checker
-  cc = CollisionChecker(fleets, base_grid.width, base_grid.height);
+  cc = CollisionChecker(fleets, base_grid.width * base_grid.scale,
+                        base_grid.height * base_grid.scale);
 
   // create agents with start/goal positions
   // het_bench coordinates are absolute free-space; convert to fleet grid
@@ -133,7 +134,8 @@ HetInstance::HetInstance(const std::string& map_filename,
     fleets[fid]->G.build_from_base(base_grid, cell_sizes[idx]);
   }
 
-  cc = CollisionChecker(fleets, base_grid.width, base_grid.height);
+  cc = CollisionChecker(fleets, base_grid.width * base_grid.scale,
+                        base_grid.height * base_grid.scale);
 
   agents.reserve(N);
   starts.reserve(N);
@@ -189,7 +191,7 @@ bool HetInstance::is_valid(const int verbose) const
 bool HetInstance::validate_scenario(const int verbose) const
 {
   bool ok = true;
-  int bw = base_grid.width;
+  int bw = base_grid.width * base_grid.scale;
 
   // helper: get base-grid cells for agent i's fleet cell
   auto base_cells_for = [&](uint i, Vertex* v) -> std::vector<int> {
@@ -79,6 +79,7 @@ void make_log(const HetInstance& ins, const ReservationTable& P,
   // --- metadata ---
   log << "agents=" << N << "\n";
   log << "map_name=" << map_name << "\n";
+  if (ins.base_grid.scale > 1) log << "map_scale=" << ins.base_grid.scale << "\n";
   log << "seed=" << seed << "\n";
   log << "solver=hetpibt\n";
   log << "comp_time(ms)=" << comp_time_ms << "\n";
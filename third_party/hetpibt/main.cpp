@@ -34,6 +34,10 @@ int main(int argc, char* argv[])
       .help("swap x/y coords (match pypibt/pibt_rs het_bench convention)")
       .default_value(false)
       .implicit_value(true);
+  program.add_argument("--map-scale")
+      .help("base cells per map cell side (overrides the map's scale line)")
+      .default_value(0)
+      .scan<'i', int>();
   program.add_argument("--goal-lock")
       .help("permanently lock agents at goals (pibt_rs-style)")
       .default_value(false)
@@ -56,9 +60,10 @@ int main(int argc, char* argv[])
   auto seed = program.get<int>("--seed");
   auto swap_xy = program.get<bool>("--swap-xy");
   auto goal_lock = program.get<bool>("--goal-lock");
+  auto map_scale = program.get<int>("--map-scale");
 
   // create instance
-  auto ins = HetInstance(scen_file, map_file, swap_xy);
+  auto ins = HetInstance(scen_file, map_file, swap_xy, map_scale);
   int skipped = ins.skip_invalid_agents(verbose);
   if (skipped > 0) {
     info(0, verbose, "skipped ", skipped, " agents with null start/goal");
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""Play two or more replays of the same scenario side by side.
+
+Every result file (hetpibt or het_rt_lacam, read by diagnose_stalls.py
+into T x N fleet-grid position arrays) gets a panel; the map, its
+background image and the goals are loaded once and shared by all panels,
+and the panels step in lock-step. Agents and goals are drawn as one
+PolyCollection per panel whose vertices and edge colours are recomputed
+from the position arrays each frame, so a 200-agent pair stays
+interactive.
+
+Compared against the first replay:
+
+  divergence   first timestep where any agent stands somewhere else in
+               another replay; agents off the first replay's position are
+               outlined red in every frame
+  cost gap     per-agent arrival (first step of the final stay at the
+               goal, the cost the solvers count); the --top agents with
+               the largest spread across replays are outlined yellow and
+               labelled
+
+Replays must hold the same agents (count, cell sizes and starts); fleet
+ids may differ between solvers, colours follow the cell size.
+
+Controls:
+  Space     - pause / play
+  Right     - step forward
+  Left      - step backward
+  Up/Down   - speed up / slow down
+  D         - jump to the divergence step
+  Q / Esc   - quit
+
+Usage:
+    python compare_replays.py old_result.txt new_result.txt
+    python compare_replays.py a.txt b.txt c.txt -m ../../../benchmarks/maps --top 8
+    python compare_replays.py a.txt b.txt --save diverge.png
+    python compare_replays.py a.txt b.txt --summary-only
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from diagnose_stalls import base_free, parse_result, resolve_map
+
+
+# same palette as visualize.py; indexed by cell size rank here
+FLEET_COLORS = [
+    "#f38ba8",  # rosewater / red-pink
+    "#89b4fa",  # blue
+    "#a6e3a1",  # green
+    "#fab387",  # peach / orange
+    "#cba6f7",  # mauve / purple
+    "#94e2d5",  # teal
+    "#f9e2af",  # yellow
+    "#eba0ac",  # maroon-pink
+    "#89dceb",  # sky blue
+    "#b4befe",  # lavender
+]
+DIVERGED = "#ff5555"
+TOP = "#ffd700"
+CORNERS = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=float)
+
+
+# ============================================================
+# Loading
+# ============================================================
+
+def read_goals(scen_path):
+    """(N, 2) fleet-grid goals and (N,) cell sizes of a het_bench scenario."""
+    rows = np.loadtxt(scen_path, ndmin=2, comments="#")
+    cs = rows[:, 2].astype(np.int32)
+    goals = rows[:, 6:8].astype(np.int32) // cs[:, None]
+    return goals, cs
+
+
+def load_runs(paths, scen=None):
+    """Parse every replay and check that they hold the same agents.
+
+    Returns (runs, cs, goals): runs is a list of parse_result dicts, cs the
+    (N,) cell size per agent and goals the shared (N, 2) fleet-grid goals
+    (scenario, else the first replay that records them).
+    """
+    runs = [parse_result(p) for p in paths]
+    first = runs[0]
+    n = len(first["agent_fleet"])
+    cs = np.array([first["fleets"][f][0] for f in first["agent_fleet"]],
+                  dtype=np.int32)
+    for path, rep in zip(paths[1:], runs[1:]):
+        rep_cs = [rep["fleets"][f][0] for f in rep["agent_fleet"]]
+        if len(rep_cs) != n or np.any(rep_cs != cs):
+            raise ValueError(f"{path}: agents differ from {paths[0]}")
+        if len(rep["pos"]) and len(first["pos"]) and \
+                np.any(rep["pos"][0] != first["pos"][0]):
+            raise ValueError(f"{path}: starts differ from {paths[0]}")
+    if scen:
+        goals, scen_cs = read_goals(scen)
+        if len(goals) < n or np.any(scen_cs[:n] != cs):
+            raise ValueError(f"{scen}: agents differ from {paths[0]}")
+        goals = goals[:n]
+    else:
+        goals = next((r["goals"] for r in runs if len(r["goals"]) == n), None)
+        if goals is None:
+            goals = first["pos"][-1]
+    return runs, cs, goals
+
+
+def align(runs):
+    """(R, T, N, 2) positions, shorter replays held at their last step."""
+    horizon = max(len(r["pos"]) for r in runs)
+    out = []
+    for rep in runs:
+        pos = rep["pos"]
+        if len(pos) < horizon:
+            pos = np.concatenate([pos, np.repeat(pos[-1:], horizon - len(pos), axis=0)])
+        out.append(pos)
+    return np.stack(out)
+
+
+def arrivals(pos, goals):
+    """(R, N) first step of the final stay at the goal, and (R, N) reached."""
+    off = np.any(pos != goals[None, None], axis=3)
+    T = pos.shape[1]
+    last_off = T - 1 - np.argmax(off[:, ::-1], axis=1)
+    arrival = np.where(off.any(axis=1), last_off + 1, 0)
+    return arrival, ~off[:, -1]
+
+
+def divergence(pos):
+    """(T, N) agents away from the first replay's position, and the first
+    timestep where that happens (None if the replays never differ)."""
+    diff = np.any(pos[1:] != pos[:1], axis=3).any(axis=0)
+    steps = np.flatnonzero(diff.any(axis=1))
+    return diff, int(steps[0]) if len(steps) else None
+
+
+def summarize(paths, pos, goals, top):
+    """Print divergence and cost gaps; returns (diff, t_div, top agents,
+    arrival)."""
+    arrival, reached = arrivals(pos, goals)
+    diff, t_div = divergence(pos)
+    gap = arrival.max(axis=0) - arrival.min(axis=0)
+    order = np.argsort(-gap, kind="stable")
+    top_agents = order[:top][gap[order[:top]] > 0]
+
+    print(f"{pos.shape[2]} agents, {pos.shape[1]} steps")
+    for k, path in enumerate(paths):
+        print(f"  [{k}] {os.path.basename(path)}: soc {int(arrival[k].sum())}, "
+              f"makespan {int(arrival[k].max(initial=0))}, "
+              f"{int(reached[k].sum())}/{len(goals)} at goal")
+    if t_div is None:
+        print("Replays are identical")
+    else:
+        agents = np.flatnonzero(diff[t_div])
+        print(f"First divergence at t={t_div}: agents "
+              + ", ".join(str(a) for a in agents[:20])
+              + (" ..." if len(agents) > 20 else ""))
+    if len(top_agents):
+        print("Largest arrival differences:")
+        for a in top_agents:
+            print(f"  agent {a:4d}  gap {int(gap[a]):4d}  arrivals "
+                  + " / ".join(str(int(x)) for x in arrival[:, a]))
+    return diff, t_div, top_agents, arrival
+
+
+# ============================================================
+# Rendering
+# ============================================================
+
+def footprints(p, cs):
+    """(N, 4, 2) corner vertices of fleet-grid positions p (N, 2)."""
+    corner = p * cs[:, None] - 0.5
+    return corner[:, None, :] + CORNERS[None] * cs[:, None, None]
+
+
+def background(free):
+    """(H, W, 3) map image, built once and shared by every panel."""
+    img = np.empty(free.shape + (3,))
+    img[free] = [0.92, 0.92, 0.95]
+    img[~free] = [0.2, 0.2, 0.25]
+    return img
+
+
+class Panel:
+    """One replay: agent and goal collections plus labels of the top agents."""
+
+    def __init__(self, ax, img, name, pos, cs, goals, colors, top_agents):
+        from matplotlib.collections import PolyCollection
+
+        self.ax, self.pos, self.cs, self.goals = ax, pos, cs, goals
+        self.top = top_agents
+        h, w = img.shape[:2]
+        ax.imshow(img, origin="upper", extent=(-0.5, w - 0.5, h - 0.5, -0.5),
+                  interpolation="nearest")
+        ax.set_xlim(-0.5, w - 0.5)
+        ax.set_ylim(h - 0.5, -0.5)
+        ax.set_aspect("equal")
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_facecolor("#1e1e2e")
+        ax.set_title(name, color="white", fontsize=9)
+        ax.add_collection(PolyCollection(
+            footprints(goals.astype(float), cs), facecolors="none",
+            edgecolors=colors, linestyles="--", linewidths=1.0, alpha=0.5,
+            zorder=3))
+        self.agents = PolyCollection(footprints(pos[0].astype(float), cs),
+                                     facecolors=colors, edgecolors="black",
+                                     linewidths=0.8, alpha=0.85, zorder=5)
+        ax.add_collection(self.agents)
+        self.labels = [ax.text(0, 0, str(a), color="black", fontsize=8,
+                               ha="center", va="center", fontweight="bold",
+                               zorder=6) for a in top_agents]
+        self.edge = np.zeros((len(cs), 4))
+        self.width = np.empty(len(cs))
+
+    def render(self, t, diverged):
+        """Draw the replay at fractional time t; diverged is (N,) bool."""
+        T = len(self.pos)
+        t0 = min(int(t), T - 1)
+        t1 = min(t0 + 1, T - 1)
+        p = self.pos[t0] + (t - t0) * (self.pos[t1] - self.pos[t0])
+        self.agents.set_verts(footprints(p, self.cs))
+        at_goal = np.all(self.pos[t0] == self.goals, axis=1) & \
+            np.all(self.pos[t1] == self.goals, axis=1)
+        self.edge[:] = (0.0, 0.0, 0.0, 1.0)
+        self.width[:] = 0.8
+        self.edge[at_goal] = (1.0, 1.0, 1.0, 1.0)
+        self.width[at_goal] = 2.0
+        self.edge[diverged] = _rgba(DIVERGED)
+        self.width[diverged] = 2.0
+        self.edge[self.top] = _rgba(TOP)
+        self.width[self.top] = 2.5
+        self.agents.set_edgecolors(self.edge)
+        self.agents.set_linewidths(self.width)
+        centers = (p + 0.5) * self.cs[:, None] - 0.5
+        for label, a in zip(self.labels, self.top):
+            label.set_position(centers[a])
+        return [self.agents] + self.labels
+
+
+def _rgba(color):
+    from matplotlib.colors import to_rgba
+    return to_rgba(color)
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare replays of one scenario in lock-step panels")
+    parser.add_argument("results", nargs="+",
+                        help="two or more result files (hetpibt or het_rt_lacam)")
+    parser.add_argument("-m", "--map", default=None,
+                        help="map file, or directory holding the recorded map name "
+                             "(default: recorded path, then benchmarks/maps)")
+    parser.add_argument("--map-scale", type=int, default=0,
+                        help="read the map at this scale (default: map_scale "
+                             "recorded in the first result, else 1)")
+    parser.add_argument("-i", "--scen", default=None,
+                        help="het_bench scenario for the goals (default: goals "
+                             "recorded in the results)")
+    parser.add_argument("--names", default=None,
+                        help="comma-separated panel titles (default: file names)")
+    parser.add_argument("--top", type=int, default=5,
+                        help="highlight this many agents with the largest "
+                             "arrival difference")
+    parser.add_argument("--speed", type=int, default=150,
+                        help="ms per frame (lower = faster, default 150)")
+    parser.add_argument("--substeps", type=int, default=4,
+                        help="interpolation substeps between integer timesteps")
+    parser.add_argument("--cols", type=int, default=0,
+                        help="panels per row (default: all in one row up to 3)")
+    parser.add_argument("--at", type=float, default=None,
+                        help="start at this timestep (default 0; the divergence "
+                             "step for a .png --save)")
+    parser.add_argument("--save", default=None,
+                        help="save a frame (.png) or the animation (.gif, .mp4)")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="print the comparison without opening a window")
+    args = parser.parse_args()
+
+    if len(args.results) < 2:
+        sys.exit("need at least two result files")
+    try:
+        runs, cs, goals = load_runs(args.results, args.scen)
+    except (OSError, KeyError, ValueError, IndexError) as e:
+        sys.exit(str(e) or type(e).__name__)
+    pos = align(runs)
+    diff, t_div, top_agents, arrival = summarize(args.results, pos, goals,
+                                                 args.top)
+    if args.summary_only:
+        return
+
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    meta = runs[0]["meta"]
+    map_path = resolve_map(meta, args.map)
+    scale = args.map_scale or int(meta.get("map_scale", 0)) or None
+    img = background(base_free(map_path, scale))
+
+    sizes = sorted(set(cs.tolist()))
+    colors = [FLEET_COLORS[sizes.index(c) % len(FLEET_COLORS)] for c in cs]
+    names = args.names.split(",") if args.names else \
+        [os.path.basename(p) for p in args.results]
+    n_panels = len(runs)
+    cols = args.cols or min(n_panels, 3)
+    rows = -(-n_panels // cols)
+    fig, axes = plt.subplots(rows, cols, figsize=(6 * cols, 6 * rows + 0.6),
+                             squeeze=False)
+    fig.patch.set_facecolor("#1e1e2e")
+    panels = []
+    for k, ax in enumerate(axes.flat):
+        if k >= n_panels:
+            ax.axis("off")
+            continue
+        title = (f"{names[k] if k < len(names) else names[-1]}\n"
+                 f"soc {int(arrival[k].sum())}  "
+                 f"makespan {int(arrival[k].max(initial=0))}")
+        panels.append(Panel(ax, img, title, pos[k], cs, goals, colors,
+                            top_agents))
+    div_text = "identical" if t_div is None else f"diverge at t={t_div}"
+    header = fig.suptitle("", color="white", fontsize=12, fontweight="bold")
+
+    substeps = max(1, args.substeps)
+    T = pos.shape[1]
+    n_frames = (T - 1) * substeps + 1
+    start = args.at
+    if start is None and args.save and args.save.endswith(".png"):
+        start = t_div or 0
+    state = {"frame": int(round((start or 0) * substeps)), "playing": True}
+    state["frame"] = min(max(state["frame"], 0), n_frames - 1)
+    anim_ref = [None]
+
+    def render_at_frame(frame):
+        t = frame / substeps
+        diverged = diff[min(int(t), T - 1)]
+        artists = []
+        for panel in panels:
+            artists += panel.render(t, diverged)
+        play_str = "PLAY" if state["playing"] else "PAUSE"
+        header.set_text(f"t = {t:.1f} / {T - 1}  ({div_text}, "
+                        f"{int(diverged.sum())} agents off)  [{play_str}]")
+        return artists + [header]
+
+    def animate(_):
+        if state["playing"]:
+            state["frame"] += 1
+            if state["frame"] >= n_frames:
+                state["frame"] = n_frames - 1
+                state["playing"] = False
+        return render_at_frame(state["frame"])
+
+    def on_key(event):
+        if event.key == " ":
+            state["playing"] = not state["playing"]
+        elif event.key in ("right", "left"):
+            state["playing"] = False
+            step = substeps if event.key == "right" else -substeps
+            state["frame"] = min(max(state["frame"] + step, 0), n_frames - 1)
+        elif event.key in ("up", "down"):
+            args.speed = max(10, min(1000, args.speed + (-20 if event.key == "up" else 20)))
+            if anim_ref[0]:
+                anim_ref[0].event_source.interval = args.speed
+        elif event.key == "d" and t_div is not None:
+            state["playing"] = False
+            state["frame"] = t_div * substeps
+        elif event.key in ("q", "escape"):
+            plt.close(fig)
+            return
+        render_at_frame(state["frame"])
+        fig.canvas.draw_idle()
+
+    fig.tight_layout(rect=(0, 0, 1, 0.95))
+    if args.save and args.save.endswith(".png"):
+        state["playing"] = False
+        render_at_frame(state["frame"])
+        fig.savefig(args.save, dpi=120, facecolor=fig.get_facecolor())
+        print(f"Saved to {args.save}")
+    elif args.save:
+        anim = FuncAnimation(fig, render_at_frame, frames=n_frames,
+                             interval=args.speed, blit=True, repeat=False)
+        anim.save(args.save,
+                  writer="pillow" if args.save.endswith(".gif") else "ffmpeg",
+                  fps=max(1, 1000 // args.speed))
+        print(f"Saved to {args.save}")
+    else:
+        render_at_frame(state["frame"])
+        fig.canvas.mpl_connect("key_press_event", on_key)
+        anim = FuncAnimation(fig, animate, frames=None, interval=args.speed,
+                             blit=True, repeat=True, cache_frame_data=False)
+        anim_ref[0] = anim
+        plt.show()
+
+
+if __name__ == "__main__":
+    main()
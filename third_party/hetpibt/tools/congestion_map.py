@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Per-cell traffic statistics and congestion heatmaps from solver replays.
+
+Reads hetpibt and het_rt_lacam result files (see diagnose_stalls.py) and
+counts, for every base-grid cell, the agent-steps spent on it:
+
+  occupancy   steps an agent not yet at its goal covers the cell with its
+              footprint
+  waits       the part of those steps where the agent stays in place, i.e.
+              the steps that make up the gap between SOC and its lower bound
+  scenarios   replays with at least one wait on the cell
+
+Counts are kept per fleet cell size, so a category whose scenarios use
+different fleet ids still adds up. They are accumulated with np.add.at on
+each fleet grid and mapped to the reported p x p blocks (--pool) once per
+group: a fleet-cell count goes to every block its cs x cs footprint
+touches, once, so a block counts agent-steps whatever the agents' sizes
+(summing base cells would weigh a cs7 wait 49 times a cs1 wait). Waits are also binned in time (--bin steps)
+to get the busiest period of each cell and the fleet mix of the waits over
+time.
+
+Replays are grouped by solver and map, which for the benchmark sets is the
+category (bottleneck_doors_105, intersection_105, ...), and each group gets a
+heatmap figure (all fleets occupancy and waits, then waits per cell size)
+and its top cells in the CSV.
+
+Usage:
+    python congestion_map.py runs/bottleneck_doors/ --out-dir heat
+    python congestion_map.py "runs/*_result.txt" -j 4 --csv hot_cells.csv --top 50
+    python congestion_map.py result.txt -m ../assets/room-64-64-8.map --map-scale 10
+"""
+import argparse
+import csv
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+from diagnose_stalls import base_free, expand, parse_result, resolve_map
+from gen_scenario import load_map
+
+
+# ============================================================
+# Accumulation
+# ============================================================
+
+def replay_counts(rep, bin_steps):
+    """Per cell size: occupancy (fh*fw,), waits (fh*fw,) and time-binned
+    waits (bins, fh*fw) of one replay, flat fleet-grid cells y * fw + x."""
+    pos, goals = rep["pos"], rep["goals"]
+    T, N = pos.shape[:2]
+    out = {}
+    if T < 2 or N == 0:
+        return out
+    active = (pos[:, :, 0] >= 0) & np.any(pos != goals[None], axis=2)
+    stay = np.zeros((T, N), dtype=bool)
+    stay[:-1] = np.all(pos[1:] == pos[:-1], axis=2)
+    waiting = active & stay
+    cs_of = np.array([rep["fleets"][f][0] for f in rep["agent_fleet"]])
+    tbin = np.broadcast_to((np.arange(T) // bin_steps)[:, None], (T, N))
+    bins = (T - 1) // bin_steps + 1
+    for cs in np.unique(cs_of):
+        fw, fh = next((w, h) for c, w, h in rep["fleets"].values() if c == cs)
+        sel = np.zeros(N, dtype=bool)
+        sel[cs_of == cs] = True
+        cells = pos[:, :, 1] * fw + pos[:, :, 0]
+        act = active & sel[None]
+        wt = waiting & sel[None]
+        occ = np.zeros(fh * fw, dtype=np.int64)
+        wait = np.zeros(fh * fw, dtype=np.int64)
+        wait_t = np.zeros((bins, fh * fw), dtype=np.int64)
+        np.add.at(occ, cells[act], 1)
+        np.add.at(wait, cells[wt], 1)
+        np.add.at(wait_t, (tbin[wt], cells[wt]), 1)
+        out[int(cs)] = (fw, fh, occ, wait, wait_t)
+    return out
+
+
+def load_file(task):
+    """(path, group key, counts or None, error or None) for one result file."""
+    path, map_arg, scale, bin_steps = task
+    try:
+        rep = parse_result(path)
+        map_path = resolve_map(rep["meta"], map_arg)
+        scale = scale or int(rep["meta"].get("map_scale", 0)) or None
+        base_free(map_path, scale)  # fail here on a missing map
+        key = (rep["meta"].get("solver", ""), map_path, scale)
+        return path, key, replay_counts(rep, bin_steps), None
+    except (OSError, KeyError, ValueError, IndexError, StopIteration) as e:
+        return path, None, None, str(e) or type(e).__name__
+
+
+def touch(n, cs, pool, blocks):
+    """(n, blocks) 0/1 matrix: fleet row (or column) i covers base cells
+    [i * cs, i * cs + cs), which touch blocks i * cs // pool ..
+    (i * cs + cs - 1) // pool."""
+    i = np.arange(n)[:, None]
+    b = np.arange(blocks)[None, :]
+    return ((b >= i * cs // pool) & (b <= (i * cs + cs - 1) // pool)).astype(np.int64)
+
+
+def raster(a, cs, shape):
+    """Fleet-grid array (..., fh, fw) spread over its cs x cs footprints,
+    zero-padded to the base grid `shape` (H, W)."""
+    a = a.repeat(cs, axis=-2).repeat(cs, axis=-1)
+    out = np.zeros(a.shape[:-2] + shape, dtype=a.dtype)
+    h, w = min(a.shape[-2], shape[0]), min(a.shape[-1], shape[1])
+    out[..., :h, :w] = a[..., :h, :w]
+    return out
+
+
+class Group:
+    """Summed counts of one solver's replays on one map, kept on the fleet
+    grids."""
+
+    def __init__(self, solver, map_path, scale):
+        self.solver = solver
+        self.map_path = map_path
+        self.free = base_free(map_path, scale)
+        self.scale = scale or getattr(load_map(map_path)[2], "scale", 1)
+        self.replays = 0
+        self.fleets = {}  # cs -> [fw, fh, occ, wait, wait_t]
+        self.scenarios = np.zeros(self.free.shape, dtype=np.int32)
+
+    @property
+    def label(self):
+        stem = os.path.splitext(os.path.basename(self.map_path))[0]
+        stem = f"{stem}_x{self.scale}" if self.scale > 1 else stem
+        return f"{self.solver}_{stem}" if self.solver else stem
+
+    def add(self, counts):
+        self.replays += 1
+        hit = np.zeros(self.free.shape, dtype=bool)
+        for cs, (fw, fh, occ, wait, wait_t) in counts.items():
+            acc = self.fleets.get(cs)
+            if acc is None:
+                acc = self.fleets[cs] = [fw, fh, np.zeros_like(occ),
+                                         np.zeros_like(wait),
+                                         np.zeros((0, fh * fw), dtype=np.int64)]
+            acc[2] += occ
+            acc[3] += wait
+            if len(wait_t) > len(acc[4]):
+                acc[4] = np.vstack([acc[4], np.zeros(
+                    (len(wait_t) - len(acc[4]), fh * fw), dtype=np.int64)])
+            acc[4][:len(wait_t)] += wait_t
+            hit |= raster((wait > 0).reshape(fh, fw), cs, self.free.shape)
+        self.scenarios += hit
+
+    def block_maps(self, pool):
+        """{cs: (occupancy, waits, time-binned waits)} in agent-steps per
+        pool x pool block (pool 1: per base cell)."""
+        pool = max(pool, 1)
+        H, W = self.free.shape
+        out = {}
+        for cs, (fw, fh, occ, wait, wait_t) in sorted(self.fleets.items()):
+            ty = touch(fh, cs, pool, -(-H // pool)).T
+            tx = touch(fw, cs, pool, -(-W // pool))
+            out[cs] = (ty @ occ.reshape(fh, fw) @ tx,
+                       ty @ wait.reshape(fh, fw) @ tx,
+                       ty @ wait_t.reshape(-1, fh, fw) @ tx)
+        return out
+
+
+# ============================================================
+# Reports
+# ============================================================
+
+def pool_cells(a, p, op=np.sum):
+    """Reduce (..., H, W) over p x p blocks (edges zero-padded)."""
+    if p <= 1:
+        return a
+    H, W = a.shape[-2:]
+    ph, pw = -(-H // p), -(-W // p)
+    padded = np.zeros(a.shape[:-2] + (ph * p, pw * p), dtype=a.dtype)
+    padded[..., :H, :W] = a
+    return op(padded.reshape(a.shape[:-2] + (ph, p, pw, p)), axis=(-3, -1))
+
+
+def top_cells(group, maps, top, pool, bin_steps, spread=0):
+    """CSV rows of the `top` cells (p x p blocks of block_maps) with the
+    most waiting agent-steps, skipping cells within `spread` blocks of one
+    already listed (a large agent's footprint would otherwise fill the
+    list)."""
+    sizes = sorted(maps)
+    occ = sum(m[0] for m in maps.values())
+    wait = sum(m[1] for m in maps.values())
+    per_cs = {cs: maps[cs][1] for cs in sizes}
+    bins = max(len(m[2]) for m in maps.values())
+    wait_t = np.zeros((bins,) + wait.shape, dtype=np.int64)
+    for _, _, wt in maps.values():
+        wait_t[:len(wt)] += wt
+    seen = pool_cells(group.scenarios, pool, np.max)
+    order = np.argsort(wait, axis=None, kind="stable")[::-1]
+    rows, picked = [], []
+    for flat in order:
+        y, x = np.unravel_index(flat, wait.shape)
+        if wait[y, x] == 0 or len(rows) == top:
+            break
+        if any(abs(y - py) <= spread and abs(x - px) <= spread
+               for py, px in picked):
+            continue
+        picked.append((y, x))
+        row = {"group": group.label, "x": int(x) * pool, "y": int(y) * pool,
+               "size": pool, "occupancy_steps": int(occ[y, x]),
+               "wait_steps": int(wait[y, x]),
+               "wait_share": round(float(wait[y, x]) / max(int(occ[y, x]), 1), 3),
+               "fleets": sum(1 for cs in sizes if per_cs[cs][y, x] > 0),
+               "scenarios": int(seen[y, x]),
+               "peak_t": int(np.argmax(wait_t[:, y, x])) * bin_steps}
+        for cs in sizes:
+            row[f"wait_steps_cs{cs}"] = int(per_cs[cs][y, x])
+        rows.append(row)
+    return rows
+
+
+def print_group(group, rows, bin_steps, shown=5):
+    occ = sum(int(f[2].sum()) for f in group.fleets.values())
+    waits = sum(int(f[3].sum()) for f in group.fleets.values())
+    print(f"\n=== {group.label}: {group.replays} replays, {occ} active "
+          f"agent-steps, {waits} waits ({100 * waits / max(occ, 1):.1f}%) ===")
+    sizes = sorted(group.fleets)
+    bins = max(len(f[4]) for f in group.fleets.values())
+    print(f"  {'steps':>11}  {'waits':>7}  " +
+          "  ".join(f"{'cs' + str(cs):>6}" for cs in sizes))
+    for b in range(bins):
+        per = [int(group.fleets[cs][4][b].sum()) if b < len(group.fleets[cs][4])
+               else 0 for cs in sizes]
+        total = sum(per)
+        if total == 0:
+            continue
+        span = f"{b * bin_steps}-{(b + 1) * bin_steps - 1}"
+        print(f"  {span:>11}  {total:>7}  " +
+              "  ".join(f"{100 * n / total:>5.0f}%" for n in per))
+    for r in rows[:shown]:
+        mix = ", ".join(f"cs{cs} {r[f'wait_steps_cs{cs}']}" for cs in sizes
+                        if r[f"wait_steps_cs{cs}"])
+        print(f"  hot ({r['x']},{r['y']}) waits {r['wait_steps']} of {r['occupancy_steps']} "
+              f"in {r['scenarios']} replays, peak t={r['peak_t']} [{mix}]")
+
+
+def plot_group(group, maps, path, pool):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import ListedColormap, LogNorm
+
+    blocked = pool_cells((~group.free).astype(np.int32), pool) == pool * pool
+    panels = [("all fleets: occupancy", sum(m[0] for m in maps.values())),
+              ("all fleets: waits", sum(m[1] for m in maps.values()))]
+    panels += [(f"cs={cs}: waits", m[1]) for cs, m in maps.items()]
+    cols = min(len(panels), 4)
+    rows = -(-len(panels) // cols)
+    fig, axes = plt.subplots(rows, cols, figsize=(4 * cols, 4 * rows),
+                             squeeze=False)
+    cmap = plt.get_cmap("YlOrRd").copy()
+    cmap.set_bad("white")
+    walls = ListedColormap(["#404040"])
+    for ax, (title, a) in zip(axes.flat, panels):
+        a = a.astype(float)
+        a[a == 0] = np.nan
+        a = np.ma.masked_where(blocked, a)
+        vmax = np.nanmax(a.filled(np.nan)) if a.count() else 1.0
+        vmax = 1.0 if np.isnan(vmax) else vmax
+        im = ax.imshow(a, cmap=cmap, norm=LogNorm(vmin=1, vmax=max(vmax, 2)),
+                       interpolation="nearest")
+        ax.imshow(np.ma.masked_where(~blocked, blocked), cmap=walls,
+                  interpolation="nearest")
+        ax.set_title(title, fontsize=9)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        fig.colorbar(im, ax=ax, fraction=0.046, pad=0.02)
+    for ax in list(axes.flat)[len(panels):]:
+        ax.axis("off")
+    fig.suptitle(f"{group.label} ({group.replays} replays)")
+    fig.tight_layout()
+    fig.savefig(path, dpi=120)
+    plt.close(fig)
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def collect(loaded):
+    groups, failed = {}, []
+    for path, key, counts, err in loaded:
+        if err is not None:
+            failed.append((path, err))
+            continue
+        if key not in groups:
+            groups[key] = Group(*key)
+        groups[key].add(counts)
+    return groups, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Congestion heatmaps and hot cells from result files")
+    parser.add_argument("results", nargs="+",
+                        help="result files, globs or directories (*result*.txt)")
+    parser.add_argument("-m", "--map", default=None,
+                        help="map file, or directory holding the recorded map names "
+                             "(default: recorded path, then benchmarks/maps)")
+    parser.add_argument("--map-scale", type=int, default=0,
+                        help="read the map at this scale (default: map_scale "
+                             "recorded in the result, else 1)")
+    parser.add_argument("--bin", type=int, default=50,
+                        help="time bin in steps for peak times and fleet mix")
+    parser.add_argument("--pool", type=int, default=0,
+                        help="report cells as P x P base-cell blocks "
+                             "(default: the map scale)")
+    parser.add_argument("--top", type=int, default=20,
+                        help="hot cells per group in the CSV")
+    parser.add_argument("--spread", type=int, default=3,
+                        help="list no two hot cells within this many cells "
+                             "(blocks) of each other; 0 lists every cell")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--csv", default=None, help="write the hot cells here")
+    parser.add_argument("--out-dir", default=None,
+                        help="write one <group>_congestion.png per group")
+    args = parser.parse_args()
+
+    paths = expand(args.results)
+    if not paths:
+        sys.exit("no result files")
+    tasks = [(p, args.map, args.map_scale or None, args.bin) for p in paths]
+    if args.jobs > 1 and len(tasks) > 1:
+        with Pool(args.jobs) as pool:
+            chunk = max(1, len(tasks) // (4 * args.jobs))
+            loaded = pool.imap(load_file, tasks, chunksize=chunk)
+            groups, failed = collect(loaded)
+    else:
+        groups, failed = collect(map(load_file, tasks))
+
+    print(f"{len(paths)} replays in {len(groups)} groups, {len(failed)} unreadable")
+    for path, err in failed[:10]:
+        print(f"  ! {path}: {err}")
+
+    all_rows = []
+    for group in groups.values():
+        if not group.fleets:
+            continue
+        pool = args.pool or group.scale
+        maps = group.block_maps(pool)
+        rows = top_cells(group, maps, args.top, pool, args.bin, args.spread)
+        print_group(group, rows, args.bin)
+        all_rows.extend(rows)
+        if args.out_dir:
+            os.makedirs(args.out_dir, exist_ok=True)
+            out = os.path.join(args.out_dir, f"{group.label}_congestion.png")
+            plot_group(group, maps, out, pool)
+            print(f"  Wrote {out}")
+
+    if args.csv:
+        fields = ["group", "x", "y", "size", "occupancy_steps", "wait_steps",
+                  "wait_share", "fleets", "scenarios", "peak_t"]
+        fields += sorted({k for r in all_rows for k in r
+                          if k.startswith("wait_steps_cs")},
+                         key=lambda k: int(k[len("wait_steps_cs"):]))
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fields, restval=0)
+            w.writeheader()
+            w.writerows(all_rows)
+        print(f"\nWrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""Per-agent delay decomposition and optimality gap of solver replays.
+
+For every agent the ideal arrival follows from D, the fleet-grid BFS
+distance from start to goal, and p, the speed period (the fleets= velocity
+field for het_rt_lacam, whose agents move when their phase counter is 0
+and then sit out p - 1 steps; 1 for hetpibt, whose planner moves every
+agent each step): (D - 1) * p + 1 steps, D when p = 1. The arrival A is
+the cost the solvers count, the first step of the final stay at the goal.
+An agent that never gets there is charged the horizon plus the ideal time
+from where it ended. The delay A - ideal splits into
+
+  waits      steps in place before the first arrival F, not counting the
+             p - 1 phase steps after each move
+  detour     the rest: moves that brought the agent no closer, p steps
+             each ((moves before F - D + distance left) * p), less any
+             phase steps the solver skipped
+  post_goal  A - F: steps after the first arrival, spent being pushed off
+             the goal and coming back
+
+which add up to the delay exactly. Waits are attributed to the cell size
+of the blocking agent through the wait-for relation of diagnose_stalls.py
+(only the steps outside the phase where every shortest-path move was
+covered by someone else), so the blame matrix shows whether large agents hold up small ones
+or the other way round.
+
+Everything is computed on T x N arrays per replay and on one array of
+agent rows for all replays; per-fleet totals are np.bincount sums.
+
+Usage:
+    python delay_report.py runs/ --csv fleet_delays.csv --agents-csv agents.csv
+    python delay_report.py "runs/*_result.txt" -j 4 --by-map
+"""
+import argparse
+import csv
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+
+from diagnose_stalls import analyze, expand, parse_result, resolve_map
+
+AGENT_FIELDS = ["file", "group", "agent", "cs", "period", "reached", "dist",
+                "ideal", "arrival", "first_arrival", "delay", "waits",
+                "detour", "post_goal", "blocked"]
+
+
+# ============================================================
+# Per replay
+# ============================================================
+
+def speed_periods(rep):
+    """(N,) speed period per agent; 1 unless the solver enforces them."""
+    if rep["meta"].get("solver") != "het_rt_lacam":
+        return np.ones(len(rep["agent_fleet"]), dtype=np.int64)
+    period = {f: max(int(round(float(v))), 1)
+              for f, v in rep["fleet_speed"].items()}
+    return np.array([period[f] for f in rep["agent_fleet"]], dtype=np.int64)
+
+
+def decompose(rep, dist, nxt, blocked):
+    """Columns of the per-agent decomposition as a dict of (N,) arrays.
+
+    `dist` is the (T, N) distance to goal, `nxt`/`blocked` the (T-1, N)
+    wait-for relation from diagnose_stalls.analyze.
+    """
+    pos, goals = rep["pos"], rep["goals"]
+    T, N = pos.shape[:2]
+    cols = np.arange(N)
+    p = speed_periods(rep)
+    at_goal = np.all(pos == goals[None], axis=2)
+    reached = at_goal[-1]
+    first = np.where(reached, np.argmax(at_goal, axis=0), T - 1)
+    moved = np.any(pos[1:] != pos[:-1], axis=2)
+    moves = np.vstack([np.zeros((1, N), dtype=np.int64),
+                       np.cumsum(moved, axis=0)])[first, cols]
+    d0 = np.maximum(dist[0], 0).astype(np.int64)
+    left = np.where(reached, 0, np.maximum(dist[first, cols], 0))
+
+    def ideal_time(d):
+        return np.where(d > 0, (d - 1) * p + 1, 0)
+
+    ideal = ideal_time(d0)
+    # first step of the final stay at the goal
+    off = ~at_goal
+    last_off = T - 1 - np.argmax(off[::-1], axis=0)
+    arrival = np.where(off.any(axis=0), last_off + 1, 0)
+    arrival = np.where(reached, arrival, T - 1 + ideal_time(left))
+
+    # steps before the first arrival; phase = within p - 1 steps of a move
+    steps = np.arange(T - 1)[:, None]
+    before = steps < first[None, :]
+    last_move = np.maximum.accumulate(np.where(moved, steps, -T), axis=0)
+    since = steps - np.vstack([np.full((1, N), -T), last_move[:-1]])
+    in_phase = since < p[None, :]
+    waits = (before & ~moved & ~in_phase).sum(axis=0)
+    post_goal = np.where(reached, arrival - first, 0)
+    detour = arrival - ideal - waits - post_goal
+    blame = blocked & before & ~in_phase & (nxt != cols[None, :])
+    return {"reached": reached, "period": p, "dist": d0, "ideal": ideal,
+            "arrival": arrival, "first_arrival": first,
+            "delay": arrival - ideal, "waits": waits, "detour": detour,
+            "post_goal": post_goal, "blocked": blame.sum(axis=0),
+            "blame": (blame, nxt)}
+
+
+def replay_rows(task):
+    """(file, group, columns or None, error or None) of one result file."""
+    path, map_arg, scale, by_map = task
+    try:
+        rep = parse_result(path)
+        map_path = resolve_map(rep["meta"], map_arg)
+        scale = scale or int(rep["meta"].get("map_scale", 0)) or None
+        solver = rep["meta"].get("solver", "")
+        group = solver
+        if by_map:
+            stem = os.path.splitext(os.path.basename(map_path))[0]
+            group = f"{solver}_{stem}" if solver else stem
+        T, N = rep["pos"].shape[:2]
+        if T < 2 or N == 0:
+            return path, group, None, "no solution"
+        _, detail = analyze(rep, map_path, scale)
+        cols = decompose(rep, detail["dist"], detail["nxt"], detail["blocked"])
+    except (OSError, KeyError, ValueError, IndexError) as e:
+        return path, None, None, str(e) or type(e).__name__
+
+    cs = np.array([rep["fleets"][f][0] for f in rep["agent_fleet"]])
+    blame, nxt = cols.pop("blame")
+    t_idx, a_idx = np.nonzero(blame)
+    cols["cs"] = cs
+    cols["agent"] = np.arange(N)
+    # (waiting cs, blocking cs) pairs, one per blocked step
+    cols["blame_pairs"] = np.stack([cs[a_idx], cs[nxt[t_idx, a_idx]]], axis=1)
+    meta = rep["meta"]
+    cols["soc"] = int(meta.get("soc", meta.get("sum_of_costs", 0)) or 0)
+    cols["soc_lb"] = int(meta.get("soc_lb", 0) or 0)
+    return path, group, cols, None
+
+
+# ============================================================
+# Aggregation
+# ============================================================
+
+def fleet_table(agents, sizes):
+    """Per-cell-size sums over the stacked agent rows."""
+    idx = np.searchsorted(sizes, agents["cs"])
+    n = len(sizes)
+
+    def total(col):
+        return np.bincount(idx, weights=agents[col], minlength=n).astype(np.int64)
+
+    rows = []
+    gap = int(agents["delay"].sum())
+    for k, cs in enumerate(sizes):
+        rows.append({
+            "cs": int(cs),
+            "agents": int(np.count_nonzero(idx == k)),
+            "reached": int(total("reached")[k]),
+            "ideal": int(total("ideal")[k]),
+            "arrival": int(total("arrival")[k]),
+            "delay": int(total("delay")[k]),
+            "waits": int(total("waits")[k]),
+            "detour": int(total("detour")[k]),
+            "post_goal": int(total("post_goal")[k]),
+            "blocked": int(total("blocked")[k]),
+            "gap_share": round(int(total("delay")[k]) / gap, 4) if gap else 0.0,
+        })
+    return rows
+
+
+def blame_matrix(pairs, sizes):
+    """(F, F) counts: row = waiting cell size, column = blocking cell size."""
+    n = len(sizes)
+    if not len(pairs):
+        return np.zeros((n, n), dtype=np.int64)
+    w = np.searchsorted(sizes, pairs[:, 0])
+    b = np.searchsorted(sizes, pairs[:, 1])
+    return np.bincount(w * n + b, minlength=n * n).reshape(n, n)
+
+
+def print_group(group, files, agents, soc, soc_lb, rows, matrix, sizes):
+    ideal = int(agents["ideal"].sum())
+    arrival = int(agents["arrival"].sum())
+    gap = arrival - ideal
+    print(f"\n=== {group}: {files} replays, {len(agents['cs'])} agents, "
+          f"{int(agents['reached'].sum())} reached ===")
+    recorded = f"; recorded soc {soc}" if soc else ""
+    if soc_lb:
+        recorded += f", soc_lb {soc_lb}"
+    print(f"  sum of arrivals {arrival} vs ideal {ideal}: gap {gap} "
+          f"({100 * gap / max(ideal, 1):.1f}% over){recorded}")
+    print(f"  {'cs':>4} {'agents':>6} {'reached':>7} {'ideal':>8} {'delay':>8} "
+          f"{'waits':>8} {'detour':>8} {'post':>7} {'gap%':>6} {'delay/ag':>8}")
+    for r in rows:
+        print(f"  {r['cs']:>4} {r['agents']:>6} {r['reached']:>7} {r['ideal']:>8} "
+              f"{r['delay']:>8} {r['waits']:>8} {r['detour']:>8} "
+              f"{r['post_goal']:>7} {100 * r['gap_share']:>5.1f}% "
+              f"{r['delay'] / max(r['agents'], 1):>8.1f}")
+    if matrix.sum():
+        print("  blocked steps, waiting cs (rows) by blocking cs (columns):")
+        print("  " + " " * 8 + "".join(f"{'cs' + str(cs):>8}" for cs in sizes))
+        for k, cs in enumerate(sizes):
+            print(f"  {'cs' + str(cs):>8}" + "".join(f"{v:>8}" for v in matrix[k]))
+        up = int(np.triu(matrix, 1).sum())    # small waits for larger
+        down = int(np.tril(matrix, -1).sum())  # large waits for smaller
+        print(f"  smaller held up by larger: {up}, larger held up by smaller: "
+              f"{down}, same size: {int(np.trace(matrix))}")
+
+
+# ============================================================
+# Main
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-agent delay decomposition and optimality gap per fleet")
+    parser.add_argument("results", nargs="+",
+                        help="result files, globs or directories (*result*.txt)")
+    parser.add_argument("-m", "--map", default=None,
+                        help="map file, or directory holding the recorded map names "
+                             "(default: recorded path, then benchmarks/maps)")
+    parser.add_argument("--map-scale", type=int, default=0,
+                        help="read the map at this scale (default: map_scale "
+                             "recorded in the result, else the map header)")
+    parser.add_argument("--by-map", action="store_true",
+                        help="one table per solver and map instead of per solver")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--csv", default=None, help="write the per-fleet rows here")
+    parser.add_argument("--agents-csv", default=None,
+                        help="write one row per agent and replay here")
+    args = parser.parse_args()
+
+    paths = expand(args.results)
+    if not paths:
+        sys.exit("no result files")
+    tasks = [(p, args.map, args.map_scale or None, args.by_map) for p in paths]
+    if args.jobs > 1 and len(tasks) > 1:
+        with Pool(args.jobs) as pool:
+            chunk = max(1, len(tasks) // (4 * args.jobs))
+            done = pool.map(replay_rows, tasks, chunksize=chunk)
+    else:
+        done = [replay_rows(t) for t in tasks]
+
+    failed = [(p, err) for p, _, _, err in done if err is not None]
+    print(f"{len(paths)} replays, {len(failed)} skipped")
+    for path, err in failed[:10]:
+        print(f"  ! {path}: {err}")
+
+    groups = {}
+    for path, group, cols, err in done:
+        if err is None:
+            groups.setdefault(group, []).append((path, cols))
+
+    fleet_rows, agent_rows = [], []
+    for group, items in groups.items():
+        keys = [k for k in items[0][1] if k not in ("blame_pairs", "soc", "soc_lb")]
+        agents = {k: np.concatenate([c[k] for _, c in items]) for k in keys}
+        pairs = np.concatenate([c["blame_pairs"] for _, c in items])
+        sizes = np.unique(agents["cs"])
+        rows = fleet_table(agents, sizes)
+        matrix = blame_matrix(pairs, sizes)
+        print_group(group, len(items), agents,
+                    sum(c["soc"] for _, c in items),
+                    sum(c["soc_lb"] for _, c in items), rows, matrix, sizes)
+        for r, blocked_by in zip(rows, matrix):
+            r["group"] = group
+            r.update({f"blocked_by_cs{cs}": int(n) for cs, n in zip(sizes, blocked_by)})
+        fleet_rows.extend(rows)
+        if args.agents_csv:
+            for path, c in items:
+                for a in range(len(c["cs"])):
+                    row = {"file": os.path.basename(path), "group": group}
+                    row.update({k: int(c[k][a]) for k in AGENT_FIELDS[2:]})
+                    agent_rows.append(row)
+
+    if args.csv:
+        fields = ["group", "cs", "agents", "reached", "ideal", "arrival", "delay",
+                  "waits", "detour", "post_goal", "blocked", "gap_share"]
+        fields += sorted({k for r in fleet_rows for k in r
+                          if k.startswith("blocked_by_cs")},
+                         key=lambda k: int(k[len("blocked_by_cs"):]))
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fields, restval=0)
+            w.writeheader()
+            w.writerows(fleet_rows)
+        print(f"\nWrote {args.csv}")
+    if args.agents_csv:
+        with open(args.agents_csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=AGENT_FIELDS)
+            w.writeheader()
+            w.writerows(agent_rows)
+        print(f"Wrote {args.agents_csv}")
+
+
+if __name__ == "__main__":
+    main()
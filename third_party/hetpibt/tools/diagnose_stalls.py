@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""Rank solver replays by how badly progress stalled.
+
+Reads hetpibt and het_rt_lacam result files into columnar arrays (T x N
+fleet-grid positions) and, for every timestep at once, builds the
+wait-for relation: agent A, not at its goal and not getting closer to it
+from t to t+1, is blocked when every neighbour of A on a shortest path to
+its goal is covered by another agent's footprint at t. A then waits for
+the owner with the smallest id of its first blocked next cell, so the
+relation is a function per timestep and is resolved by pointer jumping:
+
+  wait chain   A waits for B waits for C ...; length = hops to an agent
+               that waits for nobody
+  cycle        a chain that comes back to itself (deadlock at that step)
+  oscillation  within --window steps A moves at least window/2 times,
+               visits at most half as many cells as it makes moves and
+               ends no closer to its goal than it started (livelock)
+
+Distances come from per-goal BFS on the fleet grid, grown only as far as
+the agent's trajectory needs and cached across replays of the same map.
+
+severity = share of active agent-steps (agent not at its goal) that are
+blocked or oscillating + share of timesteps with a cycle.
+
+Usage:
+    python diagnose_stalls.py result.txt -m ../../../benchmarks/maps/room120.map
+    python diagnose_stalls.py runs/ -m ../../../benchmarks/maps -j 4 --csv stalls.csv
+    python diagnose_stalls.py "runs/*_result.txt" --detail 3
+"""
+import argparse
+import csv
+import glob
+import math
+import os
+import re
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from gen_scenario import load_map
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+MAPS_DIR = SCRIPT_DIR.parents[2] / "benchmarks" / "maps"
+
+COORD = re.compile(r"\((-?\d+),(-?\d+)\)")
+SEPARATORS = str.maketrans("(),@", "    ")
+
+
+def numbers(text):
+    """Integers of a "(x,y)@t,..." / "(x,y),..." list as an int32 array."""
+    return np.fromstring(text.translate(SEPARATORS), dtype=np.int32, sep=" ")
+
+
+# ============================================================
+# Replays
+# ============================================================
+
+def parse_result(path):
+    """Columnar replay of a hetpibt or het_rt_lacam result file.
+
+    Returns a dict with meta {key: value}, fleets {fid: (cs, fw, fh)},
+    fleet_speed {fid: velocity field}, agent_fleet (N,), goals (N, 2) and
+    pos (T, N, 2), all in fleet-grid coordinates; pos is -1 where an agent
+    has no position.
+    """
+    meta, fleets, speed = {}, {}, {}
+    agent_fleet, goals = [], []
+    steps = []   # het_rt_lacam: one row of positions per timestep
+    paths = {}   # hetpibt: agent -> (k, 3) array of x, y, t
+    mode = None
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if mode == "steps":
+                head, _, rest = line.partition(":")
+                if head.isdigit():
+                    steps.append(numbers(rest))
+                continue
+            if mode == "paths":
+                parts = line.split(":", 2)
+                if len(parts) == 3 and parts[0].isdigit():
+                    paths[int(parts[0])] = numbers(parts[2]).reshape(-1, 3)
+                continue
+            if line == "solution":
+                mode = "paths"
+            elif line.startswith("solution="):
+                mode = "steps"
+            elif line.startswith("fleets="):
+                for part in line[len("fleets="):].split(";"):
+                    fields = part.split(":")
+                    if len(fields) >= 5:
+                        fleets[int(fields[0])] = (int(fields[1]), int(fields[3]),
+                                                  int(fields[4]))
+                        speed[int(fields[0])] = float(fields[2])
+            elif line.startswith("agent_fleet="):
+                agent_fleet = [int(x) for x in line[len("agent_fleet="):].split(",") if x]
+            elif line.startswith("goals="):
+                goals = [(int(x), int(y)) for x, y in COORD.findall(line)]
+            elif "=" in line:
+                key, val = line.split("=", 1)
+                meta[key] = val
+
+    n = len(agent_fleet)
+    if mode == "steps":
+        pos = np.full((len(steps), n, 2), -1, dtype=np.int32)
+        for t, row in enumerate(steps):
+            row = row.reshape(-1, 2)[:n]
+            pos[t, :len(row)] = row
+    else:
+        horizon = max((int(p[:, 2].max()) for p in paths.values() if len(p)),
+                      default=0) + 1
+        pos = np.full((horizon, n, 2), -1, dtype=np.int32)
+        for a, p in paths.items():
+            if not len(p) or a >= n:
+                continue
+            p = p[np.argsort(p[:, 2], kind="stable")]
+            # position at t = last entry at or before t
+            k = np.searchsorted(p[:, 2], np.arange(horizon), side="right") - 1
+            pos[k >= 0, a] = p[k[k >= 0], :2]
+    return {"meta": meta, "fleets": fleets, "fleet_speed": speed,
+            "agent_fleet": np.array(agent_fleet, dtype=np.int32),
+            "goals": np.array(goals, dtype=np.int32).reshape(-1, 2), "pos": pos}
+
+
+def resolve_map(meta, map_arg):
+    """Map path for a replay: --map file, --map dir + recorded name, the
+    recorded path itself, or benchmarks/maps/<recorded name>."""
+    recorded = meta.get("map_file") or meta.get("map_name") or ""
+    name = re.split(r"[\\/]", recorded)[-1]
+    if map_arg and os.path.isfile(map_arg):
+        return map_arg
+    if map_arg:
+        return os.path.join(map_arg, name)
+    if recorded and os.path.isfile(recorded):
+        return recorded
+    return str(MAPS_DIR / name)
+
+
+# ============================================================
+# Fleet grids and distance fields (cached per process)
+# ============================================================
+
+_bases = {}
+_grids = {}
+_fields = {}
+
+
+def base_free(map_path, scale):
+    """(H, W) bool array of free base cells, map read at `scale`."""
+    key = (map_path, scale)
+    if key not in _bases:
+        width, height, grid = load_map(map_path, scale)
+        rows = getattr(grid, "map_rows", grid)
+        s = getattr(grid, "scale", 1)
+        cells = np.array([row[:width // s] for row in rows], dtype=bool)
+        _bases[key] = cells.repeat(s, axis=0).repeat(s, axis=1)
+    return _bases[key]
+
+
+def fleet_grid(map_path, scale, cs):
+    """(fw, fh, nbr) of the fleet grid; nbr[v] holds the flat indices of the
+    4-connected free neighbours of cell v (-1 padded)."""
+    key = (map_path, scale, cs)
+    if key not in _grids:
+        base = base_free(map_path, scale)
+        fh, fw = base.shape[0] // cs, base.shape[1] // cs
+        free = base[:fh * cs, :fw * cs].reshape(fh, cs, fw, cs).all(axis=(1, 3))
+        idx = np.arange(fh * fw, dtype=np.int32).reshape(fh, fw)
+        nbr = np.full((fh, fw, 4), -1, dtype=np.int32)
+        nbr[:, 1:, 0] = idx[:, :-1]
+        nbr[:, :-1, 1] = idx[:, 1:]
+        nbr[1:, :, 2] = idx[:-1, :]
+        nbr[:-1, :, 3] = idx[1:, :]
+        nbr = nbr.reshape(-1, 4)
+        flat = free.ravel()
+        nbr[nbr >= 0] = np.where(flat[nbr[nbr >= 0]], nbr[nbr >= 0], -1)
+        nbr[~flat] = -1
+        _grids[key] = (fw, fh, nbr)
+    return _grids[key]
+
+
+class DistanceField:
+    """BFS distance to one goal cell on a fleet grid, grown on demand."""
+
+    def __init__(self, nbr, goal):
+        self.nbr = nbr
+        self.dist = np.full(len(nbr), -1, dtype=np.int32)
+        self.frontier = np.array([goal], dtype=np.int32)
+        self.dist[goal] = 0
+        self.depth = 0
+
+    def at(self, cells):
+        """Distances of `cells` (flat indices), expanding the BFS until all
+        of them are reached or the goal's component is exhausted."""
+        while len(self.frontier) and (self.dist[cells] < 0).any():
+            nxt = self.nbr[self.frontier].ravel()
+            nxt = nxt[nxt >= 0]
+            nxt = np.unique(nxt[self.dist[nxt] < 0])
+            self.depth += 1
+            self.dist[nxt] = self.depth
+            self.frontier = nxt
+        return self.dist[cells]
+
+
+def distance_field(map_path, scale, cs, goal):
+    key = (map_path, scale, cs, goal)
+    if key not in _fields:
+        _fields[key] = DistanceField(fleet_grid(map_path, scale, cs)[2], goal)
+    return _fields[key]
+
+
+# ============================================================
+# Wait-for relation
+# ============================================================
+
+def footprint_cells(fx, fy, cs, base_w):
+    """(..., cs*cs) base-cell indices covered by fleet cells (fx, fy)."""
+    d = np.arange(cs)
+    cells = ((fy[..., None] * cs + d)[..., :, None] * base_w
+             + (fx[..., None] * cs + d)[..., None, :])
+    return cells.reshape(*fx.shape, cs * cs)
+
+
+def resolve_chains(nxt):
+    """Pointer jumping over rows of the functional wait-for graph.
+
+    nxt[t, a] is the agent a waits for, a itself if it waits for nobody.
+    Returns depth (chain length, valid where not stuck), stuck (a is on
+    or waits into a cycle), on_cycle and the number of cycles per row.
+    """
+    T, N = nxt.shape
+    ids = np.broadcast_to(np.arange(N, dtype=nxt.dtype), (T, N))
+    jump = nxt.copy()
+    depth = (nxt != ids).astype(np.int32)
+    low = np.minimum(ids, nxt)
+    for _ in range(max(1, math.ceil(math.log2(N + 1)))):
+        depth = depth + np.take_along_axis(depth, jump, axis=1)
+        low = np.minimum(low, np.take_along_axis(low, jump, axis=1))
+        jump = np.take_along_axis(jump, jump, axis=1)
+    # after >= N hops every agent sits on its chain root or on a cycle
+    stuck = np.take_along_axis(nxt, jump, axis=1) != jump
+    on_cycle = np.zeros((T, N), dtype=bool)
+    rows, cols = np.nonzero(stuck)
+    on_cycle[rows, jump[rows, cols]] = True
+    cycles = (on_cycle & (low == ids)).sum(axis=1)
+    return depth, stuck, on_cycle, cycles
+
+
+def longest_run(mask):
+    """(length, start) of the longest run of True in each column."""
+    T, N = mask.shape
+    padded = np.zeros((T + 2, N), dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded, axis=0)
+    best, start = np.zeros(N, dtype=int), np.zeros(N, dtype=int)
+    for a in np.nonzero(mask.any(axis=0))[0]:
+        s = np.nonzero(edges[:, a] == 1)[0]
+        e = np.nonzero(edges[:, a] == -1)[0]
+        k = int(np.argmax(e - s))
+        best[a], start[a] = e[k] - s[k], s[k]
+    return best, start
+
+
+def runs(mask_1d):
+    """[(start, length)] runs of True in a 1-D mask."""
+    edges = np.diff(np.concatenate([[0], mask_1d.astype(np.int8), [0]]))
+    s = np.nonzero(edges == 1)[0]
+    e = np.nonzero(edges == -1)[0]
+    return list(zip(s.tolist(), (e - s).tolist()))
+
+
+def analyze(rep, map_path, scale, window=20, min_wait=10):
+    """Stall metrics of one replay; see the module docstring."""
+    pos, fleets, agent_fleet = rep["pos"], rep["fleets"], rep["agent_fleet"]
+    T, N = pos.shape[:2]
+    base = base_free(map_path, scale)
+    base_h, base_w = base.shape
+    out = dict.fromkeys(COLUMNS[5:-1], 0)
+    out.update({"T": T, "N": N})
+    if T < 2 or N == 0:
+        return out, None
+
+    steps = T - 1
+    present = (pos[:, :, 0] >= 0)
+    dist = np.full((T, N), -1, dtype=np.int32)
+    flat = np.full((T, N), -1, dtype=np.int64)
+    cand = {}  # cs -> lists of (t, a, k, next cell)
+    for a in range(N):
+        fid = int(agent_fleet[a])
+        cs, fw_rec, fh_rec = fleets[fid]
+        fw, fh, nbr = fleet_grid(map_path, scale, cs)
+        if (fw, fh) != (fw_rec, fh_rec):
+            raise ValueError(f"fleet {fid} is {fw_rec}x{fh_rec} in the result "
+                             f"but {fw}x{fh} on {os.path.basename(map_path)} "
+                             f"(wrong map or --map-scale?)")
+        ok = present[:, a]
+        gx, gy = rep["goals"][a]
+        if not ok.any() or gx < 0:
+            continue
+        v = (pos[:, a, 1] * fw + pos[:, a, 0]).astype(np.int64)
+        v[~ok] = 0
+        field = distance_field(map_path, scale, cs, int(gy * fw + gx))
+        field.at(np.unique(v[ok]))
+        d = field.dist[v]
+        d[~ok] = -1
+        dist[:, a] = d
+        flat[:, a] = np.where(ok, v, -1)
+
+        stalled = (d[:-1] > 0) & (d[1:] >= d[:-1]) & ok[1:]
+        t_st = np.nonzero(stalled)[0]
+        if len(t_st):
+            nb = nbr[v[t_st]]                                   # (S, 4)
+            nd = np.where(nb >= 0, field.dist[np.maximum(nb, 0)], -2)
+            desc = (nb >= 0) & (nd >= 0) & (nd == d[t_st, None] - 1)
+            ts, ks = np.nonzero(desc)
+            c = cand.setdefault(cs, [[], [], [], []])
+            c[0].append(t_st[ts])
+            c[1].append(np.full(len(ts), a))
+            c[2].append(ks)
+            c[3].append(nb[ts, ks])
+
+    active = (dist[:-1] > 0)
+    oscillating = np.zeros((steps, N), dtype=bool)
+    if T > window:
+        win = sliding_window_view(flat, window, axis=0)      # (T-W+1, N, W)
+        moves = (np.diff(win, axis=2) != 0).sum(axis=2)
+        distinct = 1 + (np.diff(np.sort(win, axis=2), axis=2) != 0).sum(axis=2)
+        dw = sliding_window_view(dist, window, axis=0)
+        flag = ((dw[..., 0] > 0) & (dw[..., -1] >= dw[..., 0])
+                & (dw >= 0).all(axis=2)
+                & (moves >= window // 2) & (2 * distinct <= moves))
+        # step j is oscillating if a flagged window starts in [j-W+2, j]
+        csum = np.concatenate([np.zeros((1, N), dtype=np.int64),
+                               np.cumsum(flag, axis=0)])
+        j = np.arange(steps)
+        hi = np.minimum(j, len(flag) - 1) + 1
+        lo = np.maximum(j - window + 2, 0)
+        oscillating = (csum[hi] - csum[lo]) > 0
+    oscillating &= active
+
+    # --- who covers each candidate next cell ---
+    nxt = np.broadcast_to(np.arange(N, dtype=np.int64), (steps, N)).copy()
+    blocked = np.zeros((steps, N), dtype=bool)
+    if cand:
+        c_t = np.concatenate([np.concatenate(c[0]) for c in cand.values()])
+        t_need = np.unique(c_t)
+        # occupancy keys t * HW + base cell -> agent, only at those steps
+        keys, owners = [], []
+        for fid, (cs, fw, _) in fleets.items():
+            members = np.nonzero(agent_fleet == fid)[0]
+            if not len(members):
+                continue
+            p = pos[t_need][:, members]                        # (Tn, m, 2)
+            cells = footprint_cells(p[..., 0], p[..., 1], cs, base_w)
+            k = t_need[:, None, None].astype(np.int64) * base_h * base_w + cells
+            o = np.broadcast_to(members[None, :, None], cells.shape)
+            m = np.broadcast_to((p[..., 0] >= 0)[..., None], cells.shape)
+            keys.append(k[m])
+            owners.append(o[m])
+        keys = np.concatenate(keys)
+        owners = np.concatenate(owners)
+        order = np.argsort(keys, kind="stable")
+        keys, owners = keys[order], owners[order]
+
+        ta_all, k_all, blk_all, by_all = [], [], [], []
+        for cs, (ts, ag, ks, cells) in cand.items():
+            ts, ag = np.concatenate(ts), np.concatenate(ag)
+            ks, cells = np.concatenate(ks), np.concatenate(cells)
+            fw = fleet_grid(map_path, scale, cs)[0]
+            fp = footprint_cells(cells % fw, cells // fw, cs, base_w)
+            q = ts[:, None].astype(np.int64) * base_h * base_w + fp
+            i = np.minimum(np.searchsorted(keys, q), len(keys) - 1)
+            own = np.where(keys[i] == q, owners[i], -1)
+            own[own == ag[:, None]] = -1
+            big = np.where(own >= 0, own, N)
+            ta_all.append(ts.astype(np.int64) * N + ag)
+            k_all.append(ks)
+            blk_all.append((own >= 0).any(axis=1))
+            by_all.append(big.min(axis=1))
+        ta = np.concatenate(ta_all)
+        ks = np.concatenate(k_all)
+        blk = np.concatenate(blk_all)
+        by = np.concatenate(by_all)
+        n_desc = np.bincount(ta, minlength=steps * N)
+        n_blk = np.bincount(ta, weights=blk, minlength=steps * N)
+        blocked = ((n_desc > 0) & (n_desc == n_blk)).reshape(steps, N)
+        order = np.lexsort((ks, ta))
+        first = order[np.unique(ta[order], return_index=True)[1]]
+        sel = first[blocked.ravel()[ta[first]]]
+        nxt.ravel()[ta[sel]] = by[sel]
+
+    depth, stuck, on_cycle, cycles = resolve_chains(nxt)
+    chain = np.where(stuck, 0, depth)
+
+    n_active = int(active.sum())
+    stalled = blocked | oscillating
+    wait_len, wait_start = longest_run(blocked)
+    osc_len, osc_start = longest_run(oscillating)
+    cycle_steps = cycles > 0
+    cycle_runs = runs(cycle_steps)
+    out.update({
+        "active_steps": n_active,
+        "blocked_steps": int(blocked.sum()),
+        "oscillating_steps": int(oscillating.sum()),
+        "stall_share": round(stalled.sum() / n_active, 4) if n_active else 0.0,
+        "longest_wait": int(wait_len.max()),
+        "long_waits": int(sum(1 for a in range(N) for _, n in runs(blocked[:, a])
+                              if n >= min_wait)),
+        "max_chain": int(chain.max()),
+        "chain_steps": int((chain >= 2).any(axis=1).sum()),
+        "cycle_steps": int(cycle_steps.sum()),
+        "longest_cycle": max((n for _, n in cycle_runs), default=0),
+        "cycle_agents": int(on_cycle.any(axis=0).sum()),
+        "oscillating_agents": int(oscillating.any(axis=0).sum()),
+        "longest_oscillation": int(osc_len.max()),
+    })
+    out["severity"] = round(out["stall_share"] + cycle_steps.sum() / steps, 4)
+    detail = {"nxt": nxt, "blocked": blocked, "on_cycle": on_cycle,
+              "cycle_runs": cycle_runs, "wait_len": wait_len,
+              "wait_start": wait_start, "osc_len": osc_len,
+              "osc_start": osc_start, "dist": dist, "flat": flat}
+    return out, detail
+
+
+# ============================================================
+# Driver
+# ============================================================
+
+def analyze_file(task):
+    path, map_arg, scale, window, min_wait, keep = task
+    row = {"file": path}
+    try:
+        rep = parse_result(path)
+        map_path = resolve_map(rep["meta"], map_arg)
+        scale = scale or int(rep["meta"].get("map_scale", 0)) or None
+        row["map"] = os.path.basename(map_path)
+        row["solver"] = rep["meta"].get("solver", "")
+        metrics, detail = analyze(rep, map_path, scale, window, min_wait)
+        row.update(metrics)
+    except (OSError, KeyError, ValueError, IndexError) as e:
+        row["error"] = str(e)
+        return row, None
+    return row, ((rep, detail) if keep else None)
+
+
+def print_detail(row, rep, detail, top=5):
+    fleets, agent_fleet = rep["fleets"], rep["agent_fleet"]
+    cs_of = lambda a: fleets[int(agent_fleet[a])][0]  # noqa: E731
+    print(f"\n=== {row['file']} (severity {row['severity']}) ===")
+    nxt, dist = detail["nxt"], detail["dist"]
+    for start, n in sorted(detail["cycle_runs"], key=lambda r: -r[1])[:top]:
+        members = np.nonzero(detail["on_cycle"][start])[0].tolist()
+        print(f"  cycle t={start}..{start + n - 1} ({n} steps): agents {members}")
+    order = np.argsort(-detail["wait_len"])
+    for a in order[:top]:
+        n = int(detail["wait_len"][a])
+        if n == 0:
+            break
+        t = int(detail["wait_start"][a])
+        chain, b = [int(a)], int(a)
+        while nxt[t, b] != b and nxt[t, b] not in chain and len(chain) < 8:
+            b = int(nxt[t, b])
+            chain.append(b)
+        print(f"  agent {a} (cs={cs_of(a)}) blocked {n} steps from t={t} at "
+              f"dist {dist[t, a]}: waits " + " -> ".join(map(str, chain)))
+    order = np.argsort(-detail["osc_len"])
+    for a in order[:top]:
+        n = int(detail["osc_len"][a])
+        if n == 0:
+            break
+        t = int(detail["osc_start"][a])
+        cells = len(np.unique(detail["flat"][t:t + n, a]))
+        # distances within the run only: the step after it may be the goal
+        d = dist[t:t + n, a]
+        print(f"  agent {a} (cs={cs_of(a)}) oscillates {n} steps from t={t} "
+              f"over {cells} cells, dist {d[0]} -> {d[-1]} "
+              f"(range {d.min()}-{d.max()})")
+
+
+def expand(inputs):
+    paths = []
+    for p in inputs:
+        if os.path.isdir(p):
+            paths.extend(sorted(glob.glob(os.path.join(p, "**", "*result*.txt"),
+                                          recursive=True)))
+        else:
+            paths.extend(sorted(glob.glob(p)) or [p])
+    return paths
+
+
+COLUMNS = ["file", "map", "solver", "T", "N", "severity", "stall_share",
+           "active_steps", "blocked_steps", "oscillating_steps", "longest_wait",
+           "long_waits", "max_chain", "chain_steps", "cycle_steps",
+           "longest_cycle", "cycle_agents", "oscillating_agents",
+           "longest_oscillation", "error"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find deadlocks, wait chains and oscillation in result files")
+    parser.add_argument("results", nargs="+",
+                        help="result files, globs or directories (*result*.txt)")
+    parser.add_argument("-m", "--map", default=None,
+                        help="map file, or directory holding the recorded map names "
+                             "(default: recorded path, then benchmarks/maps)")
+    parser.add_argument("--map-scale", type=int, default=0,
+                        help="read the map at this scale (default: map_scale "
+                             "recorded in the result, else the map header)")
+    parser.add_argument("--window", type=int, default=20,
+                        help="oscillation window in timesteps")
+    parser.add_argument("--min-wait", type=int, default=10,
+                        help="blocked runs at least this long count as long waits")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument("--top", type=int, default=20, help="rows in the ranking")
+    parser.add_argument("--detail", type=int, default=0, metavar="K",
+                        help="print cycles, longest waits and oscillations "
+                             "of the K most severe replays")
+    parser.add_argument("--csv", default=None, help="write all rows to this file")
+    args = parser.parse_args()
+
+    paths = expand(args.results)
+    if not paths:
+        sys.exit("no result files")
+    keep = args.detail > 0
+    tasks = [(p, args.map, args.map_scale or None, args.window, args.min_wait, keep)
+             for p in paths]
+    if args.jobs > 1 and len(tasks) > 1:
+        with Pool(args.jobs) as pool:
+            chunk = max(1, len(tasks) // (4 * args.jobs))
+            done = pool.map(analyze_file, tasks, chunksize=chunk)
+    else:
+        done = [analyze_file(t) for t in tasks]
+
+    rows = [r for r, _ in done]
+    ok = sorted((i for i, r in enumerate(rows) if "error" not in r),
+                key=lambda i: -rows[i]["severity"])
+    failed = [r for r in rows if "error" in r]
+    print(f"{len(rows)} replays, {len(failed)} unreadable")
+    print(f"{'severity':>8} {'stall%':>6} {'wait':>5} {'chain':>5} {'cyc':>5} "
+          f"{'osc':>4}  file")
+    for i in ok[:args.top]:
+        r = rows[i]
+        print(f"{r['severity']:>8.3f} {100 * r['stall_share']:>5.1f}% "
+              f"{r['longest_wait']:>5} {r['max_chain']:>5} {r['cycle_steps']:>5} "
+              f"{r['oscillating_agents']:>4}  {r['file']}")
+    for r in failed[:10]:
+        print(f"  ! {r['file']}: {r['error']}")
+
+    for i in ok[:args.detail]:
+        rep, detail = done[i][1]
+        if detail is not None:
+            print_detail(rows[i], rep, detail)
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction="ignore")
+            w.writeheader()
+            w.writerows(rows)
+        print(f"\nWrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,31 @@ import argparse
 import random
 from collections import deque
 
+import numpy as np
 
-def load_map(path):
-    """Load a .map file. Returns (width, height, grid) where grid[y][x] is True if free."""
+
+class ScaledGrid(list):
+    """grid[y][x] of a map read at an integer scale.
+
+    Row y is map row y // scale widened scale times; the scale copies of a
+    row are one shared list, so this costs 1/scale of the upscaled grid.
+    map_rows keeps the map-resolution rows for build_fleet_grid.
+    """
+
+    def __init__(self, map_rows, scale):
+        wide = [[c for c in row for _ in range(scale)] for row in map_rows]
+        super().__init__(row for row in wide for _ in range(scale))
+        self.map_rows = map_rows
+        self.scale = scale
+
+
+def load_map(path, scale=None):
+    """Load a .map file. Returns (width, height, grid) where grid[y][x] is True if free.
+
+    A "scale N" header line, or `scale` (which overrides it), makes every map
+    cell N x N base cells, like --map-scale of the solvers. width and height
+    are then in base cells and grid is a ScaledGrid.
+    """
     with open(path) as f:
         lines = f.readlines()
     header = {}
@@ -36,6 +58,9 @@ def load_map(path):
     for i in range(grid_start, grid_start + height):
         row = lines[i].rstrip("\n\r")
         grid.append([c == "." for c in row])
+    scale = scale or max(1, int(header.get("scale", 1)))
+    if scale > 1:
+        return width * scale, height * scale, ScaledGrid(grid, scale)
     return width, height, grid
 
 
@@ -44,26 +69,22 @@ def build_fleet_grid(base_grid, width, height, cell_size):
 
     Fleet cell (fx,fy) covers base cells [fx*cs, (fx+1)*cs) x [fy*cs, (fy+1)*cs).
     Agent moves cell_size base cells per step.
-    A fleet cell is free if ALL cs*cs base cells are free.
+    A fleet cell is free if ALL cs*cs base cells are free; on a ScaledGrid
+    that is checked once per map cell the footprint touches.
     """
     fw = width // cell_size
     fh = height // cell_size
     if fw <= 0 or fh <= 0:
         return 0, 0, set()
+    s = getattr(base_grid, "scale", 1)
+    cells = base_grid.map_rows if s > 1 else base_grid
     free = set()
     for fy in range(fh):
+        rows = cells[fy * cell_size // s:((fy + 1) * cell_size - 1) // s + 1]
         for fx in range(fw):
-            ok = True
-            for dy in range(cell_size):
-                for dx in range(cell_size):
-                    bx = fx * cell_size + dx
-                    by = fy * cell_size + dy
-                    if bx >= width or by >= height or not base_grid[by][bx]:
-                        ok = False
-                        break
-                if not ok:
-                    break
-            if ok:
+            x0 = fx * cell_size // s
+            x1 = ((fx + 1) * cell_size - 1) // s + 1
+            if all(all(row[x0:x1]) for row in rows):
                 free.add((fx, fy))
     return fw, fh, free
 
@@ -129,85 +150,139 @@ def get_base_footprint(fx, fy, cell_size):
     return cells
 
 
-def place_agents(components, free_cells, cell_size, n_agents,
-                 occupied_starts, occupied_goals, rng):
+class Occupancy:
+    """Base-grid occupancy bitmap plus the fleet "valid anchor" masks derived
+    from it.
+
+    A mask is a (fh, fw) bool array over a fleet grid: True where the fleet
+    cell is a placement candidate whose footprint is still unoccupied.
+    reserve() marks a footprint on the bitmap and clears every overlapping
+    anchor of every registered mask with one slice assignment, so placement
+    never re-checks footprints.
+    """
+
+    def __init__(self, width, height):
+        self.bitmap = np.zeros((height, width), dtype=bool)
+        self.masks = []  # (cell_size, mask)
+
+    def anchor_mask(self, cells, cell_size):
+        """Register and return the anchor mask of `cells` (fleet coords)."""
+        height, width = self.bitmap.shape
+        fw = width // cell_size
+        fh = height // cell_size
+        mask = np.zeros((fh, fw), dtype=bool)
+        if cells:
+            xs, ys = zip(*cells)
+            mask[list(ys), list(xs)] = True
+        # anchors whose footprint already touches a reserved base cell
+        taken = self.bitmap[:fh * cell_size, :fw * cell_size]
+        taken = taken.reshape(fh, cell_size, fw, cell_size).any(axis=(1, 3))
+        mask &= ~taken
+        self.masks.append((cell_size, mask))
+        return mask
+
+    def reserve(self, fx, fy, cell_size):
+        """Mark the footprint of fleet cell (fx,fy) as occupied."""
+        bx0, by0 = fx * cell_size, fy * cell_size
+        bx1, by1 = bx0 + cell_size, by0 + cell_size
+        self.bitmap[by0:by1, bx0:bx1] = True
+        for cs, mask in self.masks:
+            mask[by0 // cs:(by1 - 1) // cs + 1,
+                 bx0 // cs:(bx1 - 1) // cs + 1] = False
+
+
+class AnchorPool:
+    """Uniform sampling from the cells of a pool that are still valid in an
+    anchor mask.
+
+    Invalid cells are swap-removed the first time they are drawn, so each
+    draw is amortized O(1) and sample() returns None only when no valid
+    anchor is left.
+    """
+
+    def __init__(self, cells, mask):
+        self.cells = list(cells)
+        self.mask = mask
+
+    def sample(self, rng):
+        cells = self.cells
+        while cells:
+            k = rng.randrange(len(cells))
+            fx, fy = cells[k]
+            if self.mask[fy, fx]:
+                return cells[k]
+            cells[k] = cells[-1]
+            cells.pop()
+        return None
+
+
+def fleet_degree(free_cells, fw, fh):
+    """(fh, fw) array of 4-neighbour counts on the fleet grid."""
+    free = np.zeros((fh, fw), dtype=np.int8)
+    if free_cells:
+        xs, ys = zip(*free_cells)
+        free[list(ys), list(xs)] = 1
+    deg = np.zeros_like(free)
+    deg[1:, :] += free[:-1, :]
+    deg[:-1, :] += free[1:, :]
+    deg[:, 1:] += free[:, :-1]
+    deg[:, :-1] += free[:, 1:]
+    return deg
+
+
+def place_agents(components, free_cells, cell_size, n_agents, occupancy, rng,
+                 avoid=None):
     """Place n_agents with non-overlapping starts and goals on the base grid.
 
-    All positions are checked for base-grid footprint overlap:
-    - Starts must not overlap any other agent's start footprint (cross-fleet)
-    - Starts must not overlap any other agent's goal footprint (cross-fleet)
-    - Goals must not overlap any other agent's goal footprint (cross-fleet)
-    - Goals must not overlap any other agent's start footprint (cross-fleet)
-    - Each agent's goal must be BFS-reachable from its start on the fleet graph
+    `occupancy` is the Occupancy shared by all fleets; it holds starts and
+    goals together, since a start may not overlap any start or goal and a
+    goal may not overlap any goal or start (cross-fleet).
+    Both endpoints come from the largest component, so every goal is
+    reachable from its start on the fleet graph. Goals avoid corridor cells
+    (<=2 neighbours, where a parked agent blocks the only path through)
+    unless no open cell is left. `avoid`, an optional (fh, fw) bool array
+    such as passages.goal_mask(), marks more cells goals treat that way.
 
     Returns list of (start_fleet, goal_fleet) tuples.
     """
     # use largest component
     comp = max(components, key=len)
+    mask = occupancy.anchor_mask(comp, cell_size)
+    deg = fleet_degree(free_cells, mask.shape[1], mask.shape[0])
+    xs, ys = zip(*comp)
+    is_open = deg[list(ys), list(xs)] > 2
+    if avoid is not None:
+        is_open &= ~avoid[list(ys), list(xs)]
+    is_open = is_open.tolist()
+    open_cells = [c for c, o in zip(comp, is_open) if o]
+    corridor_cells = [c for c, o in zip(comp, is_open) if not o]
+
+    starts = AnchorPool(comp, mask)
+    goals = AnchorPool(open_cells, mask)
+    fallback_goals = AnchorPool(corridor_cells, mask)
     placements = []
 
     for _ in range(n_agents):
-        candidates = list(comp)
-        rng.shuffle(candidates)
-
-        # find valid start: no overlap with any start OR any goal
-        start = None
-        for s in candidates:
-            fp = get_base_footprint(s[0], s[1], cell_size)
-            if fp & occupied_starts:
-                continue
-            if fp & occupied_goals:
-                continue
-            start = s
-            break
+        start = starts.sample(rng)
         if start is None:
             print(f"  Warning: could not place start (cs={cell_size}), "
-                  f"{len(occupied_starts)} start + "
-                  f"{len(occupied_goals)} goal base cells occupied")
+                  f"{int(occupancy.bitmap.sum())} base cells occupied")
             break
 
-        # find valid goal: no overlap with any goal, any start, own start,
-        # BFS-reachable from start, and avoid narrow corridor bottlenecks
-        goal = None
-        fallback_goal = None  # corridor cell, used only if no open cell found
-        start_fp = get_base_footprint(start[0], start[1], cell_size)
-        for g in candidates:
-            if g == start:
-                continue
-            gfp = get_base_footprint(g[0], g[1], cell_size)
-            # must not overlap with own start footprint
-            if gfp & start_fp:
-                continue
-            # must not overlap with any other agent's goal footprint
-            if gfp & occupied_goals:
-                continue
-            # must not overlap with any other agent's start footprint
-            if gfp & occupied_starts:
-                continue
-            # must be BFS-reachable from start on the fleet graph
-            if not bfs_reachable(start, g, free_cells):
-                continue
-            # avoid corridor bottlenecks: cells with <=2 neighbors where
-            # a parked agent blocks the only path through
-            n_neighbors = len(get_neighbors(g[0], g[1], free_cells))
-            if n_neighbors <= 2:
-                if fallback_goal is None:
-                    fallback_goal = g
-                continue
-            goal = g
-            break
+        # hide the start from the goal pools while the goal is drawn
+        mask[start[1], start[0]] = False
+        goal = goals.sample(rng)
         if goal is None:
-            goal = fallback_goal  # use corridor cell if no open cell available
-
+            goal = fallback_goals.sample(rng)
         if goal is None:
+            mask[start[1], start[0]] = True
             print(f"  Warning: could not find valid goal for agent at "
                   f"{start} (cs={cell_size})")
             break
 
         # reserve footprints
-        occupied_starts |= start_fp
-        goal_fp = get_base_footprint(goal[0], goal[1], cell_size)
-        occupied_goals |= goal_fp
+        occupancy.reserve(start[0], start[1], cell_size)
+        occupancy.reserve(goal[0], goal[1], cell_size)
         placements.append((start, goal))
 
     return placements
@@ -261,6 +336,9 @@ def main():
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
     parser.add_argument("--agents", type=str, default="10,5,3",
                         help="Comma-separated agent counts per fleet (cs=1,cs=2,cs=3)")
+    parser.add_argument("--avoid-passages", action="store_true",
+                        help="Keep goals off the narrow passages of every fleet "
+                             "(see passages.py) unless no other cell is left")
     args = parser.parse_args()
 
     rng = random.Random(args.seed)
@@ -294,8 +372,11 @@ def main():
 
     # place agents: largest cell_size first so large footprints get placed
     # before small agents fill gaps around them
-    occupied_starts = set()  # base-grid cells taken by starts
-    occupied_goals = set()   # base-grid cells taken by goals
+    occupancy = Occupancy(width, height)  # base cells taken by starts/goals
+    sizes = [cs for cs, _ in fleet_defs]
+    if args.avoid_passages:
+        from passages import map_passages
+        mp = map_passages(args.map)
     all_agents = []
 
     placement_order = sorted(range(len(fleet_defs)), key=lambda i: -fleet_defs[i][0])
@@ -305,8 +386,8 @@ def main():
         fw, fh, free, comps, cs, vel = fleet_grids[fi]
         n = agent_counts[fi]
         print(f"\nPlacing {n} agents for fleet {fi} (cs={cs})...")
-        placements = place_agents(comps, free, cs, n,
-                                   occupied_starts, occupied_goals, rng)
+        avoid = mp.goal_mask(cs, sizes) if args.avoid_passages else None
+        placements = place_agents(comps, free, cs, n, occupancy, rng, avoid)
         for start, goal in placements:
             # tiling: fleet coords; base top-left at (fx*cs, fy*cs)
             sx = start[0]
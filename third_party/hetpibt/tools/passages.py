@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""Narrow passages of every fleet grid of a map, and who competes for them.
+
+One summed-area table of the blocked base cells gives the free fleet cells
+of every cell size (a fleet cell is free when its cs x cs block sums to
+zero) and the clearance of every base cell (largest free k x k square,
+any offset, that covers it). On each fleet grid an iterative Tarjan DFS
+over flat arrays finds the articulation cells; 4-connected runs of them
+are the passages that fleet depends on. For a passage:
+
+  width   smallest clearance of its base cells (the min-cut width in base
+          cells, capped at twice the largest cell size)
+  side    free cells on the smaller side it cuts off
+  users   cell sizes whose free cells overlap its base cells; each other
+          user competes with the owning fleet for it
+
+Results are cached per (map, scale) and per cell size. crossings() answers
+for many agents at once which passages each one cannot avoid (its start
+and goal lie on different sides, or on the passage itself); the runtime
+predictor and the scenario generators use that and goal_mask().
+
+Usage:
+    python passages.py ../../../benchmarks/maps/bottleneck_doors_105.map
+    python passages.py room120.map --sizes 1,6,11 --top 5
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from gen_scenario import load_map
+
+_maps = {}
+
+
+def summed_area(a):
+    """(H+1, W+1) inclusive prefix sums with a zero first row and column."""
+    sat = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=np.int64)
+    sat[1:, 1:] = a.cumsum(axis=0).cumsum(axis=1)
+    return sat
+
+
+def box_sums(sat, k):
+    """Sums of all k x k windows; [y, x] is the window with top-left (x, y)."""
+    return sat[k:, k:] - sat[:-k, k:] - sat[k:, :-k] + sat[:-k, :-k]
+
+
+def articulation(nbr, free):
+    """Iterative Tarjan DFS over a fleet grid.
+
+    Returns (disc, sub, comp, cuts): DFS discovery index, subtree size and
+    component root per cell (-1 when blocked), and an (R, 2) array of
+    (cut cell, child) pairs such that removing the cut cell separates the
+    child's subtree, disc in [disc[child], disc[child] + sub[child]), from
+    the rest of the component.
+    """
+    V = len(nbr)
+    nb = nbr.tolist()
+    disc = [-1] * V
+    low = [0] * V
+    sub = [1] * V
+    parent = [-1] * V
+    comp = [-1] * V
+    cuts = []
+    timer = 0
+    for root in np.flatnonzero(free).tolist():
+        if disc[root] >= 0:
+            continue
+        disc[root] = low[root] = timer
+        timer += 1
+        comp[root] = root
+        stack = [[root, 0]]
+        root_cuts = []
+        while stack:
+            top = stack[-1]
+            v, i = top
+            if i < 4:
+                top[1] = i + 1
+                w = nb[v][i]
+                if w < 0:
+                    continue
+                if disc[w] < 0:
+                    parent[w] = v
+                    disc[w] = low[w] = timer
+                    timer += 1
+                    comp[w] = root
+                    stack.append([w, 0])
+                elif w != parent[v] and disc[w] < low[v]:
+                    low[v] = disc[w]
+                continue
+            stack.pop()
+            if not stack:
+                break
+            u = stack[-1][0]
+            sub[u] += sub[v]
+            if low[v] < low[u]:
+                low[u] = low[v]
+            if low[v] >= disc[u]:
+                (root_cuts if u == root else cuts).append((u, v))
+        if len(root_cuts) >= 2:  # the root cuts only with two DFS children
+            cuts.extend(root_cuts)
+    cuts = np.array(cuts, dtype=np.int64).reshape(-1, 2)
+    return (np.array(disc, dtype=np.int64), np.array(sub, dtype=np.int64),
+            np.array(comp, dtype=np.int64), cuts)
+
+
+class FleetPassages:
+    """Articulation cells and passages of one fleet grid."""
+
+    def __init__(self, blocked_sat, shape, cs):
+        H, W = shape
+        self.cs = cs
+        self.fw, self.fh = W // cs, H // cs
+        fw, fh = self.fw, self.fh
+        ys = np.arange(fh + 1) * cs
+        xs = np.arange(fw + 1) * cs
+        s = blocked_sat[np.ix_(ys, xs)]
+        self.free = (s[1:, 1:] - s[:-1, 1:] - s[1:, :-1] + s[:-1, :-1]) == 0
+        idx = np.arange(fh * fw, dtype=np.int64).reshape(fh, fw)
+        nbr = np.full((fh, fw, 4), -1, dtype=np.int64)
+        nbr[:, 1:, 0] = idx[:, :-1]
+        nbr[:, :-1, 1] = idx[:, 1:]
+        nbr[1:, :, 2] = idx[:-1, :]
+        nbr[:-1, :, 3] = idx[1:, :]
+        nbr = nbr.reshape(-1, 4)
+        flat = self.free.ravel()
+        edge = nbr >= 0
+        nbr[edge] = np.where(flat[nbr[edge]], nbr[edge], -1)
+        nbr[~flat] = -1
+        self.disc, self.sub, self.comp, self.cuts = articulation(nbr, flat)
+        self.art = np.zeros(fh * fw, dtype=bool)
+        self.art[self.cuts[:, 0]] = True
+        # passage id per articulation cell: 4-connected runs
+        self.passage_of = np.full(fh * fw, -1, dtype=np.int64)
+        self.passages = []  # lists of flat cells
+        for start in np.flatnonzero(self.art).tolist():
+            if self.passage_of[start] >= 0:
+                continue
+            pid = len(self.passages)
+            self.passage_of[start] = pid
+            cells, frontier = [start], [start]
+            while frontier:
+                nxt = []
+                for v in frontier:
+                    for w in nbr[v].tolist():
+                        if w >= 0 and self.art[w] and self.passage_of[w] < 0:
+                            self.passage_of[w] = pid
+                            cells.append(w)
+                            nxt.append(w)
+                frontier = nxt
+            self.passages.append(cells)
+        # smaller side cut off by each (cut, child) pair, then per passage
+        v, c = self.cuts[:, 0], self.cuts[:, 1]
+        side = np.minimum(self.sub[c], self.sub[self.comp[v]] - self.sub[c] - 1)
+        self.side = np.zeros(len(self.passages), dtype=np.int64)
+        np.maximum.at(self.side, self.passage_of[v], side)
+
+    def base_mask(self, cells, shape):
+        """(H, W) bool mask of the footprints of flat fleet cells."""
+        m = np.zeros((self.fh, self.fw), dtype=bool)
+        m.ravel()[cells] = True
+        cs = self.cs
+        out = np.zeros(shape, dtype=bool)
+        out[:self.fh * cs, :self.fw * cs] = m.repeat(cs, axis=0).repeat(cs, axis=1)
+        return out
+
+    def separated(self, s, g):
+        """(n, R) bool: cut row r lies on every path between s[i] and g[i]
+        (flat fleet cells), or the cut cell is s[i] or g[i] itself."""
+        if not len(self.cuts) or not len(s):
+            return np.zeros((len(s), len(self.cuts)), dtype=bool)
+        v, c = self.cuts[:, 0], self.cuts[:, 1]
+        lo, hi = self.disc[c], self.disc[c] + self.sub[c]
+        ds, dg = self.disc[s][:, None], self.disc[g][:, None]
+        in_s = (ds >= lo) & (ds < hi)
+        in_g = (dg >= lo) & (dg < hi)
+        same = (self.comp[s] == self.comp[g])[:, None] & (self.comp[s][:, None]
+                                                          == self.comp[v])
+        on = (s[:, None] == v) | (g[:, None] == v)
+        return same & ((in_s != in_g) | on)
+
+
+class MapPassages:
+    """Passages of all requested cell sizes of one map (see module doc)."""
+
+    def __init__(self, map_path, scale=None):
+        width, height, grid = load_map(map_path, scale)
+        rows = getattr(grid, "map_rows", grid)
+        s = getattr(grid, "scale", 1)
+        cells = np.zeros((height // s, width // s), dtype=bool)
+        for y, row in enumerate(rows):
+            cells[y, :len(row)] = row[:width // s]
+        self.free = cells.repeat(s, axis=0).repeat(s, axis=1)
+        self.sat = summed_area(~self.free)
+        self.fleets = {}
+        self._clearance = {}
+        self._table = None
+
+    @property
+    def shape(self):
+        return self.free.shape
+
+    def fleet(self, cs):
+        if cs not in self.fleets:
+            self.fleets[cs] = FleetPassages(self.sat, self.shape, cs)
+        return self.fleets[cs]
+
+    def clearance(self, max_k):
+        """(H, W) largest k <= max_k such that a free k x k square covers
+        the cell (0 on blocked cells)."""
+        if max_k not in self._clearance:
+            H, W = self.shape
+            clear = np.zeros(self.shape, dtype=np.int64)
+            for k in range(1, min(max_k, H, W) + 1):
+                anchors = (box_sums(self.sat, k) == 0).astype(np.int64)
+                # cell covered when some anchor lies in the k x k box ending at it
+                cover = box_sums(summed_area(np.pad(anchors, k - 1)), k)
+                clear[cover > 0] = k
+            self._clearance[max_k] = clear
+        return self._clearance[max_k]
+
+    def table(self, sizes):
+        """Passage rows of all `sizes`, one dict per passage, and the global
+        (P, P) matrix of passages whose base cells overlap."""
+        sizes = sorted(set(sizes))
+        if self._table is not None and self._table[0] == sizes:
+            return self._table[1], self._table[2]
+        fleets = [self.fleet(cs) for cs in sizes]
+        usable = {f.cs: f.base_mask(np.flatnonzero(f.free), self.shape)
+                  for f in fleets}
+        clear = self.clearance(2 * max(sizes))
+        rows, masks = [], []
+        for f in fleets:
+            for pid, cells in enumerate(f.passages):
+                base = f.base_mask(cells, self.shape)
+                ys, xs = np.nonzero(base)
+                rows.append({
+                    "cs": f.cs, "pid": pid, "cells": len(cells),
+                    "x": int(xs.min()), "y": int(ys.min()),
+                    "x1": int(xs.max()), "y1": int(ys.max()),
+                    "width": int(clear[base].min()), "side": int(f.side[pid]),
+                    "users": [cs for cs in sizes if (usable[cs] & base).any()],
+                })
+                masks.append(base.ravel())
+        m = np.array(masks, dtype=bool).reshape(len(masks), self.free.size)
+        overlap = (m.astype(np.int64) @ m.T.astype(np.int64)) > 0
+        self._table = (sizes, rows, overlap, m)
+        return rows, overlap
+
+    def masks(self, sizes):
+        """(P, H * W) bool base cells of the passages of table(sizes)."""
+        self.table(sizes)
+        return self._table[3]
+
+    def crossings(self, cs, s, g, sizes=None):
+        """(n, P) bool over the global passages of table(sizes): passages
+        agent i (cell size cs[i], fleet cells s[i], g[i] as (x, y)) cannot
+        avoid."""
+        cs, s, g = np.asarray(cs), np.asarray(s), np.asarray(g)
+        sizes = sorted(set(sizes or []) | set(cs.tolist()))
+        rows, _ = self.table(sizes)
+        offset, start = {}, 0
+        for size in sizes:
+            offset[size] = start
+            start += len(self.fleet(size).passages)
+        out = np.zeros((len(cs), len(rows)), dtype=bool)
+        for size in np.unique(cs).tolist():
+            f = self.fleet(size)
+            sel = np.flatnonzero(cs == size)
+            fs = s[sel, 1] * f.fw + s[sel, 0]
+            fg = g[sel, 1] * f.fw + g[sel, 0]
+            ok = (s[sel, 0] < f.fw) & (s[sel, 1] < f.fh) & (g[sel, 0] < f.fw) \
+                & (g[sel, 1] < f.fh)
+            fs, fg = np.where(ok, fs, 0), np.where(ok, fg, 0)
+            sep = f.separated(fs, fg) & ok[:, None]
+            if not sep.shape[1]:
+                continue
+            pid = f.passage_of[f.cuts[:, 0]]
+            hit = np.zeros((len(sel), len(f.passages)), dtype=bool)
+            ii, rr = np.nonzero(sep)
+            hit[ii, pid[rr]] = True
+            out[sel, offset[size]:offset[size] + len(f.passages)] = hit
+        return out
+
+    def goal_mask(self, cs, sizes):
+        """(fh, fw) bool: fleet cells of size cs whose footprint touches a
+        passage of any of `sizes`; a goal parked there blocks that fleet."""
+        rows, _ = self.table(sizes)
+        f = self.fleet(cs)
+        touched = np.zeros(self.shape, dtype=bool)
+        for size in sorted(set(sizes)):
+            p = self.fleet(size)
+            touched |= p.base_mask(np.flatnonzero(p.art), self.shape)
+        H, W = f.fh * cs, f.fw * cs
+        return touched[:H, :W].reshape(f.fh, cs, f.fw, cs).any(axis=(1, 3))
+
+
+def map_passages(map_path, scale=None):
+    """Cached MapPassages of a map."""
+    key = (str(map_path), scale)
+    if key not in _maps:
+        _maps[key] = MapPassages(map_path, scale)
+    return _maps[key]
+
+
+def competition(cs, crossed, overlap):
+    """(n,) bool: agent i has an unavoidable passage that overlaps one of
+    an agent of another cell size."""
+    cs = np.asarray(cs)
+    if not crossed.shape[1]:
+        return np.zeros(len(cs), dtype=bool)
+    x = crossed.astype(np.int64)
+    shared = (x @ overlap.astype(np.int64) @ x.T) > 0
+    return (shared & (cs[:, None] != cs[None, :])).any(axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Narrow passages of every fleet grid and which fleets compete")
+    parser.add_argument("map")
+    parser.add_argument("--map-scale", type=int, default=0)
+    parser.add_argument("--sizes", default="1,3,5,7",
+                        help="comma-separated cell sizes")
+    parser.add_argument("--top", type=int, default=10,
+                        help="passages listed per cell size (by side)")
+    parser.add_argument("--min-side", type=int, default=2,
+                        help="hide passages that cut off fewer free cells")
+    args = parser.parse_args()
+
+    sizes = sorted({int(x) for x in args.sizes.split(",")})
+    mp = map_passages(args.map, args.map_scale or None)
+    rows, overlap = mp.table(sizes)
+    H, W = mp.shape
+    print(f"Map: {W}x{H} base cells, {int(mp.free.sum())} free")
+    for cs in sizes:
+        f = mp.fleet(cs)
+        n_comp = len(np.unique(f.comp[f.comp >= 0]))
+        mine = [r for r in rows if r["cs"] == cs and r["side"] >= args.min_side]
+        print(f"\ncs={cs}: {f.fw}x{f.fh} fleet grid, {int(f.free.sum())} free, "
+              f"{n_comp} components, {int(f.art.sum())} articulation cells, "
+              f"{len(mine)} passages (side >= {args.min_side})")
+        for r in sorted(mine, key=lambda r: -r["side"])[:args.top]:
+            others = [u for u in r["users"] if u != cs]
+            print(f"  base ({r['x']},{r['y']})-({r['x1']},{r['y1']}) "
+                  f"width {r['width']:>2}, cuts off {r['side']:>5}, "
+                  f"{r['cells']} cells, shared with cs {others or '-'}")
+
+    # fleet pairs: passages of one fleet that another can enter
+    print("\ncompeting pairs (passages of the row fleet usable by the column fleet):")
+    print("      " + "".join(f"{'cs' + str(cs):>7}" for cs in sizes))
+    for a in sizes:
+        counts = [sum(1 for r in rows if r["cs"] == a and r["side"] >= args.min_side
+                      and b in r["users"]) if b != a else 0 for b in sizes]
+        print(f"{'cs' + str(a):>6}" + "".join(f"{n:>7}" for n in counts))
+
+
+if __name__ == "__main__":
+    sys.exit(main() or 0)
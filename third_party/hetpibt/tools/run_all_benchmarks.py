@@ -28,7 +28,9 @@ SCENS_DIR = os.path.join(BENCH_DIR, "scenarios")
 RESULTS_DIR = os.path.join(BENCH_DIR, "results")
 
 SOLVER = os.path.join(ROOT_DIR, "build", "Release", "main.exe")
-CONVERT_SCRIPT = os.path.join(GENERATORS_DIR, "convert_to_hetbench.py")
+
+sys.path.insert(0, GENERATORS_DIR)
+import scen_convert  # noqa: E402
 
 FLEET_CS = [1, 3, 7, 11]
 
@@ -58,14 +60,9 @@ MAP_TYPES = {
 
 
 def convert_scen(scen_path, map_path, output_path):
-    """Convert .scen to het_bench format using convert_to_hetbench.py."""
-    cmd = [sys.executable, CONVERT_SCRIPT,
-           "--scen", scen_path, "--map", map_path, "--output", output_path]
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-    if result.returncode != 0:
-        print(f"  CONVERT ERROR: {result.stderr.strip()}")
-        return False
-    return True
+    """Convert .scen to het_bench format (scen_convert, in-process)."""
+    return scen_convert.ensure(
+        scen_convert.Job("hetbench", scen_path, output_path, map_path))
 
 
 def run_solver(map_path, scen_path, result_path, max_steps=500, goal_lock=True):
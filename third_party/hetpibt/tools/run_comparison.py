@@ -3,7 +3,7 @@
 
 Both solvers now use the non-overlapping tiling model:
   - pibt_rs: reads base map + applies map_scale internally
-  - ours: reads a pre-scaled map (base x map_scale)
+  - ours: reads the same base map with --map-scale (no upscaled copy)
 
 Metrics: goals reached, SOC, makespan, wait ratio, per-fleet breakdowns.
 Invalid agents (our solver excludes them) are normalized out of both counts.
@@ -28,7 +28,6 @@ PIBT_RS_BENCHMARK = os.path.join(PIBT_RS_DIR, "target", "release", "examples", "
 
 BASE_MAP = os.path.join(PYPIBT_DIR, "assets", "room-64-64-8.map")
 HET_BENCH_DIR = os.path.join(PYPIBT_DIR, "het_bench")
-SCALED_MAP = os.path.join(ROOT_DIR, "build", "room64_scaled.map")
 
 CARGO_BIN = os.path.join(os.path.expanduser("~"), ".cargo", "bin")
 MAP_SCALE = 10
@@ -36,45 +35,6 @@ MAP_SCALE = 10
 FLEET_CS = [1, 6, 11]  # het_bench fleet cell sizes
 
 
-def create_scaled_map(base_map, scale, output_map):
-    """Create a scaled-up version of a .map file."""
-    with open(base_map) as f:
-        lines = f.readlines()
-
-    width = height = 0
-    grid_start = 0
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        if stripped == "map":
-            grid_start = i + 1
-            break
-        parts = stripped.split()
-        if len(parts) == 2:
-            if parts[0] == "width":
-                width = int(parts[1])
-            elif parts[0] == "height":
-                height = int(parts[1])
-
-    grid = []
-    for i in range(grid_start, grid_start + height):
-        row = lines[i].rstrip('\n\r')
-        grid.append(row)
-
-    new_w = width * scale
-    new_h = height * scale
-    with open(output_map, 'w') as f:
-        f.write("type octile\n")
-        f.write(f"height {new_h}\n")
-        f.write(f"width {new_w}\n")
-        f.write("map\n")
-        for row in grid:
-            scaled_row = ''.join(c * scale for c in row)
-            for _ in range(scale):
-                f.write(scaled_row + '\n')
-
-    return new_w, new_h
-
-
 def parse_scen(scen_path):
     """Parse het_bench scenario. Returns list of (fleet_id, cs, sx, sy, gx, gy)."""
     agents = []
@@ -118,7 +78,8 @@ def run_pibt_rs(scen_file, max_steps=500):
 
 def run_ours(scen_file, result_file, max_steps=500):
     """Run our solver, save result file, parse stdout + result."""
-    cmd = [OUR_SOLVER, "-m", SCALED_MAP, "-s", scen_file, "-v", "1",
+    cmd = [OUR_SOLVER, "-m", BASE_MAP, "--map-scale", str(MAP_SCALE),
+           "-s", scen_file, "-v", "1",
            "--max_timesteps", str(max_steps), "--swap-xy", "--goal-lock",
            "-o", result_file]
     try:
@@ -305,11 +266,6 @@ def main():
             print(f"ERROR: {name} not found at {path}")
             sys.exit(1)
 
-    # Create scaled map
-    print(f"Creating {MAP_SCALE}x scaled map...")
-    sw, sh = create_scaled_map(BASE_MAP, MAP_SCALE, SCALED_MAP)
-    print(f"  Scaled map: {sw}x{sh}")
-
     # Collect het_bench scenarios
     scen_files = sorted(
         [f for f in os.listdir(HET_BENCH_DIR) if f.endswith('.scen')],
@@ -322,7 +278,7 @@ def main():
     print(f"\n{'='*120}")
     print(f"Het-bench comparison: room-64-64-8, 3 fleets (cs=1,6,11)")
     print(f"Both solvers use non-overlapping tiling model. Max steps: {max_steps}")
-    print(f"pibt_rs: base 64x64 + scale={MAP_SCALE}  |  ours: pre-scaled {sw}x{sh} + --goal-lock + --swap-xy")
+    print(f"pibt_rs: base 64x64 + scale={MAP_SCALE}  |  ours: --map-scale {MAP_SCALE} + --goal-lock + --swap-xy")
     print(f"{'='*120}")
 
     # ---- TABLE 1: Main comparison ----
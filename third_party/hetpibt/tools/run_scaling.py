@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Scale HetPIBT to failure: run increasing agent counts until the solver breaks.
 
-Generates randomized scenarios on room-64-64-8 (640x640 scaled) with 3 fleet types
+Generates randomized scenarios on room-64-64-8 (640x640 via --map-scale) with 3 fleet types
 (cs=1, cs=6, cs=11), runs the solver, and records per-scenario metrics.
 
 Fleet composition: ~50% small (cs=1), ~30% medium (cs=6), ~20% large (cs=11)
@@ -22,16 +22,17 @@ import time
 from collections import deque
 from pathlib import Path
 
+from gen_scenario import Occupancy, build_fleet_grid, load_map, place_agents
+
 # === Paths ===
 SCRIPT_DIR = Path(__file__).resolve().parent
 ROOT_DIR = SCRIPT_DIR.parent
 PYPIBT_DIR = ROOT_DIR.parent / "pypibt"
 SOLVER = ROOT_DIR / "build" / "Release" / "main.exe"
 BASE_MAP = PYPIBT_DIR / "assets" / "room-64-64-8.map"
-SCALED_MAP = ROOT_DIR / "build" / "room64_scaled.map"
 RESULTS_DIR = ROOT_DIR / "scaling_results"
 
-MAP_SCALE = 10
+MAP_SCALE = 10  # base cells per map cell, passed to the solver as --map-scale
 
 # Fleet definitions: (cell_size, speed_counter)
 # speed_counter = how many timesteps per fleet-cell move
@@ -53,70 +54,6 @@ FLEET_RATIOS = [0.50, 0.30, 0.20]  # cs=1, cs=6, cs=11
 # Scenario generation (adapted from gen_scenario.py)
 # ============================================================
 
-def load_map(path):
-    """Load a .map file. Returns (width, height, grid) where grid[y][x] is True if free."""
-    with open(path) as f:
-        lines = f.readlines()
-    header = {}
-    grid_start = 0
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if line == "map":
-            grid_start = i + 1
-            break
-        parts = line.split()
-        if len(parts) == 2:
-            header[parts[0]] = parts[1]
-    width = int(header["width"])
-    height = int(header["height"])
-    grid = []
-    for i in range(grid_start, grid_start + height):
-        row = lines[i].rstrip("\n\r")
-        grid.append([c == "." for c in row])
-    return width, height, grid
-
-
-def create_scaled_map(base_map, scale, output_map):
-    """Create a scaled-up version of a .map file."""
-    width, height, grid = load_map(str(base_map))
-    new_w = width * scale
-    new_h = height * scale
-    with open(output_map, 'w') as f:
-        f.write("type octile\n")
-        f.write(f"height {new_h}\n")
-        f.write(f"width {new_w}\n")
-        f.write("map\n")
-        for row in grid:
-            scaled_row = ''.join(('.' if c else '@') * scale for c in row)
-            for _ in range(scale):
-                f.write(scaled_row + '\n')
-    return new_w, new_h
-
-
-def build_fleet_grid(base_grid, width, height, cell_size):
-    """Build non-overlapping tiling fleet grid. Returns (fw, fh, free_cells_set)."""
-    fw = width // cell_size
-    fh = height // cell_size
-    if fw <= 0 or fh <= 0:
-        return 0, 0, set()
-    free = set()
-    for fy in range(fh):
-        for fx in range(fw):
-            ok = True
-            for dy in range(cell_size):
-                for dx in range(cell_size):
-                    bx = fx * cell_size + dx
-                    by = fy * cell_size + dy
-                    if bx >= width or by >= height or not base_grid[by][bx]:
-                        ok = False
-                        break
-                if not ok:
-                    break
-            if ok:
-                free.add((fx, fy))
-    return fw, fh, free
-
-
 def get_neighbors(fx, fy, free_cells):
     result = []
     for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
@@ -164,79 +101,6 @@ def bfs_distance(start, goal, free_cells):
     return -1  # unreachable
 
 
-def get_base_footprint(fx, fy, cell_size):
-    cells = set()
-    for dy in range(cell_size):
-        for dx in range(cell_size):
-            cells.add((fx * cell_size + dx, fy * cell_size + dy))
-    return cells
-
-
-def place_agents(components, free_cells, cell_size, n_agents,
-                 occupied_starts, occupied_goals, rng):
-    """Place n_agents with non-overlapping starts and goals on the base grid.
-
-    Optimized: skip BFS reachability (both start & goal are from the same
-    connected component, so always reachable). Sample random candidates
-    instead of shuffling the full list.
-    """
-    comp = max(components, key=len)
-    comp_list = list(comp)
-    n_comp = len(comp_list)
-    MAX_TRIES = min(2000, n_comp)
-    placements = []
-
-    for _ in range(n_agents):
-        sample = rng.sample(comp_list, MAX_TRIES)
-
-        start = None
-        for s in sample:
-            fp = get_base_footprint(s[0], s[1], cell_size)
-            if fp & occupied_starts:
-                continue
-            if fp & occupied_goals:
-                continue
-            start = s
-            break
-        if start is None:
-            break
-
-        goal = None
-        fallback_goal = None
-        start_fp = get_base_footprint(start[0], start[1], cell_size)
-        goal_sample = rng.sample(comp_list, MAX_TRIES)
-        for g in goal_sample:
-            if g == start:
-                continue
-            gfp = get_base_footprint(g[0], g[1], cell_size)
-            if gfp & start_fp:
-                continue
-            if gfp & occupied_goals:
-                continue
-            if gfp & occupied_starts:
-                continue
-            # Skip BFS — both cells are in same connected component
-            n_neighbors = len(get_neighbors(g[0], g[1], free_cells))
-            if n_neighbors <= 2:
-                if fallback_goal is None:
-                    fallback_goal = g
-                continue
-            goal = g
-            break
-        if goal is None:
-            goal = fallback_goal
-
-        if goal is None:
-            break
-
-        occupied_starts |= start_fp
-        goal_fp = get_base_footprint(goal[0], goal[1], cell_size)
-        occupied_goals |= goal_fp
-        placements.append((start, goal))
-
-    return placements
-
-
 def generate_scenario(map_grid, map_w, map_h, agent_counts, fleet_defs, seed,
                       prebuilt_fleet_grids=None):
     """Generate a scenario. Returns (agents, placed, requested, all_placed, fleet_grids)."""
@@ -251,8 +115,7 @@ def generate_scenario(map_grid, map_w, map_h, agent_counts, fleet_defs, seed,
             comps = flood_fill(free)
             fleet_grids.append((fw, fh, free, comps, cs, vel))
 
-    occupied_starts = set()
-    occupied_goals = set()
+    occupancy = Occupancy(map_w, map_h)
     all_agents = []
 
     # Place largest first
@@ -269,8 +132,7 @@ def generate_scenario(map_grid, map_w, map_h, agent_counts, fleet_defs, seed,
         if not comps:
             placed[fi] = 0
             continue
-        placements = place_agents(comps, free, cs, n,
-                                   occupied_starts, occupied_goals, rng)
+        placements = place_agents(comps, free, cs, n, occupancy, rng)
         placed[fi] = len(placements)
         for start, goal in placements:
             sx, sy = start
@@ -333,7 +195,8 @@ def compute_horizon(agents, fleet_grids, min_horizon=1500):
 
 def run_solver(scen_file, result_file, max_steps, time_limit):
     """Run our solver and parse output. No --swap-xy needed for gen_scenario.py output."""
-    cmd = [str(SOLVER), "-m", str(SCALED_MAP), "-s", str(scen_file), "-v", "1",
+    cmd = [str(SOLVER), "-m", str(BASE_MAP), "--map-scale", str(MAP_SCALE),
+           "-s", str(scen_file), "-v", "1",
            "--max_timesteps", str(max_steps), "--goal-lock",
            "--time_limit", str(time_limit),
            "-o", str(result_file)]
@@ -550,14 +413,9 @@ def main():
         print(f"ERROR: base map not found at {BASE_MAP}")
         sys.exit(1)
 
-    # Ensure scaled map exists
-    if not SCALED_MAP.exists():
-        print(f"Creating {MAP_SCALE}x scaled map...")
-        create_scaled_map(BASE_MAP, MAP_SCALE, str(SCALED_MAP))
-
-    # Load scaled map for scenario generation
+    # Load the map at MAP_SCALE for scenario generation
     print("Loading scaled map...", flush=True)
-    map_w, map_h, map_grid = load_map(str(SCALED_MAP))
+    map_w, map_h, map_grid = load_map(str(BASE_MAP), MAP_SCALE)
     print(f"  Scaled map: {map_w}x{map_h}", flush=True)
 
     # Pre-compute fleet grids (reused across all scenarios)
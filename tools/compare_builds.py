@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Statistical performance comparison of two het_rt_lacam builds.
+
+Runs a baseline and a candidate binary on the same scenario set with R
+repetitions each. Runs are interleaved: every repetition visits the
+scenarios in a fresh shuffled order and runs both builds back to back in a
+random order, so thermal/load drift hits both builds alike.
+
+Per scenario:
+  - runtime (solver comp_time of solved runs): median ratio cand/base with a
+    bootstrap confidence interval and a two-sided Mann-Whitney U test,
+    p-values corrected across scenarios with Benjamini-Hochberg;
+  - solve rate: two-sided Fisher exact test on solved/failed counts.
+
+A runtime change is reported when its corrected p-value is below --alpha,
+the CI excludes 1 and the median moved by at least --min-effect. The
+markdown report ranks slowdowns, speedups and solve-rate changes; the raw
+per-run samples go to a CSV next to it, so a report can be rebuilt with
+--from-csv without re-running anything (pass the same --base-name and
+--cand-name; the roles are not taken from the CSV row order).
+
+Usage:
+    python tools/compare_builds.py \
+        --base het_rt_lacam/build_old/Release/main.exe \
+        --cand het_rt_lacam/build/Release/main.exe \
+        --category bottleneck_doors --category het_bench -r 7 -t 30
+
+    python tools/compare_builds.py --base-name old --cand-name new --from-csv \
+        benchmarks/results/regression/old_vs_new_runs.csv
+"""
+import argparse
+import csv
+import math
+import os
+import random
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path("E:/gb")
+OUT_DIR = ROOT / "benchmarks" / "results" / "regression"
+
+sys.path.insert(0, str(ROOT / "tools"))
+sys.path.insert(0, str(ROOT / "benchmarks" / "results" / "rt_lacam"))
+import results_db  # noqa: E402
+from run_portfolio import parse_result_file  # noqa: E402
+from run_rt import AGENT_COUNTS, discover_105, discover_het_bench  # noqa: E402
+
+CATEGORIES = ["bottleneck_doors", "corridor_speed", "intersection",
+              "cooperative_clearing", "het_bench"]
+
+RUN_FIELDS = [
+    "build", "category", "agent_label", "scen_id", "rep",
+    "solved", "soc", "makespan", "runtime_ms", "wall_ms",
+]
+
+N_BOOTSTRAP = 2000
+
+
+# ---------------------------------------------------------------------------
+# running
+# ---------------------------------------------------------------------------
+
+def discover(categories, agent_labels):
+    scenarios = []
+    for cat in categories:
+        found = discover_het_bench() if cat == "het_bench" else discover_105(cat)
+        scenarios.extend(s for s in found
+                         if cat == "het_bench" or s["agent_label"] in agent_labels)
+    return scenarios
+
+
+def run_one(exe, scen, timeout_s, flags, seed, out_path):
+    """One solver run. Returns (result dict from the -o file, wall ms)."""
+    cmd = [
+        str(exe),
+        "-m", scen["map_path"],
+        "-i", scen["scen_path"],
+        "-s", str(seed),
+        "-t", str(timeout_s),
+        "-v", "0",
+        "-l",
+        "-o", out_path,
+    ]
+    if scen["swap_xy"]:
+        cmd.append("--swap-xy")
+    cmd.extend(shlex.split(flags))
+
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    t0 = time.time()
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL, timeout=timeout_s + 10)
+        ok = proc.returncode == 0
+    except subprocess.TimeoutExpired:
+        ok = False
+    wall_ms = round((time.time() - t0) * 1000)
+    r = parse_result_file(out_path)
+    r["solved"] = r["solved"] and ok
+    return r, wall_ms
+
+
+def run_interleaved(builds, scenarios, reps, timeout_s, flags, seed, writer):
+    """Run every (scenario, build) pair `reps` times, interleaved.
+
+    `builds` maps build name -> exe. Rows are written to `writer` as they
+    come in and returned as a list.
+    """
+    rng = random.Random(seed)
+    names = list(builds)
+    tmp_dir = tempfile.mkdtemp(prefix="compare_builds_")
+    out_path = os.path.join(tmp_dir, "result.txt")
+    rows = []
+    total = reps * len(scenarios) * len(names)
+    done = 0
+    for rep in range(reps):
+        order = list(scenarios)
+        rng.shuffle(order)
+        for scen in order:
+            pair = list(names)
+            rng.shuffle(pair)
+            for name in pair:
+                r, wall_ms = run_one(builds[name], scen, timeout_s, flags,
+                                     seed, out_path)
+                row = {
+                    "build": name,
+                    "category": scen["category"],
+                    "agent_label": scen["agent_label"],
+                    "scen_id": scen["scen_id"],
+                    "rep": rep,
+                    "solved": r["solved"],
+                    "soc": r["soc"],
+                    "makespan": r["makespan"],
+                    "runtime_ms": r["comp_time_ms"],
+                    "wall_ms": wall_ms,
+                }
+                writer.writerow(row)
+                rows.append(row)
+                done += 1
+                status = f"{r['comp_time_ms']:.0f}ms" if r["solved"] else "FAIL"
+                print(f"  [{done}/{total}] rep {rep} {name:<5} "
+                      f"{scen['category']}/{scen['agent_label']}/{scen['scen_id']}"
+                      f"  {status}", flush=True)
+    if os.path.exists(out_path):
+        os.remove(out_path)
+    os.rmdir(tmp_dir)
+    return rows
+
+
+def load_runs(path):
+    rows = []
+    with open(path) as f:
+        for r in csv.DictReader(f):
+            r["solved"] = r["solved"] == "True"
+            r["runtime_ms"] = float(r["runtime_ms"])
+            rows.append(r)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# statistics
+# ---------------------------------------------------------------------------
+
+def mann_whitney(x, y):
+    """Two-sided Mann-Whitney U test (normal approximation, tie-corrected).
+
+    Returns (U of x, p-value).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n1, n2 = len(x), len(y)
+    both = np.concatenate([x, y])
+    # average ranks
+    order = np.argsort(both, kind="mergesort")
+    ranks = np.empty(len(both))
+    ranks[order] = np.arange(1, len(both) + 1)
+    _, inv, counts = np.unique(both, return_inverse=True, return_counts=True)
+    ranks = (np.bincount(inv, weights=ranks) / counts)[inv]
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    tie = (counts ** 3 - counts).sum() / (n * (n - 1))
+    var = n1 * n2 / 12 * ((n + 1) - tie)
+    if var <= 0:
+        return u, 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(var)
+    return u, min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def bootstrap_ratio_ci(base, cand, rng, level=0.95):
+    """Percentile bootstrap CI of median(cand) / median(base)."""
+    base = np.asarray(base, dtype=float)
+    cand = np.asarray(cand, dtype=float)
+    b = rng.choice(base, size=(N_BOOTSTRAP, len(base)))
+    c = rng.choice(cand, size=(N_BOOTSTRAP, len(cand)))
+    ratios = np.median(c, axis=1) / np.maximum(np.median(b, axis=1), 1e-9)
+    lo, hi = np.percentile(ratios, [50 * (1 - level), 50 * (1 + level)])
+    return lo, hi
+
+
+def fisher_exact(a, b, c, d):
+    """Two-sided Fisher exact test of the 2x2 table [[a, b], [c, d]]."""
+    row1, col1, n = a + b, a + c, a + b + c + d
+
+    def prob(k):
+        return (math.comb(col1, k) * math.comb(n - col1, row1 - k)
+                / math.comb(n, row1))
+
+    p_obs = prob(a)
+    ks = range(max(0, row1 + col1 - n), min(row1, col1) + 1)
+    return min(1.0, sum(prob(k) for k in ks if prob(k) <= p_obs * (1 + 1e-7)))
+
+
+def benjamini_hochberg(pvalues):
+    """BH-adjusted p-values, same order as the input."""
+    p = np.asarray(pvalues, dtype=float)
+    if len(p) == 0:
+        return p
+    order = np.argsort(p)
+    adj = p[order] * len(p) / np.arange(1, len(p) + 1)
+    adj = np.minimum.accumulate(adj[::-1])[::-1]
+    out = np.empty(len(p))
+    out[order] = np.minimum(adj, 1.0)
+    return out
+
+
+def compare(rows, base, cand, alpha, min_effect, seed):
+    """Per-scenario comparison records, with significance flags set."""
+    by_key = defaultdict(lambda: {base: [], cand: []})
+    for r in rows:
+        k = (r["category"], r["agent_label"], r["scen_id"])
+        by_key[k][r["build"]].append(r)
+
+    rng = np.random.default_rng(seed)
+    records = []
+    for k in sorted(by_key):
+        runs = by_key[k]
+        rb, rc = runs[base], runs[cand]
+        if not rb or not rc:
+            continue
+        tb = [r["runtime_ms"] for r in rb if r["solved"]]
+        tc = [r["runtime_ms"] for r in rc if r["solved"]]
+        sb, sc = len(tb), len(tc)
+        rec = {
+            "key": k, "n_base": len(rb), "n_cand": len(rc),
+            "solved_base": sb, "solved_cand": sc,
+            "p_solve": fisher_exact(sb, len(rb) - sb, sc, len(rc) - sc),
+            "ratio": None, "ci": None, "p_time": None,
+        }
+        if sb >= 3 and sc >= 3:
+            rec["med_base"] = float(np.median(tb))
+            rec["med_cand"] = float(np.median(tc))
+            rec["ratio"] = rec["med_cand"] / max(rec["med_base"], 1e-9)
+            rec["ci"] = bootstrap_ratio_ci(tb, tc, rng)
+            _, rec["p_time"] = mann_whitney(tc, tb)
+        records.append(rec)
+
+    timed = [r for r in records if r["p_time"] is not None]
+    for rec, q in zip(timed, benjamini_hochberg([r["p_time"] for r in timed])):
+        rec["q_time"] = q
+    for rec in records:
+        rec["time_change"] = None
+        if rec["p_time"] is None:
+            continue
+        lo, hi = rec["ci"]
+        if rec["q_time"] >= alpha or abs(rec["ratio"] - 1) < min_effect:
+            continue
+        if lo > 1:
+            rec["time_change"] = "slowdown"
+        elif hi < 1:
+            rec["time_change"] = "speedup"
+    for rec in records:
+        rec["solve_change"] = None
+        if rec["p_solve"] < alpha:
+            better = rec["solved_cand"] / rec["n_cand"] > rec["solved_base"] / rec["n_base"]
+            rec["solve_change"] = "gain" if better else "loss"
+    return records
+
+
+# ---------------------------------------------------------------------------
+# report
+# ---------------------------------------------------------------------------
+
+def write_report(records, path, base, cand, meta, alpha, min_effect):
+    lines = []
+
+    def w(s=""):
+        lines.append(s)
+
+    slow = sorted((r for r in records if r["time_change"] == "slowdown"),
+                  key=lambda r: -r["ratio"])
+    fast = sorted((r for r in records if r["time_change"] == "speedup"),
+                  key=lambda r: r["ratio"])
+    solve = sorted((r for r in records if r["solve_change"]),
+                   key=lambda r: r["p_solve"])
+    timed = [r for r in records if r["ratio"] is not None]
+
+    w(f"# Build Comparison: {base} vs {cand}")
+    w()
+    for k, v in meta.items():
+        w(f"- {k}: {v}")
+    w(f"- significance: BH-corrected p < {alpha}, bootstrap CI excludes 1, "
+      f"|median change| >= {100 * min_effect:.0f}%")
+    w()
+    w("## Summary")
+    w()
+    w(f"- Scenarios: {len(records)} ({len(timed)} with >= 3 solved runs "
+      f"per build for runtime tests)")
+    if timed:
+        geo = math.exp(sum(math.log(r["ratio"]) for r in timed) / len(timed))
+        w(f"- Geometric mean runtime ratio {cand}/{base}: {geo:.3f}x")
+    w(f"- Significant slowdowns: {len(slow)}")
+    w(f"- Significant speedups: {len(fast)}")
+    w(f"- Significant solve-rate changes: {len(solve)} "
+      f"({sum(r['solve_change'] == 'loss' for r in solve)} losses)")
+    sb = sum(r["solved_base"] for r in records)
+    sc = sum(r["solved_cand"] for r in records)
+    nb = sum(r["n_base"] for r in records)
+    nc = sum(r["n_cand"] for r in records)
+    w(f"- Solved runs: {base} {sb}/{nb}, {cand} {sc}/{nc}")
+    w()
+
+    def time_table(title, recs):
+        w(f"## {title} ({len(recs)})")
+        w()
+        if not recs:
+            w("None.")
+            w()
+            return
+        w(f"| # | Category | Agents | Scen | {base} median ms | {cand} median ms "
+          f"| Ratio | 95% CI | q |")
+        w("|---|----------|--------|------|------|------|-------|--------|---|")
+        for i, r in enumerate(recs):
+            cat, al, sid = r["key"]
+            lo, hi = r["ci"]
+            w(f"| {i+1} | {cat} | {al} | {sid} | {r['med_base']:.0f} | "
+              f"{r['med_cand']:.0f} | {r['ratio']:.2f}x | "
+              f"[{lo:.2f}, {hi:.2f}] | {r['q_time']:.3g} |")
+        w()
+
+    time_table("Slowdowns", slow)
+    time_table("Speedups", fast)
+
+    w(f"## Solve-Rate Changes ({len(solve)})")
+    w()
+    if solve:
+        w(f"| # | Category | Agents | Scen | {base} solved | {cand} solved | Change | p |")
+        w("|---|----------|--------|------|------|------|--------|---|")
+        for i, r in enumerate(solve):
+            cat, al, sid = r["key"]
+            w(f"| {i+1} | {cat} | {al} | {sid} | {r['solved_base']}/{r['n_base']} | "
+              f"{r['solved_cand']}/{r['n_cand']} | {r['solve_change']} | "
+              f"{r['p_solve']:.3g} |")
+    else:
+        w("None.")
+    w()
+
+    output = "\n".join(lines)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two solver builds with repeated interleaved runs")
+    parser.add_argument("--base", help="baseline executable")
+    parser.add_argument("--cand", help="candidate executable")
+    parser.add_argument("--base-name", default="base")
+    parser.add_argument("--cand-name", default="cand")
+    parser.add_argument("--category", action="append", choices=CATEGORIES,
+                        help="repeatable (default: all)")
+    parser.add_argument("--agents", default=",".join(AGENT_COUNTS),
+                        help="105-series agent labels, e.g. n5,n10")
+    parser.add_argument("-r", "--reps", type=int, default=7,
+                        help="runs per build and scenario (>= 5 for useful power)")
+    parser.add_argument("-t", "--timeout", type=int, default=30)
+    parser.add_argument("--flags", default="--goal-lock",
+                        help="solver flags for both builds")
+    parser.add_argument("-s", "--seed", type=int, default=0,
+                        help="solver seed and run-order/bootstrap seed")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--min-effect", type=float, default=0.05,
+                        help="minimum relative median change to report")
+    parser.add_argument("--from-csv", default=None,
+                        help="rebuild the report from a runs CSV, no solving")
+    parser.add_argument("-o", "--output", default=None,
+                        help="report path (default: results/regression/...)")
+    args = parser.parse_args()
+
+    base, cand = args.base_name, args.cand_name
+    if args.from_csv:
+        runs_csv = Path(args.from_csv)
+        rows = load_runs(runs_csv)
+        # roles come from the names, not the row order: run_interleaved
+        # shuffles which build of a pair runs first
+        names = set(r["build"] for r in rows)
+        missing = [n for n in (base, cand) if n not in names]
+        if missing:
+            parser.error(f"{runs_csv} has no runs of {', '.join(missing)} "
+                         f"(builds: {', '.join(sorted(names))}); "
+                         f"pass --base-name/--cand-name")
+        meta = {"runs": runs_csv.name}
+    else:
+        if not args.base or not args.cand:
+            parser.error("--base and --cand are required (or --from-csv)")
+        cats = args.category or CATEGORIES
+        scenarios = discover(cats, args.agents.split(","))
+        if not scenarios:
+            parser.error("no scenarios found")
+        OUT_DIR.mkdir(parents=True, exist_ok=True)
+        runs_csv = OUT_DIR / f"{base}_vs_{cand}_runs.csv"
+        print(f"{len(scenarios)} scenarios x {args.reps} reps x 2 builds "
+              f"(timeout {args.timeout}s)")
+        with open(runs_csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=RUN_FIELDS)
+            writer.writeheader()
+            rows = run_interleaved({base: args.base, cand: args.cand},
+                                   scenarios, args.reps, args.timeout,
+                                   args.flags, args.seed, writer)
+        meta = {
+            base: f"{args.base} ({results_db.binary_hash(args.base)})",
+            cand: f"{args.cand} ({results_db.binary_hash(args.cand)})",
+            "flags": f"`{args.flags} -t {args.timeout} -s {args.seed}`",
+            "repetitions": args.reps,
+            "runs": runs_csv.name,
+        }
+
+    records = compare(rows, base, cand, args.alpha, args.min_effect, args.seed)
+    out = Path(args.output) if args.output else \
+        runs_csv.with_name(runs_csv.name.replace("_runs.csv", "") + ".md")
+    if out == runs_csv:
+        out = runs_csv.with_suffix(".md")
+    print(write_report(records, out, base, cand, meta, args.alpha,
+                       args.min_effect))
+    print(f"\nReport written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Search for hard scenarios by mutating existing ones.
+
+Starting from one or more het_bench scenarios on a map, every generation
+draws parents from the archive, mutates them
+
+  move     resample one start or goal within --radius fleet cells (or
+           anywhere, 1 in 5) in the component of the other endpoint
+  swap     give one agent another fleet and re-place both endpoints near
+           the old ones
+  add      add an agent of a fleet drawn from the current mix (up to
+           --max-agents)
+
+and ranks the --pop candidates with a surrogate: a least-squares fit of
+the fitness on scen_hardness descriptors, refitted after every generation
+(a plain sum of the log descriptors until enough runs exist). Only the
+--evals best candidates are run with the real solver, --seeds runs each,
+in parallel. Every run goes to results.db (campaign hard_search, category
+search_<map category>, scen_id = content digest, one row per solver seed), so a
+candidate already run by the same binary with the same flags is never run
+again, and the candidate file is kept under <out-dir>/candidates/.
+
+Fitness of a candidate is the mean of min(runtime, timeout) over its runs,
+a failed run counting as FAIL_PENALTY x timeout, so failure rate dominates
+and runtime breaks ties. Runtime is the solver's comp_time, so the default
+flags include --no-star: anytime LaCAM* keeps refining until the timeout
+and would report the timeout for every solved run. The archive keeps the --keep fittest instances per
+agent count; they are written as <map>_hard_nN_KK_hb.scen with
+archive.csv next to them, a regression corpus of stress cases.
+
+Usage:
+    python tools/hard_search.py -m benchmarks/maps/bottleneck_doors_105.map \\
+        --scen benchmarks/scenarios/bottleneck_doors_105_0*_n10_hb.scen \\
+        --generations 20 --pop 64 --evals 4 --seeds 3 -t 10 -j 4
+    python tools/hard_search.py -m benchmarks/maps/room120.map --swap-xy \\
+        --scen benchmarks/scenarios/het_bench/scen.0 --flags "--rt --goal-lock"
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing.pool import ThreadPool
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path("E:/gb")
+HET_LACAM = ROOT / "het_rt_lacam" / "build" / "Release" / "main.exe"
+OUT_DIR = ROOT / "benchmarks" / "scenarios" / "hard"
+
+sys.path.insert(0, str(ROOT / "tools"))
+sys.path.insert(0, str(ROOT / "third_party" / "hetpibt" / "tools"))
+import results_db  # noqa: E402
+from compare_builds import run_one  # noqa: E402
+from gen_scenario import Occupancy  # noqa: E402
+from passages import map_passages  # noqa: E402
+from scen_hardness import extract_agents  # noqa: E402
+
+CAMPAIGN = "hard_search"
+FAIL_PENALTY = 2.0
+SURROGATE_FEATURES = ["sum_bfs", "max_cell_load", "max_passage_load",
+                      "overlap_pairs", "cross_fleet_overlap", "contested_share",
+                      "footprint_density"]
+RIDGE = 1e-2
+FAR_JUMP = 0.2  # share of moves that ignore --radius
+
+
+# ---------------------------------------------------------------------------
+# instances: (n, 6) int arrays of (fleet_id, cs, sx, sy, gx, gy), fleet coords
+# ---------------------------------------------------------------------------
+
+def read_instance(path, swap_xy=False):
+    """(agents, {fleet_id: (cs, velocity)}) of a het_bench scenario."""
+    rows, fleets = [], {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 10 or parts[0].startswith("#"):
+                continue
+            fid, cs, vel = int(parts[1]), int(float(parts[2])), float(parts[3])
+            sx, sy, gx, gy = (int(float(v)) for v in parts[4:8])
+            if swap_xy:
+                sx, sy, gx, gy = sy, sx, gy, gx
+            fleets[fid] = (cs, vel)
+            rows.append((fid, cs, sx // cs, sy // cs, gx // cs, gy // cs))
+    return np.array(rows, dtype=np.int64).reshape(-1, 6), fleets
+
+
+def write_instance(agents, fleets, mp, path):
+    """het_bench lines (base coords, never swapped)."""
+    with open(path, "w") as f:
+        for aid, (fid, cs, sx, sy, gx, gy) in enumerate(agents.tolist()):
+            fl = mp.fleet(cs)
+            f.write(f"{aid} {fid} {cs} {fleets[fid][1]:g} {sx * cs} {sy * cs} "
+                    f"{gx * cs} {gy * cs} {fl.fw} {fl.fh}\n")
+
+
+def instance_digest(agents):
+    return hashlib.sha256(np.ascontiguousarray(agents).tobytes()).hexdigest()[:12]
+
+
+def base_agents(agents):
+    """(n, 5) (cs, sx, sy, gx, gy) in base coords, for scen_hardness."""
+    cs = agents[:, 1:2]
+    return np.hstack([cs, agents[:, 2:] * cs])
+
+
+# ---------------------------------------------------------------------------
+# mutations
+# ---------------------------------------------------------------------------
+
+class Mutator:
+    """Valid-by-construction mutations: endpoints never overlap (any
+    fleet, starts and goals alike) and every goal stays in the component
+    of its start, as in gen_scenario.place_agents."""
+
+    def __init__(self, map_path, fleets, radius, max_agents, rng):
+        self.mp = map_passages(map_path)
+        self.fleets = fleets
+        self.radius = radius
+        self.max_agents = max_agents
+        self.rng = rng
+
+    def occupancy(self, agents, skip=()):
+        """Occupancy of every endpoint except (agent, 0 = start / 1 = goal)
+        pairs in `skip`."""
+        H, W = self.mp.shape
+        occ = Occupancy(W, H)
+        for i, (_, cs, sx, sy, gx, gy) in enumerate(agents.tolist()):
+            if (i, 0) not in skip:
+                occ.reserve(sx, sy, cs)
+            if (i, 1) not in skip:
+                occ.reserve(gx, gy, cs)
+        return occ
+
+    def place(self, occ, cs, near, comp=None):
+        """A free, unoccupied fleet cell near `near` (x, y), in component
+        `comp` if given; None if there is none."""
+        f = self.mp.fleet(cs)
+        ok = f.free.copy()
+        if comp is not None:
+            ok &= (f.comp == comp).reshape(f.fh, f.fw)
+        if near is not None and self.rng.random() >= FAR_JUMP:
+            x, y = near
+            r = self.radius
+            box = np.zeros_like(ok)
+            box[max(0, y - r):y + r + 1, max(0, x - r):x + r + 1] = True
+            ok &= box
+        ys, xs = np.nonzero(ok)
+        mask = occ.anchor_mask(list(zip(xs.tolist(), ys.tolist())), cs)
+        ys, xs = np.nonzero(mask)
+        if not len(xs):
+            return None
+        k = self.rng.randrange(len(xs))
+        return int(xs[k]), int(ys[k])
+
+    def comp_of(self, cs, cell):
+        f = self.mp.fleet(cs)
+        return f.comp[cell[1] * f.fw + cell[0]]
+
+    def move(self, agents, i):
+        end = self.rng.randrange(2)
+        _, cs, sx, sy, gx, gy = agents[i].tolist()
+        other = (gx, gy) if end == 0 else (sx, sy)
+        near = (sx, sy) if end == 0 else (gx, gy)
+        cell = self.place(self.occupancy(agents, {(i, end)}), cs, near,
+                          self.comp_of(cs, other))
+        if cell is None:
+            return None
+        out = agents.copy()
+        out[i, 2 + 2 * end:4 + 2 * end] = cell
+        return out
+
+    def swap(self, agents, i):
+        fid = agents[i, 0]
+        choices = [f for f in self.fleets if f != fid]
+        if not choices:
+            return None
+        new_fid = self.rng.choice(choices)
+        cs_old, cs = agents[i, 1], self.fleets[new_fid][0]
+        # same base position, new fleet grid
+        s = tuple(agents[i, 2:4] * cs_old // cs)
+        g = tuple(agents[i, 4:6] * cs_old // cs)
+        occ = self.occupancy(agents, {(i, 0), (i, 1)})
+        start = self.place(occ, cs, s)
+        if start is None:
+            return None
+        occ.reserve(*start, cs)
+        goal = self.place(occ, cs, g, self.comp_of(cs, start))
+        if goal is None:
+            return None
+        out = agents.copy()
+        out[i] = (new_fid, cs) + start + goal
+        return out
+
+    def add(self, agents):
+        if len(agents) >= self.max_agents:
+            return None
+        fid = int(self.rng.choice(agents[:, 0].tolist() or list(self.fleets)))
+        cs = self.fleets[fid][0]
+        occ = self.occupancy(agents)
+        start = self.place(occ, cs, None)
+        if start is None:
+            return None
+        occ.reserve(*start, cs)
+        goal = self.place(occ, cs, None, self.comp_of(cs, start))
+        if goal is None:
+            return None
+        return np.vstack([agents, [(fid, cs) + start + goal]])
+
+    def mutate(self, agents):
+        """(child, op) after 1-3 random mutations; None if every one failed."""
+        ops = []
+        child = agents
+        for _ in range(self.rng.randint(1, 3)):
+            op = self.rng.choice(["move", "move", "swap", "add"])
+            i = self.rng.randrange(len(child))
+            nxt = (self.move(child, i) if op == "move" else
+                   self.swap(child, i) if op == "swap" else self.add(child))
+            if nxt is not None:
+                child = nxt
+                ops.append(op)
+        return (child, "+".join(ops)) if ops else None
+
+
+# ---------------------------------------------------------------------------
+# surrogate
+# ---------------------------------------------------------------------------
+
+class Surrogate:
+    """log fitness ~ log1p(descriptors); unfitted it scores their sum."""
+
+    def __init__(self):
+        self.X, self.y = [], []
+        self.coef = None
+
+    @staticmethod
+    def row(feats):
+        return [1.0] + [math.log1p(feats[k]) for k in SURROGATE_FEATURES]
+
+    def add(self, feats, fitness_ms):
+        self.X.append(self.row(feats))
+        self.y.append(math.log(max(fitness_ms, 1.0)))
+
+    def fit(self):
+        if len(self.y) < len(SURROGATE_FEATURES) + 2:
+            return
+        X, y = np.array(self.X), np.array(self.y)
+        A = X.T @ X + RIDGE * np.eye(X.shape[1])
+        self.coef = np.linalg.solve(A, X.T @ y)
+
+    def score(self, feats):
+        x = np.array(self.row(feats))
+        return float(x @ self.coef) if self.coef is not None else float(x[1:].sum())
+
+
+# ---------------------------------------------------------------------------
+# evaluation
+# ---------------------------------------------------------------------------
+
+class Evaluator:
+    """Runs candidates with the real solver; results.db is the cache."""
+
+    def __init__(self, conn, exe, flags, timeout_s, seeds, category, jobs):
+        self.conn = conn
+        self.exe = exe
+        self.flags = flags
+        self.timeout_s = timeout_s
+        self.seeds = seeds
+        self.category = category
+        self.jobs = jobs
+        self.solver = "het_rt_lacam_rt" if "--rt" in flags.split() else "het_rt_lacam"
+        self.run_id = results_db.start_run(conn, CAMPAIGN, self.solver, exe=exe,
+                                           flags=flags, source="hard_search.py")
+        bhash = results_db.binary_hash(exe)
+        self.cache = {(r["agent_label"], r["scen_id"], r["seed"]): r
+                      for r in results_db.load_rows(conn, CAMPAIGN, self.solver,
+                                                    category)
+                      if r["binary_hash"] == bhash and r["flags"] == flags}
+        self.n_runs = 0
+
+    def _run(self, task):
+        path, label, digest, seed = task
+        scen = {"map_path": self.map_path, "scen_path": path, "swap_xy": False}
+        out = os.path.join(self.tmp_dir, f"{digest}_{seed}.txt")
+        r, wall_ms = run_one(self.exe, scen, self.timeout_s, self.flags, seed, out)
+        if os.path.exists(out):
+            os.remove(out)
+        return task, r, wall_ms
+
+    def evaluate(self, cands, map_path, tmp_dir):
+        """{digest: (fitness_ms, fail_rate, mean_solved_ms)} of candidates
+        given as (path, n_agents, digest)."""
+        self.map_path, self.tmp_dir = map_path, tmp_dir
+        tasks = [(path, f"n{n}", digest, seed) for path, n, digest in cands
+                 for seed in range(self.seeds)
+                 if (f"n{n}", digest, seed) not in self.cache]
+        with ThreadPool(max(1, self.jobs)) as pool:
+            for (path, label, digest, seed), r, wall_ms in pool.imap_unordered(
+                    self._run, tasks):
+                row = {"category": self.category, "agent_label": label,
+                       "scen_id": digest, "seed": seed, "agents": int(label[1:]),
+                       "solved": r["solved"], "soc": r["soc"],
+                       "makespan": r["makespan"],
+                       "runtime_ms": r["comp_time_ms"] if r["solved"] else None,
+                       "wall_ms": wall_ms, "scen_file": os.path.basename(path)}
+                results_db.add_result(self.conn, self.run_id, row)
+                self.cache[label, digest, seed] = row
+                self.n_runs += 1
+        self.conn.commit()
+        cap = self.timeout_s * 1000.0
+        out = {}
+        for path, n, digest in cands:
+            rows = [self.cache[f"n{n}", digest, s] for s in range(self.seeds)]
+            solved = [min(float(r["runtime_ms"] or 0), cap) for r in rows if r["solved"]]
+            fail = 1.0 - len(solved) / len(rows)
+            fitness = (sum(solved) + FAIL_PENALTY * cap * (len(rows) - len(solved))) / len(rows)
+            out[digest] = (fitness, fail, float(np.mean(solved)) if solved else None)
+        return out
+
+
+# ---------------------------------------------------------------------------
+# archive
+# ---------------------------------------------------------------------------
+
+class Archive:
+    """The `keep` fittest instances per agent count."""
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.niches = {}  # n -> [entry dicts], fittest first
+
+    def add(self, entry):
+        niche = self.niches.setdefault(len(entry["agents"]), [])
+        if any(e["digest"] == entry["digest"] for e in niche):
+            return False
+        niche.append(entry)
+        niche.sort(key=lambda e: -e["fitness"])
+        del niche[self.keep:]
+        return any(e is entry for e in niche)
+
+    def entries(self):
+        return [e for n in sorted(self.niches) for e in self.niches[n]]
+
+    def pick(self, rng):
+        """Binary tournament over all niches."""
+        pool = self.entries()
+        a, b = rng.choice(pool), rng.choice(pool)
+        return a if a["fitness"] >= b["fitness"] else b
+
+    def write(self, out_dir, stem, fleets, mp):
+        fields = ["file", "agents", "digest", "fitness_ms", "fail_rate",
+                  "mean_solved_ms", "surrogate", "ops", "generation"]
+        with open(os.path.join(out_dir, "archive.csv"), "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            for n in sorted(self.niches):
+                for k, e in enumerate(self.niches[n]):
+                    name = f"{stem}_hard_n{n}_{k:02d}_hb.scen"
+                    write_instance(e["agents"], fleets, mp, os.path.join(out_dir, name))
+                    w.writerow({"file": name, "agents": n, "digest": e["digest"],
+                                "fitness_ms": round(e["fitness"]),
+                                "fail_rate": round(e["fail"], 3),
+                                "mean_solved_ms": "" if e["ms"] is None else round(e["ms"]),
+                                "surrogate": round(e["score"], 3), "ops": e["ops"],
+                                "generation": e["generation"]})
+
+
+# ---------------------------------------------------------------------------
+# main
+# ---------------------------------------------------------------------------
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    p.add_argument("-m", "--map", required=True)
+    p.add_argument("--scen", nargs="+", required=True,
+                   help="het_bench seed scenarios (globs allowed)")
+    p.add_argument("--swap-xy", action="store_true",
+                   help="seed scenarios use swapped coordinates (het_bench room120)")
+    p.add_argument("--exe", default=str(HET_LACAM))
+    p.add_argument("--flags", default="--goal-lock --no-star",
+                   help="solver flags; keep --no-star (or --rt) so comp_time "
+                        "measures the time to a solution")
+    p.add_argument("-t", "--timeout", type=int, default=10)
+    p.add_argument("--generations", type=int, default=20)
+    p.add_argument("--pop", type=int, default=64,
+                   help="mutants scored by the surrogate per generation")
+    p.add_argument("--evals", type=int, default=4,
+                   help="mutants run with the solver per generation")
+    p.add_argument("--seeds", type=int, default=3, help="solver seeds per candidate")
+    p.add_argument("--keep", type=int, default=5, help="archive size per agent count")
+    p.add_argument("--radius", type=int, default=5, help="move radius in fleet cells")
+    p.add_argument("--max-agents", type=int, default=0,
+                   help="agent cap for 'add' (default: largest seed + 5)")
+    p.add_argument("--seed", type=int, default=0, help="search seed")
+    p.add_argument("-j", "--jobs", type=int, default=4)
+    p.add_argument("--out-dir", default=str(OUT_DIR))
+    p.add_argument("--db", default=str(results_db.DB_PATH))
+    args = p.parse_args()
+
+    rng = random.Random(args.seed)
+    stem = Path(args.map).stem
+    cand_dir = os.path.join(args.out_dir, "candidates")
+    os.makedirs(cand_dir, exist_ok=True)
+    paths = sorted({q for s in args.scen for q in (glob.glob(s) or [s])})
+    seeds, fleets = [], {}
+    for path in paths:
+        agents, fl = read_instance(path, args.swap_xy)
+        fleets.update(fl)
+        seeds.append(agents)
+    max_agents = args.max_agents or max(len(a) for a in seeds) + 5
+    mutator = Mutator(args.map, fleets, args.radius, max_agents, rng)
+    mp = mutator.mp
+    surrogate = Surrogate()
+    archive = Archive(args.keep)
+    if not {"--no-star", "--rt"} & set(args.flags.split()):
+        print("warning: without --no-star or --rt the solver runs anytime "
+              "LaCAM* to the timeout and runtime stops ranking candidates")
+    conn = results_db.open_db(args.db)
+    # results_db stores 105-series categories without the suffix
+    category = "search_" + (stem[:-len("_105")] if stem.endswith("_105") else stem)
+    evaluator = Evaluator(conn, args.exe, args.flags, args.timeout, args.seeds,
+                          category, args.jobs)
+    print(f"{len(seeds)} seed scenarios, fleets "
+          + ", ".join(f"{fid}:cs{cs}" for fid, (cs, _) in sorted(fleets.items()))
+          + f", {len(evaluator.cache)} cached runs")
+
+    def run(batch, generation):
+        """Evaluate (agents, ops, score) candidates, update surrogate/archive."""
+        cands, meta = [], {}
+        for agents, ops, score in batch:
+            digest = instance_digest(agents)
+            path = os.path.join(cand_dir, f"{digest}.scen")
+            if not os.path.exists(path):
+                write_instance(agents, fleets, mp, path)
+            cands.append((path, len(agents), digest))
+            meta[digest] = (agents, ops, score)
+        results = evaluator.evaluate(cands, args.map, cand_dir)
+        improved = 0
+        for digest, (fitness, fail, ms) in results.items():
+            agents, ops, score = meta[digest]
+            surrogate.add(extract_agents(base_agents(agents), args.map), fitness)
+            improved += archive.add({"digest": digest, "agents": agents,
+                                     "fitness": fitness, "fail": fail, "ms": ms,
+                                     "score": score, "ops": ops,
+                                     "generation": generation})
+        surrogate.fit()
+        return improved
+
+    t0 = time.time()
+    run([(a, "seed", float("nan")) for a in seeds], 0)
+    for gen in range(1, args.generations + 1):
+        mutants, seen = [], set()
+        for _ in range(args.pop):
+            out = mutator.mutate(archive.pick(rng)["agents"])
+            if out is None:
+                continue
+            digest = instance_digest(out[0])
+            if digest in seen:
+                continue
+            seen.add(digest)
+            feats = extract_agents(base_agents(out[0]), args.map)
+            mutants.append((out[0], out[1], surrogate.score(feats)))
+        mutants.sort(key=lambda m: -m[2])
+        improved = run(mutants[:args.evals], gen)
+        best = {n: niche[0] for n, niche in archive.niches.items()}
+        print(f"gen {gen:>3}: {len(mutants)} mutants, {improved} archived, "
+              f"{evaluator.n_runs} solver runs, {time.time() - t0:.0f}s | best "
+              + " ".join(f"n{n}={e['fitness'] / 1000:.1f}s/{e['fail']:.0%}"
+                         for n, e in sorted(best.items())), flush=True)
+    conn.close()
+    archive.write(args.out_dir, stem, fleets, mp)
+    print(f"\nArchive of {len(archive.entries())} instances written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,61 +16,27 @@ Modes:
 Usage:
   python het2baseline.py --input scen.0.scen --output scen.0_homo.scen \\
       --map room-64-64-8.map --map-w 640 --map-h 640 --homogeneous
+
+Whole directories: benchmarks/generators/scen_convert.py movingai.
 """
 import argparse
+import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "benchmarks", "generators"))
+from scen_convert import read_hetbench  # noqa: E402
+from scen_convert import write_movingai as _write_movingai  # noqa: E402
+
 
 def parse_het_bench(path):
     """Parse het_bench scenario. Returns list of agent dicts."""
-    agents = []
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            parts = line.split()
-            if len(parts) < 10:
-                continue
-            agents.append({
-                'agent_id': int(parts[0]),
-                'fleet_id': int(parts[1]),
-                'cell_size': int(float(parts[2])),
-                'velocity': float(parts[3]),
-                'sx': int(float(parts[4])),
-                'sy': int(float(parts[5])),
-                'gx': int(float(parts[6])),
-                'gy': int(float(parts[7])),
-                'grid_w': int(parts[8]),
-                'grid_h': int(parts[9]),
-            })
-    return agents
+    return read_hetbench(path)
 
 
 def write_movingai(agents, output_path, map_name, map_w, map_h, mode):
     """Write MovingAI .scen format with optional comment header."""
-    with open(output_path, 'w') as f:
-        f.write("version 1\n")
-
-        # Comment header with het_bench metadata for non-homogeneous modes
-        if mode == 'size-only':
-            f.write(f"# Converted from het_bench ({mode}): cell_size preserved\n")
-            f.write("# agent_index cell_size\n")
-            for i, a in enumerate(agents):
-                f.write(f"# {i} {a['cell_size']}\n")
-        elif mode == 'speed-only':
-            f.write(f"# Converted from het_bench ({mode}): velocity preserved\n")
-            f.write("# agent_index velocity\n")
-            for i, a in enumerate(agents):
-                f.write(f"# {i} {a['velocity']}\n")
-
-        for i, a in enumerate(agents):
-            bucket = 0
-            optimal = 0.0
-            f.write(f"{bucket}\t{map_name}\t{map_w}\t{map_h}\t"
-                    f"{a['sx']}\t{a['sy']}\t{a['gx']}\t{a['gy']}\t"
-                    f"{optimal:.8f}\n")
-
+    _write_movingai(agents, output_path, map_name, map_w, map_h, mode)
     print(f"Wrote {len(agents)} agents to {output_path} (mode={mode})")
 
 
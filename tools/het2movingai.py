@@ -10,44 +10,23 @@ With --swap-xy convention (used in our regression):
 MovingAI .scen format:
   version 1
   bucket  map_name  width  height  start_col  start_row  goal_col  goal_row  optimal_length
+
+Same as `benchmarks/generators/scen_convert.py movingai --mode cs1 --swap-xy`.
 """
 import sys
 import os
 
-def convert(scen_path, map_name, output_path, map_width=120, map_height=120):
-    agents = []
-    with open(scen_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            parts = line.split()
-            if len(parts) < 10:
-                continue
-            agent_id = int(parts[0])
-            fleet_id = int(parts[1])
-            cell_size = int(parts[2])
-            velocity = float(parts[3])
-            sx, sy, gx, gy = int(parts[4]), int(parts[5]), int(parts[6]), int(parts[7])
-
-            # Only cs=1 agents (homogeneous for CBS)
-            if cell_size != 1:
-                continue
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "benchmarks", "generators"))
+from scen_convert import read_hetbench, write_movingai  # noqa: E402
 
-            # With --swap-xy convention: sx=row, sy=col
-            start_row, start_col = sx, sy
-            goal_row, goal_col = gx, gy
 
-            agents.append((start_col, start_row, goal_col, goal_row))
-
-    with open(output_path, 'w') as f:
-        f.write("version 1\n")
-        for i, (sc, sr, gc, gr) in enumerate(agents):
-            # bucket  map  width  height  start_col  start_row  goal_col  goal_row  optimal
-            f.write(f"0\t{map_name}\t{map_width}\t{map_height}\t{sc}\t{sr}\t{gc}\t{gr}\t0\n")
-
-    print(f"{scen_path} -> {output_path}: {len(agents)} cs=1 agents")
-    return len(agents)
+def convert(scen_path, map_name, output_path, map_width=120, map_height=120):
+    # Only cs=1 agents (homogeneous for CBS); --swap-xy convention: sx=row
+    n = write_movingai(read_hetbench(scen_path), output_path, map_name,
+                       map_width, map_height, "cs1", swap_xy=True)
+    print(f"{scen_path} -> {output_path}: {n} cs=1 agents")
+    return n
 
 if __name__ == "__main__":
     scen_dir = "E:/gb/benchmarks/scenarios/het_bench"
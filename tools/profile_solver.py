@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Sampling profiles of het_rt_lacam, aggregated per scenario category.
+
+Every selected scenario is solved once under a sampler, and its stacks
+are folded into collapsed-stack lines ("root;...;leaf count"). The stacks
+are then summed over the scenarios of each category. Two samplers:
+
+  perf     `perf record -g` around the solver, folded from `perf script`
+           (Linux; build with debug info, e.g. RelWithDebInfo)
+  builtin  the solver's own SIGPROF sampler, `--profile-out` (configure
+           with -DHET_PROFILE=ON; frames main exports are named by the
+           solver, the rest are resolved here with addr2line)
+
+Per run the output directory gets:
+  <category>.folded          collapsed stacks summed over the category
+  raw/<category>_<label>_<id>.folded   one file per scenario
+  top.md                     top-N functions per category, self and total %
+
+The .folded files feed straight into flamegraph.pl / speedscope. To see
+where two configurations differ, profile each with its own --name and
+diff the runs:
+
+    python tools/profile_solver.py --exe het_rt_lacam/build_prof/main \
+        --category cooperative_clearing --name full
+    python tools/profile_solver.py --exe het_rt_lacam/build_prof/main \
+        --category cooperative_clearing --flags "--goal-lock --rt" --name rt
+    python tools/profile_solver.py --diff \
+        benchmarks/results/profiles/full benchmarks/results/profiles/rt
+"""
+import argparse
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import Counter, defaultdict
+from pathlib import Path
+
+ROOT = Path("E:/gb")
+EXE = ROOT / "het_rt_lacam" / "build" / "Release" / "main.exe"
+OUT_DIR = ROOT / "benchmarks" / "results" / "profiles"
+
+sys.path.insert(0, str(ROOT / "tools"))
+sys.path.insert(0, str(ROOT / "benchmarks" / "results" / "rt_lacam"))
+from compare_builds import CATEGORIES, discover  # noqa: E402
+from run_rt import AGENT_COUNTS  # noqa: E402
+
+# perf script frame line: "<addr> <symbol>+0x<off> (<dso>)"
+PERF_FRAME_RE = re.compile(r"^\s*([0-9a-f]+)\s+(.*?)\s+\((.*)\)$")
+# builtin sampler frame the solver could not name: "[<module>+0x<off>]"
+RAW_FRAME_RE = re.compile(r"^\[(.+)\+0x([0-9a-f]+)\]$")
+
+
+# ---------------------------------------------------------------------------
+# collapsed stacks
+# ---------------------------------------------------------------------------
+
+def short_name(name):
+    """Drop the argument list: 'A::f(int, B const&) const' -> 'A::f'."""
+    end = name.rstrip()
+    if end.endswith(" const"):
+        end = end[:-6]
+    if not end.endswith(")"):
+        return name
+    depth = 0
+    for k in range(len(end) - 1, -1, -1):
+        if end[k] == ")":
+            depth += 1
+        elif end[k] == "(":
+            depth -= 1
+            if depth == 0:
+                return end[:k] if k > 0 else name
+    return name
+
+
+def read_folded(path):
+    stacks = Counter()
+    with open(path) as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+def write_folded(stacks, path):
+    with open(path, "w") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(f"{stack} {count}\n")
+
+
+def rename_frames(stacks, rename):
+    """Apply rename(frame) to every frame of every stack."""
+    out = Counter()
+    for stack, count in stacks.items():
+        out[";".join(rename(fr) for fr in stack.split(";"))] += count
+    return out
+
+
+def fold_perf_script(text):
+    """Collapse `perf script` callchain output (leaf-first blocks)."""
+    stacks = Counter()
+    frames = []
+
+    def flush():
+        if frames:
+            stacks[";".join(reversed(frames))] += 1
+            frames.clear()
+
+    for line in text.splitlines():
+        if not line.strip():
+            flush()
+            continue
+        if not line[0].isspace():
+            flush()  # sample header: "comm pid time: period event:"
+            continue
+        m = PERF_FRAME_RE.match(line)
+        if not m:
+            continue
+        sym, dso = m.group(2), m.group(3)
+        sym = re.sub(r"\+0x[0-9a-f]+$", "", sym)
+        if sym == "[unknown]":
+            sym = f"[{os.path.basename(dso)}]"
+        frames.append(sym)
+    flush()
+    return stacks
+
+
+def addr2line_resolver(exe, stacks):
+    """Name '[main+0x..]' frames of `exe` with addr2line, if it is around."""
+    tool = shutil.which("addr2line")
+    exe_name = os.path.basename(exe)
+    offsets = set()
+    for stack in stacks:
+        for fr in stack.split(";"):
+            m = RAW_FRAME_RE.match(fr)
+            if m and m.group(1) == exe_name:
+                offsets.add(m.group(2))
+    names = {}
+    if tool and offsets:
+        order = sorted(offsets)
+        # return addresses point after the call; step back into it
+        addrs = [hex(max(int(o, 16) - 1, 0)) for o in order]
+        proc = subprocess.run([tool, "-f", "-C", "-e", str(exe)] + addrs,
+                              capture_output=True, text=True)
+        lines = proc.stdout.splitlines()
+        for k, off in enumerate(order):
+            if 2 * k < len(lines) and lines[2 * k] != "??":
+                names[off] = lines[2 * k]
+
+    def rename(fr):
+        m = RAW_FRAME_RE.match(fr)
+        if m and m.group(1) == exe_name:
+            return names.get(m.group(2), f"[{exe_name}]")
+        return RAW_FRAME_RE.sub(r"[\1]", fr) if m else fr
+    return rename
+
+
+# ---------------------------------------------------------------------------
+# running
+# ---------------------------------------------------------------------------
+
+def solver_cmd(exe, scen, timeout_s, flags, seed, out_path):
+    cmd = [
+        str(exe),
+        "-m", scen["map_path"],
+        "-i", scen["scen_path"],
+        "-s", str(seed),
+        "-t", str(timeout_s),
+        "-v", "0",
+        "-l",
+        "-o", out_path,
+    ]
+    if scen["swap_xy"]:
+        cmd.append("--swap-xy")
+    return cmd + shlex.split(flags)
+
+
+def profile_perf(cmd, tmp_dir, hz, call_graph, timeout_s):
+    data = os.path.join(tmp_dir, "perf.data")
+    rec = ["perf", "record", "-q", "-F", str(hz), "--call-graph", call_graph,
+           "-o", data, "--"] + cmd
+    subprocess.run(rec, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   timeout=timeout_s + 30)
+    if not os.path.exists(data):
+        return Counter()
+    proc = subprocess.run(["perf", "script", "-i", data, "--no-inline"],
+                          capture_output=True, text=True)
+    os.remove(data)
+    return fold_perf_script(proc.stdout)
+
+
+def profile_builtin(cmd, tmp_dir, hz, exe, timeout_s):
+    folded = os.path.join(tmp_dir, "builtin.folded")
+    if os.path.exists(folded):
+        os.remove(folded)
+    subprocess.run(cmd + ["--profile-out", folded, "--profile-hz", str(hz)],
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   timeout=timeout_s + 30)
+    if not os.path.exists(folded):
+        sys.exit(f"{exe} wrote no profile; configure it with -DHET_PROFILE=ON")
+    stacks = read_folded(folded)
+    return rename_frames(stacks, addr2line_resolver(exe, stacks))
+
+
+# ---------------------------------------------------------------------------
+# top-N tables
+# ---------------------------------------------------------------------------
+
+def function_table(stacks):
+    """{function: (self samples, total samples)} and the sample count."""
+    self_c, total_c = Counter(), Counter()
+    n = 0
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        n += count
+        self_c[frames[-1]] += count
+        for fr in set(frames):
+            total_c[fr] += count
+    return {f: (self_c[f], total_c[f]) for f in total_c}, n
+
+
+def top_rows(stacks, top, key="self"):
+    table, n = function_table(stacks)
+    k = 0 if key == "self" else 1
+    rows = sorted(table.items(), key=lambda kv: (-kv[1][k], kv[0]))[:top]
+    return [(f, 100 * s / n, 100 * t / n) for f, (s, t) in rows], n
+
+
+def write_top(per_cat, path, top, meta):
+    lines = ["# Solver Profile", ""]
+    for k, v in meta.items():
+        lines.append(f"- {k}: {v}")
+    for cat, stacks in per_cat.items():
+        for key in ["self", "total"]:
+            rows, n = top_rows(stacks, top, key)
+            lines += ["", f"## {cat} -- top {top} by {key} ({n} samples)", "",
+                      "| function | self % | total % |", "|---|---:|---:|"]
+            lines += [f"| `{f}` | {s:.1f} | {t:.1f} |" for f, s, t in rows]
+    with open(path, "w") as fh:
+        fh.write("\n".join(lines) + "\n")
+
+
+def diff_profiles(dir_a, dir_b, top):
+    """Print per-category self-% changes between two profile directories."""
+    cats = sorted(p.stem for p in Path(dir_a).glob("*.folded")
+                  if (Path(dir_b) / p.name).exists())
+    if not cats:
+        sys.exit(f"no common <category>.folded files in {dir_a} and {dir_b}")
+    a_name, b_name = Path(dir_a).name, Path(dir_b).name
+    for cat in cats:
+        ta, na = function_table(read_folded(Path(dir_a) / f"{cat}.folded"))
+        tb, nb = function_table(read_folded(Path(dir_b) / f"{cat}.folded"))
+        rows = []
+        for f in set(ta) | set(tb):
+            sa = 100 * ta.get(f, (0, 0))[0] / max(na, 1)
+            sb = 100 * tb.get(f, (0, 0))[0] / max(nb, 1)
+            rows.append((f, sa, sb))
+        rows.sort(key=lambda r: -abs(r[2] - r[1]))
+        print(f"\n{cat}: {a_name} {na} samples, {b_name} {nb} samples "
+              f"(self %, largest changes first)")
+        print(f"  {a_name:>8} {b_name:>8} {'change':>8}  function")
+        for f, sa, sb in rows[:top]:
+            print(f"  {sa:>7.1f}% {sb:>7.1f}% {sb - sa:>+7.1f}%  {f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Profile het_rt_lacam per scenario category")
+    parser.add_argument("--exe", default=str(EXE))
+    parser.add_argument("--backend", choices=["perf", "builtin"],
+                        default="perf")
+    parser.add_argument("--category", action="append", choices=CATEGORIES,
+                        help="repeatable (default: all)")
+    parser.add_argument("--agents", default="n25",
+                        help=f"agent labels, comma-separated "
+                             f"({','.join(AGENT_COUNTS)})")
+    parser.add_argument("--scen-ids", default="",
+                        help="only these scenario ids, e.g. 00,01")
+    parser.add_argument("-t", "--timeout", type=int, default=10)
+    parser.add_argument("--flags", default="--goal-lock",
+                        help="extra solver flags, e.g. '--goal-lock --rt'")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("--hz", type=int, default=999,
+                        help="sampling frequency (builtin: capped by the "
+                             "kernel timer tick)")
+    parser.add_argument("--call-graph", default="dwarf",
+                        help="perf --call-graph mode (dwarf, fp, lbr)")
+    parser.add_argument("--full-names", action="store_true",
+                        help="keep argument lists in function names")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--name", default=None,
+                        help="output subdirectory (default: from --flags)")
+    parser.add_argument("--out-dir", default=str(OUT_DIR))
+    parser.add_argument("--diff", nargs=2, metavar=("DIR_A", "DIR_B"),
+                        help="compare two profile directories and exit")
+    args = parser.parse_args()
+
+    if args.diff:
+        diff_profiles(args.diff[0], args.diff[1], args.top)
+        return
+    if args.backend == "perf" and shutil.which("perf") is None:
+        sys.exit("perf not found; install linux-tools or use --backend builtin")
+
+    categories = args.category or CATEGORIES
+    scenarios = discover(categories, args.agents.split(","))
+    if args.scen_ids:
+        ids = set(args.scen_ids.split(","))
+        scenarios = [s for s in scenarios if s["scen_id"] in ids]
+    if not scenarios:
+        sys.exit("no scenarios selected")
+
+    name = args.name or (re.sub(r"[^A-Za-z0-9]+", "_", args.flags).strip("_")
+                         or "default")
+    out_dir = Path(args.out_dir) / name
+    (out_dir / "raw").mkdir(parents=True, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix="profile_solver_")
+    result_path = os.path.join(tmp_dir, "result.txt")
+
+    per_cat = defaultdict(Counter)
+    for k, scen in enumerate(scenarios, 1):
+        cmd = solver_cmd(args.exe, scen, args.timeout, args.flags, args.seed,
+                         result_path)
+        if args.backend == "perf":
+            stacks = profile_perf(cmd, tmp_dir, args.hz, args.call_graph,
+                                  args.timeout)
+        else:
+            stacks = profile_builtin(cmd, tmp_dir, args.hz, args.exe,
+                                     args.timeout)
+        if not args.full_names:
+            stacks = rename_frames(stacks, short_name)
+        tag = f"{scen['category']}_{scen['agent_label']}_{scen['scen_id']}"
+        write_folded(stacks, out_dir / "raw" / f"{tag}.folded")
+        per_cat[scen["category"]].update(stacks)
+        print(f"[{k}/{len(scenarios)}] {tag}: {sum(stacks.values())} samples",
+              flush=True)
+
+    for cat, stacks in per_cat.items():
+        write_folded(stacks, out_dir / f"{cat}.folded")
+    meta = {
+        "exe": args.exe,
+        "backend": args.backend,
+        "flags": args.flags,
+        "timeout": f"{args.timeout}s",
+        "scenarios": len(scenarios),
+    }
+    write_top(per_cat, out_dir / "top.md", args.top, meta)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    for cat, stacks in per_cat.items():
+        rows, n = top_rows(stacks, 10)
+        print(f"\n{cat} ({n} samples), top 10 self:")
+        for f, s, t in rows:
+            print(f"  {s:>5.1f}% {t:>5.1f}%  {f}")
+    print(f"\nWrote {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
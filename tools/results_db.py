@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+SQLite results store for benchmark runs.
+
+One database (benchmarks/results/results.db) instead of a CSV per campaign
+and category:
+
+  runs     one row per (campaign, solver, binary hash, flags); re-running the
+           same binary with the same flags in a campaign reuses the run
+  results  one row per (run, category, agent_label, scen_id, seed) with the
+           standard metrics; solver-specific columns go to `extra` (JSON)
+  phases   optional per-result phase timings (phase name -> ms)
+  scen_features
+           solver-independent descriptors per scenario file (JSON), keyed
+           by path and valid while the digest of scenario, map and
+           extractor version matches (tools/scen_hardness.py)
+
+Results are indexed on the scenario key, so comparing two campaigns is an
+indexed join (paired()) instead of re-parsing and re-indexing CSVs.
+Runners call open_db() / start_run() / add_result(); analyzers call
+load_index() or paired(). Re-adding a key replaces the previous row.
+
+Usage:
+    python tools/results_db.py import-legacy     # benchmarks/results + experiments/results
+    python tools/results_db.py import FILE.csv --campaign rt_stbfs [--solver NAME]
+    python tools/results_db.py runs
+    python tools/results_db.py export --campaign rt_stbfs -o out.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import platform
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path("E:/gb")
+DB_PATH = ROOT / "benchmarks" / "results" / "results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      INTEGER PRIMARY KEY,
+    campaign    TEXT NOT NULL,
+    solver      TEXT NOT NULL,
+    binary_hash TEXT NOT NULL DEFAULT '',
+    flags       TEXT NOT NULL DEFAULT '',
+    host        TEXT NOT NULL DEFAULT '',
+    started     TEXT NOT NULL,
+    source      TEXT NOT NULL DEFAULT '',
+    UNIQUE (campaign, solver, binary_hash, flags)
+);
+CREATE TABLE IF NOT EXISTS results (
+    result_id     INTEGER PRIMARY KEY,
+    run_id        INTEGER NOT NULL REFERENCES runs(run_id),
+    category      TEXT NOT NULL,
+    agent_label   TEXT NOT NULL,
+    scen_id       TEXT NOT NULL,
+    seed          INTEGER NOT NULL DEFAULT 0,
+    agents        INTEGER,
+    solved        INTEGER NOT NULL,
+    goals_reached INTEGER,
+    goals_total   INTEGER,
+    soc           INTEGER,
+    soc_lb        INTEGER,
+    makespan      INTEGER,
+    makespan_lb   INTEGER,
+    runtime_ms    NUMERIC,  -- integral values come back as int
+    rt_steps      INTEGER,
+    extra         TEXT NOT NULL DEFAULT '{}',
+    UNIQUE (run_id, category, agent_label, scen_id, seed)
+);
+CREATE TABLE IF NOT EXISTS phases (
+    result_id INTEGER NOT NULL REFERENCES results(result_id),
+    phase     TEXT NOT NULL,
+    ms        REAL NOT NULL,
+    PRIMARY KEY (result_id, phase)
+);
+CREATE TABLE IF NOT EXISTS scen_features (
+    scen_path   TEXT PRIMARY KEY,  -- relative to ROOT, '/' separated
+    digest      TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    agent_label TEXT NOT NULL,
+    scen_id     TEXT NOT NULL,
+    format      TEXT NOT NULL,     -- 'hetbench' (what the solvers read) or 'simple'
+    features    TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_results_key
+    ON results (category, agent_label, scen_id, seed);
+CREATE INDEX IF NOT EXISTS idx_runs_solver ON runs (solver, campaign);
+CREATE INDEX IF NOT EXISTS idx_runs_hash ON runs (binary_hash);
+"""
+
+KEY_FIELDS = ["category", "agent_label", "scen_id", "seed"]
+INT_FIELDS = ["agents", "goals_reached", "goals_total", "soc", "soc_lb",
+              "makespan", "makespan_lb", "rt_steps"]
+METRIC_FIELDS = ["agents", "solved"] + INT_FIELDS[1:] + ["runtime_ms"]
+
+# legacy CSV column -> results column
+ALIASES = {
+    "map_type": "category",
+    "scenario": "scen_id",
+    "N": "agents",
+    "SOC": "soc",
+    "comp_time_ms": "runtime_ms",
+    "time_ms": "runtime_ms",
+    "steps": "rt_steps",
+}
+
+# legacy CSVs whose campaign is not their directory name
+LEGACY_CAMPAIGNS = {
+    "het_rt_lacam_pre_bfs.csv": "pre_bfs_port",
+    "het_rt_lacam.csv": "all_experiments",
+    "hetpibt.csv": "all_experiments",
+    "budget_sweep.csv": "rt_budget_sweep",
+}
+# solver for legacy CSVs without a solver column, by file-name prefix
+LEGACY_SOLVERS = [
+    ("hetpibt", "hetpibt"),
+    ("het_lacam", "het_rt_lacam"),
+    ("budget_sweep", "het_rt_lacam_rt"),
+]
+LEGACY_DIRS = [ROOT / "benchmarks" / "results", ROOT / "experiments" / "results"]
+
+
+def open_db(path=DB_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def binary_hash(exe):
+    """Short sha256 of the solver binary ('' if it does not exist)."""
+    exe = Path(exe) if exe else None
+    if exe is None or not exe.is_file():
+        return ""
+    h = hashlib.sha256()
+    with open(exe, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def start_run(conn, campaign, solver, exe=None, flags="", source=""):
+    """Return the run_id for (campaign, solver, binary, flags), creating it."""
+    bhash = binary_hash(exe)
+    row = conn.execute(
+        "SELECT run_id FROM runs WHERE campaign=? AND solver=? "
+        "AND binary_hash=? AND flags=?",
+        (campaign, solver, bhash, flags)).fetchone()
+    if row:
+        return row["run_id"]
+    cur = conn.execute(
+        "INSERT INTO runs (campaign, solver, binary_hash, flags, host, "
+        "started, source) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (campaign, solver, bhash, flags, platform.node(),
+         datetime.now().isoformat(timespec="seconds"), source))
+    return cur.lastrowid
+
+
+def _to_int(v):
+    if v in (None, ""):
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        return int(float(v))
+
+
+def normalize(row):
+    """Split a runner/CSV row into (key+metric columns, extra dict)."""
+    row = {ALIASES.get(k, k): v for k, v in row.items()}
+    core = {}
+    core["category"] = str(row.pop("category"))
+    if core["category"].endswith("_105"):
+        core["category"] = core["category"][:-len("_105")]
+    core["seed"] = _to_int(row.pop("seed", 0)) or 0
+    scen_id = row.pop("scen_id", None)
+    if scen_id in (None, ""):
+        # legacy sweeps used the seed column as the scenario index
+        scen_id = f"{core['seed']:02d}"
+        core["seed"] = 0
+    m = re.search(r"_(\d{2})(?:_n\d+)?(?:_hb)?\.scen$", str(scen_id))
+    core["scen_id"] = m.group(1) if m else str(scen_id)
+    for k in INT_FIELDS:
+        core[k] = _to_int(row.pop(k, None))
+    label = row.pop("agent_label", None)
+    if not label:
+        label = f"n{core['agents']}" if core["agents"] is not None else "var"
+    core["agent_label"] = label
+    solved = row.pop("solved", None)
+    if solved is None and core["goals_total"]:
+        solved = core["goals_reached"] == core["goals_total"]
+    core["solved"] = 1 if solved in (True, 1, "1", "True", "true", "yes") else 0
+    rt = row.pop("runtime_ms", None)
+    core["runtime_ms"] = float(rt) if rt not in (None, "") else None
+    row.pop("solver", None)
+    return core, row
+
+
+def add_result(conn, run_id, row, phases=None):
+    """Insert (or replace) one result row; `phases` maps phase -> ms."""
+    core, extra = normalize(row)
+    key = [core[k] for k in KEY_FIELDS]
+    old = conn.execute(
+        "SELECT result_id FROM results WHERE run_id=? AND category=? "
+        "AND agent_label=? AND scen_id=? AND seed=?", [run_id] + key).fetchone()
+    if old:
+        conn.execute("DELETE FROM phases WHERE result_id=?", (old["result_id"],))
+        conn.execute("DELETE FROM results WHERE result_id=?", (old["result_id"],))
+    cols = KEY_FIELDS + METRIC_FIELDS
+    cur = conn.execute(
+        f"INSERT INTO results (run_id, {', '.join(cols)}, extra) "
+        f"VALUES ({', '.join('?' * (len(cols) + 2))})",
+        [run_id] + [core[k] for k in cols] + [json.dumps(extra)])
+    for phase, ms in (phases or {}).items():
+        conn.execute("INSERT INTO phases (result_id, phase, ms) VALUES (?, ?, ?)",
+                     (cur.lastrowid, phase, ms))
+    return cur.lastrowid
+
+
+def import_csv(conn, path, campaign, solver=None):
+    """Import a legacy CSV. Rows without a scenario column are skipped, and
+    so are pruned rows (sweep_pruning.py): they are neither solved nor
+    failed, and the runners leave them out of the database too.
+
+    Returns the number of imported rows.
+    """
+    path = Path(path)
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    if not rows or not ({"category", "map_type"} & rows[0].keys()):
+        return 0
+    if not ({"scen_id", "scenario", "seed"} & rows[0].keys()):
+        return 0
+    if solver is None:
+        solver = next((name for prefix, name in LEGACY_SOLVERS
+                       if path.stem.startswith(prefix)), None)
+    rows = [r for r in rows if not r.get("pruned")]
+    run_ids = {}
+    for r in rows:
+        name = r.get("solver") or solver or path.stem
+        # budget sweeps: one run per budget
+        flags = f"--rt-budget {r['budget']}" if r.get("budget") else ""
+        if (name, flags) not in run_ids:
+            run_ids[name, flags] = start_run(conn, campaign, name, flags=flags,
+                                             source=str(path))
+        add_result(conn, run_ids[name, flags], r)
+    conn.commit()
+    return len(rows)
+
+
+def _where(campaign=None, solver=None, category=None, binary_hash=None):
+    clauses, args = [], []
+    for col, val in [("ru.campaign", campaign), ("ru.solver", solver),
+                     ("re.category", category), ("ru.binary_hash", binary_hash)]:
+        if val is not None:
+            clauses.append(f"{col}=?")
+            args.append(val)
+    return (" AND ".join(clauses) or "1"), args
+
+
+def _latest(sel):
+    """SQL selecting the newest result per scenario key within a selection."""
+    where, args = _where(**sel)
+    sql = (f"SELECT re.*, ru.campaign, ru.solver, ru.binary_hash, ru.flags "
+           f"FROM results re JOIN runs ru ON re.run_id = ru.run_id "
+           f"WHERE re.result_id IN (SELECT MAX(re.result_id) FROM results re "
+           f"JOIN runs ru ON re.run_id = ru.run_id WHERE {where} "
+           f"GROUP BY re.category, re.agent_label, re.scen_id, re.seed)")
+    return sql, args
+
+
+def _as_dict(row, prefix=""):
+    d = {k[len(prefix):]: row[k] for k in row.keys() if k.startswith(prefix)}
+    d.update(json.loads(d.pop("extra") or "{}"))
+    d["solved"] = bool(d["solved"])
+    return d
+
+
+def load_rows(conn, campaign=None, solver=None, category=None):
+    """Newest result per scenario key, as dicts (extra columns merged in)."""
+    sql, args = _latest(dict(campaign=campaign, solver=solver, category=category))
+    return [_as_dict(r) for r in conn.execute(sql, args)]
+
+
+def load_index(conn, campaign=None, solver=None, category=None):
+    """{(category, agent_label, scen_id): row} -- the analyzers' usual index."""
+    return {(r["category"], r["agent_label"], r["scen_id"]): r
+            for r in load_rows(conn, campaign, solver, category)}
+
+
+def best_runtimes(conn, campaign=None, solver=None, category=None):
+    """{(category, agent_label, scen_id): fastest solved runtime_ms} over every
+    run in the selection, not just the newest."""
+    where, args = _where(campaign=campaign, solver=solver, category=category)
+    sql = (f"SELECT re.category, re.agent_label, re.scen_id, "
+           f"MIN(re.runtime_ms) AS ms FROM results re "
+           f"JOIN runs ru ON re.run_id = ru.run_id "
+           f"WHERE {where} AND re.solved = 1 AND re.runtime_ms IS NOT NULL "
+           f"GROUP BY re.category, re.agent_label, re.scen_id")
+    return {(r["category"], r["agent_label"], r["scen_id"]): r["ms"]
+            for r in conn.execute(sql, args)}
+
+
+def paired(conn, left, right):
+    """Indexed join of two selections on the scenario key.
+
+    `left`/`right` are dicts of campaign/solver/category/binary_hash filters.
+    Returns a list of (left_row, right_row) for keys present in both.
+    """
+    sql_l, args_l = _latest(left)
+    sql_r, args_r = _latest(right)
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(results)")]
+    cols += ["campaign", "solver", "binary_hash", "flags"]
+    sel = ", ".join([f"a.{c} AS a_{c}" for c in cols] +
+                    [f"b.{c} AS b_{c}" for c in cols])
+    sql = (f"SELECT {sel} FROM ({sql_l}) a JOIN ({sql_r}) b "
+           f"ON a.category = b.category AND a.agent_label = b.agent_label "
+           f"AND a.scen_id = b.scen_id AND a.seed = b.seed "
+           f"ORDER BY a.category, a.agent_label, a.scen_id, a.seed")
+    return [(_as_dict(r, "a_"), _as_dict(r, "b_"))
+            for r in conn.execute(sql, args_l + args_r)]
+
+
+def feature_digests(conn):
+    """{scen_path: digest} of every cached scen_features row."""
+    return {r["scen_path"]: r["digest"] for r in
+            conn.execute("SELECT scen_path, digest FROM scen_features")}
+
+
+def store_features(conn, scen_path, digest, key, fmt, features):
+    """Insert (or replace) the features of one scenario file; `key` is
+    (category, agent_label, scen_id)."""
+    conn.execute(
+        "INSERT OR REPLACE INTO scen_features (scen_path, digest, category, "
+        "agent_label, scen_id, format, features) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (scen_path, digest, *key, fmt, json.dumps(features)))
+
+
+def load_features(conn, category=None, fmt="hetbench"):
+    """{(category, agent_label, scen_id): features} of cached scenarios in
+    one file format, the same key as load_index()."""
+    where, args = "format=?", [fmt]
+    if category is not None:
+        where += " AND category=?"
+        args.append(category)
+    return {(r["category"], r["agent_label"], r["scen_id"]): json.loads(r["features"])
+            for r in conn.execute(f"SELECT * FROM scen_features WHERE {where} "
+                                  f"ORDER BY scen_path", args)}
+
+
+def import_legacy(conn):
+    """Import every CSV under benchmarks/results and experiments/results.
+
+    Campaign = directory name below results/ (one per experiments CSV).
+    """
+    total = 0
+    for base in LEGACY_DIRS:
+        if not base.exists():
+            continue
+        for path in sorted(base.rglob("*.csv")):
+            if path.name in LEGACY_CAMPAIGNS:
+                campaign = LEGACY_CAMPAIGNS[path.name]
+            elif path.parent != base:
+                campaign = path.parent.name
+            else:
+                campaign = path.stem
+            n = import_csv(conn, path, campaign)
+            status = f"{n} rows -> {campaign}" if n else "skipped (no scenario key)"
+            print(f"  {path.relative_to(ROOT)}: {status}")
+            total += n
+    print(f"Imported {total} rows")
+
+
+def print_runs(conn):
+    q = ("SELECT ru.*, COUNT(re.result_id) AS n, SUM(re.solved) AS n_solved "
+         "FROM runs ru LEFT JOIN results re ON re.run_id = ru.run_id "
+         "GROUP BY ru.run_id ORDER BY ru.campaign, ru.solver, ru.run_id")
+    print(f"{'id':>4}  {'campaign':<22} {'solver':<28} {'binary':<16} "
+          f"{'solved':>9}  flags")
+    for r in conn.execute(q):
+        print(f"{r['run_id']:>4}  {r['campaign']:<22} {r['solver']:<28} "
+              f"{r['binary_hash'] or '-':<16} {r['n_solved'] or 0:>4}/{r['n']:<4}  "
+              f"{r['flags']}")
+
+
+def export_csv(conn, out, fields=None, key=None, **sel):
+    """Write a selection as CSV (all columns unless `fields` is given), rows
+    sorted by `key` if given."""
+    rows = load_rows(conn, **sel)
+    if key is not None:
+        rows.sort(key=key)
+    if fields is None:
+        fields = []
+        for r in rows:
+            fields.extend(k for k in r if k not in fields)
+    out_f = open(out, "w", newline="") if out else sys.stdout
+    w = csv.DictWriter(out_f, fieldnames=fields, extrasaction="ignore")
+    w.writeheader()
+    w.writerows(rows)
+    if out:
+        out_f.close()
+        print(f"Exported {len(rows)} rows to {out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark results database")
+    parser.add_argument("--db", default=str(DB_PATH))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("import-legacy", help="import all legacy result CSVs")
+    p = sub.add_parser("import", help="import one CSV")
+    p.add_argument("csv")
+    p.add_argument("--campaign", required=True)
+    p.add_argument("--solver", default=None,
+                   help="solver name (default: the CSV's solver column)")
+    sub.add_parser("runs", help="list runs")
+    p = sub.add_parser("export", help="write a selection as CSV")
+    p.add_argument("--campaign")
+    p.add_argument("--solver")
+    p.add_argument("--category")
+    p.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    conn = open_db(args.db)
+    if args.cmd == "import-legacy":
+        import_legacy(conn)
+    elif args.cmd == "import":
+        n = import_csv(conn, args.csv, args.campaign, args.solver)
+        print(f"Imported {n} rows from {args.csv}")
+    elif args.cmd == "runs":
+        print_runs(conn)
+    elif args.cmd == "export":
+        export_csv(conn, args.output, campaign=args.campaign,
+                   solver=args.solver, category=args.category)
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,7 +11,7 @@ import time
 import csv
 
 HET_LACAM = "E:/gb/het_rt_lacam/build/Release/main.exe"
-CONVERTER = "E:/gb/benchmarks/generators/convert_to_hetbench.py"
+GENERATORS_DIR = "E:/gb/benchmarks/generators"
 MAP_DIR = "E:/gb/benchmarks/maps"
 SCEN_DIR = "E:/gb/benchmarks/scenarios"
 RESULT_DIR = "E:/gb/experiments/results"
@@ -26,23 +26,15 @@ MAP_CONFIGS = [
 
 NUM_SCENARIOS = 25
 
+sys.path.insert(0, GENERATORS_DIR)
+import scen_convert  # noqa: E402
+
 
 def convert_scenario(scen_path, map_path, output_path):
-    """Convert 5-col to het_bench format."""
-    cmd = [
-        sys.executable, CONVERTER,
-        "--scen", scen_path,
-        "--map", map_path,
-        "--output", output_path,
-    ]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    if proc.returncode != 0:
-        print(f"  CONVERT FAILED: {proc.stderr}")
-        return False
-    # Check for warnings
-    if "WARNING" in proc.stdout:
-        print(f"  {proc.stdout.strip()}")
-    return True
+    """Convert 5-col to het_bench format (in-process, skipped when the
+    output is newer than the scenario and map)."""
+    return scen_convert.ensure(
+        scen_convert.Job("hetbench", scen_path, output_path, map_path))
 
 
 def run_one(map_path, scen_path, timeout_sec):
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
-"""Run het_lacam on 25-scenario sets with truncated agent counts."""
+"""Run het_lacam on 25-scenario sets with truncated agent counts (--agents)."""
 
 import subprocess
 import os
 import sys
 import re
+import tempfile
 import time
 
 HET_LACAM = "E:/gb/het_rt_lacam/build/Release/main.exe"
@@ -21,32 +22,24 @@ MAP_CONFIGS = [
 ]
 
 
-def truncate_scenario(scen_path, n_agents):
-    """Read first n_agents lines from scenario file."""
-    lines = []
+def count_agents(scen_path):
+    """Number of agent lines in a scenario (upper bound for --agents)."""
     with open(scen_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-            lines.append(line)
-            if len(lines) >= n_agents:
-                break
-    return lines
+        return sum(1 for line in f if line.strip() and not line.startswith('#'))
 
 
-def run_one(map_file, scen_lines, timeout_sec, idx):
-    """Run het_lacam on a truncated scenario. Returns dict with results."""
-    # Write truncated scenario to temp file
-    tmp_scen = os.path.join(RESULT_DIR, f"_tmp_scen_{idx}.scen")
-    tmp_result = os.path.join(RESULT_DIR, f"_tmp_result_{idx}.txt")
-    with open(tmp_scen, 'w') as f:
-        f.write('\n'.join(scen_lines) + '\n')
+def run_one(map_file, scen_path, n_agents, timeout_sec):
+    """Run het_lacam on the first n_agents of a scenario. Returns dict with results."""
+    # Agent selection happens in the solver (--agents); the result file is a
+    # private temp file so concurrent runs never collide in RESULT_DIR.
+    fd, tmp_result = tempfile.mkstemp(prefix="het_lacam_", suffix=".txt")
+    os.close(fd)
 
     cmd = [
         HET_LACAM,
         "-m", map_file,
-        "-i", tmp_scen,
+        "-i", scen_path,
+        "--agents", str(n_agents),
         "-t", str(timeout_sec),
         "-v", "1",
         "-l",  # log_short (skip solution dump)
@@ -71,24 +64,23 @@ def run_one(map_file, scen_lines, timeout_sec, idx):
     # Parse result file
     result = {
         "solved": False,
-        "agents": len(scen_lines),
+        "agents": min(n_agents, count_agents(scen_path)),
         "soc": 0,
         "makespan": 0,
         "comp_time_ms": elapsed * 1000,
     }
 
-    if os.path.exists(tmp_result):
-        with open(tmp_result) as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("solved="):
-                    result["solved"] = line.split("=")[1] == "1"
-                elif line.startswith("soc="):
-                    result["soc"] = int(line.split("=")[1])
-                elif line.startswith("makespan="):
-                    result["makespan"] = int(line.split("=")[1])
-                elif line.startswith("comp_time="):
-                    result["comp_time_ms"] = float(line.split("=")[1])
+    with open(tmp_result) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("solved="):
+                result["solved"] = line.split("=")[1] == "1"
+            elif line.startswith("soc="):
+                result["soc"] = int(line.split("=")[1])
+            elif line.startswith("makespan="):
+                result["makespan"] = int(line.split("=")[1])
+            elif line.startswith("comp_time="):
+                result["comp_time_ms"] = float(line.split("=")[1])
 
     # Parse fleet info from stdout
     fleet_info = ""
@@ -97,9 +89,7 @@ def run_one(map_file, scen_lines, timeout_sec, idx):
             fleet_info += line.strip() + " "
 
     # Cleanup
-    for f in [tmp_scen, tmp_result]:
-        if os.path.exists(f):
-            os.remove(f)
+    os.remove(tmp_result)
 
     return result
 
@@ -126,11 +116,10 @@ def main():
                 print(f"  SKIP {scen_name} (not found)")
                 continue
 
-            scen_lines = truncate_scenario(scen_path, MAX_AGENTS)
-            n = len(scen_lines)
+            n = min(MAX_AGENTS, count_agents(scen_path))
 
             print(f"  [{i+1:2d}/25] {scen_name} ({n} agents)...", end=" ", flush=True)
-            r = run_one(map_path, scen_lines, TIMEOUT, i)
+            r = run_one(map_path, scen_path, MAX_AGENTS, TIMEOUT)
             r["scenario"] = scen_name
 
             status = "SOLVED" if r["solved"] else "FAILED"
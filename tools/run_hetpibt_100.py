@@ -11,7 +11,7 @@ import time
 import csv
 
 HETPIBT = "E:/gb/third_party/hetpibt/build/Release/main.exe"
-CONVERTER = "E:/gb/benchmarks/generators/convert_to_hetbench.py"
+GENERATORS_DIR = "E:/gb/benchmarks/generators"
 MAP_DIR = "E:/gb/benchmarks/maps"
 SCEN_DIR = "E:/gb/benchmarks/scenarios"
 RESULT_DIR = "E:/gb/experiments/results"
@@ -26,14 +26,14 @@ MAP_CONFIGS = [
 
 NUM_SCENARIOS = 25
 
+sys.path.insert(0, GENERATORS_DIR)
+import scen_convert  # noqa: E402
+
 
 def ensure_hb(scen_path, map_path, hb_path):
-    if os.path.exists(hb_path):
-        return True
-    cmd = [sys.executable, CONVERTER,
-           "--scen", scen_path, "--map", map_path, "--output", hb_path]
-    proc = subprocess.run(cmd, capture_output=True, text=True)
-    return proc.returncode == 0
+    # in-process; reconverts only when the scenario or map is newer
+    return scen_convert.ensure(
+        scen_convert.Job("hetbench", scen_path, hb_path, map_path))
 
 
 def run_one(map_path, scen_path, timeout_ms):
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Seed portfolio: race several het_rt_lacam configurations on one scenario.
+
+LaCAM-style search is seed-sensitive, so instead of one run with a 30s
+timeout we launch K solver processes with different seeds (and optionally
+different flag sets) and keep
+
+  --mode first : the first configuration that returns a feasible solution
+                 (the others are killed immediately), or
+  --mode best  : the lowest-SoC solution available when the deadline hits
+                 (or when every configuration has finished).
+
+Every race is appended to benchmarks/results/portfolio/portfolio.csv with the
+winning seed/flags, so default flags per category can be chosen from data.
+
+Usage:
+    python tools/run_portfolio.py \
+        -m benchmarks/maps/bottleneck_doors_105.map \
+        -i benchmarks/scenarios/bottleneck_doors_105_01_n15_hb.scen \
+        --category bottleneck_doors -k 4 \
+        --flag-set= --flag-set=--no-st-bfs --flag-set=--no-refiner \
+        -t 30
+
+    python tools/run_portfolio.py --summary   # win counts per category
+"""
+import argparse
+import csv
+import os
+import shlex
+import subprocess
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+ROOT = Path("E:/gb")
+HET_LACAM = ROOT / "het_rt_lacam" / "build" / "Release" / "main.exe"
+PORTFOLIO_CSV = ROOT / "benchmarks" / "results" / "portfolio" / "portfolio.csv"
+
+POLL_INTERVAL = 0.05  # seconds
+
+CSV_FIELDS = [
+    "category", "map", "scen", "mode", "num_configs", "timeout_s",
+    "solved", "winner_seed", "winner_flags", "soc", "makespan",
+    "runtime_ms", "wall_ms", "num_solved",
+]
+
+
+def make_configs(seeds, flag_sets):
+    """Cartesian product of flag sets and seeds -> list of config dicts."""
+    configs = []
+    for flags in flag_sets:
+        for seed in seeds:
+            configs.append({"seed": seed, "flags": flags})
+    return configs
+
+
+def parse_result_file(path):
+    """Parse a het_rt_lacam -o result file (key=value lines)."""
+    result = {"solved": False, "soc": 0, "makespan": 0, "comp_time_ms": 0.0}
+    if not os.path.exists(path):
+        return result
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("solved="):
+                result["solved"] = line.split("=")[1] == "1"
+            elif line.startswith("soc="):
+                result["soc"] = int(line.split("=")[1])
+            elif line.startswith("makespan="):
+                result["makespan"] = int(line.split("=")[1])
+            elif line.startswith("comp_time="):
+                result["comp_time_ms"] = float(line.split("=")[1])
+    return result
+
+
+def build_cmd(exe, map_path, scen_path, config, timeout_s, out_path, swap_xy,
+              mode="first"):
+    cmd = [
+        str(exe),
+        "-m", str(map_path),
+        "-i", str(scen_path),
+        "-s", str(config["seed"]),
+        "-t", str(timeout_s),
+        "-v", "0",
+        "-l",
+        "-o", str(out_path),
+    ]
+    if swap_xy:
+        cmd.append("--swap-xy")
+    if mode == "first":
+        cmd.append("--no-star")  # exit as soon as a solution exists
+    cmd.extend(shlex.split(config["flags"]))
+    return cmd
+
+
+def race(exe, map_path, scen_path, configs, timeout_s, mode="first",
+         swap_xy=False, verbose=True):
+    """Run all configs concurrently. Returns (winner_or_None, finished list).
+
+    Each entry of `finished` is the config dict extended with the parsed
+    result and the process return code.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="portfolio_")
+    procs = []
+    t0 = time.time()
+    for k, config in enumerate(configs):
+        out_path = os.path.join(tmp_dir, f"result_{k}.txt")
+        cmd = build_cmd(exe, map_path, scen_path, config, timeout_s,
+                        out_path, swap_xy, mode)
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        procs.append((proc, config, out_path))
+
+    finished = []
+    winner = None
+    deadline = t0 + timeout_s + 5  # grace for solver shutdown
+    running = list(procs)
+    while running and time.time() < deadline:
+        still_running = []
+        for proc, config, out_path in running:
+            if proc.poll() is None:
+                still_running.append((proc, config, out_path))
+                continue
+            r = parse_result_file(out_path)
+            entry = dict(config)
+            entry.update(r)
+            entry["returncode"] = proc.returncode
+            entry["solved"] = r["solved"] and proc.returncode == 0
+            entry["wall_ms"] = round((time.time() - t0) * 1000)
+            finished.append(entry)
+            if verbose:
+                status = f"soc={r['soc']}" if entry["solved"] else "FAIL"
+                print(f"    seed={config['seed']:<3} flags='{config['flags']}'"
+                      f"  {status}  ({entry['wall_ms']}ms)")
+            if entry["solved"] and mode == "first" and winner is None:
+                winner = entry
+        running = still_running
+        if winner is not None:
+            break
+        if running:
+            time.sleep(POLL_INTERVAL)
+
+    # kill the losers (and anything past the deadline)
+    for proc, _, _ in running:
+        proc.kill()
+    for proc, _, _ in running:
+        proc.wait()
+
+    if mode == "best":
+        solved = [e for e in finished if e["solved"]]
+        if solved:
+            winner = min(solved, key=lambda e: (e["soc"], e["comp_time_ms"]))
+
+    for _, _, out_path in procs:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+    os.rmdir(tmp_dir)
+    return winner, finished
+
+
+def append_csv(row, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not path.exists()
+    with open(path, "a", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        if new_file:
+            w.writeheader()
+        w.writerow(row)
+
+
+def print_summary(path):
+    """Win counts per category and flag set, from the portfolio CSV."""
+    if not Path(path).exists():
+        print(f"No portfolio results at {path}")
+        return
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    by_cat = defaultdict(Counter)
+    totals = Counter()
+    for r in rows:
+        totals[r["category"]] += 1
+        if r["solved"] == "True":
+            by_cat[r["category"]][r["winner_flags"] or "(default)"] += 1
+    print(f"{'category':<25} {'races':>6}  winning flag sets")
+    for cat in sorted(totals):
+        wins = ", ".join(f"{fl}: {n}" for fl, n in by_cat[cat].most_common())
+        print(f"{cat:<25} {totals[cat]:>6}  {wins or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Race het_rt_lacam seeds/flags on one scenario")
+    parser.add_argument("-m", "--map", help="map file")
+    parser.add_argument("-i", "--scen", help="scenario file")
+    parser.add_argument("--category", default="",
+                        help="category label recorded in the CSV")
+    parser.add_argument("-k", "--num-seeds", type=int, default=4,
+                        help="seeds per flag set (seeds 0..K-1)")
+    parser.add_argument("--seeds", type=int, nargs="+",
+                        help="explicit seed list (overrides -k)")
+    parser.add_argument("--flag-set", action="append", default=None,
+                        help="extra solver flags for one portfolio member "
+                             "(repeatable; use the = form for dashes, "
+                             "e.g. --flag-set=--no-st-bfs)")
+    parser.add_argument("--mode", choices=["first", "best"], default="first")
+    parser.add_argument("-t", "--timeout", type=int, default=30)
+    parser.add_argument("--swap-xy", action="store_true")
+    parser.add_argument("--exe", default=str(HET_LACAM))
+    parser.add_argument("--csv", default=str(PORTFOLIO_CSV))
+    parser.add_argument("--summary", action="store_true",
+                        help="print win counts from --csv and exit")
+    args = parser.parse_args()
+
+    if args.summary:
+        print_summary(args.csv)
+        return
+    if not args.map or not args.scen:
+        parser.error("-m/--map and -i/--scen are required")
+
+    seeds = args.seeds if args.seeds else list(range(args.num_seeds))
+    flag_sets = args.flag_set if args.flag_set else [""]
+    configs = make_configs(seeds, flag_sets)
+
+    print(f"Portfolio: {len(configs)} configs on {Path(args.scen).name} "
+          f"(mode={args.mode}, timeout={args.timeout}s)")
+    t0 = time.time()
+    winner, finished = race(args.exe, args.map, args.scen, configs,
+                            args.timeout, args.mode, args.swap_xy)
+    wall_ms = round((time.time() - t0) * 1000)
+
+    row = {
+        "category": args.category,
+        "map": Path(args.map).name,
+        "scen": Path(args.scen).name,
+        "mode": args.mode,
+        "num_configs": len(configs),
+        "timeout_s": args.timeout,
+        "solved": winner is not None,
+        "winner_seed": winner["seed"] if winner else "",
+        "winner_flags": winner["flags"] if winner else "",
+        "soc": winner["soc"] if winner else 0,
+        "makespan": winner["makespan"] if winner else 0,
+        "runtime_ms": round(winner["comp_time_ms"]) if winner else 0,
+        "wall_ms": wall_ms,
+        "num_solved": sum(1 for e in finished if e["solved"]),
+    }
+    append_csv(row, args.csv)
+
+    if winner:
+        print(f"  WINNER seed={winner['seed']} flags='{winner['flags']}' "
+              f"soc={winner['soc']} ({row['runtime_ms']}ms solver, "
+              f"{wall_ms}ms wall)")
+    else:
+        print(f"  no configuration solved the scenario ({wall_ms}ms)")
+    print(f"  -> appended to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
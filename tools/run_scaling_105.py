@@ -2,20 +2,28 @@
 """Scaling experiment: het_lacam on intersection and cooperative_clearing.
 
 Tests agent counts: 5, 10, 15, 20, 25.
-For each count, truncates scenarios and runs het_lacam.
+For each count, runs het_lacam on the first N agents (--agents N).
+--prune-after / --budget-factor skip or shorten hopeless runs (see
+sweep_pruning.py); those rows are marked in the `pruned` column.
 """
+import argparse
 import subprocess
 import os
 import sys
 import re
+import tempfile
 import time
 import csv
 
+import results_db
+import sweep_pruning
+
 HET_LACAM = "E:/gb/het_rt_lacam/build/Release/main.exe"
 SCEN_DIR = "E:/gb/benchmarks/scenarios"
 MAP_DIR = "E:/gb/benchmarks/maps"
 RESULT_DIR = "E:/gb/experiments/results"
 TIMEOUT = 60
+CAMPAIGN = "het_lacam_scaling_105"  # results.db history of this sweep
 
 MAP_CONFIGS = [
     ("intersection", "intersection_105.map", "intersection_105"),
@@ -26,37 +34,23 @@ AGENT_COUNTS = [5, 10, 15, 20, 25]
 NUM_SCENARIOS = 25
 
 
-def truncate_hb_scen(hb_path, n_agents):
-    """Read first n_agents lines from het_bench scenario."""
-    lines = []
-    with open(hb_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            lines.append(line)
-            if len(lines) >= n_agents:
-                break
-    # Renumber agent IDs 0..n-1
-    renumbered = []
-    for i, line in enumerate(lines):
-        parts = line.split()
-        parts[0] = str(i)  # agent_id
-        renumbered.append(' '.join(parts))
-    return renumbered
+def count_agents(scen_path):
+    """Number of agent lines in a scenario (upper bound for --agents)."""
+    with open(scen_path) as f:
+        return sum(1 for line in f if line.strip() and not line.startswith('#'))
 
 
-def run_one(map_path, scen_lines, timeout_sec, tag):
-    tmp_scen = os.path.join(RESULT_DIR, f"_tmp_scale_{tag}.scen")
-    tmp_result = os.path.join(RESULT_DIR, f"_tmp_scale_{tag}.txt")
-
-    with open(tmp_scen, 'w') as f:
-        f.write('\n'.join(scen_lines) + '\n')
+def run_one(map_path, scen_path, n_agents, timeout_sec):
+    # The solver selects the first n_agents itself (--agents), so no truncated
+    # scenario is written; the result goes to a private temp file.
+    fd, tmp_result = tempfile.mkstemp(prefix="het_lacam_", suffix=".txt")
+    os.close(fd)
 
     cmd = [
         HET_LACAM,
         "-m", map_path,
-        "-i", tmp_scen,
+        "-i", scen_path,
+        "--agents", str(n_agents),
         "-t", str(timeout_sec),
         "-v", "0",
         "-l",
@@ -71,37 +65,37 @@ def run_one(map_path, scen_lines, timeout_sec, tag):
         elapsed = time.time() - t0
     except subprocess.TimeoutExpired:
         elapsed = time.time() - t0
-        for f in [tmp_scen, tmp_result]:
-            if os.path.exists(f):
-                os.remove(f)
+        os.remove(tmp_result)
         return {"solved": False, "soc": 0, "makespan": 0,
                 "comp_time_ms": elapsed * 1000}
 
     result = {"solved": False, "soc": 0, "makespan": 0,
               "comp_time_ms": elapsed * 1000}
 
-    if os.path.exists(tmp_result):
-        with open(tmp_result) as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("solved="):
-                    result["solved"] = line.split("=")[1] == "1"
-                elif line.startswith("soc="):
-                    result["soc"] = int(line.split("=")[1])
-                elif line.startswith("makespan="):
-                    result["makespan"] = int(line.split("=")[1])
-                elif line.startswith("comp_time="):
-                    result["comp_time_ms"] = float(line.split("=")[1])
-
-    for f in [tmp_scen, tmp_result]:
-        if os.path.exists(f):
-            os.remove(f)
-
+    with open(tmp_result) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("solved="):
+                result["solved"] = line.split("=")[1] == "1"
+            elif line.startswith("soc="):
+                result["soc"] = int(line.split("=")[1])
+            elif line.startswith("makespan="):
+                result["makespan"] = int(line.split("=")[1])
+            elif line.startswith("comp_time="):
+                result["comp_time_ms"] = float(line.split("=")[1])
+
+    os.remove(tmp_result)
     return result
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sweep_pruning.add_arguments(parser)
+    args = parser.parse_args()
+
     os.makedirs(RESULT_DIR, exist_ok=True)
+    db = results_db.open_db() if args.budget_factor > 0 else None
+    pruner = sweep_pruning.Pruner.from_args(args, db, CAMPAIGN)
     all_results = []
 
     for map_type, map_file, scen_prefix in MAP_CONFIGS:
@@ -123,39 +117,46 @@ def main():
                 if not os.path.exists(hb_path):
                     continue
 
-                lines = truncate_hb_scen(hb_path, n_agents)
-                actual_n = len(lines)
-
-                tag = f"{map_type}_{n_agents}_{i}"
-                r = run_one(map_path, lines, TIMEOUT, tag)
-
-                if r["solved"]:
-                    solved_count += 1
-
-                total_time += r["comp_time_ms"]
+                actual_n = min(n_agents, count_agents(hb_path))
+                key = (map_type, f"n{n_agents}", f"{i:02d}")
+                reason = pruner.skip("het_rt_lacam", key, TIMEOUT)
+                if reason is None:
+                    timeout, cap = pruner.budget("het_rt_lacam", key, TIMEOUT)
+                    r = run_one(map_path, hb_path, n_agents, timeout)
+                    reason = pruner.outcome("het_rt_lacam", key, r["solved"], cap)
+                else:
+                    r = {"solved": False, "soc": 0, "makespan": 0,
+                         "comp_time_ms": 0}
+                if reason is None:
+                    solved_count += r["solved"]
+                    total_time += r["comp_time_ms"]
 
                 all_results.append({
                     "map_type": map_type,
                     "agents": actual_n,
                     "seed": i,
-                    "solved": r["solved"],
+                    "solved": "" if reason else r["solved"],
                     "soc": r["soc"],
                     "makespan": r["makespan"],
                     "comp_time_ms": round(r["comp_time_ms"], 1),
+                    "pruned": reason or "",
                 })
 
-            n_run = sum(1 for r in all_results
-                        if r["map_type"] == map_type and r["agents"] == n_agents)
+            rows = [r for r in all_results
+                    if r["map_type"] == map_type and r["agents"] == n_agents]
+            n_run = sum(1 for r in rows if not r["pruned"])
+            n_pruned = len(rows) - n_run
             avg_t = total_time / max(n_run, 1)
             print(f"  N={n_agents:2d}: {solved_count}/{n_run} solved "
-                  f"({solved_count/max(n_run,1)*100:.0f}%), avg_t={avg_t:.0f}ms")
+                  f"({solved_count/max(n_run,1)*100:.0f}%), avg_t={avg_t:.0f}ms"
+                  + (f", {n_pruned} pruned" if n_pruned else ""))
 
     # Write CSV
     csv_path = os.path.join(RESULT_DIR, "het_lacam_scaling_105.csv")
     with open(csv_path, 'w', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=[
             "map_type", "agents", "seed", "solved",
-            "soc", "makespan", "comp_time_ms"])
+            "soc", "makespan", "comp_time_ms", "pruned"])
         writer.writeheader()
         writer.writerows(all_results)
     print(f"\nCSV written to {csv_path}")
@@ -168,12 +169,17 @@ def main():
     for map_type, _, _ in MAP_CONFIGS:
         for n in AGENT_COUNTS:
             rows = [r for r in all_results
-                    if r["map_type"] == map_type and r["agents"] == n]
+                    if r["map_type"] == map_type and r["agents"] == n
+                    and not r["pruned"]]
             if not rows:
                 continue
             s = sum(1 for r in rows if r["solved"])
             avg_t = sum(r["comp_time_ms"] for r in rows) / len(rows)
             print(f"  {map_type:<23} {n:>4} {s:>4}/{len(rows):>2} {s/len(rows)*100:>6.1f}% {avg_t:>10.0f}")
+    if pruner.active:
+        print(f"\n{pruner.summary()}")
+    if db is not None:
+        db.close()
 
 
 if __name__ == "__main__":
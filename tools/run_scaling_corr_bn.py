@@ -5,6 +5,7 @@ Agent counts: 5, 10, 15, 20, 25. Seeds 00-24. 60s timeout.
 import subprocess
 import os
 import sys
+import tempfile
 import time
 import csv
 
@@ -23,33 +24,21 @@ AGENT_COUNTS = [5, 10, 15, 20, 25]
 NUM_SCENARIOS = 25
 
 
-def truncate_hb_scen(hb_path, n_agents):
-    lines = []
-    with open(hb_path) as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            lines.append(line)
-            if len(lines) >= n_agents:
-                break
-    renumbered = []
-    for i, line in enumerate(lines):
-        parts = line.split()
-        parts[0] = str(i)
-        renumbered.append(' '.join(parts))
-    return renumbered
-
-
-def run_one(map_path, scen_lines, timeout_sec, tag):
-    tmp_scen = os.path.join(RESULT_DIR, f"_tmp_{tag}.scen")
-    tmp_result = os.path.join(RESULT_DIR, f"_tmp_{tag}.txt")
-
-    with open(tmp_scen, 'w') as f:
-        f.write('\n'.join(scen_lines) + '\n')
+def count_agents(scen_path):
+    """Number of agent lines in a scenario (upper bound for --agents)."""
+    with open(scen_path) as f:
+        return sum(1 for line in f if line.strip() and not line.startswith('#'))
+
+
+def run_one(map_path, scen_path, n_agents, timeout_sec):
+    # The solver selects the first n_agents itself (--agents); only the
+    # result file is per-run, in a private temp file (safe to parallelize).
+    fd, tmp_result = tempfile.mkstemp(prefix="het_lacam_", suffix=".txt")
+    os.close(fd)
 
     cmd = [
-        HET_LACAM, "-m", map_path, "-i", tmp_scen,
+        HET_LACAM, "-m", map_path, "-i", scen_path,
+        "--agents", str(n_agents),
         "-t", str(timeout_sec), "-v", "0", "-l", "--no-star",
         "-o", tmp_result,
     ]
@@ -61,29 +50,26 @@ def run_one(map_path, scen_lines, timeout_sec, tag):
         elapsed = time.time() - t0
     except subprocess.TimeoutExpired:
         elapsed = time.time() - t0
-        for p in [tmp_scen, tmp_result]:
-            if os.path.exists(p): os.remove(p)
+        os.remove(tmp_result)
         return {"solved": False, "soc": 0, "makespan": 0,
                 "comp_time_ms": elapsed * 1000}
 
     result = {"solved": False, "soc": 0, "makespan": 0,
               "comp_time_ms": elapsed * 1000}
 
-    if os.path.exists(tmp_result):
-        with open(tmp_result) as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("solved="):
-                    result["solved"] = line.split("=")[1] == "1"
-                elif line.startswith("soc="):
-                    result["soc"] = int(line.split("=")[1])
-                elif line.startswith("makespan="):
-                    result["makespan"] = int(line.split("=")[1])
-                elif line.startswith("comp_time="):
-                    result["comp_time_ms"] = float(line.split("=")[1])
-
-    for p in [tmp_scen, tmp_result]:
-        if os.path.exists(p): os.remove(p)
+    with open(tmp_result) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("solved="):
+                result["solved"] = line.split("=")[1] == "1"
+            elif line.startswith("soc="):
+                result["soc"] = int(line.split("=")[1])
+            elif line.startswith("makespan="):
+                result["makespan"] = int(line.split("=")[1])
+            elif line.startswith("comp_time="):
+                result["comp_time_ms"] = float(line.split("=")[1])
+
+    os.remove(tmp_result)
     return result
 
 
@@ -109,15 +95,14 @@ def main():
                 hb_path = os.path.join(SCEN_DIR, f"{scen_prefix}_{i:02d}_hb.scen")
                 if not os.path.exists(hb_path): continue
 
-                lines = truncate_hb_scen(hb_path, n_agents)
-                tag = f"{map_type}_{n_agents}_{i}"
-                r = run_one(map_path, lines, TIMEOUT, tag)
+                actual_n = min(n_agents, count_agents(hb_path))
+                r = run_one(map_path, hb_path, n_agents, TIMEOUT)
                 if r["solved"]: solved_count += 1
                 total_time += r["comp_time_ms"]
                 n_run += 1
 
                 all_results.append({
-                    "map_type": map_type, "agents": len(lines),
+                    "map_type": map_type, "agents": actual_n,
                     "seed": i, "solved": r["solved"],
                     "soc": r["soc"], "makespan": r["makespan"],
                     "comp_time_ms": round(r["comp_time_ms"], 1),
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Runtime prediction and longest-job-first scheduling for benchmark sweeps.
+
+With a worker pool, a sweep finishes when its last job does, so the long
+jobs (timeouts) should start first. RuntimeModel estimates the cost of a
+job from
+
+  history   runtime_ms of the newest stored result for the same
+            (category, agent_label, scen_id) in results.db, capped at the
+            sweep timeout;
+  features  a least-squares fit of log(runtime_ms) on cheap scenario
+            features (agent count, fleet mix, sum/max of per-agent BFS
+            distances on the fleet grids, narrow passages the agents cannot
+            avoid and how many agents share one with another fleet, one
+            intercept per map category) trained on the scenarios that do
+            have history.
+
+Without any history the feature score (sum of BFS distances) still ranks
+jobs, but it is not in ms, so no makespan is predicted.
+
+lpt_schedule() simulates greedy longest-processing-time list scheduling,
+which is what submitting jobs longest-first to a pool amounts to, and
+gives the predicted makespan of the sweep.
+
+Usage:
+    python tools/runtime_model.py --category bottleneck_doors -j 4 -t 60
+    python tools/runtime_model.py --category all --solver het_rt_lacam_rt --loo
+"""
+import argparse
+import heapq
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path("E:/gb")
+
+sys.path.insert(0, str(ROOT / "tools"))
+sys.path.insert(0, str(ROOT / "third_party" / "hetpibt" / "tools"))
+import results_db  # noqa: E402
+from gen_scenario import build_fleet_grid, get_neighbors, load_map  # noqa: E402
+from passages import competition, map_passages  # noqa: E402
+
+FEATURES = ["log_agents", "n_fleets", "large_share", "log_sum_bfs",
+            "log_max_bfs", "log_crossings", "contested_share"]
+RIDGE = 1e-3  # keeps the fit stable with few history rows per category
+
+
+# ---------------------------------------------------------------------------
+# scenario features
+# ---------------------------------------------------------------------------
+
+_maps = {}
+_fleet_graphs = {}
+_distances = {}
+
+
+def fleet_graph(map_path, cell_size):
+    """(width, neighbor lists) of the fleet grid, cells indexed y * width + x."""
+    if map_path not in _maps:
+        _maps[map_path] = load_map(map_path)
+    if (map_path, cell_size) not in _fleet_graphs:
+        width, height, grid = _maps[map_path]
+        fw, _, free = build_fleet_grid(grid, width, height, cell_size)
+        adj = {fy * fw + fx: [ny * fw + nx for nx, ny in
+                              get_neighbors(fx, fy, free)]
+               for fx, fy in free}
+        _fleet_graphs[map_path, cell_size] = (fw, adj)
+    return _fleet_graphs[map_path, cell_size]
+
+
+def bfs_distance(map_path, cell_size, start, goal):
+    """Fleet-grid BFS distance between two (fx, fy) cells, None if cut off."""
+    key = (map_path, cell_size, start, goal)
+    if key not in _distances:
+        fw, adj = fleet_graph(map_path, cell_size)
+        s, g = start[1] * fw + start[0], goal[1] * fw + goal[0]
+        dist = {s: 0} if s in adj else {}
+        frontier = list(dist)
+        d = 0
+        while frontier and g not in dist:
+            d += 1
+            nxt = []
+            for u in frontier:
+                for v in adj[u]:
+                    if v not in dist:
+                        dist[v] = d
+                        nxt.append(v)
+            frontier = nxt
+        _distances[key] = dist.get(g)
+    return _distances[key]
+
+
+def read_agents(scen_path):
+    """[(cell_size, sx, sy, gx, gy)] from either scenario format."""
+    agents = []
+    with open(scen_path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            try:
+                if len(parts) >= 10:  # agent_id fleet_id cs vel sx sy gx gy w h
+                    agents.append(tuple(int(float(v)) for v in
+                                        [parts[2]] + parts[4:8]))
+                else:  # cs sx sy gx gy
+                    agents.append(tuple(int(v) for v in parts[:5]))
+            except ValueError:
+                continue
+    return agents
+
+
+def scen_features(scen):
+    """Cheap per-scenario features (dict over FEATURES plus raw values)."""
+    agents = read_agents(scen["scen_path"])
+    dists = []
+    starts, goals = [], []
+    for cs, sx, sy, gx, gy in agents:
+        if scen["swap_xy"]:
+            sx, sy, gx, gy = sy, sx, gy, gx
+        starts.append((sx // cs, sy // cs))
+        goals.append((gx // cs, gy // cs))
+        d = bfs_distance(scen["map_path"], cs, starts[-1], goals[-1])
+        if d is not None:
+            dists.append(d)
+    sizes = [a[0] for a in agents]
+    n = max(len(agents), 1)
+    sum_bfs = sum(dists)
+    crossings = contested = 0
+    if agents:
+        mp = map_passages(scen["map_path"])
+        crossed = mp.crossings(sizes, starts, goals)
+        _, overlap = mp.table(sizes)
+        crossings = int(crossed.sum())
+        contested = int(competition(sizes, crossed, overlap).sum())
+    return {
+        "agents": len(agents),
+        "sum_bfs": sum_bfs,
+        "log_agents": math.log(n),
+        "n_fleets": len(set(sizes)),
+        "large_share": sum(1 for cs in sizes if cs > 1) / n,
+        "log_sum_bfs": math.log1p(sum_bfs),
+        "log_max_bfs": math.log1p(max(dists, default=0)),
+        "log_crossings": math.log1p(crossings),
+        "contested_share": contested / n,
+    }
+
+
+def scen_key(scen):
+    return (scen["category"], scen["agent_label"], scen["scen_id"])
+
+
+# ---------------------------------------------------------------------------
+# model
+# ---------------------------------------------------------------------------
+
+class RuntimeModel:
+    """Per-job runtime estimates (ms) for one solver and timeout."""
+
+    def __init__(self, history, timeout_ms):
+        self.history = history  # {scen_key: runtime_ms}
+        self.timeout_ms = timeout_ms
+        self.categories = []
+        self.coef = None
+        self.calibrated = True
+        self.features = {}
+
+    @classmethod
+    def from_db(cls, conn, solver, timeout_ms, campaign=None):
+        index = results_db.load_index(conn, campaign=campaign, solver=solver)
+        history = {k: float(r["runtime_ms"]) for k, r in index.items()
+                   if r.get("runtime_ms") not in (None, "")}
+        return cls(history, timeout_ms)
+
+    def features_of(self, scen):
+        key = scen_key(scen)
+        if key not in self.features:
+            self.features[key] = scen_features(scen)
+        return self.features[key]
+
+    def _row(self, scen):
+        f = self.features_of(scen)
+        onehot = [1.0 if scen["category"] == c else 0.0 for c in self.categories]
+        return [f[k] for k in FEATURES] + onehot + [1.0]
+
+    def fit(self, scenarios):
+        """Fit the feature model on the scenarios that have history."""
+        train = [s for s in scenarios if scen_key(s) in self.history]
+        self.categories = sorted({s["category"] for s in train})
+        if len(train) < len(FEATURES) + len(self.categories) + 1:
+            self.coef = None
+            return self
+        X = np.array([self._row(s) for s in train])
+        y = np.log(np.maximum([self.cost(s) for s in train], 1.0))
+        reg = RIDGE * np.eye(X.shape[1])
+        self.coef = np.linalg.solve(X.T @ X + reg, X.T @ y)
+        return self
+
+    def cost(self, scen):
+        return min(self.history[scen_key(scen)], self.timeout_ms)
+
+    def predict(self, scen):
+        """(estimate, source) where source is history / model / features."""
+        if scen_key(scen) in self.history:
+            return self.cost(scen), "history"
+        if self.coef is not None:
+            est = math.exp(float(np.dot(self._row(scen), self.coef)))
+            return min(max(est, 1.0), self.timeout_ms), "model"
+        return float(self.features_of(scen)["sum_bfs"]), "features"
+
+    def predict_all(self, scenarios):
+        """Fit on `scenarios`, then predict each. `calibrated` tells whether
+        every estimate is in ms."""
+        if any(scen_key(s) not in self.history for s in scenarios):
+            self.fit(scenarios)
+        preds = [self.predict(s) for s in scenarios]
+        self.calibrated = all(src != "features" for _, src in preds)
+        return preds
+
+
+def lpt_schedule(costs, workers):
+    """Longest-first order and greedy list schedule on `workers`.
+
+    Returns (order, makespan, loads): job indices by decreasing cost, the
+    finish time of the last worker and each worker's total.
+    """
+    order = sorted(range(len(costs)), key=lambda i: -costs[i])
+    return order, *list_schedule(costs, order, workers)
+
+
+def list_schedule(costs, order, workers):
+    """(makespan, loads) when jobs start in `order` on the first free worker."""
+    heap = [(0.0, w) for w in range(max(workers, 1))]
+    for i in order:
+        load, w = heapq.heappop(heap)
+        heapq.heappush(heap, (load + costs[i], w))
+    loads = [load for load, _ in sorted(heap, key=lambda t: t[1])]
+    return max(loads, default=0.0), loads
+
+
+def leave_one_out(model, scenarios):
+    """[(key, actual_ms, predicted_ms)] predicting each history job from
+    a feature model fitted on all the others."""
+    out = []
+    for s in scenarios:
+        key = scen_key(s)
+        if key not in model.history:
+            continue
+        actual = model.history.pop(key)
+        model.fit(scenarios)
+        if model.coef is not None:
+            out.append((key, min(actual, model.timeout_ms), model.predict(s)[0]))
+        model.history[key] = actual
+    model.fit(scenarios)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# main
+# ---------------------------------------------------------------------------
+
+def main():
+    sys.path.insert(0, str(ROOT / "benchmarks" / "results" / "rt_lacam"))
+    from compare_builds import CATEGORIES, discover
+    from run_rt import AGENT_COUNTS
+
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    p.add_argument("--category", default="all", choices=["all"] + CATEGORIES)
+    p.add_argument("--agents", nargs="+", default=AGENT_COUNTS,
+                   help="agent labels for the 105 categories")
+    p.add_argument("--solver", default="het_rt_lacam_rt")
+    p.add_argument("--campaign", default=None,
+                   help="restrict history to one campaign")
+    p.add_argument("-t", "--timeout", type=int, default=60)
+    p.add_argument("-j", "--jobs", type=int, default=4)
+    p.add_argument("--loo", action="store_true",
+                   help="leave-one-out error of the feature model on history")
+    args = p.parse_args()
+
+    cats = CATEGORIES if args.category == "all" else [args.category]
+    scenarios = discover(cats, args.agents)
+    db = results_db.open_db()
+    model = RuntimeModel.from_db(db, args.solver, args.timeout * 1000,
+                                 args.campaign)
+    db.close()
+    preds = model.predict_all(scenarios)
+    costs = [c for c, _ in preds]
+    sources = [src for _, src in preds]
+    unit = "ms" if model.calibrated else "bfs"
+
+    order, makespan, loads = lpt_schedule(costs, args.jobs)
+    fifo, _ = list_schedule(costs, range(len(costs)), args.jobs)
+    print(f"{len(scenarios)} jobs, {args.jobs} workers, "
+          f"{sources.count('history')} from history, "
+          f"{sources.count('model')} from the feature model, "
+          f"{sources.count('features')} unscaled")
+    print(f"{'job':<36} {'predicted':>10} source")
+    for i in order[:20]:
+        s = scenarios[i]
+        label = f"{s['category']}/{s['agent_label']}/scen{s['scen_id']}"
+        print(f"{label:<36} {costs[i]:>8.0f}{unit:>2} {sources[i]}")
+    if len(order) > 20:
+        print(f"... {len(order) - 20} more")
+    print(f"\ntotal work       {sum(costs):>10.0f} {unit}")
+    print(f"lower bound      {max(sum(costs) / args.jobs, max(costs, default=0)):>10.0f} {unit}")
+    print(f"makespan (LJF)   {makespan:>10.0f} {unit}")
+    print(f"makespan (FIFO)  {fifo:>10.0f} {unit}")
+
+    if args.loo:
+        errs = leave_one_out(model, scenarios)
+        if not errs:
+            print("\nleave-one-out: not enough history to fit the model")
+            return
+        ratio = np.array([math.log(max(p_, 1.0) / max(a, 1.0))
+                          for _, a, p_ in errs])
+        print(f"\nleave-one-out on {len(errs)} history jobs: median |log ratio| "
+              f"{np.median(np.abs(ratio)):.2f} "
+              f"(x{math.exp(np.median(np.abs(ratio))):.2f}), "
+              f"within 2x: {np.mean(np.abs(ratio) <= math.log(2)):.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Solver-independent hardness descriptors for every benchmark scenario.
+
+For each .scen in benchmarks/scenarios (both file formats, plus het_bench/)
+the extractor computes, vectorized over agents:
+
+  density     agents per free fleet cell of each fleet (density_csK),
+              the largest of those, and footprint area per free base cell
+  distances   sum / max fleet-grid BFS distance, unreachable agents
+  corridors   union of all shortest paths of an agent, as base cells:
+              mean size, share of agent pairs (and of cross-fleet pairs)
+              whose corridors overlap, most corridors through one cell
+  mix         fleets, cell-size ratio and coefficient of variation,
+              entropy of the fleet shares
+  passages    narrow passages (third_party/hetpibt/tools/passages.py):
+              agents whose corridor enters the busiest one, passages used
+              at all, unavoidable crossings, share of agents whose
+              unavoidable passage another fleet needs too
+
+BFS runs level-synchronously for all agents of a fleet at once on shifted
+copies of the fleet grid. Results are cached in results.db
+(results_db.scen_features) under a digest of scenario, map and VERSION, so
+a re-run only touches new or changed files, and load_features() returns
+them under the same (category, agent_label, scen_id) key as the results.
+--strata splits each category into quantile bins of one feature, to pick
+stratified sweep subsets (instead of hand labels such as budget_sweep's
+"high-step") or to sanity-check the runtime model.
+
+Usage:
+    python tools/scen_hardness.py -j 4
+    python tools/scen_hardness.py --category intersection --strata 3 --by max_cell_load
+    python tools/scen_hardness.py --csv features.csv --force
+"""
+import argparse
+import csv
+import hashlib
+import re
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path("E:/gb")
+SCEN_DIR = ROOT / "benchmarks" / "scenarios"
+MAPS_DIR = ROOT / "benchmarks" / "maps"
+
+sys.path.insert(0, str(ROOT / "tools"))
+sys.path.insert(0, str(ROOT / "third_party" / "hetpibt" / "tools"))
+import results_db  # noqa: E402
+from passages import competition, map_passages  # noqa: E402
+from runtime_model import read_agents  # noqa: E402
+
+VERSION = 1  # bump when a descriptor changes; invalidates the cache
+FEATURES = ["agents", "n_fleets", "footprint_density", "max_fleet_density",
+            "sum_bfs", "max_bfs", "unreachable", "corridor_cells",
+            "overlap_pairs", "cross_fleet_overlap", "max_cell_load",
+            "size_ratio", "size_cv", "fleet_entropy", "max_passage_load",
+            "passages_used", "crossings", "contested_share"]
+# scenario file prefixes that do not name their map
+MAP_ALIASES = {"cs154": "corridor_speed_154",
+               "coop_clearing_77": "cooperative_clearing_77"}
+
+
+# ---------------------------------------------------------------------------
+# scenario discovery
+# ---------------------------------------------------------------------------
+
+def discover_all(scen_dir=SCEN_DIR, maps_dir=MAPS_DIR):
+    """Every scenario file with its map, swap flag and results key."""
+    map_stems = sorted((p.stem for p in Path(maps_dir).glob("*.map")),
+                       key=len, reverse=True)
+    jobs = []
+    for path in sorted(Path(scen_dir).glob("*.scen")):
+        stem = path.stem
+        for alias, target in MAP_ALIASES.items():
+            if stem.startswith(alias + "_"):
+                stem = target + stem[len(alias):]
+        map_stem = next((m for m in map_stems if stem.startswith(m)), None)
+        if map_stem is None:
+            print(f"  {path.name}: no matching map, skipped")
+            continue
+        rest = stem[len(map_stem):]
+        m_id = re.match(r"_(\d{2})(?:_|$)", rest)
+        m_n = re.search(r"_n(\d+)(?:_|$)", rest)
+        category = map_stem[:-len("_105")] if map_stem.endswith("_105") else map_stem
+        jobs.append({
+            "scen_path": str(path), "map_path": str(Path(maps_dir) / f"{map_stem}.map"),
+            "swap_xy": False, "category": category,
+            "agent_label": f"n{m_n.group(1)}" if m_n else None,
+            "scen_id": m_id.group(1) if m_id else "00",
+        })
+    for path in sorted((Path(scen_dir) / "het_bench").glob("scen.*")):
+        jobs.append({
+            "scen_path": str(path), "map_path": str(Path(maps_dir) / "room120.map"),
+            "swap_xy": True, "category": "het_bench", "agent_label": "var",
+            "scen_id": path.suffix[1:],
+        })
+    return jobs
+
+
+def digest(job):
+    h = hashlib.sha256(f"v{VERSION}".encode())
+    for p in (job["scen_path"], job["map_path"]):
+        h.update(Path(p).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def rel_path(path):
+    try:
+        return Path(path).relative_to(ROOT).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+
+# ---------------------------------------------------------------------------
+# descriptors
+# ---------------------------------------------------------------------------
+
+def bfs_levels(free, sources):
+    """(k, fh * fw) BFS distance from each flat source cell over the free
+    (fh, fw) fleet grid (-1 = unreachable), all sources expanded level by
+    level together with shifted copies of the frontier."""
+    k = len(sources)
+    fh, fw = free.shape
+    dist = np.full((k, fh, fw), -1, dtype=np.int32)
+    front = np.zeros((k, fh, fw), dtype=bool)
+    ys, xs = np.divmod(np.asarray(sources), fw)
+    dist[np.arange(k), ys, xs] = 0
+    front[np.arange(k), ys, xs] = True
+    d = 0
+    while front.any():
+        d += 1
+        new = np.zeros_like(front)
+        new[:, 1:] |= front[:, :-1]
+        new[:, :-1] |= front[:, 1:]
+        new[:, :, 1:] |= front[:, :, :-1]
+        new[:, :, :-1] |= front[:, :, 1:]
+        new &= free & (dist < 0)
+        dist[new] = d
+        front = new
+    return dist.reshape(k, -1)
+
+
+def footprints(on, f, shape):
+    """(k, H * W) base cells covered by fleet-cell masks (k, fh * fw)."""
+    cs = f.cs
+    cells = on.reshape(-1, f.fh, f.fw).repeat(cs, axis=1).repeat(cs, axis=2)
+    out = np.zeros((len(on),) + shape, dtype=bool)
+    out[:, :f.fh * cs, :f.fw * cs] = cells
+    return out.reshape(len(on), -1)
+
+
+def extract(job):
+    """Descriptors of one scenario (dict over FEATURES plus density_csK)."""
+    agents = np.array(read_agents(job["scen_path"]), dtype=np.int64).reshape(-1, 5)
+    if job["swap_xy"]:
+        agents[:, 1:] = agents[:, [2, 1, 4, 3]]
+    return extract_agents(agents, job["map_path"])
+
+
+def extract_agents(agents, map_path):
+    """extract() of an (n, 5) array of (cs, sx, sy, gx, gy) base coords."""
+    cs = agents[:, 0]
+    n = len(cs)
+    start = agents[:, 1:3] // np.maximum(cs, 1)[:, None]
+    goal = agents[:, 3:5] // np.maximum(cs, 1)[:, None]
+    mp = map_passages(map_path)
+    sizes = sorted(set(cs.tolist()))
+    out = {"agents": n, "n_fleets": len(sizes),
+           "footprint_density": float((cs ** 2).sum() / max(int(mp.free.sum()), 1))}
+
+    dist = np.full(n, -1, dtype=np.int64)
+    corridor = np.zeros((n, mp.free.size), dtype=bool)
+    for size in sizes:
+        f = mp.fleet(size)
+        sel = np.flatnonzero(cs == size)
+        inside = (start[sel] < (f.fw, f.fh)).all(axis=1) & \
+            (goal[sel] < (f.fw, f.fh)).all(axis=1)
+        sel = sel[inside]
+        s = start[sel, 1] * f.fw + start[sel, 0]
+        g = goal[sel, 1] * f.fw + goal[sel, 0]
+        fields = bfs_levels(f.free, np.concatenate([s, g]))
+        ds, dg = fields[:len(sel)], fields[len(sel):]
+        d = ds[np.arange(len(sel)), g]
+        on = (ds >= 0) & (dg >= 0) & (ds + dg == d[:, None]) & (d >= 0)[:, None]
+        corridor[sel] = footprints(on, f, mp.shape)
+        dist[sel] = d
+        out[f"density_cs{size}"] = float((cs == size).sum() / max(int(f.free.sum()), 1))
+    out["max_fleet_density"] = max(out[f"density_cs{size}"] for size in sizes) if n else 0.0
+    reached = dist >= 0
+    out["sum_bfs"] = int(dist[reached].sum())
+    out["max_bfs"] = int(dist[reached].max(initial=0))
+    out["unreachable"] = int((~reached).sum())
+
+    c = corridor.astype(np.float32)
+    shared = (c @ c.T) > 0
+    iu = np.triu_indices(n, k=1)
+    cross = cs[iu[0]] != cs[iu[1]]
+    out["corridor_cells"] = float(corridor.sum(axis=1).mean()) if n else 0.0
+    out["overlap_pairs"] = float(shared[iu].mean()) if len(iu[0]) else 0.0
+    out["cross_fleet_overlap"] = float(shared[iu][cross].mean()) if cross.any() else 0.0
+    out["max_cell_load"] = int(corridor.sum(axis=0).max(initial=0))
+
+    share = np.bincount(np.searchsorted(sizes, cs)) / max(n, 1)
+    out["size_ratio"] = float(max(sizes) / min(sizes)) if n else 0.0
+    out["size_cv"] = float(cs.std() / cs.mean()) if n else 0.0
+    out["fleet_entropy"] = float(-(share * np.log(share)).sum())
+
+    masks = mp.masks(sizes).astype(np.float32)
+    load = ((c @ masks.T) > 0).sum(axis=0)
+    out["max_passage_load"] = int(load.max(initial=0))
+    out["passages_used"] = int((load > 0).sum())
+    crossed = mp.crossings(cs, start, goal)
+    _, overlap = mp.table(sizes)
+    out["crossings"] = int(crossed.sum())
+    out["contested_share"] = float(competition(cs, crossed, overlap).sum() / max(n, 1))
+    return out
+
+
+def _extract_job(job):
+    return job, extract(job)
+
+
+def update_cache(conn, jobs, workers=1, force=False):
+    """Compute missing or stale features and store them.
+    Returns (computed, cached) counts."""
+    known = results_db.feature_digests(conn)
+    todo = []
+    for job in jobs:
+        job["digest"] = digest(job)
+        if force or known.get(rel_path(job["scen_path"])) != job["digest"]:
+            todo.append(job)
+    # one map at a time keeps the per-process passage cache warm
+    todo.sort(key=lambda j: j["map_path"])
+    if workers > 1 and len(todo) > 1:
+        with Pool(workers) as pool:
+            done = list(pool.imap_unordered(_extract_job, todo, chunksize=8))
+    else:
+        done = [_extract_job(job) for job in todo]
+    for job, feats in done:
+        label = job["agent_label"] or f"n{feats['agents']}"
+        fmt = "hetbench" if is_hetbench(job["scen_path"]) else "simple"
+        results_db.store_features(conn, rel_path(job["scen_path"]), job["digest"],
+                                  (job["category"], label, job["scen_id"]), fmt, feats)
+    conn.commit()
+    return len(done), len(jobs) - len(done)
+
+
+def is_hetbench(scen_path):
+    """True for 10-column het_bench lines (agent_id fleet_id cs vel ...)."""
+    with open(scen_path) as f:
+        for line in f:
+            parts = line.split()
+            if parts and not parts[0].startswith("#"):
+                return len(parts) >= 10
+    return False
+
+
+# ---------------------------------------------------------------------------
+# stratification
+# ---------------------------------------------------------------------------
+
+def strata(features, by, k):
+    """{key: stratum 0..k-1} from quantile bins of feature `by`, per category."""
+    out = {}
+    cats = sorted({key[0] for key in features})
+    for cat in cats:
+        keys = [key for key in features if key[0] == cat]
+        vals = np.array([features[key][by] for key in keys], dtype=float)
+        edges = np.quantile(vals, np.linspace(0, 1, k + 1)[1:-1])
+        for key, b in zip(keys, np.searchsorted(edges, vals, side="right")):
+            out[key] = int(b)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# main
+# ---------------------------------------------------------------------------
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    p.add_argument("--db", default=str(results_db.DB_PATH))
+    p.add_argument("--category", default=None,
+                   help="restrict the report (the cache always covers all files)")
+    p.add_argument("--strata", type=int, default=3,
+                   help="quantile bins per category")
+    p.add_argument("--by", default="max_cell_load", choices=FEATURES)
+    p.add_argument("--force", action="store_true", help="recompute cached rows")
+    p.add_argument("-j", "--jobs", type=int, default=1)
+    p.add_argument("--csv", default=None, help="write all features as CSV")
+    args = p.parse_args()
+
+    jobs = discover_all()
+    conn = results_db.open_db(args.db)
+    computed, cached = update_cache(conn, jobs, args.jobs, args.force)
+    print(f"{len(jobs)} scenario files: {computed} computed, {cached} cached")
+    features = results_db.load_features(conn, args.category)
+    conn.close()
+    if not features:
+        print("no het_bench-format scenarios selected")
+        return
+
+    bins = strata(features, args.by, args.strata)
+    cols = ["agents", "sum_bfs", "overlap_pairs", "max_cell_load",
+            "max_passage_load", "contested_share"]
+    print(f"\nstrata by {args.by} (median per bin)")
+    print(f"{'category':<22} {'bin':>3} {'n':>4} " +
+          " ".join(f"{c[:12]:>12}" for c in cols))
+    for cat in sorted({key[0] for key in features}):
+        for b in range(args.strata):
+            rows = [features[key] for key in features
+                    if key[0] == cat and bins[key] == b]
+            if not rows:
+                continue
+            med = [float(np.median([r[c] for r in rows])) for c in cols]
+            print(f"{cat:<22} {b:>3} {len(rows):>4} " +
+                  " ".join(f"{v:>12.3g}" for v in med))
+
+    if args.csv:
+        extra = sorted({k for f in features.values() for k in f} - set(FEATURES))
+        fields = ["category", "agent_label", "scen_id", "stratum"] + FEATURES + extra
+        with open(args.csv, "w", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            for key, feats in sorted(features.items()):
+                w.writerow(dict(zip(fields, key), stratum=bins[key], **feats))
+        print(f"\nWrote {len(features)} rows to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
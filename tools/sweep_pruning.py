@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Early-abort policies for benchmark sweeps.
+
+Both policies are off by default:
+
+  --prune-after K     after K consecutive failures of a scenario family
+                      (solver, category, scen_id) at increasing agent
+                      counts, skip the family's larger agent counts
+  --budget-factor F   cap a job's timeout at F x the fastest solved
+                      runtime in results.db for the same scenario key,
+                      but never below --budget-min seconds
+
+A skipped job, or a capped job that fails, is pruned, not failed. Its row
+keeps `solved` empty, says why in `pruned`, and is left out of
+results.db, so an earlier full-budget result for the key stays. A capped
+failure does not count towards --prune-after. Sweeps must visit each
+family in increasing agent count, which all the runners do.
+
+Runner side:
+
+    pruner = Pruner.from_args(args, db)
+    reason = pruner.skip(solver, key, timeout_s)
+    if reason is None:
+        timeout_s, cap = pruner.budget(solver, key, timeout_s)
+        ... run ...
+        reason = pruner.outcome(solver, key, solved, cap)
+"""
+import math
+
+import results_db
+
+
+def add_arguments(parser):
+    g = parser.add_argument_group("pruning")
+    g.add_argument("--prune-after", type=int, default=0, metavar="K",
+                   help="skip larger agent counts of a scenario after K "
+                        "consecutive failures (0: off)")
+    g.add_argument("--budget-factor", type=float, default=0.0, metavar="F",
+                   help="cap the timeout at F x the best solved runtime "
+                        "in results.db (0: off)")
+    g.add_argument("--budget-min", type=int, default=5, metavar="S",
+                   help="lower bound of a capped timeout in seconds")
+
+
+class Pruner:
+    """Per-sweep pruning state; keys are (category, agent_label, scen_id)."""
+
+    def __init__(self, after=0, budget_factor=0.0, budget_min_s=5, conn=None,
+                 campaign=None):
+        self.after = after
+        self.budget_factor = budget_factor
+        self.budget_min_s = budget_min_s
+        self.conn = conn
+        self.campaign = campaign  # history to take best runtimes from
+        self.best_ms = {}         # solver -> {key: ms}
+        self.failed = {}          # (solver, category, scen_id) -> [labels]
+        self.n_skipped = 0
+        self.n_capped = 0
+        self.n_cap_failed = 0
+        self.saved_s = 0.0        # timeouts of skipped jobs (upper bound)
+
+    @classmethod
+    def from_args(cls, args, conn=None, campaign=None):
+        return cls(args.prune_after, args.budget_factor, args.budget_min,
+                   conn, campaign)
+
+    @property
+    def active(self):
+        return self.after > 0 or self.budget_factor > 0
+
+    def skip(self, solver, key, timeout_s):
+        """Reason to skip this job, or None to run it."""
+        if self.after <= 0:
+            return None
+        failed = self.failed.get((solver, key[0], key[2]), [])
+        if len(failed) < self.after:
+            return None
+        self.n_skipped += 1
+        self.saved_s += timeout_s
+        return f"skipped: failed at {','.join(failed[-self.after:])}"
+
+    def budget(self, solver, key, timeout_s):
+        """(timeout_s, cap reason or None) for a job that runs."""
+        if self.budget_factor <= 0 or self.conn is None:
+            return timeout_s, None
+        if solver not in self.best_ms:
+            self.best_ms[solver] = results_db.best_runtimes(
+                self.conn, campaign=self.campaign, solver=solver)
+        best = self.best_ms[solver].get(key)
+        if best is None:
+            return timeout_s, None
+        cap = max(math.ceil(self.budget_factor * float(best) / 1000),
+                  self.budget_min_s)
+        if cap >= timeout_s:
+            return timeout_s, None
+        self.n_capped += 1
+        return cap, (f"capped: no solution in {cap}s "
+                     f"({self.budget_factor:g}x best {float(best) / 1000:.1f}s)")
+
+    def outcome(self, solver, key, solved, cap=None):
+        """Record a finished job. Returns the prune reason when a capped job
+        failed (its row is then pruned, not failed), else None."""
+        family = (solver, key[0], key[2])
+        if solved:
+            self.failed.pop(family, None)
+            return None
+        if cap is not None:
+            self.n_cap_failed += 1
+            return cap
+        self.failed.setdefault(family, []).append(key[1])
+        return None
+
+    def summary(self):
+        if not self.active:
+            return ""
+        return (f"pruning: {self.n_skipped} skipped (up to "
+                f"{self.saved_s:.0f}s of timeouts saved), "
+                f"{self.n_capped} capped budgets, "
+                f"{self.n_cap_failed} of them failed and were pruned")
@@ -1,4 +1,12 @@
-"""Upscale a .map file by an integer factor."""
+"""Upscale a .map file by an integer factor.
+
+With --header only a "scale N" line is added and the grid is kept, which
+both solvers (and the Python map loaders) read as the upscaled map, so the
+large grid is never written out. The solvers' --map-scale N does the same
+without a new file.
+
+Usage: python upscale_map.py in.map out.map scale [--header]
+"""
 import sys
 
 def upscale_map(infile, outfile, scale):
@@ -29,8 +37,19 @@ def upscale_map(infile, outfile, scale):
                 f.write(scaled_row + '\n')
     print(f"Wrote {outfile}: {new_w}x{new_h} (scale {scale}x from {w}x{h})")
 
+def write_scale_header(infile, outfile, scale):
+    with open(infile) as f:
+        lines = [l for l in f.readlines() if not l.startswith("scale")]
+    i = next(i for i, l in enumerate(lines) if l.strip() == "map")
+    with open(outfile, 'w', newline='\n') as f:
+        f.writelines(lines[:i] + [f"scale {scale}\n"] + lines[i:])
+    print(f"Wrote {outfile}: scale {scale} header")
+
 if __name__ == "__main__":
     infile = sys.argv[1]
     outfile = sys.argv[2]
     scale = int(sys.argv[3])
-    upscale_map(infile, outfile, scale)
+    if "--header" in sys.argv[4:]:
+        write_scale_header(infile, outfile, scale)
+    else:
+        upscale_map(infile, outfile, scale)